@@ -0,0 +1,545 @@
+# Copyright (C) 2022 Greenbone Networks GmbH
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+""" Deterministic generator of a synthetic feed of VTs and includes
+
+The generated feed mimics the shape of the real feed: local security checks
+with long tags and many package checks, detection VTs, vulnerability VTs
+depending on them, deep script_dependencies() chains, policy VTs with huge
+preference blobs, include files, latin-1 content and VTs with deliberate
+violations of the plugins. The same seed and number of VTs always generate
+the same feed.
+
+Usage: python benchmarks/feed.py OUTPUT_DIR [--vts N] [--seed N]
+"""
+
+import random
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple
+
+from troubadix.helper import CURRENT_ENCODING
+
+OID_PREFIX = "1.3.6.1.4.1.25623.1.0"
+# the share of each kind of VT, the rest are vulnerability VTs
+LSC_SHARE = 0.4
+DETECTION_SHARE = 0.15
+CHAIN_SHARE = 0.1
+POLICY_SHARE = 0.02
+INCLUDE_SHARE = 0.03
+LATIN1_SHARE = 0.05
+VIOLATION_SHARE = 0.1
+# the share of the local security checks with overlong tags
+OVERLONG_SHARE = 0.05
+CHAIN_DEPTH = 25
+
+_LETTERS = "abcdefghijklmnopqrstuvwxyz"
+_WORDS = (
+    "remote attacker memory buffer overflow service denial crafted request "
+    "authentication bypass information disclosure privilege escalation "
+    "arbitrary code execution input validation cross site scripting "
+    "injection component affected version vulnerability"
+).split()
+_LATIN1_WORDS = ("Müller", "Straße", "Café", "Señor", "Ångström", "naïve")
+_FAMILIES = (
+    "Web application abuses",
+    "Denial of Service",
+    "General",
+    "Product detection",
+)
+
+DESCRIPTION = """if(description)
+{{
+  script_oid("{oid}");
+  script_version("2022-08-01T10:00:00+0000");
+  script_tag(name:"last_modification", value:"2022-08-01 10:00:00 +0000 (Mon, 01 Aug 2022)");
+  script_tag(name:"creation_date", value:"2022-07-01 10:00:00 +0000 (Fri, 01 Jul 2022)");
+  script_tag(name:"cvss_base", value:"{cvss}");
+  script_tag(name:"cvss_base_vector", value:"{vector}");
+{cves}
+  script_name("{name}");
+  script_category({category});
+  script_copyright("Copyright (C) 2022 Greenbone Networks GmbH");
+  script_family("{family}");
+{calls}
+  script_tag(name:"summary", value:"{summary}");
+{tags}
+  exit(0);
+}}
+"""
+
+# the VTs and includes of the real feed used by the generated VTs
+BASE_VTS = (
+    ("global_settings.nasl", "ACT_SETTINGS"),
+    ("find_service.nasl", "ACT_GATHER_INFO"),
+    ("httpver.nasl", "ACT_GATHER_INFO"),
+    ("gather-package-list.nasl", "ACT_GATHER_INFO"),
+)
+BASE_INCLUDES = (
+    "host_details.inc",
+    "misc_func.inc",
+    "http_func.inc",
+    "http_keepalive.inc",
+    "revisions-lib.inc",
+    "pkg-lib-deb.inc",
+)
+
+VULN_VECTOR = "AV:N/AC:L/Au:N/C:P/I:P/A:P"
+DETECTION_VECTOR = "AV:N/AC:L/Au:N/C:N/I:N/A:N"
+
+
+class FeedStats(NamedTuple):
+    files: int
+    size: int
+    kinds: Dict[str, int]
+
+
+def _text(rand: random.Random, words: int) -> str:
+    """Generate a text wrapped like the tags of the feed"""
+    lines = []
+    line: List[str] = []
+    previous = None
+    for _ in range(words):
+        # repeated words are found by the grammar check
+        word = rand.choice(_WORDS)
+        while word == previous:
+            word = rand.choice(_WORDS)
+        line.append(word)
+        previous = word
+        if len(line) == 12:
+            lines.append(" ".join(line))
+            line = []
+    lines.append(" ".join(line))
+    return ("\n  ".join(lines).strip() or "foo").capitalize() + "."
+
+
+def _product(rand: random.Random) -> str:
+    return "".join(rand.choices(_LETTERS, k=rand.randint(4, 10)))
+
+
+def _cves(rand: random.Random, count: int) -> str:
+    if not count:
+        return ""
+    cves = ", ".join(
+        f'"CVE-20{rand.randint(10, 22)}-{rand.randint(1000, 99999)}"'
+        for _ in range(count)
+    )
+    return f"  script_cve_id({cves});"
+
+
+def _tags(**tags: str) -> str:
+    return "\n".join(
+        f'  script_tag(name:"{name}", value:"{value}");'
+        for name, value in tags.items()
+    )
+
+
+class FeedGenerator:
+    """Generates the VTs below <root>/nasl/common"""
+
+    def __init__(self, root: Path, seed: int = 0) -> None:
+        self.root = root
+        self.base = root / "nasl" / "common"
+        self._rand = random.Random(seed)
+        self._oid = 100000
+        self._oids: List[str] = []
+        self._detections: List[str] = []
+        self._includes: List[str] = list(BASE_INCLUDES[:4])
+        self._kinds: Dict[str, int] = {}
+        self._files = 0
+        self._size = 0
+
+    def _next_oid(self) -> str:
+        self._oid += 1
+        oid = f"{OID_PREFIX}.{self._oid}"
+        self._oids.append(oid)
+        return oid
+
+    def _write(self, kind: str, relative: str, content: str) -> None:
+        rand = self._rand
+        if kind not in ("base", "include"):
+            if rand.random() < LATIN1_SHARE:
+                content = content.replace(
+                    'script_name("',
+                    f'script_name("{rand.choice(_LATIN1_WORDS)} ',
+                )
+            if rand.random() < VIOLATION_SHARE:
+                content = rand.choice(_VIOLATIONS)(self, content)
+
+        path = self.base / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = content.encode(CURRENT_ENCODING)
+        path.write_bytes(data)
+
+        self._kinds[kind] = self._kinds.get(kind, 0) + 1
+        self._files += 1
+        self._size += len(data)
+
+    def _description(
+        self,
+        *,
+        name: str,
+        family: str,
+        category: str = "ACT_GATHER_INFO",
+        cvss: str = "7.5",
+        cves: int = 0,
+        calls: List[str] = (),
+        summary: str = "",
+        **tags: str,
+    ) -> str:
+        rand = self._rand
+        return DESCRIPTION.format(
+            oid=self._next_oid(),
+            cvss=cvss,
+            vector=DETECTION_VECTOR if cvss == "0.0" else VULN_VECTOR,
+            cves=_cves(rand, cves),
+            name=name,
+            category=category,
+            family=family,
+            calls="\n".join(f"  {call}" for call in calls),
+            summary=summary or _text(rand, 20),
+            tags=_tags(**tags),
+        )
+
+    def _includes_code(self, count: int) -> str:
+        includes = self._rand.sample(
+            self._includes, min(count, len(self._includes))
+        )
+        return "".join(f'include("{include}");\n' for include in includes)
+
+    def lsc(self, index: int) -> None:
+        rand = self._rand
+        advisory = f"DLA-{index:04d}-1"
+        package = _product(rand)
+        content = self._description(
+            name=f"Debian LTS: Security Advisory for {package} ({advisory})",
+            family="Debian Local Security Checks",
+            cves=rand.randint(1, 60),
+            calls=[
+                'script_dependencies("gather-package-list.nasl");',
+                'script_mandatory_keys("ssh/login/debian_linux", '
+                '"ssh/login/packages", re:"ssh/login/release=DEB10");',
+                'script_xref(name:"URL", value:"https://lists.debian.org/'
+                f'debian-lts-announce/2022/08/msg{index:05d}.html");',
+            ],
+            summary=f"The remote host is missing an update for the '{package}'"
+            f"\n  package(s) announced via the {advisory} advisory.",
+            insight=_text(
+                rand,
+                rand.randint(400, 800)
+                if rand.random() < OVERLONG_SHARE
+                else rand.randint(50, 300),
+            ),
+            affected=f"'{package}' package(s) on Debian Linux.",
+            solution="Please install the updated package(s).",
+            vuldetect="Checks if a vulnerable package version is present on "
+            "the target host.",
+            qod_type="package",
+            solution_type="VendorFix",
+        )
+        code = [
+            'include("revisions-lib.inc");\ninclude("pkg-lib-deb.inc");\n\n'
+            "release = dpkg_get_ssh_release();\nif(!release)\n  exit(0);\n\n"
+            'res = "";\nreport = "";\n'
+        ]
+        for _ in range(rand.randint(5, 300)):
+            code.append(
+                f'\nif(!isnull(res = isdpkgvuln(pkg:"lib{_product(rand)}", '
+                f'ver:"{rand.randint(1, 9)}.{rand.randint(0, 20)}-'
+                f'{rand.randint(1, 9)}", rls:"DEB10"))) {{\n'
+                "  report += res;\n}\n"
+            )
+        code.append(
+            '\nif(report != "") {\n  security_message(data:report);\n'
+            "} else if(__pkg_match) {\n  exit(99);\n}\n\nexit(0);\n"
+        )
+        self._write(
+            "lsc",
+            f"2022/debian/deb_dla_{index:04d}.nasl",
+            content + "\n" + "".join(code),
+        )
+
+    def detection(self, index: int) -> None:
+        rand = self._rand
+        product = _product(rand)
+        relative = f"gb_{product}_{index}_detect.nasl"
+        content = self._description(
+            name=f"{product.capitalize()} Detection (HTTP)",
+            family="Product detection",
+            cvss="0.0",
+            calls=[
+                'script_dependencies("find_service.nasl", '
+                '"httpver.nasl", "global_settings.nasl");',
+                'script_require_ports("Services/www", 80);',
+                'script_exclude_keys("Settings/disable_cgi_scanning");',
+            ],
+            summary=f"HTTP based detection of {product}.",
+            qod_type="remote_banner",
+        )
+        code = (
+            f"{self._includes_code(3)}\n"
+            "port = http_get_port(default:80);\n"
+            'res = http_get_cache(port:port, item:"/");\n\n'
+            f'if("<title>{product}</title>" >< res) {{\n'
+            '  version = "unknown";\n'
+            f'  set_kb_item(name:"{product}/detected", value:TRUE);\n'
+            f'  cpe = "cpe:/a:{product}:{product}";\n'
+            f'  register_product(cpe:cpe, location:"/", port:port, '
+            'service:"www");\n'
+            f'  log_message(data:build_detection_report(app:"{product}", '
+            'version:version, install:"/", cpe:cpe), port:port);\n}\n\n'
+            "exit(0);\n"
+        )
+        self._detections.append(relative)
+        self._write("detection", relative, content + "\n" + code)
+
+    def vulnerability(self, index: int) -> None:
+        rand = self._rand
+        detection = (
+            rand.choice(self._detections)
+            if self._detections
+            else "gb_product_detect.nasl"
+        )
+        product = detection.split("_")[1]
+        content = self._description(
+            name=f"{product.capitalize()} < 1.{index} Multiple Vulnerabilities",
+            family=rand.choice(_FAMILIES[:3]),
+            category=rand.choice(("ACT_GATHER_INFO", "ACT_ATTACK")),
+            cves=rand.randint(0, 5),
+            calls=[
+                f'script_dependencies("{detection}");',
+                f'script_mandatory_keys("{product}/detected");',
+                'script_xref(name:"URL", value:"https://example.com/'
+                f'advisories/{index}");',
+            ],
+            insight=_text(rand, rand.randint(10, 120)),
+            affected=f"{product} prior to version 1.{index}.",
+            solution=f"Update to version 1.{index} or later.",
+            qod_type="remote_banner",
+            solution_type="VendorFix",
+        )
+        code = (
+            f"{self._includes_code(2)}\n"
+            f'if(!port = get_app_port(cpe:"cpe:/a:{product}:{product}"))\n'
+            "  exit(0);\n\n"
+            f'if(version_is_less(version:"1.0", test_version:"1.{index}")) {{\n'
+            f'  report = report_fixed_ver(installed_version:"1.0", '
+            f'fixed_version:"1.{index}");\n'
+            "  security_message(port:port, data:report);\n  exit(0);\n}\n\n"
+            "exit(99);\n"
+        )
+        self._write(
+            "vulnerability",
+            f"2022/{product}/gb_{product}_vuln_{index}.nasl",
+            content + "\n" + code,
+        )
+
+    def chain(self, index: int) -> None:
+        """A chain of VTs, each depending on the previous one"""
+        chain = index // CHAIN_DEPTH
+        depth = index % CHAIN_DEPTH
+        calls = ['script_require_ports("Services/www", 80);']
+        if depth:
+            calls.insert(
+                0,
+                f'script_dependencies("chain_{chain}_{depth - 1}.nasl");',
+            )
+        content = self._description(
+            name=f"Chain {chain} Step {depth}",
+            family="General",
+            cvss="0.0",
+            calls=calls,
+            qod_type="remote_active",
+        )
+        self._write(
+            "chain",
+            f"chain_{chain}_{depth}.nasl",
+            content
+            + f'\nset_kb_item(name:"chain/{chain}/{depth}", value:TRUE);\n'
+            "exit(0);\n",
+        )
+
+    def policy(self, index: int) -> None:
+        rand = self._rand
+        calls = [
+            f'script_add_preference(name:"Value {i}", type:"entry", '
+            f'value:"{_product(rand)}", id:{i + 1});'
+            for i in range(rand.randint(50, 400))
+        ]
+        blob = _text(rand, rand.randint(2000, 20000))
+        content = self._description(
+            name=f"Policy Compliance Check {index}",
+            family="Policy",
+            cvss="0.0",
+            calls=calls,
+            summary="Checks the compliance of the host with the policy.",
+            qod_type="general_note",
+        )
+        content += (
+            f'\n{self._includes_code(2)}\npolicy = "{blob}";\n\n'
+            "log_message(data:policy, port:0);\n\nexit(0);\n"
+        )
+        self._write("policy", f"policy/policy_{index}.nasl", content)
+
+    def include(self, index: int) -> None:
+        rand = self._rand
+        name = f"{_product(rand)}_func.inc"
+        functions = []
+        for i in range(rand.randint(5, 60)):
+            functions.append(
+                f"function {name[:-9]}_{i}(data) {{\n"
+                "  local_var result;\n\n"
+                "  if(!data)\n    return NULL;\n\n"
+                f'  result = ereg_replace(string:data, pattern:"[{i}]+", '
+                'replace:"");\n'
+                "  return result;\n}\n"
+            )
+        self._includes.append(name)
+        self._write(
+            "include",
+            name,
+            "# Copyright (C) 2022 Greenbone Networks GmbH\n\n"
+            + "\n".join(functions),
+        )
+
+    def base_files(self) -> None:
+        """The VTs and includes of the real feed the generated VTs depend
+        on"""
+        for relative, category in BASE_VTS:
+            content = self._description(
+                name=relative[:-5].replace("_", " ").capitalize(),
+                family="Settings" if category == "ACT_SETTINGS" else "General",
+                cvss="0.0",
+                category=category,
+                summary=f"Base VT {relative}.",
+                qod_type="remote_banner",
+            )
+            self._write("base", relative, content + "\nexit(0);\n")
+
+        for relative in BASE_INCLUDES:
+            self._write(
+                "base",
+                relative,
+                "# Copyright (C) 2022 Greenbone Networks GmbH\n\n"
+                f"function {relative[:-4].replace('-', '_')}() {{\n"
+                "  return TRUE;\n}\n",
+            )
+
+    def generate(self, vts: int) -> FeedStats:
+        """Generate the given number of VTs and include files in addition to
+        the base VTs"""
+        self.base_files()
+        kinds = (
+            (INCLUDE_SHARE, self.include),
+            (DETECTION_SHARE, self.detection),
+            (LSC_SHARE, self.lsc),
+            (CHAIN_SHARE, self.chain),
+            (POLICY_SHARE, self.policy),
+        )
+        counts = {generate: int(vts * share) for share, generate in kinds}
+        # the dependencies of a VT are generated before the VT itself
+        for _, generate in kinds:
+            for index in range(counts[generate]):
+                generate(index)
+        for index in range(vts - sum(counts.values())):
+            self.vulnerability(index)
+
+        return FeedStats(self._files, self._size, dict(self._kinds))
+
+
+def _invalid_cvss(generator: FeedGenerator, content: str) -> str:
+    return content.replace('value:"7.5"', 'value:"17.5"', 1)
+
+
+def _missing_solution_type(generator: FeedGenerator, content: str) -> str:
+    return content.replace(
+        '  script_tag(name:"solution_type", value:"VendorFix");\n', ""
+    )
+
+
+def _trailing_whitespace(generator: FeedGenerator, content: str) -> str:
+    return content.replace(");\n", ");  \n", 3)
+
+
+def _tabs(generator: FeedGenerator, content: str) -> str:
+    return content.replace("\n  ", "\n\t", 5)
+
+
+def _misspelling(generator: FeedGenerator, content: str) -> str:
+    return content.replace("remote", "remtoe", 2)
+
+
+def _duplicate_oid(generator: FeedGenerator, content: str) -> str:
+    oid = generator._oids[-1]
+    other = generator._rand.choice(generator._oids)
+    return content.replace(oid, other, 1)
+
+
+def _todo(generator: FeedGenerator, content: str) -> str:
+    return content.replace("exit(0);\n}\n", "exit(0);\n}\n\n# TODO: fix\n", 1)
+
+
+def _http_link(generator: FeedGenerator, content: str) -> str:
+    return content.replace(
+        'script_tag(name:"summary", value:"',
+        'script_tag(name:"summary", value:"See https://example.com. ',
+        1,
+    )
+
+
+def _display(generator: FeedGenerator, content: str) -> str:
+    return content + '\ndisplay("debug");\n'
+
+
+def _double_end_points(generator: FeedGenerator, content: str) -> str:
+    return content.replace('.");', '..");', 1)
+
+
+_VIOLATIONS: List[Callable[[FeedGenerator, str], str]] = [
+    _invalid_cvss,
+    _missing_solution_type,
+    _trailing_whitespace,
+    _tabs,
+    _misspelling,
+    _duplicate_oid,
+    _todo,
+    _http_link,
+    _display,
+    _double_end_points,
+]
+
+
+def generate_feed(root: Path, vts: int, seed: int = 0) -> FeedStats:
+    """Generate a feed with the given number of VTs below <root>/nasl"""
+    return FeedGenerator(root, seed).generate(vts)
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--vts", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    stats = generate_feed(args.output, args.vts, args.seed)
+    kinds = ", ".join(f"{kind}: {count}" for kind, count in stats.kinds.items())
+    print(f"Generated {stats.files} files ({stats.size} bytes) - {kinds}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+# Copyright (C) 2022 Greenbone Networks GmbH
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+""" Benchmark of the grammar check on large LSC like files
+
+Usage: python benchmarks/grammar.py [--packages N] [--repeat N]
+"""
+
+import random
+import re
+import timeit
+from argparse import ArgumentParser
+
+from troubadix.plugins.grammar import (
+    GrammarEngine,
+    get_false_positives_pattern,
+    get_grammer_pattern,
+)
+
+NASL_FILE = "2022/debian/deb_dla_0000.nasl"
+
+HEADER = """if(description)
+{
+  script_oid("1.3.6.1.4.1.25623.1.0.890000");
+  script_version("2022-08-01T10:00:00+0000");
+  script_tag(name:"cvss_base", value:"7.5");
+  script_name("Debian LTS: Security Advisory for foo (DLA-0000-1)");
+  script_tag(name:"summary", value:"The remote host is missing an update for
+  the 'foo' package(s) announced via the DLA-0000-1 advisory.");
+  script_tag(name:"insight", value:"Multiple vulnerabilities were discovered
+  in foo, which could result in denial of service or the execution of
+  arbitrary code. A remote attacker is able to bypass the authentication.");
+  script_tag(name:"solution", value:"Please install the updated package(s).");
+  script_tag(name:"solution_type", value:"VendorFix");
+  script_family("Debian Local Security Checks");
+  exit(0);
+}
+
+include("revisions-lib.inc");
+include("pkg-lib-deb.inc");
+
+release = dpkg_get_ssh_release();
+if(!release)
+  exit(0);
+
+res = "";
+report = "";
+"""
+
+PACKAGE = """
+if(!isnull(res = isdpkgvuln(pkg:"{name}", ver:"{version}", rls:"DEB10"))) {{
+  report += res;
+}}
+"""
+
+FOOTER = """
+if(report != "") {
+  security_message(data:report);
+} else if(__pkg_match) {
+  exit(99);
+}
+
+exit(0);
+"""
+
+
+def generate_content(packages: int) -> str:
+    rand = random.Random(packages)
+    parts = [HEADER]
+    for _ in range(packages):
+        name = "lib" + "".join(rand.choices("abcdefghijklmnopqrstuvwxyz", k=8))
+        version = (
+            f"{rand.randint(1, 9)}.{rand.randint(0, 20)}-{rand.randint(1, 9)}"
+        )
+        parts.append(PACKAGE.format(name=name, version=version))
+    parts.append(FOOTER)
+    return "".join(parts)
+
+
+def old_check(pattern: re.Pattern, content: str) -> list:
+    false_positives = get_false_positives_pattern(NASL_FILE)
+    return [
+        match.group(0)
+        for match in pattern.finditer(content)
+        if not false_positives.search(match.group(0))
+    ]
+
+
+def new_check(engine: GrammarEngine, content: str) -> list:
+    false_positives = get_false_positives_pattern(NASL_FILE)
+    return [
+        match.group(0)
+        for match in engine.finditer(content)
+        if not false_positives.search(match.group(0))
+    ]
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--packages", type=int, nargs="+", default=[10, 100, 1000]
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pattern = get_grammer_pattern()
+    engine = GrammarEngine(pattern)
+
+    print(f"{'packages':>8} {'size':>10} {'finditer':>12} {'engine':>12}")
+    for packages in args.packages:
+        content = generate_content(packages)
+        assert old_check(pattern, content) == new_check(engine, content)
+
+        old = min(
+            timeit.repeat(
+                lambda: old_check(pattern, content),
+                number=1,
+                repeat=args.repeat,
+            )
+        )
+        new = min(
+            timeit.repeat(
+                lambda: new_check(engine, content), number=1, repeat=args.repeat
+            )
+        )
+        print(
+            f"{packages:>8} {len(content):>10} {old * 1000:>10.2f}ms "
+            f"{new * 1000:>10.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
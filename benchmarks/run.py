@@ -0,0 +1,259 @@
+# Copyright (C) 2022 Greenbone Networks GmbH
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+""" Benchmark suite of troubadix on a synthetic feed
+
+Generates a feed with benchmarks/feed.py and measures the file discovery,
+each plugin on its own, complete runs of the runner with several numbers of
+worker processes and the reporter. The results are written as JSON and can
+be compared with the results of a previous run to catch regressions.
+
+Every plugin gets a fresh context per file. Therefore the costs of decoding
+the content and scanning the script calls are included in the time of each
+plugin.
+
+Usage: python -m benchmarks.run [--vts N] [--seed N] [--feed DIR]
+    [--jobs N ...] [--repeat N] [--output FILE] [--compare FILE]
+    [--threshold RATIO]
+"""
+
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from multiprocessing import cpu_count
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from pontos.terminal.terminal import ConsoleTerminal
+
+from benchmarks.feed import generate_feed
+from troubadix.__version__ import __version__
+from troubadix.discovery import FileFinder
+from troubadix.plugin import FilePluginContext, FilesPluginContext
+from troubadix.plugins import StandardPlugins
+from troubadix.reporter import Reporter, SARIFSink
+from troubadix.results import FileResults, Results
+from troubadix.runner import Runner
+
+# Increase if the format of the results changes
+RESULTS_FORMAT_VERSION = 1
+DEFAULT_OUTPUT = Path("benchmark-results.json")
+
+
+class Benchmarks:
+    """Runs the benchmarks on a feed and collects the durations"""
+
+    def __init__(self, root: Path, repeat: int) -> None:
+        self.root = root
+        self.repeat = repeat
+        self.plugins = StandardPlugins(None, None)
+        self.results: Dict[str, dict] = {}
+        self.files: List[Path] = []
+        self.contents: Dict[Path, bytes] = {}
+        self.file_results: Dict[Path, FileResults] = {}
+
+    def measure(self, name: str, function: Callable[[], None]) -> None:
+        durations = []
+        for _ in range(self.repeat):
+            with redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                function()
+                durations.append(time.perf_counter() - start)
+
+        self.results[name] = {
+            "min": min(durations),
+            "mean": statistics.mean(durations),
+            "durations": durations,
+        }
+        print(f"{name:60} {min(durations) * 1000:12.2f}ms", flush=True)
+
+    def discovery(self) -> None:
+        finder = FileFinder(["**/*.nasl", "**/*.inc"])
+        self.measure("discovery", lambda: finder.find([self.root]))
+        self.files = sorted(finder.find([self.root]))
+        self.contents = {
+            nasl_file: nasl_file.read_bytes() for nasl_file in self.files
+        }
+        self.file_results = {
+            nasl_file: FileResults(nasl_file) for nasl_file in self.files
+        }
+
+    def plugins_each(self) -> None:
+        for plugin_class in self.plugins.file_plugins:
+
+            def run_plugin(plugin_class=plugin_class) -> None:
+                for nasl_file, content in self.contents.items():
+                    context = FilePluginContext(
+                        root=self.root,
+                        nasl_file=nasl_file,
+                        raw_content=content,
+                    )
+                    results = list(plugin_class(context).run())
+                    # keep the results of the last repetition for the
+                    # reporter
+                    self.file_results[nasl_file].plugin_results[
+                        plugin_class.name
+                    ] = results
+
+            self.measure(f"plugin/{plugin_class.name}", run_plugin)
+
+        context = FilesPluginContext(root=self.root, nasl_files=self.files)
+        for plugin_class in self.plugins.files_plugins:
+            self.measure(
+                f"plugin/{plugin_class.name}",
+                lambda plugin_class=plugin_class: list(
+                    plugin_class(context).run()
+                ),
+            )
+
+    def runner(self, jobs: List[int]) -> None:
+        for n_jobs in jobs:
+
+            def run(n_jobs=n_jobs) -> None:
+                term = ConsoleTerminal()
+                reporter = Reporter(term, self.root, statistic=False)
+                Runner(n_jobs, reporter, root=self.root).run(self.files)
+                reporter.close()
+
+            self.measure(f"runner/j{n_jobs}", run)
+
+    def reporter(self) -> None:
+        def report(verbose: int = 0, sinks: list = ()) -> None:
+            reporter = Reporter(
+                ConsoleTerminal(), self.root, verbose=verbose, sinks=sinks
+            )
+            for i, results in enumerate(self.file_results.values(), 1):
+                results.has_plugin_results = any(
+                    results.plugin_results.values()
+                )
+                reporter.report_by_file_plugin(results, i)
+            reporter.report_by_plugin(Results())
+            reporter.report_statistic()
+            reporter.close()
+
+        self.measure("reporter/statistic", report)
+        self.measure("reporter/verbose", lambda: report(verbose=2))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self.measure(
+                "reporter/sarif",
+                lambda: report(
+                    sinks=[SARIFSink(Path(tmpdir) / "results.sarif", self.root)]
+                ),
+            )
+
+
+def compare(results: dict, baseline_path: Path, threshold: float) -> bool:
+    """Print the ratios of the durations to the baseline
+
+    Returns:
+        True if no benchmark is slower than the baseline by more than the
+        threshold
+    """
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    success = True
+    print(f"\n{'benchmark':60} {'baseline':>12} {'current':>12} {'ratio':>8}")
+    for name, result in results["benchmarks"].items():
+        base = baseline.get("benchmarks", {}).get(name)
+        if not base:
+            continue
+
+        ratio = result["min"] / base["min"] if base["min"] else 1.0
+        marker = ""
+        if ratio > threshold:
+            marker = " !"
+            success = False
+        print(
+            f"{name:60} {base['min'] * 1000:10.2f}ms "
+            f"{result['min'] * 1000:10.2f}ms {ratio:8.2f}{marker}"
+        )
+    return success
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--vts", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--feed",
+        type=Path,
+        help="Generate the feed in this empty directory and keep it",
+    )
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument(
+        "--compare",
+        type=Path,
+        metavar="FILE",
+        help="Compare the results with the results of a previous run",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="Fail if a benchmark is slower than the compared one by more "
+        "than this ratio",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output = args.feed or Path(tmpdir)
+        feed = generate_feed(output, args.vts, args.seed)
+        root = output.resolve() / "nasl"
+
+        # the worker processes can't be more than the available cpus
+        jobs = sorted({min(n_jobs, cpu_count()) for n_jobs in args.jobs})
+
+        benchmarks = Benchmarks(root, args.repeat)
+        benchmarks.discovery()
+        benchmarks.plugins_each()
+        benchmarks.runner(jobs)
+        benchmarks.reporter()
+
+    results = {
+        "version": RESULTS_FORMAT_VERSION,
+        "troubadix": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": cpu_count(),
+        "feed": {
+            "vts": args.vts,
+            "seed": args.seed,
+            "files": feed.files,
+            "size": feed.size,
+            "kinds": feed.kinds,
+        },
+        "repeat": args.repeat,
+        "benchmarks": benchmarks.results,
+    }
+    args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(f"Results written to {os.fspath(args.output)}")
+
+    if args.compare and not compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
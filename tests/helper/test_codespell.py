@@ -0,0 +1,186 @@
+# Copyright (C) 2022 Greenbone Networks GmbH
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import io
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from codespell_lib import main as codespell_main
+
+from tests.plugins import TemporaryDirectory
+from troubadix.helper.codespell import Codespell, Misspelling, get_codespell
+
+_here = Path(__file__).parent
+_codespell_config_path = _here.parent.parent / "troubadix" / "codespell"
+
+
+class CodespellTestCase(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = TemporaryDirectory()
+        tmpdir = Path(self._tmpdir.__enter__())
+
+        dictionary = tmpdir / "dictionary.txt"
+        dictionary.write_text(
+            "teh->the\n"
+            "ba->by, be,\n"
+            "clas->class, disabled due to name clash\n"
+            "ignored->ignore\n"
+            "tihs->this\n"
+            "ist->is, it, its\n"
+            "don't->do not\n",
+            encoding="utf-8",
+        )
+        exclude_file = tmpdir / "exclude.txt"
+        exclude_file.write_text("  skip teh line\n", encoding="utf-8")
+        ignore_file = tmpdir / "ignore.txt"
+        ignore_file.write_text("ignored\nTihs\n", encoding="utf-8")
+
+        self.codespell = Codespell([dictionary], exclude_file, ignore_file)
+        self.file = tmpdir / "file.nasl"
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def check(self, content: bytes):
+        return list(self.codespell.check(self.file, content))
+
+    def test_misspellings(self):
+        results = self.check(b"Teh TEH teh\r\nba ignored\rTihs tihs\n")
+
+        self.assertEqual(
+            results,
+            [
+                Misspelling(self.file, 1, "Teh", ("The",)),
+                Misspelling(self.file, 1, "TEH", ("THE",)),
+                Misspelling(self.file, 1, "teh", ("the",)),
+                Misspelling(self.file, 2, "ba", ("by", "be")),
+                Misspelling(self.file, 3, "tihs", ("this",)),
+            ],
+        )
+        self.assertEqual(str(results[3]), f"{self.file}:2: ba ==> by, be")
+        self.assertEqual(results[3].message, "ba ==> by, be")
+
+    def test_reason(self):
+        results = self.check(b"clas")
+
+        self.assertEqual(
+            results,
+            [
+                Misspelling(
+                    self.file,
+                    1,
+                    "clas",
+                    ("class",),
+                    "disabled due to name clash",
+                )
+            ],
+        )
+        self.assertEqual(
+            str(results[0]),
+            f"{self.file}:1: clas ==> class  | disabled due to name clash",
+        )
+
+    def test_alternative_apostrophe(self):
+        results = self.check("don’t".encode("utf-8"))
+
+        self.assertEqual(
+            results, [Misspelling(self.file, 1, "don’t", ("do not",))]
+        )
+
+    def test_excluded_line(self):
+        self.assertEqual(self.check(b"  skip teh line   \n"), [])
+        self.assertEqual(len(self.check(b"skip teh line\n")), 1)
+
+    def test_escape_sequence(self):
+        self.assertEqual(self.check(b"\\tihs \\nteh"), [])
+        self.assertEqual(len(self.check(b"\\ist")), 1)
+
+    def test_encoding(self):
+        self.assertEqual(
+            self.check("für teh".encode("latin-1")),
+            [Misspelling(self.file, 1, "teh", ("the",))],
+        )
+
+    def test_binary(self):
+        self.assertEqual(self.check(b"\x00teh"), [])
+
+    def test_ignore_directive(self):
+        self.assertEqual(self.check(b"teh tihs  # codespell:ignore\n"), [])
+        self.assertEqual(
+            self.check(b"teh tihs ba  # codespell:ignore teh,tihs\n"),
+            [Misspelling(self.file, 1, "ba", ("by", "be"))],
+        )
+        # not a directive without a preceding comment character
+        self.assertEqual(len(self.check(b"teh codespell:ignore\n")), 1)
+
+    def test_ignore_next_line_directive(self):
+        self.assertEqual(
+            self.check(
+                b"# codespell:ignore-next-line\n"
+                b"teh ba\n"
+                b"# codespell:ignore-next-line teh\n"
+                b"teh ba\n"
+                b"teh\n"
+            ),
+            [
+                Misspelling(self.file, 4, "ba", ("by", "be")),
+                Misspelling(self.file, 5, "teh", ("the",)),
+            ],
+        )
+        # the listed words are ignored on the line of the directive as well
+        self.assertEqual(
+            self.check(b"teh ba  # codespell:ignore-next-line teh\nteh\n"),
+            [Misspelling(self.file, 1, "ba", ("by", "be"))],
+        )
+
+
+class CodespellParityTestCase(unittest.TestCase):
+    def test_parity(self):
+        additions = _codespell_config_path / "codespell.additions"
+        exclude_file = _codespell_config_path / "codespell.exclude"
+        ignore_words_file = _codespell_config_path / "codespell.ignore"
+        codespell = get_codespell(additions, exclude_file, ignore_words_file)
+
+        for nasl_file in [
+            _here.parent / "plugins" / "test.nasl",
+            _here.parent / "plugins" / "test_files" / "fail_spelling.nasl",
+            _here.parent
+            / "plugins"
+            / "test_files"
+            / "fail_spelling_directives.nasl",
+        ]:
+            with self.subTest(nasl_file=nasl_file.name):
+                with redirect_stdout(io.StringIO()) as f:
+                    codespell_main(
+                        "--dictionary=-",
+                        f"--dictionary={additions}",
+                        f"--exclude-file={exclude_file}",
+                        f"--ignore-words={ignore_words_file}",
+                        "--disable-colors",
+                        str(nasl_file),
+                    )
+
+                self.assertEqual(
+                    [
+                        str(misspelling)
+                        for misspelling in codespell.check(
+                            nasl_file, nasl_file.read_bytes()
+                        )
+                    ],
+                    f.getvalue().splitlines(),
+                )
@@ -0,0 +1,91 @@
+# Copyright (C) 2022 Greenbone Networks GmbH
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+from pathlib import Path
+
+from tests.plugins import TemporaryDirectory
+from troubadix.helper.git import GitError, get_changed_files, git
+
+
+def commit(repo: Path, message: str) -> None:
+    git("add", "-A", cwd=repo)
+    git(
+        "-c",
+        "user.name=Foo",
+        "-c",
+        "user.email=foo@example.com",
+        "commit",
+        "-q",
+        "-m",
+        message,
+        cwd=repo,
+    )
+
+
+class GetChangedFilesTestCase(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = TemporaryDirectory()
+        self.repo = Path(self._tmpdir.__enter__()).resolve()
+        git("init", "-q", cwd=self.repo)
+        for name in ["a.nasl", "b.nasl", "c.nasl", "d.nasl"]:
+            (self.repo / name).write_text(name, encoding="utf-8")
+        commit(self.repo, "Initial")
+        git("tag", "base", cwd=self.repo)
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def test_changed_since(self):
+        (self.repo / "a.nasl").write_text("changed", encoding="utf-8")
+        (self.repo / "b.nasl").unlink()
+        (self.repo / "sub dir").mkdir()
+        git("mv", "c.nasl", "sub dir/e.nasl", cwd=self.repo)
+        commit(self.repo, "Change")
+        # uncommitted changes are included
+        (self.repo / "d.nasl").write_text("changed", encoding="utf-8")
+        # untracked files are included unless they are ignored
+        (self.repo / "f.nasl").write_text("new", encoding="utf-8")
+        (self.repo / "g.nasl").write_text("ignored", encoding="utf-8")
+        (self.repo / ".git" / "info" / "exclude").write_text(
+            "g.nasl\n", encoding="utf-8"
+        )
+
+        files = get_changed_files("base", toplevel=self.repo)
+
+        self.assertEqual(
+            sorted(files),
+            [
+                self.repo / "a.nasl",
+                self.repo / "d.nasl",
+                self.repo / "f.nasl",
+                self.repo / "sub dir" / "e.nasl",
+            ],
+        )
+
+    def test_staged(self):
+        (self.repo / "a.nasl").write_text("changed", encoding="utf-8")
+        (self.repo / "f.nasl").write_text("new", encoding="utf-8")
+        git("add", "f.nasl", cwd=self.repo)
+
+        files = get_changed_files(staged=True, toplevel=self.repo)
+
+        self.assertEqual(files, [self.repo / "f.nasl"])
+
+    def test_invalid_revision(self):
+        with self.assertRaises(GitError):
+            get_changed_files("nonexistent", toplevel=self.repo)
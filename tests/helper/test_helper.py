@@ -0,0 +1,54 @@
+# Copyright (C) 2022 Greenbone Networks GmbH
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import stat
+import unittest
+from unittest.mock import patch
+
+from tests.plugins import TemporaryDirectory
+from troubadix.helper import write_file_atomically
+
+
+class WriteFileAtomicallyTestCase(unittest.TestCase):
+    def test_write(self):
+        with TemporaryDirectory() as tempdir:
+            path = tempdir / "test.nasl"
+            path.write_bytes(b"old")
+            path.chmod(0o640)
+
+            write_file_atomically(path, b"new\r\n")
+
+            self.assertEqual(path.read_bytes(), b"new\r\n")
+            self.assertEqual(stat.S_IMODE(path.stat().st_mode), 0o640)
+            self.assertEqual(list(tempdir.iterdir()), [path])
+
+    def test_failed_write(self):
+        with TemporaryDirectory() as tempdir:
+            path = tempdir / "test.nasl"
+            path.write_bytes(b"old")
+
+            with patch("os.replace", side_effect=OSError("failed")):
+                with self.assertRaises(OSError):
+                    write_file_atomically(path, b"new")
+
+            self.assertEqual(path.read_bytes(), b"old")
+            self.assertEqual(list(tempdir.iterdir()), [path])
+
+    def test_missing_file(self):
+        with TemporaryDirectory() as tempdir:
+            with self.assertRaises(FileNotFoundError):
+                write_file_atomically(tempdir / "missing.nasl", b"new")
@@ -0,0 +1,108 @@
+# Copyright (C) 2022 Greenbone Networks GmbH
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+from pathlib import Path
+
+from troubadix.helper import CURRENT_ENCODING
+from troubadix.helper.patterns import (
+    ScriptTag,
+    SpecialScriptTag,
+    get_script_tag_pattern,
+    get_special_script_tag_pattern,
+)
+from troubadix.helper.vt_metadata import VTMetadata
+
+_here = Path(__file__).parent.parent / "plugins"
+
+
+class VTMetadataTestCase(unittest.TestCase):
+    def test_script_tags(self):
+        content = (
+            'script_tag(name:"cvss_base", value:"4.0");\n'
+            'script_tag(name:"cvss_base_vector", '
+            'value:"AV:N/AC:L/Au:S/C:N/I:P/A:N");\n'
+            'script_tag(name:"qod", value:"97");\n'
+            'script_tag(name:"qod", value:"30");\n'
+        )
+        vt_metadata = VTMetadata(content)
+
+        self.assertEqual(vt_metadata.cvss_base, "4.0")
+        self.assertFalse(vt_metadata.is_detection)
+
+        matches = vt_metadata.get_script_tags(ScriptTag.QOD)
+        self.assertEqual(len(matches), 2)
+        self.assertEqual(matches[0].group("value"), "97")
+        self.assertEqual(matches[1].group("value"), "30")
+        self.assertEqual(vt_metadata.get_line_number(matches[1]), 4)
+
+        self.assertIsNone(vt_metadata.get_script_tag(ScriptTag.SOLUTION))
+
+    def test_invalid_value(self):
+        vt_metadata = VTMetadata('script_tag(name:"cvss_base", value:"a12");')
+
+        self.assertIsNone(vt_metadata.get_script_tag(ScriptTag.CVSS_BASE))
+        self.assertIsNone(vt_metadata.cvss_base)
+
+    def test_special_script_tags(self):
+        content = (
+            'script_oid("1.3.6.1.4.1.25623.1.0.100313");\n'
+            'script_family("Product detection");\n'
+            "script_category(ACT_GATHER_INFO);\n"
+            'script_dependencies("foo.nasl", "bar.nasl");\n'
+            "script_script_tag(foo);\n"
+        )
+        vt_metadata = VTMetadata(content)
+
+        self.assertEqual(vt_metadata.oid, "1.3.6.1.4.1.25623.1.0.100313")
+        self.assertEqual(vt_metadata.family, "Product detection")
+        self.assertEqual(vt_metadata.category, "ACT_GATHER_INFO")
+        self.assertIsNone(vt_metadata.name)
+
+        match = vt_metadata.get_special_script_tag(
+            SpecialScriptTag.DEPENDENCIES
+        )
+        self.assertEqual(match.group("value"), 'foo.nasl", "bar.nasl')
+        self.assertEqual(vt_metadata.get_line_number(match), 4)
+
+        position = content.index("script_script_tag")
+        self.assertEqual(vt_metadata.calls["script_tag"], [position])
+        self.assertEqual(vt_metadata.calls["tag"], [position + 7])
+
+    def test_same_as_patterns(self):
+        for nasl_file in _here.glob("**/*.nasl"):
+            content = nasl_file.read_text(encoding=CURRENT_ENCODING)
+            vt_metadata = VTMetadata(content)
+
+            for tag in ScriptTag:
+                self.assertEqual(
+                    [
+                        m.span()
+                        for m in get_script_tag_pattern(tag).finditer(content)
+                    ],
+                    [m.span() for m in vt_metadata.get_script_tags(tag)],
+                )
+
+            for tag in SpecialScriptTag:
+                pattern = get_special_script_tag_pattern(tag)
+                self.assertEqual(
+                    [m.span() for m in pattern.finditer(content)],
+                    [
+                        m.span()
+                        for m in vt_metadata.get_special_script_tags(tag)
+                    ],
+                )
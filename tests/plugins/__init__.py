@@ -15,13 +15,19 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import os
 import tempfile
 import unittest
 from pathlib import Path
 from typing import Iterable
 from unittest.mock import MagicMock
 
-from troubadix.plugin import FilePluginContext, FilesPluginContext
+from troubadix.helper import CURRENT_ENCODING, VTMetadata
+from troubadix.plugin import (
+    FilePluginContext,
+    FilesPluginContext,
+    FixTransaction,
+)
 
 
 class TemporaryDirectory:
@@ -56,13 +62,22 @@ class PluginTestCase(unittest.TestCase):
         file_content: str = None,
         lines: Iterable[str] = None,
         root: Path = None,
+        raw_content: bytes = None,
+        stat: os.stat_result = None,
     ) -> FilePluginContext:
         """Create a FilePluginContext mock"""
         fake_context = MagicMock()
         fake_context.nasl_file = nasl_file
         fake_context.file_content = file_content
+        if raw_content is None and file_content is not None:
+            raw_content = file_content.encode(CURRENT_ENCODING)
+        fake_context.raw_content = raw_content
+        fake_context.stat = stat
         fake_context.lines = lines
         fake_context.root = root
+        if file_content is not None:
+            fake_context.vt_metadata = VTMetadata(file_content)
+            fake_context.fixes = FixTransaction(file_content)
         return fake_context
 
     def create_files_plugin_context(
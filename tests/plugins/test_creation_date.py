@@ -16,7 +16,6 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from pathlib import Path
-from unittest.mock import MagicMock
 
 from troubadix.plugin import LinterError
 from troubadix.plugins.creation_date import CheckCreationDate
@@ -139,9 +138,9 @@ class CheckCreationDateTestCase(PluginTestCase):
             'script_tag(name:"creation_date", value:"2013-05-14 11:24:55 +0200 '
             '(Tue, 14 May 2013 )");'
         )
-        fake_context = MagicMock()
-        fake_context.nasl_file = path
-        fake_context.file_content = content
+        fake_context = self.create_file_plugin_context(
+            nasl_file=path, file_content=content
+        )
         plugin = CheckCreationDate(fake_context)
 
         results = list(plugin.run())
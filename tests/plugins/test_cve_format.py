@@ -40,6 +40,16 @@ class CheckCVEFormatTestCase(PluginTestCase):
 
         self.assertEqual(len(results), 0)
 
+    def test_cache_inputs(self):
+        fake_context = self.create_file_plugin_context(
+            nasl_file=Path("some/file.nasl")
+        )
+        plugin = CheckCVEFormat(fake_context)
+
+        self.assertEqual(
+            list(plugin.get_cache_inputs()), [str(datetime.now().year)]
+        )
+
     def test_exclude_inc_file(self):
         path = Path("some/file.inc")
         fake_context = self.create_file_plugin_context(nasl_file=path)
@@ -152,3 +152,59 @@ class CheckNewlinesTestCase(PluginTestCase):
             'open redirect vulnerability.");',
             results[0].message,
         )
+
+    def test_grammar_multiline(self):
+        nasl_file = Path(__file__).parent / "test.nasl"
+        content = (
+            'script_tag(name:"cvss_base", value:"4.0");\n'
+            'script_tag(name:"insight", value:"Foo is affected by the\n'
+            '  the following vulnerabilities.");\n'
+            'script_tag(name:"solution", value:"meh");\n'
+        )
+
+        fake_context = self.create_file_plugin_context(
+            nasl_file=nasl_file, file_content=content
+        )
+        plugin = CheckGrammar(fake_context)
+
+        results = list(plugin.run())
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual(
+            "VT/Include has the following grammar problem: "
+            'script_tag(name:"insight", value:"Foo is affected by the\n'
+            '  the following vulnerabilities.");',
+            results[0].message,
+        )
+
+    def test_false_positives(self):
+        nasl_file = Path(__file__).parent / "test.nasl"
+        content = (
+            'script_tag(name:"cvss_base", value:"4.0");\n'
+            'script_tag(name:"insight", value:"A few issues were fixed.");\n'
+            'script_tag(name:"insight", value:"Check these error messages '
+            'first.");\n'
+            'script_tag(name:"insight", value:"Handle with WITH clauses.");\n'
+        )
+
+        fake_context = self.create_file_plugin_context(
+            nasl_file=nasl_file, file_content=content
+        )
+        plugin = CheckGrammar(fake_context)
+
+        results = list(plugin.run())
+
+        self.assertEqual(len(results), 0)
+
+    def test_file_false_positives(self):
+        content = 'script_tag(name:"insight", value:"Use with\n WITH foo.");\n'
+
+        fake_context = self.create_file_plugin_context(
+            nasl_file=Path("gb_sles_2021_3215_1.nasl"), file_content=content
+        )
+        self.assertEqual(len(list(CheckGrammar(fake_context).run())), 0)
+
+        fake_context = self.create_file_plugin_context(
+            nasl_file=Path("gb_sles_2021_3216_1.nasl"), file_content=content
+        )
+        self.assertEqual(len(list(CheckGrammar(fake_context).run())), 1)
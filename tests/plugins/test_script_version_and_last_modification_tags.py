@@ -121,5 +121,11 @@ class CheckScriptVersionAndLastModificationTagsTestCase(PluginTestCase):
             self.assertEqual(len(results), 1)
             self.assertIsInstance(results[0], LinterFix)
 
-            new_content = nasl_file.read_text(encoding=CURRENT_ENCODING)
+            new_content = fake_context.fixes.apply()
             self.assertNotEqual(content, new_content)
+            self.assertRegex(
+                new_content,
+                r'^script_version\("\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\+0000"\);\n'
+                r'script_tag\(name:"last_modification", value:"\d{4}-\d\d-\d\d '
+                r'\d\d:\d\d:\d\d \+0000 \(\w{3}, \d\d \w{3} \d{4}\)"\);\n$',
+            )
@@ -16,8 +16,10 @@
 #  along with this program.  If not, see <http://www.gnu.org/licenses/>.
 from pathlib import Path
 
+from troubadix.helper import CURRENT_ENCODING
+from troubadix.helper.codespell import Misspelling
 from troubadix.plugin import LinterError
-from troubadix.plugins.spelling import CheckSpelling
+from troubadix.plugins.spelling import CheckSpelling, get_false_positive_rules
 
 from . import PluginTestCase
 
@@ -25,7 +27,10 @@ from . import PluginTestCase
 class CheckSpellingTestCase(PluginTestCase):
     def test_ok(self):
         nasl_file = Path(__file__).parent / "test.nasl"
-        fake_context = self.create_files_plugin_context(nasl_files=[nasl_file])
+        fake_context = self.create_file_plugin_context(
+            nasl_file=nasl_file,
+            file_content=nasl_file.read_text(encoding=CURRENT_ENCODING),
+        )
         plugin = CheckSpelling(fake_context)
 
         results = list(plugin.run())
@@ -34,7 +39,10 @@ class CheckSpellingTestCase(PluginTestCase):
 
     def test_nok(self):
         nasl_file = Path(__file__).parent / "test_files" / "fail_spelling.nasl"
-        fake_context = self.create_files_plugin_context(nasl_files=[nasl_file])
+        fake_context = self.create_file_plugin_context(
+            nasl_file=nasl_file,
+            file_content=nasl_file.read_text(encoding=CURRENT_ENCODING),
+        )
         plugin = CheckSpelling(fake_context)
 
         results = list(plugin.run())
@@ -43,19 +51,19 @@ class CheckSpellingTestCase(PluginTestCase):
 
         self.assertIsInstance(results[0], LinterError)
         self.assertEqual(
-            f"{nasl_file}:1: soltuion ==> solution",
+            "Line 1: soltuion ==> solution",
             results[0].message,
         )
 
         self.assertIsInstance(results[1], LinterError)
         self.assertEqual(
-            f"{nasl_file}:1: aviaalable ==> available",
+            "Line 1: aviaalable ==> available",
             results[1].message,
         )
 
         self.assertIsInstance(results[2], LinterError)
         self.assertEqual(
-            f"{nasl_file}:2: upated ==> updated",
+            "Line 2: upated ==> updated",
             results[2].message,
         )
 
@@ -64,7 +72,10 @@ class CheckSpellingTestCase(PluginTestCase):
         codespell_additions.write_text("", encoding="utf-8")
 
         nasl_file = Path(__file__).parent / "test_files" / "fail_spelling.nasl"
-        fake_context = self.create_files_plugin_context(nasl_files=[nasl_file])
+        fake_context = self.create_file_plugin_context(
+            nasl_file=nasl_file,
+            file_content=nasl_file.read_text(encoding=CURRENT_ENCODING),
+        )
         plugin = CheckSpelling(fake_context)
 
         results = list(plugin.run())
@@ -74,6 +85,33 @@ class CheckSpellingTestCase(PluginTestCase):
         self.assertEqual(len(results), 1)
         self.assertIsInstance(results[0], LinterError)
         self.assertEqual(
-            f"{nasl_file}:2: upated ==> updated",
+            "Line 2: upated ==> updated",
             results[0].message,
         )
+
+    def test_false_positives(self):
+        def is_false_positive(path: str, word: str, *suggestions: str):
+            misspelling = Misspelling(Path(path), 1, word, suggestions)
+            return any(
+                rule.matches(misspelling)
+                for rule in get_false_positive_rules(misspelling.file)
+            )
+
+        self.assertTrue(is_false_positive("foo.nasl", "CNA", "CAN"))
+        self.assertFalse(is_false_positive("foo.nasl", "cna", "can"))
+
+        self.assertTrue(is_false_positive("gb_sles_2022_1.nasl", "HDA", "HAD"))
+        self.assertFalse(is_false_positive("foo.nasl", "hda", "had"))
+
+        self.assertTrue(is_false_positive("GSHB/foo.nasl", "Alle", "All"))
+        self.assertTrue(is_false_positive("GSHB/foo.nasl", "calle", "called"))
+        self.assertFalse(is_false_positive("foo.nasl", "calle", "called"))
+
+        self.assertTrue(
+            is_false_positive(
+                "ELSA-2022-1234.nasl", "chang", "change", "charge"
+            )
+        )
+        self.assertFalse(
+            is_false_positive("ELSA-2022-1234.nasl", "chang", "change")
+        )
@@ -16,10 +16,10 @@
 #  along with this program.  If not, see <http://www.gnu.org/licenses/>.
 from pathlib import Path
 
-from troubadix.plugin import LinterError
+from troubadix.plugin import FilePluginContext, LinterError
 from troubadix.plugins.trailing_spaces_tabs import CheckTrailingSpacesTabs
 
-from . import PluginTestCase
+from . import PluginTestCase, TemporaryDirectory
 
 
 class CheckTrailingSpacesTabsTestCase(PluginTestCase):
@@ -61,3 +61,18 @@ class CheckTrailingSpacesTabsTestCase(PluginTestCase):
             "The VT has one or more trailing spaces and/or tabs!",
             results[0].message,
         )
+
+    def test_nok_crlf(self):
+        with TemporaryDirectory() as tmpdir:
+            nasl_file = tmpdir / "test.nasl"
+            nasl_file.write_bytes(
+                b'script_tag(name:"cvss_base", value:"4.0"); \r\n'
+                b'script_tag(name:"solution", value:"meh");\r\n'
+            )
+            context = FilePluginContext(root=tmpdir, nasl_file=nasl_file)
+            plugin = CheckTrailingSpacesTabs(context)
+
+            results = list(plugin.run())
+
+        self.assertEqual(len(results), 1)
+        self.assertIsInstance(results[0], LinterError)
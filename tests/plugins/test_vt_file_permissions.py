@@ -25,10 +25,9 @@ from . import PluginTestCase
 
 class CheckVTFilePermissionsTestCase(PluginTestCase):
     def test_ok(self):
+        nasl_file = Path(__file__).parent / "test_files" / "ok_permissions.nasl"
         fake_context = self.create_file_plugin_context(
-            nasl_file=Path(__file__).parent
-            / "test_files"
-            / "ok_permissions.nasl"
+            nasl_file=nasl_file, stat=nasl_file.stat()
         )
 
         plugin = CheckVTFilePermissions(fake_context)
@@ -38,10 +37,11 @@ class CheckVTFilePermissionsTestCase(PluginTestCase):
         self.assertEqual(len(results), 0)
 
     def test_nok(self):
+        nasl_file = (
+            Path(__file__).parent / "test_files" / "fail_permissions.nasl"
+        )
         fake_context = self.create_file_plugin_context(
-            nasl_file=Path(__file__).parent
-            / "test_files"
-            / "fail_permissions.nasl"
+            nasl_file=nasl_file, stat=nasl_file.stat()
         )
 
         plugin = CheckVTFilePermissions(fake_context)
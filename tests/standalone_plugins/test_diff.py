@@ -0,0 +1,211 @@
+# Copyright (C) 2022 Greenbone Networks GmbH
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import tempfile
+import unittest
+from contextlib import contextmanager
+from pathlib import Path
+from subprocess import CalledProcessError
+from typing import Generator
+
+from troubadix.standalone_plugins.changed_oid import git
+from troubadix.standalone_plugins.diff import (
+    DiffLine,
+    FileDiff,
+    get_vt_diffs,
+    git_diff,
+    parse_diff,
+)
+
+DIFF = b"""diff --git a/test.nasl b/test.nasl
+index 1111111..2222222 100644
+--- a/test.nasl
++++ b/test.nasl
+@@ -2 +2,2 @@ if(description)
+-script_version("2021-03-02T12:11:43+0000");
++script_version("2021-03-03T12:11:43+0000");
++--- not a header
+@@ -10,0 +12 @@ exit(0);
++++ not a header either
+\\ No newline at end of file
+diff --git a/new file.nasl b/new file.nasl
+new file mode 100644
+index 0000000..3333333
+--- /dev/null
++++ b/new file.nasl\t
+@@ -0,0 +1 @@
++exit(0);
+diff --git "a/t\\303\\244st.nasl" "b/t\\303\\244st.nasl"
+old mode 100644
+new mode 100755
+"""
+
+
+@contextmanager
+def tempgitdir() -> Generator[Path, None, None]:
+    cwd = Path.cwd()
+    tempdir = tempfile.TemporaryDirectory()
+    temppath = Path(tempdir.name)
+    os.chdir(str(temppath))
+    git("init", "-b", "main")
+    git("config", "--local", "user.email", "max.mustermann@example.com")
+    git("config", "--local", "user.name", "Max Mustermann")
+    try:
+        yield temppath
+    finally:
+        os.chdir(str(cwd))
+        tempdir.cleanup()
+
+
+class ParseDiffTestCase(unittest.TestCase):
+    def test_parse_diff(self):
+        file_diffs = list(parse_diff(DIFF.splitlines(keepends=True)))
+
+        self.assertEqual(
+            file_diffs,
+            [
+                FileDiff(
+                    Path("test.nasl"),
+                    [
+                        DiffLine(
+                            2, 'script_version("2021-03-03T12:11:43+0000");'
+                        ),
+                        DiffLine(3, "--- not a header"),
+                        DiffLine(12, "++ not a header either"),
+                    ],
+                    [
+                        DiffLine(
+                            2, 'script_version("2021-03-02T12:11:43+0000");'
+                        ),
+                    ],
+                ),
+                FileDiff(Path("new file.nasl"), [DiffLine(1, "exit(0);")], []),
+                FileDiff(Path("t\xc3\xa4st.nasl"), [], []),
+            ],
+        )
+
+    def test_texts(self):
+        file_diff = next(parse_diff(DIFF.splitlines(keepends=True)))
+
+        self.assertEqual(
+            file_diff.added_text,
+            'script_version("2021-03-03T12:11:43+0000");\n'
+            "--- not a header\n"
+            "++ not a header either",
+        )
+        self.assertEqual(
+            file_diff.removed_text,
+            'script_version("2021-03-02T12:11:43+0000");',
+        )
+
+    def test_empty(self):
+        self.assertEqual(list(parse_diff([])), [])
+
+
+class GitDiffTestCase(unittest.TestCase):
+    def test_git_diff(self):
+        with tempgitdir() as tmpdir:
+            (tmpdir / "a.nasl").write_text("a\nb\nc\n")
+            (tmpdir / "deleted.nasl").write_text("a\n")
+            git("add", ".")
+            git("commit", "-m", "test")
+            (tmpdir / "a.nasl").write_text("a\nB\nc\nd\n")
+            (tmpdir / "b.txt").write_text("b\n")
+            (tmpdir / "deleted.nasl").unlink()
+            git("add", "-A")
+            git("commit", "-m", "test2")
+
+            self.assertEqual(
+                list(git_diff("HEAD~1")),
+                [
+                    FileDiff(
+                        Path("a.nasl"),
+                        [DiffLine(2, "B"), DiffLine(4, "d")],
+                        [DiffLine(2, "b")],
+                    ),
+                    FileDiff(Path("b.txt"), [DiffLine(1, "b")], []),
+                ],
+            )
+            self.assertEqual(
+                [
+                    file_diff.path
+                    for file_diff in git_diff("HEAD~1", [Path("b.txt")])
+                ],
+                [Path("b.txt")],
+            )
+
+    def test_get_vt_diffs(self):
+        with tempgitdir() as tmpdir:
+            (tmpdir / "a.nasl").write_text("a\n")
+            (tmpdir / "unchanged.nasl").write_text("a\n")
+            git("add", ".")
+            git("commit", "-m", "test")
+            (tmpdir / "a.nasl").write_text("b\n")
+            (tmpdir / "b.txt").write_text("b\n")
+            git("add", "-A")
+            git("commit", "-m", "test2")
+
+            self.assertEqual(
+                [file_diff.path for file_diff in get_vt_diffs("HEAD~1")],
+                [Path("a.nasl")],
+            )
+            self.assertEqual(
+                list(
+                    get_vt_diffs(
+                        "HEAD~1", [Path("a.nasl"), Path("unchanged.nasl")]
+                    )
+                ),
+                [
+                    FileDiff(
+                        Path("a.nasl"), [DiffLine(1, "b")], [DiffLine(1, "a")]
+                    ),
+                    FileDiff(Path("unchanged.nasl"), [], []),
+                ],
+            )
+
+    def test_get_vt_diffs_path_spelling(self):
+        with tempgitdir() as tmpdir:
+            (tmpdir / "sub").mkdir()
+            (tmpdir / "sub" / "a.nasl").write_text("a\n")
+            git("add", ".")
+            git("commit", "-m", "test")
+            (tmpdir / "sub" / "a.nasl").write_text("b\n")
+            git("add", "-A")
+            git("commit", "-m", "test2")
+
+            nasl_file = (tmpdir / "sub" / "a.nasl").resolve()
+            self.assertEqual(
+                list(get_vt_diffs("HEAD~1", [nasl_file])),
+                [FileDiff(nasl_file, [DiffLine(1, "b")], [DiffLine(1, "a")])],
+            )
+
+            # relative to the current working directory within the repository
+            os.chdir("sub")
+            self.assertEqual(
+                list(get_vt_diffs("HEAD~1", [Path("a.nasl")])),
+                [
+                    FileDiff(
+                        Path("a.nasl"), [DiffLine(1, "b")], [DiffLine(1, "a")]
+                    )
+                ],
+            )
+
+    def test_git_diff_fail(self):
+        with tempgitdir():
+            with self.assertRaises(CalledProcessError):
+                list(git_diff("unknown"))
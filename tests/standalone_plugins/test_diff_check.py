@@ -0,0 +1,151 @@
+# Copyright (C) 2022 Greenbone Networks GmbH
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import io
+import os
+import tempfile
+import unittest
+from contextlib import contextmanager, redirect_stderr, redirect_stdout
+from pathlib import Path
+from typing import Generator
+from unittest.mock import patch
+
+from troubadix.standalone_plugins.changed_oid import ChangedOIDRule, git
+from troubadix.standalone_plugins.diff_check import check_diff, main, parse_args
+from troubadix.standalone_plugins.version_updated import VersionUpdatedRule
+
+VT = (
+    'script_oid("{oid}");\n'
+    'script_version("{date}T12:11:43+0000");\n'
+    'script_tag(name:"last_modification", '
+    'value:"{date} 12:11:43 +0000 (Tue, 02 Mar 2021)");\n'
+)
+OID = "1.3.6.1.4.1.25623.1.0.100313"
+
+
+@contextmanager
+def tempgitdir() -> Generator[Path, None, None]:
+    cwd = Path.cwd()
+    tempdir = tempfile.TemporaryDirectory()
+    temppath = Path(tempdir.name)
+    os.chdir(str(temppath))
+    git("init", "-b", "main")
+    git("config", "--local", "user.email", "max.mustermann@example.com")
+    git("config", "--local", "user.name", "Max Mustermann")
+    try:
+        yield temppath
+    finally:
+        os.chdir(str(cwd))
+        tempdir.cleanup()
+
+
+def commit_vts(tmpdir: Path, vts: dict) -> None:
+    for name, content in vts.items():
+        (tmpdir / name).write_text(content)
+    git("add", "-A")
+    git("commit", "-m", "test")
+
+
+class CheckDiffTestCase(unittest.TestCase):
+    def check(self, *args: str) -> tuple:
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        with patch("sys.argv", ["troubadix-diff-check", *args]):
+            with redirect_stdout(stdout), redirect_stderr(stderr):
+                exit_code = main()
+        return exit_code, stdout.getvalue(), stderr.getvalue()
+
+    def test_ok(self):
+        with tempgitdir() as tmpdir:
+            commit_vts(
+                tmpdir, {"a.nasl": VT.format(oid=OID, date="2021-03-02")}
+            )
+            commit_vts(
+                tmpdir, {"a.nasl": VT.format(oid=OID, date="2021-03-03")}
+            )
+
+            exit_code, stdout, stderr = self.check("-c", "HEAD~1")
+
+            self.assertEqual(exit_code, 0)
+            self.assertEqual(stdout, "Check file a.nasl\n")
+            self.assertEqual(stderr, "")
+
+    def test_all_rules(self):
+        with tempgitdir() as tmpdir:
+            commit_vts(
+                tmpdir,
+                {
+                    "a.nasl": VT.format(oid=OID, date="2021-03-02"),
+                    "b.nasl": VT.format(oid=OID + "1", date="2021-03-02"),
+                },
+            )
+            commit_vts(
+                tmpdir,
+                {
+                    "a.nasl": VT.format(oid=OID + "2", date="2021-03-02"),
+                    "b.nasl": VT.format(oid=OID + "1", date="2021-03-03"),
+                },
+            )
+
+            exit_code, stdout, stderr = self.check("-c", "HEAD~1")
+
+            self.assertEqual(exit_code, 2)
+            self.assertEqual(stdout, "Check file a.nasl\nCheck file b.nasl\n")
+            self.assertIn("OID of VT a.nasl was changed.", stderr)
+            self.assertIn("a.nasl: Missing updated script_version", stderr)
+            self.assertIn("a.nasl: Missing updated last_modification", stderr)
+            self.assertNotIn("b.nasl", stderr)
+
+    def test_exclude_rules(self):
+        with tempgitdir() as tmpdir:
+            commit_vts(
+                tmpdir, {"a.nasl": VT.format(oid=OID, date="2021-03-02")}
+            )
+            commit_vts(
+                tmpdir, {"a.nasl": VT.format(oid=OID + "2", date="2021-03-03")}
+            )
+
+            exit_code, _, _ = self.check(
+                "-c", "HEAD~1", "--exclude-rules", "changed_oid"
+            )
+
+            self.assertEqual(exit_code, 0)
+
+    def test_check_diff(self):
+        with tempgitdir() as tmpdir:
+            commit_vts(
+                tmpdir, {"a.nasl": VT.format(oid=OID, date="2021-03-02")}
+            )
+            commit_vts(
+                tmpdir,
+                {"a.nasl": VT.format(oid=OID, date="2021-03-02") + "exit(0);"},
+            )
+
+            with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+                self.assertTrue(check_diff([ChangedOIDRule()], [], "HEAD~1"))
+                self.assertFalse(
+                    check_diff(
+                        [VersionUpdatedRule()], [Path("a.nasl")], "HEAD~1"
+                    )
+                )
+
+    def test_parse_args(self):
+        parsed_args = parse_args(["-c", "HEAD~1"])
+
+        self.assertEqual(parsed_args.commit_range, "HEAD~1")
+        self.assertEqual(parsed_args.files, [])
+        self.assertEqual(parsed_args.exclude_rules, [])
@@ -15,11 +15,20 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import datetime
 import unittest
 from unittest.mock import MagicMock
 
 from tests.plugins import TemporaryDirectory
-from troubadix.standalone_plugins.last_modification import parse_args, update
+from troubadix.standalone_plugins.last_modification import (
+    UpdateStatus,
+    parse_args,
+    update,
+    update_content,
+    update_files,
+)
+
+NOW = datetime.datetime(2022, 5, 17, 8, 15, 30, tzinfo=datetime.timezone.utc)
 
 
 class ParseArgsTestCase(unittest.TestCase):
@@ -47,6 +56,19 @@ class ParseArgsTestCase(unittest.TestCase):
             args = parse_args(["--from-file", str(from_file)])
 
             self.assertEqual(args.from_file, from_file)
+            self.assertFalse(args.dry_run)
+
+    def test_parse_dry_run(self):
+        with TemporaryDirectory() as tempdir:
+            testfile1 = tempdir / "testfile1.nasl"
+            testfile1.touch()
+
+            args = parse_args(
+                ["--files", str(testfile1), "--dry-run", "-j", "1"]
+            )
+
+            self.assertTrue(args.dry_run)
+            self.assertEqual(args.n_jobs, 1)
 
 
 class UpdateTestCase(unittest.TestCase):
@@ -108,3 +130,90 @@ class UpdateTestCase(unittest.TestCase):
             new_content = testfile1.read_text(encoding="utf8")
 
             self.assertEqual(content, new_content)
+
+
+class UpdateContentTestCase(unittest.TestCase):
+    def test_update_content(self):
+        content = (
+            'script_version("2021-07-19T12:32:02+0000");\r\n'
+            'script_tag(name: "last_modification", value: "2021-07-19 '
+            '12:32:02 +0000 (Mon, 19 Jul 2021)");\r\n'
+        )
+
+        status, new_content = update_content(content, NOW)
+
+        self.assertEqual(status, UpdateStatus.UPDATED)
+        self.assertEqual(
+            new_content,
+            'script_version("2022-05-17T08:15:30+0000");\r\n'
+            'script_tag(name:"last_modification", value:"2022-05-17 '
+            '08:15:30 +0000 (Tue, 17 May 2022)");\r\n',
+        )
+
+        status, newer_content = update_content(new_content, NOW)
+
+        self.assertEqual(status, UpdateStatus.UNCHANGED)
+        self.assertEqual(newer_content, new_content)
+
+    def test_missing_tags(self):
+        content = 'script_version("2021-07-19T12:32:02+0000");\n'
+        self.assertEqual(
+            update_content(content, NOW),
+            (UpdateStatus.MISSING_LAST_MODIFICATION, content),
+        )
+
+        content = 'script_tag(name: "last_modification", value: "bar");\n'
+        self.assertEqual(
+            update_content(content, NOW),
+            (UpdateStatus.MISSING_SCRIPT_VERSION, content),
+        )
+
+
+class UpdateFilesTestCase(unittest.TestCase):
+    content = (
+        'script_version("2021-07-19T12:32:02+0000");\n'
+        'script_tag(name: "last_modification", value: "2021-07-19 '
+        '12:32:02 +0000 (Mon, 19 Jul 2021)");\n'
+    )
+
+    def test_update_files(self):
+        with TemporaryDirectory() as tempdir:
+            files = []
+            for i in range(10):
+                nasl_file = tempdir / f"test{i}.nasl"
+                nasl_file.write_text(self.content, encoding="latin1")
+                files.append(nasl_file)
+            missing = tempdir / "missing.nasl"
+
+            results = {
+                result.nasl_file: result.status
+                for result in update_files(files + [missing], NOW, n_jobs=2)
+            }
+
+            self.assertEqual(results.pop(missing), UpdateStatus.FAILED)
+            self.assertEqual(
+                results,
+                {nasl_file: UpdateStatus.UPDATED for nasl_file in files},
+            )
+            for nasl_file in files:
+                self.assertIn(
+                    'script_version("2022-05-17T08:15:30+0000");',
+                    nasl_file.read_text(encoding="latin1"),
+                )
+            self.assertEqual(
+                sorted(path.name for path in tempdir.iterdir()),
+                sorted(nasl_file.name for nasl_file in files),
+            )
+
+    def test_dry_run(self):
+        with TemporaryDirectory() as tempdir:
+            nasl_file = tempdir / "test.nasl"
+            nasl_file.write_text(self.content, encoding="latin1")
+
+            results = list(update_files([nasl_file], NOW, dry_run=True))
+
+            self.assertEqual(len(results), 1)
+            self.assertEqual(results[0].status, UpdateStatus.UPDATED)
+            self.assertEqual(
+                nasl_file.read_text(encoding="latin1"), self.content
+            )
@@ -154,6 +154,19 @@ class TestVersionChanged(unittest.TestCase):
                 )
             )
 
+    def test_change_both_absolute_path(self):
+        with tempgitdir() as tmpdir:
+            setupgit(tmpdir)
+            change_version_and_last_modification(tmpdir)
+            parsed_args = parse_args(
+                ["-c", "HEAD~1", "-f", str((tmpdir / "test.nasl").resolve())]
+            )
+            self.assertTrue(
+                check_version_updated(
+                    parsed_args.files, parsed_args.commit_range
+                )
+            )
+
     def test_git_fail(self):
         with self.assertRaises(SubprocessError):
             git("bla")
@@ -15,7 +15,9 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import io
 import unittest
+from contextlib import redirect_stderr, redirect_stdout
 from multiprocessing import cpu_count
 from pathlib import Path
 from unittest.mock import Mock
@@ -23,6 +25,13 @@ from unittest.mock import Mock
 from pontos.terminal import Terminal
 
 from troubadix.argparser import parse_args
+from troubadix.cache import CACHE_MAX_AGE, DEFAULT_CACHE_DIR
+from troubadix.profiling import (
+    CPROFILE_FILE_NAME,
+    CPROFILE_REPORT_NAME,
+    PROFILE_TOP,
+    TRACEMALLOC_REPORT_NAME,
+)
 
 
 class TestArgparsing(unittest.TestCase):
@@ -152,3 +161,164 @@ class TestArgparsing(unittest.TestCase):
         parsed_args = parse_args(self.terminal, ["--log-file-statistic", "foo"])
 
         self.assertEqual(parsed_args.log_file_statistic, Path("foo"))
+
+    def test_parse_cache_dir(self):
+        parsed_args = parse_args(self.terminal, ["-f"])
+        self.assertIsNone(parsed_args.cache_dir)
+
+        parsed_args = parse_args(self.terminal, ["-f", "--cache-dir"])
+        self.assertEqual(parsed_args.cache_dir, Path(".troubadix_cache"))
+
+        parsed_args = parse_args(self.terminal, ["-f", "--cache-dir", "foo"])
+        self.assertEqual(parsed_args.cache_dir, Path("foo"))
+
+    def test_parse_chunksize(self):
+        parsed_args = parse_args(self.terminal, ["-f"])
+        self.assertIsNone(parsed_args.chunksize)
+
+        parsed_args = parse_args(self.terminal, ["-f", "--chunksize", "auto"])
+        self.assertIsNone(parsed_args.chunksize)
+
+        parsed_args = parse_args(self.terminal, ["-f", "--chunksize", "8"])
+        self.assertEqual(parsed_args.chunksize, 8)
+
+        with redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            parse_args(self.terminal, ["-f", "--chunksize", "0"])
+
+    def test_parse_stdin(self):
+        parsed_args = parse_args(self.terminal, ["-f"])
+        self.assertIsNone(parsed_args.stdin_separator)
+        self.assertFalse(parsed_args.stream)
+
+        parsed_args = parse_args(self.terminal, ["--stdin"])
+        self.assertEqual(parsed_args.stdin_separator, b"\n")
+
+        parsed_args = parse_args(self.terminal, ["--stdin0"])
+        self.assertEqual(parsed_args.stdin_separator, b"\0")
+
+        parsed_args = parse_args(self.terminal, ["-f", "--stream"])
+        self.assertTrue(parsed_args.stream)
+
+        with redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            parse_args(self.terminal, ["--stdin", "--files", "foo.nasl"])
+
+    def test_parse_changed_files(self):
+        parsed_args = parse_args(self.terminal, ["--changed-since", "main"])
+        self.assertEqual(parsed_args.changed_since, "main")
+        self.assertFalse(parsed_args.staged)
+
+        parsed_args = parse_args(
+            self.terminal, ["--staged", "--include-patterns", "*.nasl"]
+        )
+        self.assertTrue(parsed_args.staged)
+        self.assertEqual(parsed_args.include_patterns, ["*.nasl"])
+
+        with redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            parse_args(self.terminal, ["--staged", "--changed-since", "main"])
+
+    def test_parse_with_dependents(self):
+        parsed_args = parse_args(
+            self.terminal, ["--changed-since", "main", "--with-dependents"]
+        )
+        self.assertTrue(parsed_args.with_dependents)
+
+        with self.assertRaises(SystemExit):
+            parse_args(self.terminal, ["--stdin", "--with-dependents"])
+
+    def test_parse_fix_diff(self):
+        parsed_args = parse_args(
+            self.terminal, ["-f", "--fix", "--diff", "fixes.patch"]
+        )
+        self.assertTrue(parsed_args.fix)
+        self.assertEqual(parsed_args.diff_file, Path("fixes.patch"))
+
+        with self.assertRaises(SystemExit):
+            parse_args(self.terminal, ["-f", "--diff", "fixes.patch"])
+
+    def test_parse_serve_client(self):
+        parsed_args = parse_args(
+            self.terminal, ["--serve", "--socket", "troubadix.sock"]
+        )
+        self.assertTrue(parsed_args.serve)
+        self.assertEqual(parsed_args.socket, Path("troubadix.sock"))
+
+        parsed_args = parse_args(self.terminal, ["--client", "foo.nasl"])
+        self.assertEqual(parsed_args.client, [Path("foo.nasl")])
+        # resolved by the daemon and the client themselves
+        self.assertIsNone(parsed_args.socket)
+
+        with self.assertRaises(SystemExit), redirect_stderr(io.StringIO()):
+            parse_args(self.terminal, ["--serve", "--files", "foo.nasl"])
+
+        with self.assertRaises(SystemExit):
+            parse_args(
+                self.terminal,
+                ["--client", "foo.nasl", "--jsonl-file", "results.jsonl"],
+            )
+
+    def test_parse_watch(self):
+        parsed_args = parse_args(self.terminal, ["--watch", "-d", "foo"])
+        self.assertTrue(parsed_args.watch)
+
+        with self.assertRaises(SystemExit):
+            parse_args(self.terminal, ["--watch", "--files", "foo.nasl"])
+
+        with self.assertRaises(SystemExit):
+            parse_args(self.terminal, ["--watch", "--full", "--fix"])
+
+    def test_parse_profile_plugins(self):
+        parsed_args = parse_args(self.terminal, ["--profile-plugins", "-f"])
+        self.assertEqual(parsed_args.profile_plugins, 10)
+
+        parsed_args = parse_args(
+            self.terminal,
+            [
+                "-f",
+                "--profile-plugins",
+                "5",
+                "--profile-plugins-json",
+                "profile.json",
+            ],
+        )
+        self.assertEqual(parsed_args.profile_plugins, 5)
+        self.assertEqual(parsed_args.profile_plugins_json, Path("profile.json"))
+
+        with self.assertRaises(SystemExit):
+            parse_args(
+                self.terminal, ["-f", "--profile-plugins-json", "profile.json"]
+            )
+
+    def test_parse_cprofile_tracemalloc(self):
+        parsed_args = parse_args(
+            self.terminal,
+            ["-f", "--cprofile", "cprofile", "--tracemalloc", "tracemalloc"],
+        )
+        self.assertEqual(parsed_args.cprofile_dir, Path("cprofile"))
+        self.assertEqual(parsed_args.tracemalloc_dir, Path("tracemalloc"))
+
+        parsed_args = parse_args(self.terminal, ["-f"])
+        self.assertIsNone(parsed_args.cprofile_dir)
+        self.assertIsNone(parsed_args.tracemalloc_dir)
+
+        with self.assertRaises(SystemExit):
+            parse_args(self.terminal, ["--lsp", "--cprofile", "cprofile"])
+
+    def test_defaults_match_constants(self):
+        # the argparser doesn't import the modules to keep the startup fast
+        parsed_args = parse_args(
+            self.terminal, ["-f", "--cache-dir", "--profile-plugins"]
+        )
+        self.assertEqual(parsed_args.cache_dir, DEFAULT_CACHE_DIR)
+        self.assertEqual(parsed_args.profile_plugins, PROFILE_TOP)
+
+        output = io.StringIO()
+        with redirect_stdout(output), self.assertRaises(SystemExit):
+            parse_args(self.terminal, ["--help"])
+        usage = " ".join(output.getvalue().split())
+        self.assertIn(f"DIR/{CPROFILE_FILE_NAME}", usage)
+        self.assertIn(f"DIR/{CPROFILE_REPORT_NAME}", usage)
+        self.assertIn(f"DIR/{TRACEMALLOC_REPORT_NAME}", usage)
+        self.assertIn(f"(default: {DEFAULT_CACHE_DIR})", usage)
+        self.assertIn(
+            f"not used for {CACHE_MAX_AGE // (24 * 60 * 60)} days", usage
+        )
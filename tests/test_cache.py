@@ -0,0 +1,280 @@
+# Copyright (C) 2022 Greenbone Networks GmbH
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import io
+import os
+import time
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from pontos.terminal.terminal import ConsoleTerminal
+
+from tests.plugins import TemporaryDirectory
+from troubadix.cache import (
+    CACHE_MAX_AGE,
+    MemoryResultCache,
+    ResultCache,
+    get_dependency_cache_inputs,
+)
+from troubadix.helper import VTMetadata
+from troubadix.plugin import FilePluginContext, LinterError, LinterWarning
+from troubadix.plugins.cvss_format import CheckCVSSFormat
+from troubadix.plugins.dependencies import CheckDependencies
+from troubadix.reporter import Reporter
+from troubadix.runner import Runner
+
+_here = Path(__file__).parent
+
+
+class ResultCacheTestCase(unittest.TestCase):
+    def test_entry_roundtrip(self):
+        with TemporaryDirectory() as tmpdir:
+            nasl_file = tmpdir / "foo.nasl"
+            nasl_file.write_text("foo", encoding="latin1")
+            cache = ResultCache(tmpdir / "cache")
+
+            entry = cache.get_entry(nasl_file)
+            self.assertIsNone(entry.get("plugin", "1"))
+
+            entry.set(
+                "plugin",
+                "1",
+                [
+                    LinterError("error", file=nasl_file, plugin="plugin"),
+                    LinterWarning("warning", plugin="plugin", line=2),
+                ],
+            )
+            entry.save()
+
+            results = cache.get_entry(nasl_file).get("plugin", "1")
+            self.assertEqual(len(results), 2)
+            self.assertIsInstance(results[0], LinterError)
+            self.assertEqual(results[0].message, "error")
+            self.assertEqual(results[0].file, nasl_file)
+            self.assertIsInstance(results[1], LinterWarning)
+            self.assertIsNone(results[1].file)
+            self.assertEqual(results[1].line, 2)
+
+            # outdated fingerprint
+            self.assertIsNone(cache.get_entry(nasl_file).get("plugin", "2"))
+
+            # changed content
+            nasl_file.write_text("bar", encoding="latin1")
+            self.assertIsNone(cache.get_entry(nasl_file).get("plugin", "1"))
+
+    def test_timings(self):
+        with TemporaryDirectory() as tmpdir:
+            cache = ResultCache(tmpdir / "cache")
+            self.assertEqual(cache.load_timings(), {})
+
+            cache.save_timings({"a": 1.0, "b": 2.0})
+            cache.save_timings({"b": 3.0})
+
+            self.assertEqual(cache.load_timings(), {"a": 1.0, "b": 3.0})
+
+    def test_prune(self):
+        with TemporaryDirectory() as tmpdir:
+            nasl_file = tmpdir / "foo.nasl"
+            cache = ResultCache(tmpdir / "cache")
+            self.assertEqual(cache.prune(), 0)
+
+            paths = []
+            for content in ["foo", "bar", "baz"]:
+                nasl_file.write_text(content, encoding="latin1")
+                entry = cache.get_entry(nasl_file)
+                entry.set("plugin", "1", [])
+                entry.save()
+                paths.append(entry._path)
+
+            old = time.time() - CACHE_MAX_AGE - 60
+            for path in paths:
+                os.utime(path, (old, old))
+
+            # using an entry marks it as used
+            entry = cache.get_entry(nasl_file)
+            self.assertEqual(entry.get("plugin", "1"), [])
+            entry.save()
+
+            self.assertEqual(cache.prune(), 2)
+            self.assertEqual(
+                [path.exists() for path in paths], [False, False, True]
+            )
+            self.assertIsNotNone(cache.get_entry(nasl_file).get("plugin", "1"))
+
+            # only checked once per interval
+            os.utime(paths[2], (old, old))
+            self.assertEqual(cache.prune(), 0)
+            self.assertEqual(cache.prune(interval=0), 1)
+
+    def test_plugin_fingerprint(self):
+        with TemporaryDirectory() as tmpdir:
+            nasl_file = tmpdir / "foo.nasl"
+            nasl_file.write_text(
+                'script_dependencies("bar.nasl");', encoding="latin1"
+            )
+            cache = ResultCache(tmpdir / "cache")
+            context = FilePluginContext(root=tmpdir, nasl_file=nasl_file)
+
+            fingerprint = cache.get_plugin_fingerprint(
+                CheckDependencies(context)
+            )
+            self.assertNotEqual(
+                fingerprint,
+                cache.get_plugin_fingerprint(CheckCVSSFormat(context)),
+            )
+
+            # a new dependency invalidates the results
+            dependency = tmpdir / "bar.nasl"
+            dependency.write_text("bar", encoding="latin1")
+            new_fingerprint = cache.get_plugin_fingerprint(
+                CheckDependencies(context)
+            )
+            self.assertNotEqual(fingerprint, new_fingerprint)
+
+            # a changed dependency invalidates the results
+            dependency.write_text("baz", encoding="latin1")
+            self.assertNotEqual(
+                new_fingerprint,
+                cache.get_plugin_fingerprint(CheckDependencies(context)),
+            )
+
+    def test_dependency_cache_inputs(self):
+        with TemporaryDirectory() as tmpdir:
+            (tmpdir / "common").mkdir()
+            (tmpdir / "common" / "bar.nasl").write_text("", encoding="latin1")
+            vt_metadata = VTMetadata(
+                "script_dependencies(\"foo.nasl\", 'bar.nasl');"
+            )
+
+            inputs = get_dependency_cache_inputs(tmpdir, vt_metadata)
+
+            self.assertIn("common/foo.nasl:missing", inputs)
+            self.assertIn("/foo.nasl:missing", inputs)
+            self.assertNotIn("common/bar.nasl:missing", inputs)
+            self.assertIn("/bar.nasl:missing", inputs)
+
+
+class MemoryResultCacheTestCase(unittest.TestCase):
+    def test_entry(self):
+        with TemporaryDirectory() as tmpdir:
+            nasl_file = tmpdir / "foo.nasl"
+            nasl_file.write_text("foo", encoding="latin1")
+            # the file has been modified long before it is hashed
+            os.utime(nasl_file, ns=(0, 0))
+            cache = MemoryResultCache()
+
+            entry = cache.get_entry(nasl_file, stat=nasl_file.stat())
+            entry.set("plugin", "1", [LinterError("error", plugin="plugin")])
+            entry.save()
+            self.assertEqual(list(tmpdir.iterdir()), [nasl_file])
+
+            # unchanged status, the content isn't read again
+            self.assertIs(
+                cache.get_entry(nasl_file, b"", nasl_file.stat()), entry
+            )
+
+            # touched without changing the content
+            os.utime(nasl_file, ns=(10**9, 10**9))
+            self.assertIs(
+                cache.get_entry(nasl_file, stat=nasl_file.stat()), entry
+            )
+
+            # changed content with the same status
+            nasl_file.write_text("bar", encoding="latin1")
+            os.utime(nasl_file, ns=(10**9, 10**9))
+            entry = cache.get_entry(nasl_file, stat=nasl_file.stat())
+            self.assertIs(
+                cache.get_entry(nasl_file, stat=nasl_file.stat()), entry
+            )
+            self.assertIsNotNone(entry.get("plugin", "1"))
+
+    def test_recently_modified(self):
+        with TemporaryDirectory() as tmpdir:
+            nasl_file = tmpdir / "foo.nasl"
+            nasl_file.write_text("foo", encoding="latin1")
+            cache = MemoryResultCache()
+
+            entry = cache.get_entry(nasl_file, stat=nasl_file.stat())
+            entry.set("plugin", "1", [])
+
+            # modified within the granularity of the modification time
+            stat = nasl_file.stat()
+            nasl_file.write_text("bar", encoding="latin1")
+            os.utime(nasl_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            entry = cache.get_entry(nasl_file, stat=nasl_file.stat())
+            self.assertIsNone(entry.get("plugin", "1"))
+
+    def test_cache_dir(self):
+        with TemporaryDirectory() as tmpdir:
+            nasl_file = tmpdir / "foo.nasl"
+            nasl_file.write_text("foo", encoding="latin1")
+            cache = MemoryResultCache(tmpdir / "cache")
+
+            entry = cache.get_entry(nasl_file, stat=nasl_file.stat())
+            entry.set("plugin", "1", [])
+            entry.save()
+            cache.save_timings({"a": 1.0})
+
+            cache = ResultCache(tmpdir / "cache")
+            self.assertEqual(cache.get_entry(nasl_file).get("plugin", "1"), [])
+            self.assertEqual(cache.load_timings(), {"a": 1.0})
+
+    def test_timings(self):
+        cache = MemoryResultCache()
+        self.assertEqual(cache.load_timings(), {})
+
+        cache.save_timings({"a": 1.0, "b": 2.0})
+        cache.save_timings({"b": 3.0})
+
+        self.assertEqual(cache.load_timings(), {"a": 1.0, "b": 3.0})
+
+
+class RunnerCacheTestCase(unittest.TestCase):
+    def test_runner_uses_cached_results(self):
+        nasl_file = (
+            _here
+            / "plugins"
+            / "test_files"
+            / "nasl"
+            / "21.04"
+            / "runner"
+            / "fail.nasl"
+        )
+        root = _here / "plugins" / "test_files" / "nasl"
+
+        with TemporaryDirectory() as tmpdir:
+            error_counts = []
+            for _ in range(2):
+                reporter = Reporter(term=ConsoleTerminal(), root=root)
+                runner = Runner(
+                    n_jobs=1,
+                    reporter=reporter,
+                    included_plugins=[CheckCVSSFormat.name],
+                    root=root,
+                    cache_dir=tmpdir,
+                )
+                with redirect_stdout(io.StringIO()):
+                    runner.run([nasl_file])
+
+                error_counts.append(reporter.get_error_count())
+
+            self.assertEqual(error_counts, [2, 2])
+            self.assertEqual(len(list(tmpdir.glob("*/*.json"))), 1)
+            self.assertIn(
+                str(nasl_file.resolve()), ResultCache(tmpdir).load_timings()
+            )
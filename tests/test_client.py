@@ -0,0 +1,59 @@
+# Copyright (C) 2022 Greenbone Networks GmbH
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import io
+import unittest
+from contextlib import redirect_stderr
+from pathlib import Path
+from unittest.mock import patch
+
+from tests.plugins import TemporaryDirectory
+from troubadix.client import check, format_message, get_default_socket_path
+
+
+class TestClient(unittest.TestCase):
+    def test_format_message(self):
+        self.assertEqual(
+            format_message({"style": "error", "indent": 4, "message": "a\nb"}),
+            "×     a\n      b",
+        )
+        self.assertEqual(
+            format_message({"style": "print", "indent": 0, "message": "a"}),
+            "  a",
+        )
+        self.assertEqual(
+            format_message({"style": "ok", "message": "a"}, color=True),
+            "\033[32m✓\033[0m a",
+        )
+
+    def test_default_socket_path(self):
+        with patch.dict("os.environ", {"XDG_RUNTIME_DIR": "/run/user/1"}):
+            self.assertEqual(
+                get_default_socket_path(), Path("/run/user/1/troubadix.sock")
+            )
+
+    def test_no_daemon(self):
+        with TemporaryDirectory() as tmpdir:
+            stderr = io.StringIO()
+            with redirect_stderr(stderr):
+                exit_code = check(
+                    [tmpdir / "foo.nasl"],
+                    socket_path=tmpdir / "troubadix.sock",
+                )
+
+        self.assertEqual(exit_code, 1)
+        self.assertIn("No troubadix daemon is listening", stderr.getvalue())
@@ -0,0 +1,122 @@
+# Copyright (C) 2022 Greenbone Networks GmbH
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from tests.plugins import TemporaryDirectory
+from troubadix.cache import ResultCache
+from troubadix.dependency_index import (
+    DependencyIndex,
+    get_dependency_names,
+    get_script_dependencies,
+)
+
+
+def create_vt(path: Path, *dependencies: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    deps = ", ".join(f'"{dep}"' for dep in dependencies)
+    path.write_text(
+        f"script_dependencies({deps});\n" if dependencies else "exit(0);\n",
+        encoding="latin1",
+    )
+
+
+class DependencyIndexTestCase(unittest.TestCase):
+    def test_get_script_dependencies(self):
+        self.assertEqual(
+            get_script_dependencies(
+                b'script_dependencies("a.nasl", "2008/b.nasl");\n'
+                b"script_dependencies('c.nasl');\n"
+            ),
+            ["a.nasl", "2008/b.nasl", "c.nasl"],
+        )
+        self.assertEqual(get_script_dependencies(b"exit(0);"), [])
+
+    def test_get_dependency_names(self):
+        self.assertEqual(
+            get_dependency_names("common/2008/a.nasl"),
+            {"common/2008/a.nasl", "2008/a.nasl"},
+        )
+        self.assertEqual(get_dependency_names("a.nasl"), {"a.nasl"})
+
+    def test_expand(self):
+        with TemporaryDirectory() as root:
+            create_vt(root / "common" / "a.nasl")
+            create_vt(root / "common" / "foo" / "b.nasl", "a.nasl")
+            create_vt(root / "22.04" / "c.nasl", "foo/b.nasl", "a.nasl")
+            create_vt(root / "d.nasl", "gone.nasl")
+            create_vt(root / "e.nasl", "c.nasl")
+
+            index = DependencyIndex(root)
+            index.update()
+
+            self.assertEqual(
+                index.expand([root / "common" / "a.nasl"]),
+                [
+                    root / "common" / "a.nasl",
+                    root / "22.04" / "c.nasl",
+                    root / "common" / "foo" / "b.nasl",
+                ],
+            )
+            # only direct dependents and no duplicates
+            self.assertEqual(
+                index.expand(
+                    [root / "common" / "foo" / "b.nasl", root / "22.04/c.nasl"]
+                ),
+                [
+                    root / "common" / "foo" / "b.nasl",
+                    root / "22.04" / "c.nasl",
+                    root / "e.nasl",
+                ],
+            )
+            self.assertEqual(
+                index.expand([], deleted=[root / "gone.nasl"]),
+                [root / "d.nasl"],
+            )
+
+    def test_persisted(self):
+        with TemporaryDirectory() as root:
+            cache = ResultCache(root / "cache")
+            create_vt(root / "nasl" / "a.nasl")
+            create_vt(root / "nasl" / "b.nasl", "a.nasl")
+            create_vt(root / "nasl" / "c.nasl")
+            nasl_root = root / "nasl"
+
+            DependencyIndex(nasl_root, cache).update()
+
+            create_vt(nasl_root / "c.nasl", "a.nasl")
+            stat = (nasl_root / "c.nasl").stat()
+            os.utime(
+                nasl_root / "c.nasl",
+                ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000),
+            )
+
+            index = DependencyIndex(nasl_root, cache)
+            with patch.object(
+                Path, "read_bytes", autospec=True, side_effect=Path.read_bytes
+            ) as read_mock:
+                index.update()
+
+            # only the changed file has been read again
+            read_mock.assert_called_once_with(nasl_root / "c.nasl")
+            self.assertEqual(
+                index.get_dependents(nasl_root / "a.nasl"),
+                {nasl_root / "b.nasl", nasl_root / "c.nasl"},
+            )
@@ -0,0 +1,100 @@
+# Copyright (C) 2022 Greenbone Networks GmbH
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from tests.plugins import TemporaryDirectory
+from troubadix.discovery import FileFinder
+
+
+def create_files(root: Path, *names: str) -> None:
+    for name in names:
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(name, encoding="latin1")
+
+
+class FileFinderTestCase(unittest.TestCase):
+    def test_recursive(self):
+        with TemporaryDirectory() as tmpdir:
+            create_files(
+                tmpdir,
+                "a.nasl",
+                "b.inc",
+                "c.txt",
+                "2022/foo/d.nasl",
+                "2022/templates/bar/e.nasl",
+            )
+
+            files = FileFinder(
+                ["**/*.nasl", "**/*.inc"], ["**/templates/*/*.nasl"]
+            ).find([tmpdir])
+
+            self.assertEqual(
+                sorted(files),
+                [
+                    tmpdir / "2022/foo/d.nasl",
+                    tmpdir / "a.nasl",
+                    tmpdir / "b.inc",
+                ],
+            )
+            self.assertEqual(files[tmpdir / "a.nasl"].st_size, 6)
+
+    def test_non_recursive(self):
+        with TemporaryDirectory() as tmpdir:
+            create_files(tmpdir, "a.nasl", "foo/b.nasl", "foo/bar/c.nasl")
+
+            with patch("os.scandir", wraps=os.scandir) as scandir_mock:
+                files = FileFinder(["*.nasl", "foo/*.nasl"]).find([tmpdir])
+
+            self.assertEqual(
+                sorted(files), [tmpdir / "a.nasl", tmpdir / "foo/b.nasl"]
+            )
+            # foo/bar can't contain matching files
+            self.assertEqual(scandir_mock.call_count, 2)
+
+    def test_excluded_directories_are_skipped(self):
+        with TemporaryDirectory() as tmpdir:
+            create_files(tmpdir, "a.nasl", "foo/b.nasl", "foo/bar/c.nasl")
+
+            with patch("os.scandir", wraps=os.scandir) as scandir_mock:
+                files = FileFinder(["**/*.nasl"], ["foo/**/*"]).find([tmpdir])
+
+            self.assertEqual(list(files), [tmpdir / "a.nasl"])
+            scandir_mock.assert_called_once()
+
+    def test_duplicates(self):
+        with TemporaryDirectory() as tmpdir:
+            create_files(tmpdir, "foo/a.nasl")
+            (tmpdir / "b.nasl").symlink_to(tmpdir / "foo" / "a.nasl")
+
+            files = FileFinder(["**/*.nasl"]).find([tmpdir, tmpdir / "foo"])
+
+            self.assertEqual(len(files), 1)
+
+    def test_exclude_from_other_directory(self):
+        with TemporaryDirectory() as tmpdir:
+            create_files(tmpdir, "foo/a.nasl", "foo/b.nasl")
+
+            files = FileFinder(["**/*.nasl"], ["a.nasl"]).find(
+                [tmpdir, tmpdir / "foo"]
+            )
+
+            self.assertEqual(list(files), [tmpdir / "foo" / "b.nasl"])
@@ -0,0 +1,274 @@
+# Copyright (C) 2022 Greenbone Networks GmbH
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+# pylint: disable=protected-access
+
+import io
+import time
+import unittest
+from pathlib import Path
+from typing import List
+
+from tests.plugins import TemporaryDirectory
+from troubadix.lsp import (
+    DocumentContext,
+    LanguageServer,
+    _uses_file_content,
+    path_to_uri,
+    read_message,
+    write_message,
+)
+from troubadix.plugins.cvss_format import CheckCVSSFormat
+from troubadix.plugins.duplicate_oid import CheckDuplicateOID
+from troubadix.plugins.todo_tbd import CheckTodoTbd
+from troubadix.plugins.valid_oid import CheckValidOID
+
+CONTENT = """if(description)
+{
+  script_oid("1.3.6.1.4.1.25623.1.0.100001");
+  exit(0);
+}
+
+foo = 1;
+"""
+
+
+def _read_messages(stream: io.BytesIO) -> List[dict]:
+    stream.seek(0)
+    messages = []
+    while True:
+        message = read_message(stream)
+        if message is None:
+            return messages
+        messages.append(message)
+
+
+class LanguageServerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.output = io.BytesIO()
+
+    def _create_server(self, root: Path, **kwargs) -> LanguageServer:
+        server = LanguageServer(
+            io.BytesIO(),
+            self.output,
+            root=root,
+            included_plugins=[CheckValidOID.name, CheckTodoTbd.name],
+            **kwargs,
+        )
+        server.handle({"id": 1, "method": "initialize", "params": {}})
+        return server
+
+    def _get_diagnostics(self) -> List[List[dict]]:
+        return [
+            message["params"]["diagnostics"]
+            for message in _read_messages(self.output)
+            if message.get("method") == "textDocument/publishDiagnostics"
+        ]
+
+    def _open(self, server: LanguageServer, nasl_file: Path, text: str):
+        server.handle(
+            {
+                "method": "textDocument/didOpen",
+                "params": {
+                    "textDocument": {
+                        "uri": path_to_uri(nasl_file),
+                        "version": 1,
+                        "text": text,
+                    }
+                },
+            }
+        )
+
+    def _change(
+        self, server: LanguageServer, nasl_file: Path, version: int, text: str
+    ):
+        server.handle(
+            {
+                "method": "textDocument/didChange",
+                "params": {
+                    "textDocument": {
+                        "uri": path_to_uri(nasl_file),
+                        "version": version,
+                    },
+                    "contentChanges": [{"text": text}],
+                },
+            }
+        )
+
+    def test_message_roundtrip(self):
+        stream = io.BytesIO()
+        write_message(stream, {"id": 1, "method": "foo", "params": "bär"})
+        stream.seek(0)
+
+        header, body = stream.getvalue().split(b"\r\n\r\n")
+        self.assertEqual(header, b"Content-Length: %d" % len(body))
+        self.assertEqual(
+            read_message(stream), {"id": 1, "method": "foo", "params": "bär"}
+        )
+        self.assertIsNone(read_message(stream))
+
+    def test_lifecycle(self):
+        messages = io.BytesIO()
+        write_message(messages, {"id": 1, "method": "shutdown"})
+        write_message(messages, {"id": 2, "method": "initialize"})
+        write_message(messages, {"id": 3, "method": "foo"})
+        write_message(messages, {"id": 4, "method": "shutdown"})
+        write_message(messages, {"method": "exit"})
+        messages.seek(0)
+
+        server = LanguageServer(messages, self.output)
+        self.assertEqual(server.serve(), 0)
+
+        responses = {
+            message["id"]: message
+            for message in _read_messages(self.output)
+            if "id" in message
+        }
+        self.assertEqual(responses[1]["error"]["code"], -32002)
+        self.assertEqual(
+            responses[2]["result"]["capabilities"]["textDocumentSync"][
+                "change"
+            ],
+            1,
+        )
+        self.assertEqual(responses[3]["error"]["code"], -32601)
+        self.assertIsNone(responses[4]["result"])
+
+    def test_exit_without_shutdown(self):
+        server = LanguageServer(io.BytesIO(), self.output)
+        self.assertEqual(server.serve(), 1)
+
+    def test_diagnostics(self):
+        with TemporaryDirectory() as tmpdir:
+            nasl_file = tmpdir / "foo.nasl"
+            server = self._create_server(tmpdir)
+
+            self._open(
+                server,
+                nasl_file,
+                CONTENT.replace("100001", "x") + "# TODO: foo\r\n",
+            )
+
+            diagnostics = self._get_diagnostics()[0]
+            self.assertEqual(
+                [diagnostic["code"] for diagnostic in diagnostics],
+                [CheckTodoTbd.name, CheckValidOID.name],
+            )
+            self.assertEqual(
+                diagnostics[0]["range"],
+                {
+                    "start": {"line": 7, "character": 0},
+                    "end": {"line": 7, "character": 11},
+                },
+            )
+            self.assertEqual(diagnostics[0]["severity"], 2)
+            self.assertEqual(diagnostics[1]["severity"], 1)
+            self.assertEqual(diagnostics[1]["range"]["start"]["line"], 0)
+
+    def test_ignore_warnings(self):
+        with TemporaryDirectory() as tmpdir:
+            server = self._create_server(tmpdir, ignore_warnings=True)
+            self._open(server, tmpdir / "foo.nasl", CONTENT + "# TODO\n")
+
+            self.assertEqual(self._get_diagnostics(), [[]])
+
+    def test_rerun_changed_inputs_only(self):
+        with TemporaryDirectory() as tmpdir:
+            nasl_file = tmpdir / "foo.nasl"
+            server = self._create_server(tmpdir, debounce_delay=0.0)
+            self._open(server, nasl_file, CONTENT)
+            document = server._documents[path_to_uri(nasl_file)]
+            valid_oid = document.plugins[CheckValidOID.name]
+            todo_tbd = document.plugins[CheckTodoTbd.name]
+
+            # the code after the description block has been changed
+            document.text = CONTENT + "bar = 2;\n"
+            server.check(document)
+            self.assertIs(document.plugins[CheckValidOID.name], valid_oid)
+            self.assertIsNot(document.plugins[CheckTodoTbd.name], todo_tbd)
+
+            # the OID has been changed
+            document.text = CONTENT.replace("100001", "x")
+            server.check(document)
+            self.assertIsNot(document.plugins[CheckValidOID.name], valid_oid)
+            self.assertEqual(
+                [
+                    diagnostic["code"]
+                    for diagnostic in self._get_diagnostics()[-1]
+                ],
+                [CheckValidOID.name],
+            )
+
+    def test_debounce(self):
+        with TemporaryDirectory() as tmpdir:
+            nasl_file = tmpdir / "foo.nasl"
+            server = self._create_server(tmpdir, debounce_delay=0.1)
+            self._open(server, nasl_file, CONTENT)
+
+            self._change(server, nasl_file, 2, CONTENT + "# TODO\n")
+            self._change(server, nasl_file, 3, CONTENT + "\n# TODO\n")
+            time.sleep(0.5)
+
+            diagnostics = self._get_diagnostics()
+            self.assertEqual(len(diagnostics), 2)
+            self.assertEqual(diagnostics[1][0]["range"]["start"]["line"], 8)
+
+            server.handle(
+                {
+                    "method": "textDocument/didClose",
+                    "params": {"textDocument": {"uri": path_to_uri(nasl_file)}},
+                }
+            )
+            self.assertEqual(self._get_diagnostics()[-1], [])
+
+    def test_duplicate_oid(self):
+        with TemporaryDirectory() as tmpdir:
+            (tmpdir / "common").mkdir()
+            (tmpdir / "common" / "bar.nasl").write_text(
+                CONTENT, encoding="latin1"
+            )
+            server = self._create_server(tmpdir)
+            server._check_duplicate_oid = True
+            server._get_index(tmpdir).ready.wait(5)
+
+            self._open(server, tmpdir / "common" / "foo.nasl", CONTENT)
+
+            diagnostics = self._get_diagnostics()[0]
+            self.assertEqual(len(diagnostics), 1)
+            self.assertEqual(diagnostics[0]["code"], CheckDuplicateOID.name)
+            self.assertEqual(
+                diagnostics[0]["message"],
+                "OID 1.3.6.1.4.1.25623.1.0.100001 already used by "
+                "'common/bar.nasl'",
+            )
+
+
+class DocumentContextTestCase(unittest.TestCase):
+    def test_content(self):
+        context = DocumentContext(
+            root=Path("."), nasl_file=Path("foo.nasl"), text="bär\n€"
+        )
+        self.assertEqual(context.raw_content, "bär\n€".encode("utf-8"))
+        self.assertEqual(context.lines, ["bÃ¤r", "â\x82¬"])
+
+        context = DocumentContext(
+            root=Path("."), nasl_file=Path("foo.nasl"), text="bär"
+        )
+        self.assertEqual(context.raw_content, "bär".encode("latin1"))
+
+    def test_uses_file_content(self):
+        self.assertTrue(_uses_file_content(CheckCVSSFormat))
+        self.assertFalse(_uses_file_content(CheckValidOID))
@@ -15,6 +15,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import io
 import sys
 import unittest
 from pathlib import Path
@@ -22,7 +23,11 @@ from unittest.mock import Mock
 
 from pontos.terminal import Terminal
 
-from troubadix.troubadix import generate_file_list, generate_patterns
+from troubadix.troubadix import (
+    from_stdin,
+    generate_file_list,
+    generate_patterns,
+)
 
 
 class TestNASLinter(unittest.TestCase):
@@ -105,3 +110,16 @@ class TestNASLinter(unittest.TestCase):
 
         self.assertEqual(new_include_patterns, expected_include_patterns)
         self.assertEqual(new_exclude_patterns, expected_exclude_patterns)
+
+    def test_from_stdin(self):
+        stdin = io.BytesIO(b"foo.nasl\r\n\nbar/baz.inc\nlast.nasl")
+        self.assertEqual(
+            list(from_stdin(b"\n", stdin)),
+            [Path("foo.nasl"), Path("bar/baz.inc"), Path("last.nasl")],
+        )
+
+        stdin = io.BytesIO(b"foo bar.nasl\0with\nnewline.nasl\0")
+        self.assertEqual(
+            list(from_stdin(b"\0", stdin)),
+            [Path("foo bar.nasl"), Path("with\nnewline.nasl")],
+        )
@@ -0,0 +1,222 @@
+# Copyright (C) 2022 Greenbone Networks GmbH
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from tests.plugins import TemporaryDirectory
+from troubadix.plugin import (
+    Edit,
+    FilePlugin,
+    FilePluginContext,
+    FixTransaction,
+    LinterError,
+    LinterFix,
+    LinterResult,
+    LinterWarning,
+    Severity,
+)
+
+
+class LinterResultTestCase(unittest.TestCase):
+    def test_severity(self):
+        self.assertEqual(LinterResult("foo").severity, Severity.RESULT)
+        self.assertEqual(LinterFix("foo").severity, Severity.FIX)
+        self.assertEqual(LinterWarning("foo").severity, Severity.WARNING)
+        self.assertEqual(LinterError("foo").severity, Severity.ERROR)
+
+    def test_create(self):
+        result = LinterResult.create(
+            Severity.WARNING, "foo", file=Path("foo.nasl"), plugin="bar"
+        )
+
+        self.assertIsInstance(result, LinterWarning)
+        self.assertEqual(
+            result, LinterWarning("foo", file=Path("foo.nasl"), plugin="bar")
+        )
+
+    def test_equality(self):
+        self.assertEqual(LinterError("foo", line=1), LinterError("foo", line=1))
+        self.assertNotEqual(LinterError("foo"), LinterError("foo", line=1))
+        self.assertNotEqual(LinterError("foo"), LinterWarning("foo"))
+
+    def test_slots(self):
+        result = LinterError("foo")
+
+        with self.assertRaises(AttributeError):
+            result.other = "bar"
+
+    def test_repr(self):
+        self.assertEqual(
+            repr(LinterError("foo", plugin="bar", line=2)),
+            "LinterError(message='foo', file=None, plugin='bar', line=2)",
+        )
+
+
+class FilePluginContextTestCase(unittest.TestCase):
+    def test_views(self):
+        with TemporaryDirectory() as tmpdir:
+            nasl_file = tmpdir / "foo.nasl"
+            nasl_file.write_bytes(b"foo\r\nb\xe4r\n")
+            nasl_file.chmod(0o644)
+
+            context = FilePluginContext(root=tmpdir, nasl_file=nasl_file)
+
+            self.assertEqual(context.raw_content, b"foo\r\nb\xe4r\n")
+            self.assertEqual(context.file_content, "foo\nbär\n")
+            self.assertEqual(context.lines, ["foo", "bär"])
+            self.assertEqual(context.stat.st_size, 9)
+            self.assertEqual(context.stat.st_mode & 0o777, 0o644)
+
+    def test_newlines(self):
+        with TemporaryDirectory() as tmpdir:
+            nasl_file = tmpdir / "foo.nasl"
+            nasl_file.write_bytes(b"foo \r\nbar\rbaz\n")
+
+            context = FilePluginContext(root=tmpdir, nasl_file=nasl_file)
+
+            self.assertEqual(context.raw_content, b"foo \r\nbar\rbaz\n")
+            self.assertEqual(context.file_content, "foo \nbar\nbaz\n")
+            self.assertEqual(context.lines, ["foo ", "bar", "baz"])
+
+    def test_read_once(self):
+        with TemporaryDirectory() as tmpdir:
+            nasl_file = tmpdir / "foo.nasl"
+            nasl_file.write_text("foo\n", encoding="utf-8")
+
+            context = FilePluginContext(root=tmpdir, nasl_file=nasl_file)
+
+            with patch.object(
+                type(nasl_file), "open", wraps=nasl_file.open
+            ) as open_mock:
+                self.assertEqual(context.stat.st_size, 4)
+                self.assertEqual(context.file_content, "foo\n")
+                self.assertEqual(context.raw_content, b"foo\n")
+                self.assertEqual(context.lines, ["foo"])
+                self.assertEqual(context.vt_metadata.file_content, "foo\n")
+
+            open_mock.assert_called_once()
+
+    def test_empty_file(self):
+        with TemporaryDirectory() as tmpdir:
+            nasl_file = tmpdir / "foo.nasl"
+            nasl_file.write_bytes(b"")
+
+            context = FilePluginContext(root=tmpdir, nasl_file=nasl_file)
+
+            self.assertEqual(context.file_content, "")
+            nasl_file.write_bytes(b"foo")
+            self.assertEqual(context.file_content, "")
+            self.assertEqual(context.lines, [])
+
+
+class FixPlugin(FilePlugin):
+    name = "fix_plugin"
+
+    def run(self):
+        return []
+
+
+class FixTransactionTestCase(unittest.TestCase):
+    def test_apply(self):
+        fixes = FixTransaction("foo bar baz\n")
+
+        self.assertTrue(fixes.submit("b", [Edit(8, 11, "qux")]))
+        self.assertTrue(fixes.submit("a", [Edit(0, 3, ""), Edit(4, 4, "a ")]))
+
+        self.assertEqual(
+            fixes.edits, [Edit(0, 3, ""), Edit(4, 4, "a "), Edit(8, 11, "qux")]
+        )
+        self.assertEqual(fixes.apply(), " a bar qux\n")
+
+    def test_apply_original_line_breaks(self):
+        fixes = FixTransaction("foo\nbar\nbaz\n", "foo\r\nbar\rbaz\r\n")
+
+        self.assertTrue(fixes.submit("a", [Edit(4, 8, "BAR ")]))
+        self.assertTrue(fixes.submit("b", [Edit(11, 12, "\n")]))
+
+        self.assertEqual(fixes.apply(), "foo\r\nBAR baz\r\n")
+
+    def test_apply_original_line_breaks_in_text(self):
+        fixes = FixTransaction("foo\nbar\n", "foo\rbar\r")
+
+        self.assertTrue(fixes.submit("a", [Edit(4, 8, "BAR\nbaz\n")]))
+
+        self.assertEqual(fixes.apply(), "foo\rBAR\rbaz\r")
+
+    def test_conflict(self):
+        fixes = FixTransaction("foo bar baz")
+
+        self.assertTrue(fixes.submit("a", [Edit(4, 7, "BAR")]))
+        self.assertFalse(fixes.submit("b", [Edit(0, 1, "F"), Edit(6, 9, "")]))
+        self.assertFalse(fixes.submit("c", [Edit(4, 4, "new ")]))
+        self.assertTrue(fixes.submit("d", [Edit(7, 7, "s")]))
+
+        self.assertEqual(fixes.get_conflicting_plugin(Edit(5, 6, "")), "a")
+        self.assertIsNone(fixes.get_conflicting_plugin(Edit(0, 1, "")))
+        # the rejected fix of b is not applied at all
+        self.assertEqual(fixes.apply(), "foo BARs baz")
+
+    def test_invalid_edit(self):
+        fixes = FixTransaction("foo")
+
+        with self.assertRaises(ValueError):
+            fixes.submit("a", [Edit(2, 4, "")])
+        with self.assertRaises(ValueError):
+            fixes.submit("a", [Edit(2, 1, "")])
+
+    def test_diff(self):
+        fixes = FixTransaction("foo\r\nbar\nbaz")
+        fixes.submit("a", [Edit(0, 3, "FOO"), Edit(9, 12, "BAZ")])
+
+        self.assertEqual(
+            fixes.diff("common/foo.nasl"),
+            "--- a/common/foo.nasl\n"
+            "+++ b/common/foo.nasl\n"
+            "@@ -1,3 +1,3 @@\n"
+            "-foo\r\n"
+            "+FOO\r\n"
+            " bar\n"
+            "-baz\n"
+            "\\ No newline at end of file\n"
+            "+BAZ\n"
+            "\\ No newline at end of file\n",
+        )
+
+    def test_submit_fix(self):
+        context = FilePluginContext(root=Path("."), nasl_file=Path("foo.nasl"))
+        context._file_content = "foo bar"
+        plugin = FixPlugin(context)
+
+        self.assertFalse(context.has_fixes)
+
+        result = plugin.submit_fix([Edit(0, 3, "FOO")], "Fixed foo.")
+        self.assertEqual(
+            result,
+            LinterFix("Fixed foo.", file=Path("foo.nasl"), plugin="fix_plugin"),
+        )
+        self.assertTrue(context.has_fixes)
+
+        result = plugin.submit_fix([Edit(1, 2, "")], "Fixed o.")
+        self.assertIsInstance(result, LinterWarning)
+        self.assertEqual(
+            result.message,
+            "Fix has not been applied because it conflicts with the fix of "
+            "fix_plugin.",
+        )
+        self.assertEqual(context.fixes.apply(), "FOO bar")
@@ -0,0 +1,112 @@
+# Copyright (C) 2022 Greenbone Networks GmbH
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import io
+import json
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from pontos.terminal.terminal import ConsoleTerminal
+
+from tests.plugins import TemporaryDirectory
+from troubadix.profiling import PluginProfile, PluginTiming, get_percentile
+from troubadix.reporter import Reporter
+from troubadix.results import FileResults, Results
+
+_root = Path("/feed")
+
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        self.profile = PluginProfile()
+        for i in range(1, 21):
+            nasl_file = _root / f"{i}.nasl"
+            self.profile.add("check_a", nasl_file, i / 1000, i / 2000)
+            self.profile.add("check_b", nasl_file, 0.001, 0.001)
+        self.profile.add("check_c", None, 0.5, 0.25)
+
+    def test_get_percentile(self):
+        self.assertEqual(get_percentile([], 95), 0.0)
+        self.assertEqual(get_percentile([3.0], 95), 3.0)
+        self.assertEqual(get_percentile(range(100, 0, -1), 95), 95)
+        self.assertEqual(get_percentile([1.0, 2.0], 50), 1.0)
+
+    def test_add_results(self):
+        profile = PluginProfile()
+        results = FileResults(_root / "a.nasl")
+        results.add_plugin_timing("check_a", 0.5, 0.25)
+        results.add_plugin_timing("check_a", 0.5, 0.25)
+        profile.add_results(results)
+        profile.add_results(Results().add_plugin_timing("check_b", 1.0, 0.5))
+
+        self.assertEqual(
+            profile.timings,
+            [
+                PluginTiming("check_a", _root / "a.nasl", 1.0, 0.5),
+                PluginTiming("check_b", None, 1.0, 0.5),
+            ],
+        )
+
+    def test_get_plugin_statistics(self):
+        statistics = self.profile.get_plugin_statistics()
+
+        self.assertEqual(
+            [statistic.plugin for statistic in statistics],
+            ["check_c", "check_a", "check_b"],
+        )
+        statistic = statistics[1]
+        self.assertEqual(statistic.count, 20)
+        self.assertAlmostEqual(statistic.total, 0.21)
+        self.assertAlmostEqual(statistic.mean, 0.0105)
+        self.assertAlmostEqual(statistic.p95, 0.019)
+        self.assertAlmostEqual(statistic.cpu, 0.105)
+
+    def test_get_slowest(self):
+        self.assertEqual(
+            self.profile.get_slowest_files(2),
+            [(_root / "20.nasl", 0.021), (_root / "19.nasl", 0.02)],
+        )
+        self.assertEqual(
+            self.profile.get_slowest_pairs(1),
+            [PluginTiming("check_a", _root / "20.nasl", 0.02, 0.01)],
+        )
+
+    def test_write_json(self):
+        with TemporaryDirectory() as tmpdir:
+            path = tmpdir / "profile.json"
+            self.profile.write_json(path)
+            data = json.loads(path.read_text(encoding="utf-8"))
+
+        self.assertEqual(data["version"], 1)
+        self.assertEqual(len(data["timings"]), 41)
+        self.assertEqual(
+            data["timings"][-1],
+            {"plugin": "check_c", "file": None, "wall": 0.5, "cpu": 0.25},
+        )
+
+    def test_report_profile(self):
+        reporter = Reporter(term=ConsoleTerminal(), root=_root)
+
+        with redirect_stdout(io.StringIO()) as f:
+            reporter.report_profile(self.profile, 1)
+
+        output = f.getvalue()
+        self.assertIn(f"{'check_a':47}   0.21   0.10  10.50  19.00", output)
+        self.assertIn("Slowest 1 files", output)
+        self.assertIn("   0.021s 20.nasl", output)
+        self.assertIn("   0.020s check_a 20.nasl", output)
@@ -17,13 +17,24 @@
 # pylint: disable=protected-access
 
 import io
+import json
+import tempfile
 import unittest
 from contextlib import redirect_stdout
 from pathlib import Path
+from xml.etree import ElementTree
 
 from pontos.terminal.terminal import ConsoleTerminal
 
-from troubadix.reporter import Reporter
+from troubadix.plugin import LinterError, LinterFix, LinterWarning
+from troubadix.reporter import (
+    BufferedWriter,
+    JSONLinesSink,
+    JUnitSink,
+    Reporter,
+    SARIFSink,
+)
+from troubadix.results import FileResults, Results
 
 _here = Path(__file__).parent
 
@@ -110,3 +121,203 @@ class TestReporter(unittest.TestCase):
         output = f.getvalue()
 
         self.assertFalse(output)
+
+    def test_log_files(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            log_file = Path(tmpdir) / "log.txt"
+            log_file_statistic = Path(tmpdir) / "statistic.txt"
+            log_file.write_text("previous\n", encoding="utf-8")
+            reporter = Reporter(
+                root=self.root,
+                term=self._term,
+                log_file=log_file,
+                log_file_statistic=log_file_statistic,
+                verbose=1,
+            )
+
+            with redirect_stdout(io.StringIO()):
+                reporter.report_by_file_plugin(
+                    create_file_results(self.root / "21.04" / "test.nasl"),
+                    pos=1,
+                )
+                reporter.report_statistic()
+            reporter.close()
+
+            self.assertEqual(
+                log_file.read_text(encoding="utf-8"),
+                "previous\n"
+                "\n\nChecking 21.04/test.nasl (1)\n"
+                "\tResults for plugin check_a\n"
+                "\t\tan error\n"
+                "\t\tin two lines\n"
+                "\t\ta warning\n"
+                "\tResults for plugin check_b\n"
+                "\t\ta fix\n",
+            )
+            statistic = log_file_statistic.read_text(encoding="utf-8")
+            self.assertIn(f"{'check_a':48} {1:8} {1:8}\n", statistic)
+            self.assertIn(f"{'sum':48} {1:8} {1:8}\n", statistic)
+
+
+def create_file_results(nasl_file: Path) -> FileResults:
+    results = FileResults(nasl_file)
+    results.add_plugin_results(
+        "check_a",
+        [
+            LinterError(
+                "an error\nin two lines",
+                file=nasl_file,
+                plugin="check_a",
+                line=3,
+            ),
+            LinterWarning("a warning", file=nasl_file, plugin="check_a"),
+        ],
+    )
+    results.add_plugin_results(
+        "check_b",
+        [LinterFix("a fix", file=nasl_file, plugin="check_b")],
+    )
+    return results
+
+
+class TestSinks(unittest.TestCase):
+    def setUp(self):
+        self.root = _here / "plugins" / "test_files" / "nasl"
+        self.nasl_file = self.root / "21.04" / "test.nasl"
+        self.files_results = Results().add_plugin_results(
+            "check_files", [LinterError("duplicate", plugin="check_files")]
+        )
+
+    def report(self, sink_class: type, path: Path) -> None:
+        sink = sink_class(path, self.root)
+        sink.report_results(create_file_results(self.nasl_file))
+        sink.report_results(FileResults(self.root / "21.04" / "ok.nasl"))
+        sink.report_results(self.files_results)
+        sink.close()
+
+    def test_buffered_writer(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "out.txt"
+            writer = BufferedWriter(path)
+            for i in range(1000):
+                writer.write(f"{i}\n")
+            writer.flush()
+
+            self.assertEqual(
+                path.read_text(encoding="utf-8"),
+                "".join(f"{i}\n" for i in range(1000)),
+            )
+
+            writer.write("end\n")
+            writer.close()
+
+            self.assertTrue(path.read_text(encoding="utf-8").endswith("end\n"))
+
+    def test_json_lines(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "results.jsonl"
+            self.report(JSONLinesSink, path)
+
+            lines = path.read_text(encoding="utf-8").splitlines()
+
+        self.assertEqual(
+            [json.loads(line) for line in lines],
+            [
+                {
+                    "type": "error",
+                    "plugin": "check_a",
+                    "file": "21.04/test.nasl",
+                    "line": 3,
+                    "message": "an error\nin two lines",
+                },
+                {
+                    "type": "warning",
+                    "plugin": "check_a",
+                    "file": "21.04/test.nasl",
+                    "line": None,
+                    "message": "a warning",
+                },
+                {
+                    "type": "fix",
+                    "plugin": "check_b",
+                    "file": "21.04/test.nasl",
+                    "line": None,
+                    "message": "a fix",
+                },
+                {
+                    "type": "error",
+                    "plugin": "check_files",
+                    "file": None,
+                    "line": None,
+                    "message": "duplicate",
+                },
+            ],
+        )
+
+    def test_sarif(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "results.sarif"
+            self.report(SARIFSink, path)
+
+            sarif = json.loads(path.read_text(encoding="utf-8"))
+
+        self.assertEqual(sarif["version"], "2.1.0")
+        run = sarif["runs"][0]
+        self.assertEqual(run["tool"]["driver"]["name"], "troubadix")
+        self.assertEqual(
+            run["tool"]["driver"]["rules"],
+            [{"id": "check_a"}, {"id": "check_b"}, {"id": "check_files"}],
+        )
+        self.assertEqual(
+            [result["level"] for result in run["results"]],
+            ["error", "warning", "note", "error"],
+        )
+        self.assertEqual(
+            run["results"][0]["locations"],
+            [
+                {
+                    "physicalLocation": {
+                        "artifactLocation": {"uri": "21.04/test.nasl"},
+                        "region": {"startLine": 3},
+                    }
+                }
+            ],
+        )
+        self.assertNotIn("locations", run["results"][3])
+
+    def test_sarif_empty(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "results.sarif"
+            SARIFSink(path, self.root).close()
+
+            sarif = json.loads(path.read_text(encoding="utf-8"))
+
+        self.assertEqual(sarif["runs"][0]["results"], [])
+
+    def test_junit(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "results.xml"
+            self.report(JUnitSink, path)
+
+            testsuite = ElementTree.parse(path).getroot().find("testsuite")
+
+        testcases = testsuite.findall("testcase")
+        self.assertEqual(
+            [testcase.get("name") for testcase in testcases],
+            ["21.04/test.nasl", "21.04/ok.nasl", "check_files"],
+        )
+
+        failure = testcases[0].find("failure")
+        self.assertEqual(
+            failure.text,
+            "21.04/test.nasl:3: check_a: an error\nin two lines",
+        )
+        self.assertEqual(
+            testcases[0].find("system-out").text,
+            "warning: 21.04/test.nasl: check_a: a warning\n"
+            "fix: 21.04/test.nasl: check_b: a fix",
+        )
+        self.assertIsNone(testcases[1].find("failure"))
+        self.assertEqual(
+            testcases[2].find("failure").text, "check_files: duplicate"
+        )
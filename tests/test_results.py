@@ -16,11 +16,12 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 # pylint: disable=protected-access
 
+import pickle
 import unittest
 from pathlib import Path
 
-from troubadix.results import FileResults
-from troubadix.plugin import LinterWarning, LinterError
+from troubadix.plugin import LinterError, LinterFix, LinterResult, LinterWarning
+from troubadix.results import FileResults, ResultColumns
 
 
 class TestResults(unittest.TestCase):
@@ -76,3 +77,95 @@ class TestResults(unittest.TestCase):
         )
 
         self.assertTrue(fresults)
+
+    def test_add_plugin_facts(self):
+        fresults = FileResults(file_path=Path("some/file.nasl"))
+        fresults.add_plugin_facts(plugin_name="test", facts="1.2.3")
+        fresults.add_plugin_facts(plugin_name="other", facts=None)
+
+        self.assertEqual(fresults.plugin_facts, {"test": "1.2.3"})
+        self.assertFalse(fresults)
+
+    def test_pickle(self):
+        file_path = Path("some/file.nasl")
+        results = [
+            LinterError("error", file=file_path, plugin="test", line=1),
+            LinterWarning("warning", file=file_path, plugin="other"),
+            LinterError("no plugin"),
+        ]
+        fresults = FileResults(file_path=file_path)
+        fresults.add_plugin_results(plugin_name="test", results=results)
+        fresults.add_plugin_results(plugin_name="empty", results=[])
+        fresults.add_plugin_facts(plugin_name="test", facts=(True, None))
+
+        unpickled = pickle.loads(pickle.dumps(fresults))
+
+        self.assertEqual(unpickled.file_path, file_path)
+        self.assertEqual(unpickled.plugin_results["test"], results)
+        self.assertEqual(unpickled.plugin_results["empty"], [])
+        self.assertIsInstance(
+            unpickled.plugin_results["test"][1], LinterWarning
+        )
+        self.assertEqual(unpickled.plugin_facts, {"test": (True, None)})
+        self.assertTrue(unpickled)
+
+    def test_pickle_shares_paths(self):
+        file_path = Path("some/file.nasl")
+        fresults = FileResults(file_path=file_path)
+        fresults.add_plugin_results(
+            "test",
+            [
+                LinterError("error", file=Path("some/file.nasl")),
+                LinterError("error", file=Path("some/file.nasl"), line=2),
+            ],
+        )
+
+        unpickled = pickle.loads(pickle.dumps(fresults))
+
+        first, second = unpickled.plugin_results["test"]
+        self.assertIs(first.file, second.file)
+        self.assertEqual(first.file, file_path)
+
+
+class TestResultColumns(unittest.TestCase):
+    def test_roundtrip(self):
+        file_path = Path("some/file.nasl")
+        plugin_results = {
+            "first": [
+                LinterError("error", file=file_path, plugin="first", line=0),
+                LinterFix("fix", file=file_path, plugin="first"),
+                LinterResult("error", plugin="other"),
+            ],
+            "empty": [],
+            "second": [LinterWarning("error")],
+        }
+
+        columns = ResultColumns.from_plugin_results(plugin_results)
+
+        self.assertEqual(
+            columns.strings,
+            [
+                "first",
+                "empty",
+                "second",
+                "error",
+                "fix",
+                "other",
+                "some/file.nasl",
+            ],
+        )
+        self.assertEqual(list(columns.owners), [0, 0, 0, 2])
+        self.assertEqual(list(columns.severities), [3, 1, 0, 2])
+        self.assertEqual(list(columns.messages), [3, 4, 3, 3])
+        self.assertEqual(list(columns.files), [6, 6, -1, -1])
+        self.assertEqual(list(columns.plugins), [0, 0, 5, -1])
+        self.assertEqual(list(columns.lines), [0, -1, -1, -1])
+
+        unpickled = pickle.loads(pickle.dumps(columns))
+
+        self.assertEqual(unpickled.to_plugin_results(), plugin_results)
+
+    def test_empty(self):
+        columns = ResultColumns.from_plugin_results({})
+
+        self.assertEqual(columns.to_plugin_results(), {})
@@ -17,6 +17,9 @@
 # pylint: disable=protected-access
 
 import io
+import pstats
+import tempfile
+import threading
 import unittest
 from contextlib import redirect_stdout
 from pathlib import Path
@@ -30,13 +33,20 @@ from troubadix.plugins.badwords import CheckBadwords
 from troubadix.plugins.copyright_text import CheckCopyrightText
 from troubadix.plugins.cvss_format import CheckCVSSFormat
 from troubadix.plugins.duplicate_oid import CheckDuplicateOID
+from troubadix.plugins.illegal_characters import CheckIllegalCharacters
 from troubadix.plugins.missing_desc_exit import CheckMissingDescExit
 from troubadix.plugins.no_solution import CheckNoSolution
 from troubadix.plugins.script_version_and_last_modification_tags import (
     CheckScriptVersionAndLastModificationTags,
 )
-from troubadix.reporter import Reporter
-from troubadix.runner import Runner, TroubadixException
+from troubadix.profiling import PluginProfile
+from troubadix.reporter import PatchSink, Reporter
+from troubadix.runner import (
+    STREAM_BACKLOG,
+    STREAM_CHUNKSIZE,
+    Runner,
+    TroubadixException,
+)
 
 _here = Path(__file__).parent
 
@@ -186,6 +196,242 @@ class TestRunner(unittest.TestCase):
             0,
         )
 
+    def test_runner_run_map_reduce_plugin(self):
+        content = (
+            '  script_oid("1.3.6.1.4.1.25623.1.0.100001");\n' "  exit(0);\n"
+        )
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            nasl_files = [root / "a.nasl", root / "b.nasl", root / "c.nasl"]
+            for nasl_file in nasl_files:
+                nasl_file.write_text(content, encoding=CURRENT_ENCODING)
+
+            reporter = Reporter(term=self._term, root=root)
+            runner = Runner(
+                n_jobs=2,
+                reporter=reporter,
+                included_plugins=[CheckDuplicateOID.name],
+                root=root,
+            )
+
+            with redirect_stdout(io.StringIO()):
+                sys_exit = runner.run(nasl_files)
+
+        self.assertFalse(sys_exit)
+        self.assertEqual(
+            reporter._result_counts.result_counts[CheckDuplicateOID.name][
+                "error"
+            ],
+            2,
+        )
+
+    def test_runner_run_stream(self):
+        content = (
+            '  script_oid("1.3.6.1.4.1.25623.1.0.100001");\n' "  exit(0);\n"
+        )
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            nasl_files = [root / f"{i}.nasl" for i in range(20)]
+            for nasl_file in nasl_files:
+                nasl_file.write_text(content, encoding=CURRENT_ENCODING)
+
+            reporter = Reporter(term=self._term, root=root, verbose=2)
+            runner = Runner(
+                n_jobs=2,
+                reporter=reporter,
+                included_plugins=[CheckDuplicateOID.name],
+                root=root,
+                chunksize=3,
+            )
+
+            output = io.StringIO()
+            with redirect_stdout(output):
+                # duplicates are only checked once
+                sys_exit = runner.run(
+                    iter(nasl_files + nasl_files[:5]), stream=True
+                )
+
+        self.assertFalse(sys_exit)
+        self.assertEqual(
+            reporter._result_counts.result_counts[CheckDuplicateOID.name][
+                "error"
+            ],
+            19,
+        )
+        self.assertIn("(20)", output.getvalue())
+        self.assertNotIn("(21)", output.getvalue())
+
+    def test_runner_run_stream_error(self):
+        content = (
+            '  script_oid("1.3.6.1.4.1.25623.1.0.100001");\n' "  exit(0);\n"
+        )
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            # more files than batches are sent to the pool at once
+            nasl_files = [root / "missing.nasl"] + [
+                root / f"{i}.nasl"
+                for i in range(STREAM_BACKLOG * STREAM_CHUNKSIZE + 1)
+            ]
+            for nasl_file in nasl_files[1:]:
+                nasl_file.write_text(content, encoding=CURRENT_ENCODING)
+
+            runner = Runner(
+                n_jobs=1,
+                reporter=Reporter(term=self._term, root=root),
+                included_plugins=[CheckDuplicateOID.name],
+                root=root,
+            )
+
+            errors = []
+
+            def run():
+                try:
+                    runner.run(iter(nasl_files), stream=True)
+                except FileNotFoundError as e:
+                    errors.append(e)
+
+            # the run hangs if the pool waits for the discovery of the files
+            thread = threading.Thread(target=run, daemon=True)
+            with redirect_stdout(io.StringIO()):
+                thread.start()
+                thread.join(timeout=60)
+
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(errors), 1)
+
+    def test_runner_report_phase_timings(self):
+        nasl_file = (
+            _here
+            / "plugins"
+            / "test_files"
+            / "nasl"
+            / "21.04"
+            / "runner"
+            / "fail.nasl"
+        )
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            log_file = Path(tmpdir) / "log.txt"
+            reporter = Reporter(
+                term=self._term, root=self.root, log_file=log_file
+            )
+            runner = Runner(
+                n_jobs=2,
+                reporter=reporter,
+                included_plugins=[CheckCVSSFormat.name, CheckNoSolution.name],
+                root=self.root,
+            )
+
+            with redirect_stdout(io.StringIO()):
+                runner.run([nasl_file])
+
+            elapsed = log_file.read_text(encoding="utf-8").splitlines()[-1]
+
+        self.assertRegex(
+            elapsed,
+            r"^\tTime elapsed: .+ \(file plugins: .+, reduce: .+, "
+            r"tail latency: .+\)$",
+        )
+
+    def test_runner_profile(self):
+        content = (
+            '  script_oid("1.3.6.1.4.1.25623.1.0.100001");\n' "  exit(0);\n"
+        )
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            nasl_files = [root / "a.nasl", root / "b.nasl"]
+            for nasl_file in nasl_files:
+                nasl_file.write_text(content, encoding=CURRENT_ENCODING)
+
+            profile = PluginProfile()
+            runner = Runner(
+                n_jobs=2,
+                reporter=Reporter(term=self._term, root=root),
+                included_plugins=[
+                    CheckCVSSFormat.name,
+                    CheckDuplicateOID.name,
+                ],
+                root=root,
+                profile=profile,
+            )
+
+            with redirect_stdout(io.StringIO()):
+                runner.run(nasl_files)
+
+        # the map step of each file and the reduce step
+        self.assertEqual(
+            {
+                timing.file
+                for timing in profile.timings
+                if timing.plugin == CheckDuplicateOID.name
+            },
+            {nasl_files[0], nasl_files[1], None},
+        )
+        self.assertEqual(
+            sorted(
+                timing.file
+                for timing in profile.timings
+                if timing.plugin == CheckCVSSFormat.name
+            ),
+            nasl_files,
+        )
+        for timing in profile.timings:
+            self.assertGreaterEqual(timing.wall, 0.0)
+            self.assertGreaterEqual(timing.cpu, 0.0)
+
+    def test_runner_cprofile_tracemalloc(self):
+        content = (
+            '  script_oid("1.3.6.1.4.1.25623.1.0.100001");\n' "  exit(0);\n"
+        )
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            nasl_files = [root / "a.nasl", root / "b.nasl"]
+            for nasl_file in nasl_files:
+                nasl_file.write_text(content, encoding=CURRENT_ENCODING)
+
+            cprofile_dir = root / "cprofile"
+            tracemalloc_dir = root / "tracemalloc"
+            runner = Runner(
+                n_jobs=2,
+                reporter=Reporter(term=self._term, root=root),
+                included_plugins=[
+                    CheckCVSSFormat.name,
+                    CheckDuplicateOID.name,
+                ],
+                root=root,
+                cprofile_dir=cprofile_dir,
+                tracemalloc_dir=tracemalloc_dir,
+            )
+
+            with redirect_stdout(io.StringIO()) as f:
+                runner.run(nasl_files)
+
+            output = f.getvalue()
+            self.assertIn("Merged cProfile data", output)
+            self.assertIn("Merged tracemalloc data", output)
+
+            # the dumps of the workers are removed after merging
+            self.assertEqual(
+                sorted(path.name for path in cprofile_dir.iterdir()),
+                ["plugins.txt", "troubadix.prof"],
+            )
+            self.assertEqual(
+                [path.name for path in tracemalloc_dir.iterdir()],
+                ["allocations.txt"],
+            )
+
+            stats = pstats.Stats(str(cprofile_dir / "troubadix.prof"))
+            self.assertTrue(stats.total_calls)
+
+            report = (cprofile_dir / "plugins.txt").read_text(encoding="utf-8")
+            self.assertIn(CheckCVSSFormat.name, report)
+            self.assertIn(CheckDuplicateOID.name, report)
+
+            report = (tracemalloc_dir / "allocations.txt").read_text(
+                encoding="utf-8"
+            )
+            self.assertIn("Allocations by plugin", report)
+
     def test_runner_run_fail_with_verbose_level_2(self):
         nasl_file = (
             _here
@@ -391,15 +637,16 @@ class TestRunner(unittest.TestCase):
             ", check_no_solution\n"
             "\tRunning plugins: check_duplicate_oid, check_no_solution, "
             "check_missing_desc_exit\n"
-            "\n\nRun plugin check_duplicate_oid\n"
+            "\n\n"
+            f"Checking {get_path_from_root(nasl_file, self.root)} (1/1)\n\t\t"
+            "No results for plugin check_missing_desc_exit\n\n\n"
+            "Run plugin check_duplicate_oid\n"
             "\tResults for plugin check_duplicate_oid\n"
             "\t\tInvalid OID 1.2.3.4.5.6.78909.1.7.654321 found"
             " in '21.04/runner/test.nasl'.\n\n\n"
             "Run plugin check_no_solution\n"
-            "\t\tNo results for plugin check_no_solution\n\n\n"
-            f"Checking {get_path_from_root(nasl_file, self.root)} (1/1)\n\t\t"
-            "No results for plugin"
-            " check_missing_desc_exit\n\tTime elapsed: 0:00:00.013967"
+            "\t\tNo results for plugin check_no_solution\n"
+            "\tTime elapsed: 0:00:00.013967"
         )
         gen_content = gen_log_file.read_text(encoding="utf-8")
         gen_log_file.unlink()
@@ -598,3 +845,89 @@ class TestRunner(unittest.TestCase):
         gen_log_file.unlink()
 
         self.assertNotEqual(compare_content, gen_content)
+
+    def _create_fixable_file(self, tmpdir: Path) -> Path:
+        nasl_file = tmpdir / "common" / "fix.nasl"
+        nasl_file.parent.mkdir()
+        nasl_file.write_bytes(
+            b"# Copyright (C) 2017 Greenbone Networks GmbH\r\n"
+            b"# Text descriptions are largely excerpted from the referenced\r\n"
+            b"# advisory, and are Copyright (C) the respective author(s)\r\n"
+            b'  script_tag(name:"summary", value:"Foo | b\xe4r");\r\n'
+            b"exit(0);"
+        )
+        return nasl_file
+
+    def test_runner_fix_all_plugins(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            nasl_file = self._create_fixable_file(root)
+            runner = Runner(
+                reporter=Reporter(term=self._term, root=root, fix=True),
+                n_jobs=1,
+                included_plugins=[
+                    CheckCopyrightText.name,
+                    CheckIllegalCharacters.name,
+                ],
+                root=root,
+                fix=True,
+            )
+
+            with redirect_stdout(io.StringIO()):
+                runner.run([nasl_file])
+
+            self.assertEqual(
+                nasl_file.read_bytes(),
+                b"# Copyright (C) 2017 Greenbone Networks GmbH\r\n"
+                b"# Some text descriptions might be excerpted from (a) "
+                b"referenced\r\n# source(s), and are Copyright (C) by the "
+                b"respective right holder(s).\r\n"
+                b'  script_tag(name:"summary", value:"Foo   b\xe4r");\r\n'
+                b"exit(0);",
+            )
+            self.assertEqual(runner._reporter._result_counts.fix_count, 2)
+
+    def test_runner_fix_diff(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            nasl_file = self._create_fixable_file(root)
+            content = nasl_file.read_bytes()
+            patch_file = root / "fixes.patch"
+            reporter = Reporter(
+                term=self._term,
+                root=root,
+                fix=True,
+                sinks=[PatchSink(patch_file)],
+            )
+            runner = Runner(
+                reporter=reporter,
+                n_jobs=1,
+                included_plugins=[
+                    CheckCopyrightText.name,
+                    CheckIllegalCharacters.name,
+                ],
+                root=root,
+                fix=True,
+                diff=True,
+            )
+
+            with redirect_stdout(io.StringIO()):
+                runner.run([nasl_file])
+            reporter.close()
+
+            self.assertEqual(nasl_file.read_bytes(), content)
+            patch = patch_file.read_bytes()
+
+        self.assertIn(b"fix.nasl\n", patch.splitlines(keepends=True)[0])
+        self.assertIn(
+            b"-# Text descriptions are largely excerpted from the "
+            b"referenced\r\n",
+            patch,
+        )
+        self.assertIn(
+            b'+  script_tag(name:"summary", value:"Foo   b\xe4r");\r\n',
+            patch,
+        )
+        self.assertTrue(
+            patch.endswith(b" exit(0);\n\\ No newline at end of file\n")
+        )
@@ -0,0 +1,110 @@
+# Copyright (C) 2022 Greenbone Networks GmbH
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+from pathlib import Path
+
+from tests.plugins import TemporaryDirectory
+from troubadix.runner import get_tail_latency
+from troubadix.scheduler import (
+    MAX_BATCH_SIZE,
+    create_batches,
+    estimate_costs,
+    get_timing_key,
+)
+
+
+class EstimateCostsTestCase(unittest.TestCase):
+    def test_by_size(self):
+        with TemporaryDirectory() as tmpdir:
+            small = tmpdir / "small.nasl"
+            small.write_text("a", encoding="latin1")
+            large = tmpdir / "large.nasl"
+            large.write_text("a" * 100, encoding="latin1")
+            missing = tmpdir / "missing.nasl"
+
+            costs = estimate_costs([small, large, missing])
+
+        self.assertEqual(costs, {small: 1.0, large: 100.0, missing: 0.0})
+
+    def test_by_timings(self):
+        with TemporaryDirectory() as tmpdir:
+            recorded = tmpdir / "recorded.nasl"
+            recorded.write_text("a" * 10, encoding="latin1")
+            new = tmpdir / "new.nasl"
+            new.write_text("a" * 100, encoding="latin1")
+
+            costs = estimate_costs(
+                [recorded, new], {get_timing_key(recorded): 2.0}
+            )
+
+        self.assertEqual(costs, {recorded: 2.0, new: 20.0})
+
+    def test_known_sizes(self):
+        with TemporaryDirectory() as tmpdir:
+            known = tmpdir / "known.nasl"
+            unknown = tmpdir / "unknown.nasl"
+            unknown.write_text("a" * 10, encoding="latin1")
+
+            costs = estimate_costs([known, unknown], known_sizes={known: 5})
+
+        self.assertEqual(costs, {known: 5.0, unknown: 10.0})
+
+
+class CreateBatchesTestCase(unittest.TestCase):
+    def test_fixed_chunksize(self):
+        costs = {Path(f"{i}.nasl"): float(i) for i in range(5)}
+
+        batches = create_batches(costs, n_jobs=2, chunksize=2)
+
+        self.assertEqual(
+            batches,
+            [
+                [Path("4.nasl"), Path("3.nasl")],
+                [Path("2.nasl"), Path("1.nasl")],
+                [Path("0.nasl")],
+            ],
+        )
+
+    def test_auto(self):
+        costs = {Path("huge.nasl"): 1000.0}
+        costs.update({Path(f"{i}.nasl"): 1.0 for i in range(200)})
+
+        batches = create_batches(costs, n_jobs=2)
+
+        self.assertEqual(batches[0], [Path("huge.nasl")])
+        self.assertEqual(
+            sorted(f for batch in batches for f in batch), sorted(costs)
+        )
+        self.assertTrue(all(len(batch) <= MAX_BATCH_SIZE for batch in batches))
+        self.assertLess(len(batches), len(costs))
+        # the batches are shrinking towards the end
+        self.assertLessEqual(len(batches[-1]), len(batches[1]))
+
+    def test_auto_without_costs(self):
+        costs = {Path(f"{i}.nasl"): 0.0 for i in range(100)}
+
+        batches = create_batches(costs, n_jobs=2)
+
+        self.assertEqual([len(batch) for batch in batches], [64, 36])
+
+
+class TailLatencyTestCase(unittest.TestCase):
+    def test_tail_latency(self):
+        self.assertIsNone(get_tail_latency(1, 0.0, [5.0], 5.0))
+        self.assertEqual(get_tail_latency(3, 0.0, [2.0, 5.0, 4.0], 5.0), 1.0)
+        self.assertEqual(get_tail_latency(3, 0.0, [5.0], 5.0), 5.0)
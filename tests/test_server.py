@@ -0,0 +1,108 @@
+# Copyright (C) 2022 Greenbone Networks GmbH
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import io
+import threading
+import unittest
+from pathlib import Path
+
+from tests.plugins import TemporaryDirectory
+from troubadix.client import check
+from troubadix.plugins.cvss_format import CheckCVSSFormat
+from troubadix.plugins.no_solution import CheckNoSolution
+from troubadix.server import Server
+
+_here = Path(__file__).parent
+_root = _here / "plugins" / "test_files" / "nasl"
+
+
+class TestServer(unittest.TestCase):
+    def test_check(self):
+        fail_file = _root / "21.04" / "runner" / "fail.nasl"
+        valid_file = _root / "21.04" / "runner" / "test_valid_oid.nasl"
+
+        with TemporaryDirectory() as tmpdir:
+            socket_path = tmpdir / "troubadix.sock"
+            server = Server(
+                socket_path,
+                n_jobs=1,
+                root=_root,
+                included_plugins=[CheckCVSSFormat.name, CheckNoSolution.name],
+            )
+            thread = threading.Thread(target=server.serve_forever)
+            thread.start()
+            try:
+                output = io.StringIO()
+                exit_code = check(
+                    [fail_file], socket_path=socket_path, output=output
+                )
+                self.assertEqual(exit_code, 1)
+                lines = output.getvalue().splitlines()
+                self.assertEqual(lines[0], "ℹ Start linting 1 files ... ")
+                self.assertIn(
+                    f"× {CheckCVSSFormat.name:48}        2        0",
+                    lines,
+                )
+
+                # the workers are kept for the next job
+                output = io.StringIO()
+                exit_code = check(
+                    [valid_file],
+                    socket_path=socket_path,
+                    statistic=False,
+                    verbose=1,
+                    output=output,
+                )
+                self.assertEqual(exit_code, 0)
+                self.assertNotIn("sum", output.getvalue())
+
+                output = io.StringIO()
+                exit_code = check(
+                    [tmpdir / "missing.nasl"],
+                    socket_path=socket_path,
+                    output=output,
+                )
+                self.assertEqual(exit_code, 1)
+                self.assertIn("Files not found", output.getvalue())
+            finally:
+                server.shutdown()
+                thread.join()
+                server.server_close()
+
+            self.assertFalse(socket_path.exists())
+
+    def test_socket_in_use(self):
+        with TemporaryDirectory() as tmpdir:
+            socket_path = tmpdir / "troubadix.sock"
+            server = Server(socket_path, n_jobs=1)
+            try:
+                self.assertEqual(socket_path.stat().st_mode & 0o077, 0)
+                with self.assertRaises(FileExistsError):
+                    Server(socket_path, n_jobs=1)
+            finally:
+                server.server_close()
+
+    def test_stale_socket(self):
+        with TemporaryDirectory() as tmpdir:
+            socket_path = tmpdir / "troubadix.sock"
+            server = Server(socket_path, n_jobs=1)
+            # a killed daemon leaves the socket behind
+            server.socket.close()
+            self.assertTrue(socket_path.exists())
+
+            server = Server(socket_path, n_jobs=1)
+            server.server_close()
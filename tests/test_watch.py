@@ -0,0 +1,202 @@
+# Copyright (C) 2022 Greenbone Networks GmbH
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import io
+import os
+import time
+import unittest
+from contextlib import redirect_stdout
+
+from pontos.terminal.terminal import ConsoleTerminal
+
+from tests.plugins import TemporaryDirectory
+from troubadix.cache import RACY_INTERVAL_NS
+from troubadix.dependency_index import DependencyIndex
+from troubadix.discovery import FileFinder
+from troubadix.plugins.cvss_format import CheckCVSSFormat
+from troubadix.plugins.dependency_category_order import (
+    CheckDependencyCategoryOrder,
+)
+from troubadix.plugins.duplicate_oid import CheckDuplicateOID
+from troubadix.reporter import Reporter
+from troubadix.runner import Runner
+from troubadix.watch import Watcher
+
+
+def _create_vt(
+    oid: str,
+    *,
+    cvss: str = "10.0",
+    category: str = "ACT_GATHER_INFO",
+    dependencies: str = "",
+) -> str:
+    content = (
+        "if(description)\n{\n"
+        f'  script_oid("1.3.6.1.4.1.25623.1.0.{oid}");\n'
+        f'  script_tag(name:"cvss_base", value:"{cvss}");\n'
+        '  script_tag(name:"cvss_base_vector", '
+        'value:"AV:N/AC:L/Au:N/C:C/I:C/A:C");\n'
+        f"  script_category({category});\n"
+    )
+    if dependencies:
+        content += f'  script_dependencies("{dependencies}");\n'
+    return content + "  exit(0);\n}\n"
+
+
+class TestWatcher(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = TemporaryDirectory()
+        self.root = self._tmpdir.__enter__()
+        self.dir = self.root / "common"
+        self.dir.mkdir()
+        self.mtime_ns = time.time_ns() - 10 * RACY_INTERVAL_NS
+        term = ConsoleTerminal()
+
+        runner = Runner(
+            n_jobs=1,
+            reporter=Reporter(term, self.root),
+            root=self.root,
+            included_plugins=[
+                CheckCVSSFormat.name,
+                CheckDependencyCategoryOrder.name,
+                CheckDuplicateOID.name,
+            ],
+        )
+        self.watcher = Watcher(
+            runner,
+            term,
+            dirs=[self.dir],
+            finder=FileFinder(["**/*.nasl"]),
+            root=self.root,
+            index=DependencyIndex(self.root),
+            interval=0.0,
+        )
+        self.pool = runner.create_pool()
+
+    def tearDown(self):
+        self.pool.terminate()
+        self.pool.join()
+        self._tmpdir.__exit__(None, None, None)
+
+    def _write(self, name: str, content: str) -> None:
+        # files modified shortly before a scan would be checked again by the
+        # next cycle, see RACY_INTERVAL_NS
+        self.mtime_ns += 1_000_000_000
+        path = self.dir / name
+        path.write_text(content, encoding="utf-8")
+        os.utime(path, ns=(self.mtime_ns, self.mtime_ns))
+
+    def test_cycles(self):
+        self._write("a.nasl", _create_vt("1", cvss="11.0"))
+        self._write("b.nasl", _create_vt("2"))
+
+        result = self.watcher.cycle(self.pool)
+        self.assertEqual(len(result.checked), 2)
+        self.assertEqual(len(result.new), 1)
+        self.assertEqual(result.new[0].file, "common/a.nasl")
+        self.assertEqual(result.new[0].plugin, CheckCVSSFormat.name)
+        self.assertEqual(result.fixed, [])
+
+        # unchanged files aren't checked again
+        self.assertIsNone(self.watcher.cycle(self.pool))
+
+        self._write("a.nasl", _create_vt("1", cvss="10.0"))
+        self._write("c.nasl", _create_vt("2"))
+
+        result = self.watcher.cycle(self.pool)
+        self.assertEqual(
+            sorted(result.checked), [self.dir / "a.nasl", self.dir / "c.nasl"]
+        )
+        self.assertEqual(len(result.fixed), 1)
+        self.assertEqual(result.fixed[0].plugin, CheckCVSSFormat.name)
+        self.assertEqual(
+            [finding.plugin for finding in result.new],
+            [CheckDuplicateOID.name],
+        )
+
+        (self.dir / "c.nasl").unlink()
+
+        result = self.watcher.cycle(self.pool)
+        self.assertEqual(result.checked, [])
+        self.assertEqual(result.deleted, [self.dir / "c.nasl"])
+        self.assertEqual(result.new, [])
+        self.assertEqual(
+            [finding.plugin for finding in result.fixed],
+            [CheckDuplicateOID.name],
+        )
+        self.assertEqual(self.watcher.findings, set())
+
+    def test_racy_files(self):
+        path = self.dir / "a.nasl"
+        path.write_text(_create_vt("1"), encoding="utf-8")
+
+        self.watcher.cycle(self.pool)
+
+        # a change within the granularity of the modification time could
+        # have gone unnoticed
+        path.write_text(_create_vt("1", cvss="11.0"), encoding="utf-8")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        result = self.watcher.cycle(self.pool)
+        self.assertEqual(result.checked, [path])
+        self.assertEqual(len(result.new), 1)
+
+    def test_dependents(self):
+        self._write("a.nasl", _create_vt("1"))
+        self._write("b.nasl", _create_vt("2", dependencies="common/a.nasl"))
+
+        result = self.watcher.cycle(self.pool)
+        self.assertEqual(result.new, [])
+
+        self._write("a.nasl", _create_vt("1", category="ACT_ATTACK"))
+
+        result = self.watcher.cycle(self.pool)
+        self.assertEqual(
+            result.checked, [self.dir / "a.nasl", self.dir / "b.nasl"]
+        )
+        self.assertEqual(
+            [(finding.file, finding.plugin) for finding in result.new],
+            [("common/b.nasl", CheckDependencyCategoryOrder.name)],
+        )
+
+    def test_watch(self):
+        self._write("a.nasl", _create_vt("1", cvss="11.0"))
+
+        with redirect_stdout(io.StringIO()) as f:
+            self.watcher.watch(self.pool, cycles=1)
+
+        lines = f.getvalue().splitlines()
+        self.assertRegex(lines[0], r"Checked 1 files in ")
+        self.assertIn(
+            "1 new, 0 fixed, 1 errors and 0 warnings in total", lines[1]
+        )
+        self.assertIn("Watching", lines[2])
+
+        self._write("a.nasl", _create_vt("1", cvss="10.0"))
+
+        with redirect_stdout(io.StringIO()) as f:
+            self.watcher.watch(self.pool, cycles=1)
+
+        lines = f.getvalue().splitlines()
+        self.assertRegex(lines[0], r"Checked 1 files in ")
+        self.assertIn(
+            f"fixed error: common/a.nasl: {CheckCVSSFormat.name}: ", lines[1]
+        )
+        self.assertIn(
+            "0 new, 1 fixed, 0 errors and 0 warnings in total", lines[-1]
+        )
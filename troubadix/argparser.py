@@ -21,7 +21,7 @@ import sys
 from argparse import ArgumentParser, Namespace
 from multiprocessing import cpu_count
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Optional
 
 from pontos.terminal import Terminal
 
@@ -54,6 +54,17 @@ def check_cpu_count(number: str) -> int:
     return number
 
 
+def chunksize_type(string: str) -> Optional[int]:
+    """Parse the chunksize. None is used for automatic chunking"""
+    if string == "auto":
+        return None
+
+    chunksize = int(string)
+    if chunksize < 1:
+        raise ValueError(f"{string} is not a positive number.")
+    return chunksize
+
+
 def parse_args(
     terminal: Terminal,
     args: Iterable[str] = None,
@@ -127,6 +138,79 @@ def parse_args(
         ),
     )
 
+    what_group.add_argument(
+        "--changed-since",
+        metavar="REVISION",
+        help=(
+            "Check the files added or modified since the merge base of the "
+            "given git revision and HEAD, including uncommitted changes and "
+            "untracked files, which are not ignored. Deleted files are "
+            "skipped."
+        ),
+    )
+
+    what_group.add_argument(
+        "--staged",
+        action="store_true",
+        help="Check the files added or modified in the git index.",
+    )
+
+    what_group.add_argument(
+        "--stdin",
+        dest="stdin_separator",
+        action="store_const",
+        const=b"\n",
+        help=(
+            "Read the files that should be checked from the standard input. "
+            "Files should be separated by newline. The checks are started "
+            "while the files are still being read."
+        ),
+    )
+
+    what_group.add_argument(
+        "--stdin0",
+        dest="stdin_separator",
+        action="store_const",
+        const=b"\0",
+        help=(
+            "Like '--stdin' but the files are separated by NUL characters, "
+            "e.g. 'git ls-files -z | troubadix --stdin0'"
+        ),
+    )
+
+    what_group.add_argument(
+        "--serve",
+        action="store_true",
+        help=(
+            "Run as daemon listening on the Unix domain socket given by "
+            "'--socket'. The daemon keeps the plugins and warm worker "
+            "processes in memory and checks the files sent by '--client'. "
+            "The results of unchanged files are reused."
+        ),
+    )
+
+    what_group.add_argument(
+        "--client",
+        nargs="+",
+        type=file_type,
+        metavar="FILE",
+        help=(
+            "Check the given files with the daemon started by '--serve'. "
+            "'troubadix-client' is a faster alternative, which doesn't load "
+            "the plugins at all."
+        ),
+    )
+
+    what_group.add_argument(
+        "--lsp",
+        action="store_true",
+        help=(
+            "Run as language server on stdin/stdout. The file plugins check "
+            "the unsaved content of the open documents while typing and the "
+            "results are published as diagnostics."
+        ),
+    )
+
     parser.add_argument(
         "--verbose",
         "-v",
@@ -148,6 +232,30 @@ def parse_args(
         help=("Log file path for troubadix statistic"),
     )
 
+    parser.add_argument(
+        "--jsonl-file",
+        dest="jsonl_file",
+        type=file_type,
+        help="Write all results as JSON Lines to this file",
+    )
+
+    parser.add_argument(
+        "--sarif-file",
+        dest="sarif_file",
+        type=file_type,
+        help="Write all results as SARIF log to this file",
+    )
+
+    parser.add_argument(
+        "--junit-file",
+        dest="junit_file",
+        type=file_type,
+        help=(
+            "Write all results as JUnit XML to this file. Each checked file "
+            "is a test case, which fails if an error has been found."
+        ),
+    )
+
     parser.add_argument(
         "--non-recursive",
         action="store_true",
@@ -165,7 +273,8 @@ def parse_args(
             "Allows to specify pattern(s) (glob) to "
             'limit the "--full"/"--dirs" run to specific file names. '
             'e.g. "gb_*.nasl", or "*some_vt*.nasl" or "some_dir/gb_*nasl". '
-            'Only usable with "-f"/"--full" or "-d"/"--dirs".'
+            'Only usable with "-f"/"--full", "-d"/"--dirs", '
+            '"--changed-since" or "--staged".'
         ),
     )
 
@@ -177,7 +286,8 @@ def parse_args(
             "Allows to specify pattern(s) (glob) to "
             'exclude specific file names from the "--full"/"--dirs" run. '
             'e.g. "some_dir/*.nasl", "gb_*nasl", "*/anything.*'
-            'Only usable with "-f"/"--full" or "-d"/"--dirs".'
+            'Only usable with "-f"/"--full", "-d"/"--dirs", '
+            '"--changed-since" or "--staged".'
         ),
     )
 
@@ -212,6 +322,18 @@ def parse_args(
         help="Try to fix specific issues during the linting.",
     )
 
+    parser.add_argument(
+        "--diff",
+        dest="diff_file",
+        type=file_type,
+        metavar="PATCH_FILE",
+        help=(
+            "Write the fixes as unified patch to PATCH_FILE instead of "
+            "modifying the files. The patch can be applied with 'git apply' "
+            "in the current working directory. Requires '--fix'."
+        ),
+    )
+
     parser.add_argument(
         "-j",
         "--n-jobs",
@@ -224,12 +346,134 @@ def parse_args(
         ),
     )
 
+    parser.add_argument(
+        "--cache-dir",
+        type=directory_type,
+        nargs="?",
+        const=Path(".troubadix_cache"),
+        help=(
+            "Cache the results of the single file plugins in the given "
+            "directory and reuse them for unchanged files. "
+            "Not used together with '--fix'. Entries not used for 30 days "
+            "are removed. Delete the directory to clear the cache. "
+            "Default: %(const)s"
+        ),
+    )
+
+    parser.add_argument(
+        "--chunksize",
+        type=chunksize_type,
+        default=None,
+        metavar="auto|N",
+        help=(
+            "Number of files sent to a worker process at once. 'auto' groups "
+            "the files by their estimated costs, based on the size of the "
+            "files or the durations recorded in the '--cache-dir' by "
+            "previous runs. Default: auto"
+        ),
+    )
+
+    parser.add_argument(
+        "--with-dependents",
+        action="store_true",
+        help=(
+            "Also check the VTs depending on the given files via "
+            "script_dependencies(), including the dependents of files "
+            "deleted according to '--changed-since'/'--staged'. The "
+            "dependencies of all VTs are indexed in the '--cache-dir' "
+            "(default: .troubadix_cache) and only changed VTs are read "
+            "again by later runs."
+        ),
+    )
+
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help=(
+            "Start checking the files of a '-f/--full' or '-d'/'--dirs' run "
+            "while they are still being discovered instead of scheduling "
+            "them by their estimated costs. Always used with '--stdin' and "
+            "'--stdin0'."
+        ),
+    )
+
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help=(
+            "Keep running and check the files of '-f/--full' or '-d'/'--dirs' "
+            "again after they have been changed. Only the changed files, the "
+            "VTs depending on them and the affected checks over all files "
+            "are run again and only the new and fixed findings are printed. "
+            "Stop with CTRL+C."
+        ),
+    )
+
+    parser.add_argument(
+        "--profile-plugins",
+        type=int,
+        nargs="?",
+        const=10,
+        metavar="N",
+        help=(
+            "Record the wall time and cpu time of each plugin on each file "
+            "and print the total, mean and 95th percentile per plugin, the "
+            "N slowest files and the N slowest plugins on a single file. "
+            "Default N: %(const)s"
+        ),
+    )
+
+    parser.add_argument(
+        "--profile-plugins-json",
+        type=file_type,
+        metavar="FILE",
+        help=(
+            "Write the timings recorded by '--profile-plugins' as JSON to "
+            "FILE"
+        ),
+    )
+
+    parser.add_argument(
+        "--cprofile",
+        dest="cprofile_dir",
+        type=directory_type,
+        metavar="DIR",
+        help=(
+            "Profile the main process and each worker process with cProfile. "
+            "The profiles are merged into DIR/troubadix.prof and the "
+            "time spent per plugin is written to DIR/plugins.txt."
+        ),
+    )
+
+    parser.add_argument(
+        "--tracemalloc",
+        dest="tracemalloc_dir",
+        type=directory_type,
+        metavar="DIR",
+        help=(
+            "Trace the memory allocations of each worker process. The memory "
+            "held at the exit of the workers is written to "
+            "DIR/allocations.txt as top allocations and per "
+            "plugin. Slows down the run considerably."
+        ),
+    )
+
     parser.add_argument(
         "--no-statistic",
         action="store_true",
         help="Don't print the statistic",
     )
 
+    parser.add_argument(
+        "--socket",
+        type=Path,
+        help=(
+            "Unix domain socket of '--serve' and '--client'. "
+            "Default: $XDG_RUNTIME_DIR/troubadix.sock or "
+            "troubadix-<uid>.sock in the temporary directory"
+        ),
+    )
+
     if not args:
         print("No arguments given.", file=sys.stderr)
         parser.print_help(sys.stdout)
@@ -240,11 +484,14 @@ def parse_args(
     if (
         not parsed_args.full
         and not parsed_args.dirs
+        and not parsed_args.changed_since
+        and not parsed_args.staged
         and (parsed_args.include_patterns or parsed_args.exclude_patterns)
     ):
         terminal.warning(
             "The arguments '--include-patterns' and '--exclude-patterns' "
-            "must be used with '-f/--full' or '-d'/'--dirs'"
+            "must be used with '-f/--full', '-d'/'--dirs', "
+            "'--changed-since' or '--staged'"
         )
         sys.exit(1)
 
@@ -259,4 +506,68 @@ def parse_args(
         )
         sys.exit(1)
 
+    if parsed_args.with_dependents and (
+        parsed_args.stream or parsed_args.stdin_separator
+    ):
+        terminal.warning(
+            "'--with-dependents' can't be used with '--stream', '--stdin' "
+            "or '--stdin0'"
+        )
+        sys.exit(1)
+
+    if parsed_args.profile_plugins_json and parsed_args.profile_plugins is None:
+        terminal.warning(
+            "'--profile-plugins-json' can only be used with '--profile-plugins'"
+        )
+        sys.exit(1)
+
+    if parsed_args.diff_file and not parsed_args.fix:
+        terminal.warning("'--diff' can only be used with '--fix'")
+        sys.exit(1)
+
+    if (parsed_args.serve or parsed_args.client or parsed_args.lsp) and (
+        parsed_args.log_file
+        or parsed_args.log_file_statistic
+        or parsed_args.jsonl_file
+        or parsed_args.sarif_file
+        or parsed_args.junit_file
+        or parsed_args.diff_file
+        or parsed_args.with_dependents
+        or parsed_args.stream
+        or parsed_args.profile_plugins is not None
+        or parsed_args.cprofile_dir
+        or parsed_args.tracemalloc_dir
+    ):
+        terminal.warning(
+            "'--serve', '--client' and '--lsp' don't support output files "
+            "and profiling and can't be used with '--with-dependents' or "
+            "'--stream'"
+        )
+        sys.exit(1)
+
+    if parsed_args.watch and not parsed_args.full and not parsed_args.dirs:
+        terminal.warning(
+            "'--watch' can only be used with '-f/--full' or '-d'/'--dirs'"
+        )
+        sys.exit(1)
+
+    if parsed_args.watch and (
+        parsed_args.fix
+        or parsed_args.log_file
+        or parsed_args.log_file_statistic
+        or parsed_args.jsonl_file
+        or parsed_args.sarif_file
+        or parsed_args.junit_file
+        or parsed_args.with_dependents
+        or parsed_args.stream
+        or parsed_args.profile_plugins is not None
+        or parsed_args.cprofile_dir
+        or parsed_args.tracemalloc_dir
+    ):
+        terminal.warning(
+            "'--watch' doesn't support output files and profiling and can't "
+            "be used with '--fix', '--with-dependents' or '--stream'"
+        )
+        sys.exit(1)
+
     return parsed_args
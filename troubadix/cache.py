@@ -0,0 +1,422 @@
+# Copyright (C) 2022 Greenbone Networks GmbH
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+""" On-disk cache for the results of file plugins """
+
+import hashlib
+import inspect
+import json
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from troubadix.__version__ import __version__
+from troubadix.helper import SpecialScriptTag, VTMetadata
+from troubadix.helper.helper import FEED_VERSIONS
+from troubadix.plugin import (
+    FilePlugin,
+    LinterError,
+    LinterFix,
+    LinterResult,
+    LinterWarning,
+)
+
+DEFAULT_CACHE_DIR = Path(".troubadix_cache")
+TIMINGS_FILE_NAME = "timings.json"
+DEPENDENCIES_FILE_NAME = "dependencies.json"
+# Touched whenever the cache directory is checked for outdated entries
+PRUNED_FILE_NAME = "pruned"
+
+# Increase if the format of the cache entries changes
+CACHE_FORMAT_VERSION = 1
+# The status of a file is only trusted if the file has been modified at least
+# this long (in nanoseconds) before it has been hashed. Otherwise a change
+# within the granularity of the modification time could go unnoticed.
+RACY_INTERVAL_NS = 2_000_000_000
+# Entries not used for this long (in seconds) are removed from the cache
+CACHE_MAX_AGE = 30 * 24 * 60 * 60
+# The cache directory is checked for outdated entries at most this often
+PRUNE_INTERVAL = 24 * 60 * 60
+
+_RESULT_TYPES = {
+    "error": LinterError,
+    "warning": LinterWarning,
+    "fix": LinterFix,
+    "result": LinterResult,
+}
+_RESULT_TYPE_NAMES = {value: key for key, value in _RESULT_TYPES.items()}
+
+_troubadix_dir = Path(__file__).parent
+
+
+def hash_file(path: Path) -> str:
+    """Get the sha256 hex digest of the content of a file"""
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def get_dependency_cache_inputs(
+    root: Path, vt_metadata: VTMetadata
+) -> List[str]:
+    """Get the state of all files listed in the script_dependencies() of a VT
+
+    Plugins reading the dependencies of a VT need to be rerun if one of the
+    dependencies is changed, added or removed.
+    """
+    inputs = []
+    for match in vt_metadata.get_special_script_tags(
+        SpecialScriptTag.DEPENDENCIES
+    ):
+        for dep in re.sub(r'[\'"\s]', "", match.group("value")).split(","):
+            for vers in FEED_VERSIONS:
+                path = root / vers / dep
+                if path.is_file():
+                    state = hash_file(path)
+                elif path.exists():
+                    state = "exists"
+                else:
+                    state = "missing"
+                inputs.append(f"{vers}/{dep}:{state}")
+
+    return inputs
+
+
+def _serialize_result(result: LinterResult) -> list:
+    return [
+        _RESULT_TYPE_NAMES[type(result)],
+        result.message,
+        str(result.file) if result.file is not None else None,
+        result.plugin,
+        result.line,
+    ]
+
+
+def _deserialize_result(data: list) -> LinterResult:
+    result_type, message, file, plugin, line = data
+    return _RESULT_TYPES[result_type](
+        message,
+        file=Path(file) if file is not None else None,
+        plugin=plugin,
+        line=line,
+    )
+
+
+def _write_json(path: Path, data) -> None:
+    """Write json data atomically"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_name, path)
+    except OSError:
+        Path(tmp_name).unlink()
+        raise
+
+
+class FileCacheEntry:
+    """The cached results of all file plugins for a single file
+
+    Entries without a path are only kept in memory. The modification time of
+    an entry on disk is the time it has been used last.
+    """
+
+    def __init__(self, path: Optional[Path]) -> None:
+        self._path = path
+        self._changed = False
+        self._used = False
+        self._plugins: Dict[str, dict] = {}
+
+        if path is None:
+            return
+
+        try:
+            self._plugins = json.loads(path.read_text(encoding="utf-8"))
+            self._used = True
+        except (OSError, ValueError):
+            pass
+
+    def get(
+        self, plugin_name: str, fingerprint: str
+    ) -> Optional[List[LinterResult]]:
+        """Get the cached results of a plugin or None if the results are not
+        cached or outdated"""
+        entry = self._plugins.get(plugin_name)
+        if not entry or entry.get("fingerprint") != fingerprint:
+            return None
+
+        try:
+            return [_deserialize_result(data) for data in entry["results"]]
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def set(
+        self,
+        plugin_name: str,
+        fingerprint: str,
+        results: Iterable[LinterResult],
+    ) -> None:
+        self._plugins[plugin_name] = {
+            "fingerprint": fingerprint,
+            "results": [_serialize_result(result) for result in results],
+        }
+        self._changed = True
+
+    def save(self) -> None:
+        """Write the entry atomically if it has been changed. Otherwise only
+        mark the entry on disk as used, see `ResultCache.prune`."""
+        if not self._changed:
+            if self._used:
+                try:
+                    os.utime(self._path)
+                except OSError:
+                    pass
+                self._used = False
+            return
+
+        if self._path is not None:
+            _write_json(self._path, self._plugins)
+        self._changed = False
+        self._used = False
+
+
+class ResultCache:
+    """Cache for the results of file plugins
+
+    The entries are stored per file in the cache directory and are keyed by
+    the path and the content of the file. The results of each plugin are
+    additionally tagged with a fingerprint of the troubadix version, the
+    sources of the plugin and all other inputs of the plugin (see
+    `FilePlugin.get_cache_inputs`).
+    """
+
+    def __init__(self, cache_dir: Path) -> None:
+        self.cache_dir = cache_dir
+        self._fingerprints: Dict[type, str] = {}
+        self._base_fingerprint: Optional[str] = None
+
+    def _get_base_fingerprint(self) -> str:
+        if self._base_fingerprint is None:
+            sha = hashlib.sha256(
+                f"{CACHE_FORMAT_VERSION}:{__version__}".encode()
+            )
+            for source in sorted(
+                [_troubadix_dir / "plugin.py"]
+                + list((_troubadix_dir / "helper").glob("*.py"))
+            ):
+                sha.update(source.read_bytes())
+            self._base_fingerprint = sha.hexdigest()
+        return self._base_fingerprint
+
+    def _get_class_fingerprint(self, plugin_class: type) -> str:
+        fingerprint = self._fingerprints.get(plugin_class)
+        if fingerprint is None:
+            sha = hashlib.sha256(self._get_base_fingerprint().encode())
+            sha.update(Path(inspect.getsourcefile(plugin_class)).read_bytes())
+            fingerprint = sha.hexdigest()
+            self._fingerprints[plugin_class] = fingerprint
+        return fingerprint
+
+    def get_plugin_fingerprint(self, plugin: FilePlugin) -> str:
+        """Get the fingerprint of a plugin for the file of its context"""
+        sha = hashlib.sha256(self._get_class_fingerprint(type(plugin)).encode())
+        for cache_input in plugin.get_cache_inputs():
+            sha.update(b"\0")
+            sha.update(cache_input.encode("utf-8", "surrogateescape"))
+        return sha.hexdigest()
+
+    @staticmethod
+    def _get_key(nasl_file: Path, content: bytes) -> str:
+        sha = hashlib.sha256(os.fsencode(nasl_file.resolve()))
+        sha.update(b"\0")
+        sha.update(content)
+        return sha.hexdigest()
+
+    def _get_entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key[2:]}.json"
+
+    def get_entry(
+        self,
+        nasl_file: Path,
+        content: Optional[bytes] = None,
+        stat: Optional[os.stat_result] = None,
+    ) -> FileCacheEntry:
+        """Get the cache entry for the current path and content of a file
+
+        Arguments:
+            nasl_file   the file
+            content     the already read raw content of the file
+            stat        the status of the file at the time the content has
+                        been read. Not used by the on-disk cache.
+        """
+        if content is None:
+            content = nasl_file.read_bytes()
+
+        return FileCacheEntry(
+            self._get_entry_path(self._get_key(nasl_file, content))
+        )
+
+    def _load_json(self, name: str) -> dict:
+        try:
+            data = json.loads(
+                (self.cache_dir / name).read_text(encoding="utf-8")
+            )
+        except (OSError, ValueError):
+            return {}
+
+        return data if isinstance(data, dict) else {}
+
+    def load_timings(self) -> Dict[str, float]:
+        """Load the durations of checking the files recorded by previous
+        runs"""
+        return self._load_json(TIMINGS_FILE_NAME)
+
+    def save_timings(self, timings: Dict[str, float]) -> None:
+        """Record the durations of checking the files for the next runs"""
+        if not timings:
+            return
+
+        all_timings = self.load_timings()
+        all_timings.update(timings)
+        _write_json(self.cache_dir / TIMINGS_FILE_NAME, all_timings)
+
+    def load_dependencies(self) -> dict:
+        """Load the script dependencies of the VTs recorded by previous runs,
+        see `troubadix.dependency_index.DependencyIndex`"""
+        return self._load_json(DEPENDENCIES_FILE_NAME)
+
+    def save_dependencies(self, dependencies: dict) -> None:
+        """Record the script dependencies of the VTs for the next runs"""
+        _write_json(self.cache_dir / DEPENDENCIES_FILE_NAME, dependencies)
+
+    def prune(
+        self,
+        max_age: float = CACHE_MAX_AGE,
+        interval: float = PRUNE_INTERVAL,
+    ) -> int:
+        """Remove the entries, which haven't been used for max_age seconds
+
+        Every checked revision of a file leaves an entry behind. The cache
+        directory is only checked if it hasn't been checked within the last
+        interval seconds, to keep short runs fast.
+
+        Returns:
+            The number of removed entries
+        """
+        if not self.cache_dir or not self.cache_dir.is_dir():
+            return 0
+
+        now = time.time()
+        pruned_file = self.cache_dir / PRUNED_FILE_NAME
+        try:
+            if now - pruned_file.stat().st_mtime < interval:
+                return 0
+        except OSError:
+            pass
+
+        try:
+            pruned_file.touch()
+        except OSError:
+            return 0
+
+        # the entries are stored by the first two characters of the key
+        with os.scandir(self.cache_dir) as directories:
+            directories = [
+                directory.path
+                for directory in directories
+                if len(directory.name) == 2 and directory.is_dir()
+            ]
+
+        removed = 0
+        for directory in directories:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.stat().st_mtime < now - max_age:
+                            os.unlink(entry.path)
+                            removed += 1
+                    except OSError:
+                        pass
+
+        return removed
+
+
+class MemoryResultCache(ResultCache):
+    """Cache for the results of file plugins kept in memory, e.g. by the
+    workers of the long-running daemon
+
+    Every file has at most one entry, which is replaced as soon as the file
+    is changed. A file is considered unchanged if its modification time and
+    size are unchanged. Otherwise the content is hashed again and the entry
+    is only replaced if the content has been changed. If a cache directory is
+    given, the entries and timings are additionally stored on disk.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None) -> None:
+        super().__init__(cache_dir)
+        # the status of the file when it has been hashed, the time of hashing
+        # in nanoseconds, the key and the entry by the resolved path
+        self._entries: Dict[
+            Path, Tuple[Optional[Tuple[int, int]], int, str, FileCacheEntry]
+        ] = {}
+        self._timings: Optional[Dict[str, float]] = None
+
+    def get_entry(
+        self,
+        nasl_file: Path,
+        content: Optional[bytes] = None,
+        stat: Optional[os.stat_result] = None,
+    ) -> FileCacheEntry:
+        path = nasl_file.resolve()
+        state = (stat.st_mtime_ns, stat.st_size) if stat else None
+
+        cached = self._entries.get(path)
+        if (
+            cached is not None
+            and state is not None
+            and cached[0] == state
+            and state[0] < cached[1] - RACY_INTERVAL_NS
+        ):
+            return cached[3]
+
+        if content is None:
+            content = nasl_file.read_bytes()
+
+        hashed = time.time_ns()
+        key = self._get_key(nasl_file, content)
+        if cached is not None and cached[2] == key:
+            entry = cached[3]
+        else:
+            entry = FileCacheEntry(
+                self._get_entry_path(key) if self.cache_dir else None
+            )
+
+        self._entries[path] = (state, hashed, key, entry)
+        return entry
+
+    def load_timings(self) -> Dict[str, float]:
+        if self._timings is None:
+            self._timings = super().load_timings() if self.cache_dir else {}
+        return self._timings
+
+    def save_timings(self, timings: Dict[str, float]) -> None:
+        if self.cache_dir:
+            super().save_timings(timings)
+        else:
+            self.load_timings().update(timings)
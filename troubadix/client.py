@@ -0,0 +1,182 @@
+# Copyright (C) 2022 Greenbone Networks GmbH
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+""" Thin client of the troubadix daemon
+
+The client only depends on the standard library, to keep its startup cheap.
+Start the daemon with 'troubadix --serve' and check files with
+'troubadix-client <files>' or 'troubadix --client <files>'.
+
+Protocol: The client connects to the Unix domain socket of the daemon and
+sends a single JSON object of the job, terminated by a newline:
+
+    {"files": [<absolute paths>], "verbose": <int>, "statistic": <bool>}
+
+The daemon streams back the output of the check as one JSON object per line:
+
+    {"style": <style>, "indent": <int>, "message": <str>}
+
+where style is one of "print", "ok", "fail", "error", "warning", "info" and
+"bold_info". The last line contains the exit code of the check:
+
+    {"exit_code": <int>}
+"""
+
+import json
+import os
+import socket
+import sys
+import tempfile
+from argparse import ArgumentParser, Namespace
+from pathlib import Path
+from typing import IO, Iterable, List, Optional
+
+SOCKET_FILE_NAME = "troubadix.sock"
+
+# The status signs and colors of the styles, see pontos.terminal
+_STYLES = {
+    "print": (" ", "37"),
+    "ok": ("\N{CHECK MARK}", "32"),
+    "fail": ("\N{HEAVY MULTIPLICATION X}", "31"),
+    "error": ("\N{MULTIPLICATION SIGN}", "31"),
+    "warning": ("\N{WARNING SIGN}", "33"),
+    "info": ("\N{INFORMATION SOURCE}", "36"),
+    "bold_info": ("\N{INFORMATION SOURCE}", "36"),
+}
+# the length of the status sign and the following space
+_STATUS_LEN = 2
+
+
+def get_default_socket_path() -> Path:
+    """Get the path of the socket of the daemon of the current user"""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return Path(runtime_dir) / SOCKET_FILE_NAME
+    return Path(tempfile.gettempdir()) / f"troubadix-{os.getuid()}.sock"
+
+
+def encode_message(message: dict) -> bytes:
+    return json.dumps(message).encode("utf-8") + b"\n"
+
+
+def format_message(message: dict, color: bool = False) -> str:
+    """Format a message of the daemon like the terminal of troubadix"""
+    sign, color_code = _STYLES.get(message.get("style"), _STYLES["print"])
+    indent = message.get("indent", 0)
+    lines = message.get("message", "").split("\n")
+    text = " " * indent + f"\n{' ' * (indent + _STATUS_LEN)}".join(lines)
+
+    if not color:
+        return f"{sign} {text}"
+
+    if message.get("style") == "bold_info":
+        return f"\033[1m\033[{color_code}m{sign}\033[39m {text}\033[0m"
+    return f"\033[{color_code}m{sign}\033[0m {text}"
+
+
+def check(
+    files: Iterable[Path],
+    *,
+    socket_path: Path,
+    verbose: int = 0,
+    statistic: bool = True,
+    output: Optional[IO[str]] = None,
+) -> int:
+    """Let the daemon check the files and print its output
+
+    Returns:
+        the exit code of the check
+    """
+    output = output or sys.stdout
+    color = output.isatty()
+    job = {
+        "files": [os.path.abspath(nasl_file) for nasl_file in files],
+        "verbose": verbose,
+        "statistic": statistic,
+    }
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(os.fspath(socket_path))
+        except (FileNotFoundError, ConnectionRefusedError):
+            print(
+                f"No troubadix daemon is listening on {socket_path}. Start "
+                "it with 'troubadix --serve'.",
+                file=sys.stderr,
+            )
+            return 1
+
+        sock.sendall(encode_message(job))
+        sock.shutdown(socket.SHUT_WR)
+
+        with sock.makefile("r", encoding="utf-8") as reader:
+            for line in reader:
+                message = json.loads(line)
+                if "exit_code" in message:
+                    return message["exit_code"]
+                print(format_message(message, color), file=output)
+
+    print("The troubadix daemon closed the connection.", file=sys.stderr)
+    return 1
+
+
+def parse_args(args: Optional[List[str]] = None) -> Namespace:
+    parser = ArgumentParser(
+        description="Check files with a running troubadix daemon, "
+        "see 'troubadix --serve'.",
+    )
+    parser.add_argument(
+        "files",
+        nargs="+",
+        type=Path,
+        help="List of files that should be linted",
+    )
+    parser.add_argument(
+        "--socket",
+        type=Path,
+        default=get_default_socket_path(),
+        help="Unix domain socket of the daemon. Default: %(default)s",
+    )
+    parser.add_argument(
+        "--verbose",
+        "-v",
+        action="count",
+        default=0,
+        help=("-v verbose, -vv more verbose, -vvv debug"),
+    )
+    parser.add_argument(
+        "--no-statistic",
+        action="store_true",
+        help="Don't print the statistic",
+    )
+    return parser.parse_args(args=args)
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    parsed_args = parse_args(args)
+    sys.exit(
+        check(
+            parsed_args.files,
+            socket_path=parsed_args.socket,
+            verbose=parsed_args.verbose,
+            statistic=not parsed_args.no_statistic,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
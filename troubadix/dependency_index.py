@@ -0,0 +1,208 @@
+# Copyright (C) 2022 Greenbone Networks GmbH
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+""" Index of the VTs depending on other VTs via script_dependencies() """
+
+import re
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from troubadix.cache import ResultCache
+from troubadix.discovery import FileFinder
+from troubadix.helper import CURRENT_ENCODING, SpecialScriptTag, VTMetadata
+from troubadix.helper.helper import FEED_VERSIONS
+
+# Increase if the format of the index changes
+INDEX_FORMAT_VERSION = 1
+
+
+def get_script_dependencies(content: bytes) -> List[str]:
+    """Get the names of the script_dependencies() of a VT"""
+    if b"script_dependencies" not in content:
+        return []
+
+    vt_metadata = VTMetadata(content.decode(CURRENT_ENCODING))
+    dependencies = []
+    for match in vt_metadata.get_special_script_tags(
+        SpecialScriptTag.DEPENDENCIES
+    ):
+        dependencies.extend(
+            dep
+            for dep in re.sub(r'[\'"\s]', "", match.group("value")).split(",")
+            if dep
+        )
+    return dependencies
+
+
+def get_dependency_names(relative: str) -> Set[str]:
+    """Get the names a VT can be referenced by in script_dependencies()
+
+    Arguments:
+        relative    the path of the VT relative to the root of the VTs
+    """
+    names = {relative}
+    for vers in FEED_VERSIONS:
+        if vers and relative.startswith(f"{vers}/"):
+            names.add(relative[len(vers) + 1 :])
+    return names
+
+
+class DependencyIndex:
+    """An index of the VTs depending on other VTs
+
+    The index is built from a single pass over the script_dependencies()
+    calls of all VTs below the root. If a cache is used, the dependencies
+    are recorded together with the modification time and the size of each
+    VT. Later runs only read the VTs that have been changed since.
+    """
+
+    def __init__(self, root: Path, cache: Optional[ResultCache] = None) -> None:
+        self.root = root
+        self._cache = cache
+        # the dependencies of each VT by its path relative to the root
+        self._dependencies: Dict[str, List[str]] = {}
+        self._dependents: Optional[Dict[str, Set[str]]] = None
+
+    def _load(self) -> Dict[str, list]:
+        if not self._cache:
+            return {}
+
+        data = self._cache.load_dependencies()
+        if (
+            data.get("version") != INDEX_FORMAT_VERSION
+            or data.get("root") != str(self.root.resolve())
+            or not isinstance(data.get("files"), dict)
+        ):
+            return {}
+        return data["files"]
+
+    def update(self) -> None:
+        """Read the dependencies of all new and changed VTs"""
+        recorded = self._load()
+        files = {}
+        changed = False
+
+        for nasl_file, stat in FileFinder(["**/*.nasl"]).iter_find([self.root]):
+            relative = nasl_file.relative_to(self.root).as_posix()
+            entry = recorded.get(relative)
+            if entry and entry[:2] == [stat.st_mtime_ns, stat.st_size]:
+                files[relative] = entry
+                continue
+
+            try:
+                dependencies = get_script_dependencies(nasl_file.read_bytes())
+            except OSError:
+                continue
+            files[relative] = [stat.st_mtime_ns, stat.st_size, dependencies]
+            changed = True
+
+        self._dependencies = {
+            relative: entry[2] for relative, entry in files.items()
+        }
+        self._dependents = None
+
+        if self._cache and (changed or len(files) != len(recorded)):
+            self._cache.save_dependencies(
+                {
+                    "version": INDEX_FORMAT_VERSION,
+                    "root": str(self.root.resolve()),
+                    "files": files,
+                }
+            )
+
+    def update_files(
+        self, files: Iterable[Path], deleted: Iterable[Path] = ()
+    ) -> None:
+        """Read the dependencies of the given changed VTs again and remove
+        the deleted VTs"""
+        for nasl_file in files:
+            relative = self._get_relative(nasl_file)
+            if relative is None or nasl_file.suffix != ".nasl":
+                continue
+
+            try:
+                self._dependencies[relative] = get_script_dependencies(
+                    nasl_file.read_bytes()
+                )
+            except OSError:
+                self._dependencies.pop(relative, None)
+
+        for nasl_file in deleted:
+            self._dependencies.pop(self._get_relative(nasl_file), None)
+
+        self._dependents = None
+
+    def _get_relative(self, nasl_file: Path) -> Optional[str]:
+        try:
+            return (
+                nasl_file.resolve().relative_to(self.root.resolve()).as_posix()
+            )
+        except ValueError:
+            return None
+
+    @property
+    def dependents(self) -> Dict[str, Set[str]]:
+        """The VTs depending on a name used in script_dependencies()"""
+        if self._dependents is None:
+            self._dependents = defaultdict(set)
+            for relative, dependencies in self._dependencies.items():
+                for dependency in dependencies:
+                    self._dependents[dependency].add(relative)
+        return self._dependents
+
+    def get_dependents(self, nasl_file: Path) -> Set[Path]:
+        """Get the VTs directly depending on a VT"""
+        relative = self._get_relative(nasl_file)
+        if relative is None:
+            return set()
+
+        return {
+            self.root / dependent
+            for name in get_dependency_names(relative)
+            for dependent in self.dependents.get(name, ())
+        }
+
+    def expand(
+        self, files: Iterable[Path], deleted: Iterable[Path] = ()
+    ) -> List[Path]:
+        """Add the VTs depending on the given files
+
+        The results of CheckDependencyCategoryOrder and
+        CheckDeprecatedDependency of a VT depend on its direct
+        dependencies. Therefore only the direct dependents are added.
+
+        Arguments:
+            files       the changed files
+            deleted     the deleted files, their dependents are added too
+
+        Returns:
+            the files followed by their dependents, that aren't part of the
+            files already
+        """
+        files = list(files)
+        known = {nasl_file.resolve() for nasl_file in files}
+        expanded = list(files)
+
+        for nasl_file in files + list(deleted):
+            for dependent in sorted(self.get_dependents(nasl_file)):
+                resolved = dependent.resolve()
+                if resolved not in known:
+                    known.add(resolved)
+                    expanded.append(dependent)
+
+        return expanded
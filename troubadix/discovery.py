@@ -0,0 +1,227 @@
+# Copyright (C) 2022 Greenbone Networks GmbH
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+""" Discovery of the files to check with a single walk of the directories """
+
+import os
+import re
+from pathlib import Path
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Pattern,
+    Sequence,
+    Tuple,
+)
+
+# Matches a "**" component and all directories below
+RECURSIVE = "**"
+
+
+def _translate_part(part: str) -> str:
+    """Translate a glob pattern for a single path component into a regex"""
+    regex = []
+    i = 0
+    while i < len(part):
+        char = part[i]
+        i += 1
+        if char == "*":
+            regex.append("[^/]*")
+        elif char == "?":
+            regex.append("[^/]")
+        elif char == "[":
+            end = part.find("]", i + 1 if part[i : i + 1] in "!]" else i)
+            if end < 0:
+                regex.append(re.escape(char))
+                continue
+            chars = part[i:end].replace("\\", "\\\\")
+            if chars.startswith("!"):
+                chars = "^" + chars[1:]
+            elif chars.startswith("^"):
+                chars = "\\" + chars
+            regex.append(f"[{chars}]")
+            i = end + 1
+        else:
+            regex.append(re.escape(char))
+    return "".join(regex)
+
+
+def _translate_parts(parts: Sequence[str]) -> str:
+    regex = ""
+    for index, part in enumerate(parts):
+        if part == RECURSIVE:
+            # zero or more directories
+            regex += "(?:[^/]+/)*"
+        else:
+            regex += _translate_part(part)
+            if index < len(parts) - 1:
+                regex += "/"
+    return regex
+
+
+def _split(pattern: str) -> List[str]:
+    return [part for part in pattern.split("/") if part not in ("", ".")]
+
+
+def _compile(regexes: Iterable[str]) -> Optional[Pattern]:
+    regexes = list(regexes)
+    if not regexes:
+        return None
+    return re.compile("|".join(f"(?:{regex})" for regex in regexes) + r"\Z")
+
+
+class FileFinder:
+    """Finds the files matching glob patterns like `Path.glob()`
+
+    All include and exclude patterns are compiled into a single regex each
+    and matched against the paths relative to the searched directory. Every
+    directory is scanned only once. Directories below an exclude pattern
+    ending with "/**/*" are skipped completely and subdirectories aren't
+    scanned at all, if none of the include patterns can match in them.
+    Symbolic links to directories are not followed like in the recursive
+    `Path.glob("**/...")`.
+    """
+
+    def __init__(
+        self,
+        include_patterns: Iterable[str],
+        exclude_patterns: Optional[Iterable[str]] = None,
+    ) -> None:
+        include_parts = [_split(pattern) for pattern in include_patterns]
+        exclude_parts = [_split(pattern) for pattern in exclude_patterns or []]
+
+        self._include = _compile(_translate_parts(p) for p in include_parts)
+        self._exclude = _compile(_translate_parts(p) for p in exclude_parts)
+        # an exclude pattern "<dir>/**/*" excludes everything below <dir>
+        self._exclude_dirs = _compile(
+            _translate_parts(parts[:-2])
+            for parts in exclude_parts
+            if len(parts) > 2 and parts[-2:] == [RECURSIVE, "*"]
+        )
+
+        # the number of directories to descend into or None for all
+        self._max_depth: Optional[int] = 0
+        for parts in include_parts:
+            if RECURSIVE in parts:
+                self._max_depth = None
+                break
+            self._max_depth = max(self._max_depth, len(parts) - 1)
+
+    def match(self, relative: str) -> bool:
+        """Check if a file path relative to a searched directory is included
+        and not excluded"""
+        return bool(
+            self._include
+            and self._include.match(relative)
+            and not (self._exclude and self._is_excluded(relative))
+        )
+
+    def _is_excluded(self, relative: str) -> bool:
+        return bool(self._exclude.match(relative))
+
+    def _walk(
+        self, directory: str, relative: str, depth: int
+    ) -> Iterable[Tuple[str, os.DirEntry]]:
+        try:
+            with os.scandir(directory) as entries:
+                entries = list(entries)
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            return
+
+        for entry in entries:
+            relative_path = f"{relative}{entry.name}"
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if (
+                        self._max_depth is not None and depth >= self._max_depth
+                    ) or (
+                        self._exclude_dirs
+                        and self._exclude_dirs.match(relative_path)
+                    ):
+                        continue
+                    yield from self._walk(
+                        entry.path, f"{relative_path}/", depth + 1
+                    )
+                elif self._include.match(relative_path) and entry.is_file():
+                    yield relative_path, entry
+            except OSError:
+                continue
+
+    def iter_find(
+        self, dirs: Iterable[Path]
+    ) -> Iterator[Tuple[Path, os.stat_result]]:
+        """Find all matching files below the given directories
+
+        The files are yielded while the directories are still being walked.
+
+        Returns:
+            the found files with their status in the order of the directories.
+            Files found multiple times, e.g. via overlapping directories or
+            symbolic links, are only returned once.
+        """
+        if not self._include:
+            return
+
+        dirs = list(dirs)
+        seen = set()
+        for directory in dirs:
+            real_directory = os.path.realpath(directory)
+
+            for relative, entry in self._walk(str(directory), "", 0):
+                path = directory / relative
+                if self._exclude and (
+                    self._is_excluded(relative)
+                    or any(
+                        self._is_excluded_from(path, other)
+                        for other in dirs
+                        if other is not directory
+                    )
+                ):
+                    continue
+
+                if entry.is_symlink():
+                    canonical = os.path.realpath(entry.path)
+                else:
+                    canonical = os.path.join(real_directory, relative)
+                if canonical in seen:
+                    continue
+                seen.add(canonical)
+
+                try:
+                    yield path, entry.stat()
+                except OSError:
+                    continue
+
+    def find(self, dirs: Iterable[Path]) -> Dict[Path, os.stat_result]:
+        """Find all matching files below the given directories
+
+        Returns:
+            the found files with their status, see `iter_find()`
+        """
+        return dict(self.iter_find(dirs))
+
+    def _is_excluded_from(self, path: Path, directory: Path) -> bool:
+        """Check if the path is excluded by the patterns applied to another
+        directory containing it"""
+        try:
+            relative = path.relative_to(directory)
+        except ValueError:
+            return False
+        return self._is_excluded(relative.as_posix())
@@ -15,7 +15,13 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-from .helper import get_path_from_root, get_root, is_ignore_file, subprocess_cmd
+from .helper import (
+    get_path_from_root,
+    get_root,
+    is_ignore_file,
+    subprocess_cmd,
+    write_file_atomically,
+)
 from .patterns import (
     ScriptTag,
     SpecialScriptTag,
@@ -23,6 +29,7 @@ from .patterns import (
     get_script_tag_pattern,
     get_special_script_tag_pattern,
 )
+from .vt_metadata import VTMetadata
 
 # js: can we get this to utf-8 in future @scanner @feed?
 CURRENT_ENCODING = "latin1"  # currently default
@@ -0,0 +1,250 @@
+# Copyright (C) 2022 Greenbone Networks GmbH
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+""" In-process spell checking based on the codespell dictionaries """
+
+import hashlib
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    Match,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+import codespell_lib
+
+# The dictionaries used by codespell for "--dictionary=-"
+BUILTIN_DICTIONARIES = ("dictionary.txt", "dictionary_rare.txt")
+
+_WORD_PATTERN = re.compile(r"[\w\-'’]+")
+_NEWLINE_PATTERN = re.compile(r"\r\n|\r")
+# codespell generates alternative misspellings with typographic apostrophes
+_ALT_CHARS = (("'", "’"),)
+# a word preceded by a backslash may be a valid word after an escape sequence
+_ESCAPE_CHARS = ("a", "b", "f", "n", "r", "t", "v")
+# inline directives ignoring all or the listed words of the current or the
+# next line, e.g. "# codespell:ignore teh" or "# codespell:ignore-next-line"
+_IGNORE_TAG = "codespell:ignore"
+_IGNORE_NEXT_LINE_TAG = "codespell:ignore-next-line"
+_IGNORE_PATTERN = re.compile(
+    rf"[^\w\s]\s*{_IGNORE_TAG}(?!-)\b(\s+(?P<words>[\w,]*))?"
+)
+_IGNORE_NEXT_LINE_PATTERN = re.compile(
+    rf"[^\w\s]\s*{_IGNORE_NEXT_LINE_TAG}\b(\s+(?P<words>[\w,]*))?"
+)
+
+
+class Correction(NamedTuple):
+    suggestions: Tuple[str, ...]
+    # the reason why a correction isn't applied automatically
+    reason: str
+
+
+class Misspelling(NamedTuple):
+    file: Path
+    line: int
+    word: str
+    suggestions: Tuple[str, ...]
+    reason: str = ""
+
+    @property
+    def message(self) -> str:
+        """The misspelling and its suggestions without the location"""
+        message = f"{self.word} ==> {', '.join(self.suggestions)}"
+        if self.reason:
+            message = f"{message}  | {self.reason}"
+        return message
+
+    def __str__(self) -> str:
+        return f"{self.file}:{self.line}: {self.message}"
+
+
+def _fix_case(word: str, suggestions: Tuple[str, ...]) -> Tuple[str, ...]:
+    if word == word.capitalize():
+        return tuple(suggestion.capitalize() for suggestion in suggestions)
+    if word == word.upper():
+        return tuple(suggestion.upper() for suggestion in suggestions)
+    return suggestions
+
+
+def _get_directive_words(match: Match) -> Set[str]:
+    return set(filter(None, (match.group("words") or "").split(",")))
+
+
+def _decode(content: bytes) -> str:
+    try:
+        return content.decode("utf-8")
+    except UnicodeDecodeError:
+        return content.decode("latin-1")
+
+
+class Codespell:
+    """A spell checker using the same dictionaries and rules as codespell
+    with "--dictionary=- --dictionary=<additions> --exclude-file=<exclude>
+    --ignore-words=<ignore>"
+
+    The dictionaries are loaded once into a hash map and the content of a file
+    is checked in memory. Like codespell 2.4, the inline directives
+    "codespell:ignore" and "codespell:ignore-next-line" are honored.
+    """
+
+    def __init__(
+        self,
+        dictionaries: Iterable[Path],
+        exclude_file: Path,
+        ignore_words_file: Path,
+    ) -> None:
+        sha = hashlib.sha256(codespell_lib.__version__.encode())
+
+        self.ignore_words: Set[str] = set()
+        self.ignore_words_cased: Set[str] = set()
+        content = ignore_words_file.read_bytes()
+        sha.update(content)
+        for word in content.decode("utf-8").splitlines():
+            word = word.strip()
+            if word == word.lower():
+                self.ignore_words.add(word)
+            else:
+                self.ignore_words_cased.add(word)
+
+        content = exclude_file.read_bytes()
+        sha.update(content)
+        self.exclude_lines: Set[str] = {
+            line.rstrip() for line in content.decode("utf-8").splitlines()
+        }
+
+        self.corrections: Dict[str, Correction] = {}
+        for dictionary in dictionaries:
+            content = dictionary.read_bytes()
+            sha.update(content)
+            self._add_dictionary(content.decode("utf-8"))
+
+        self.fingerprint = sha.hexdigest()
+
+    def _add_correction(self, key: str, data: str) -> None:
+        if key in self.ignore_words:
+            return
+
+        data = data.strip()
+        if "," in data:
+            data, reason = data.rsplit(",", 1)
+            reason = reason.lstrip()
+        else:
+            reason = ""
+
+        self.corrections[key] = Correction(
+            tuple(suggestion.strip() for suggestion in data.split(",")),
+            reason,
+        )
+
+    def _add_dictionary(self, content: str) -> None:
+        for line in content.splitlines():
+            key, data = line.split("->")
+            key = key.lower()
+            data = data.lower()
+            self._add_correction(key, data)
+
+            for char, alt_char in _ALT_CHARS:
+                if char in key:
+                    self._add_correction(
+                        key.replace(char, alt_char),
+                        data.replace(char, alt_char),
+                    )
+
+    def check(self, file: Path, content: bytes) -> Iterator[Misspelling]:
+        """Check the raw content of a file for misspellings"""
+        if file.name.startswith(".") or b"\x00" in content[:1024]:
+            return
+
+        lines = _NEWLINE_PATTERN.sub("\n", _decode(content)).split("\n")
+        next_line_words: Optional[Set[str]] = None
+        for line_number, line in enumerate(lines, start=1):
+            line = line.rstrip()
+            # the words of an ignore-next-line directive of the previous line,
+            # an empty set ignores the whole line
+            previous_line_words = next_line_words
+            next_line_words = None
+
+            directive_words: Set[str] = set()
+            if _IGNORE_NEXT_LINE_TAG in line:
+                match = _IGNORE_NEXT_LINE_PATTERN.search(line)
+                if match:
+                    directive_words = _get_directive_words(match)
+                    next_line_words = directive_words
+
+            if not line or line in self.exclude_lines:
+                continue
+
+            ignore_words = directive_words
+            if _IGNORE_TAG in line:
+                match = _IGNORE_PATTERN.search(line)
+                if match:
+                    words = _get_directive_words(match)
+                    if not words:
+                        continue
+                    ignore_words = ignore_words | words
+
+            if previous_line_words is not None:
+                if not previous_line_words:
+                    continue
+                ignore_words = ignore_words | previous_line_words
+
+            for match in _WORD_PATTERN.finditer(line):
+                word = match.group()
+                if word in self.ignore_words_cased:
+                    continue
+
+                lword = word.lower()
+                correction = self.corrections.get(lword)
+                if not correction or lword in ignore_words:
+                    continue
+
+                start = match.start()
+                if (
+                    start > 0
+                    and line[start - 1] == "\\"
+                    and word.startswith(_ESCAPE_CHARS)
+                    and lword[1:] not in self.corrections
+                ):
+                    continue
+
+                yield Misspelling(
+                    file,
+                    line_number,
+                    word,
+                    _fix_case(word, correction.suggestions),
+                    correction.reason,
+                )
+
+
+@lru_cache(maxsize=None)
+def get_codespell(
+    additions: Path, exclude_file: Path, ignore_words_file: Path
+) -> Codespell:
+    """Get a spell checker, loaded once per process for the given files"""
+    data_path = Path(codespell_lib.__file__).parent / "data"
+    dictionaries = [data_path / name for name in BUILTIN_DICTIONARIES]
+    dictionaries.append(additions)
+
+    return Codespell(dictionaries, exclude_file, ignore_words_file)
@@ -0,0 +1,128 @@
+# Copyright (C) 2022 Greenbone Networks GmbH
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+""" Querying the files changed in a git repository """
+
+import os
+import subprocess
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+
+class GitError(Exception):
+    """A git command has failed"""
+
+
+def git(*args: str, cwd: Optional[Path] = None) -> bytes:
+    """Run a git command and return its raw output"""
+    try:
+        return subprocess.run(
+            ["git"] + list(args),
+            capture_output=True,
+            check=True,
+            cwd=cwd,
+        ).stdout
+    except FileNotFoundError as e:
+        raise GitError("git is not installed") from e
+    except subprocess.CalledProcessError as e:
+        message = e.stderr.decode("utf-8", "replace").strip()
+        raise GitError(message or f"git {' '.join(args)} failed") from e
+
+
+def get_toplevel(cwd: Optional[Path] = None) -> Path:
+    """Get the root directory of the working tree of a repository"""
+    return Path(os.fsdecode(git("rev-parse", "--show-toplevel", cwd=cwd)[:-1]))
+
+
+class FileChanges(NamedTuple):
+    # the added or modified files, that still exist
+    changed: List[Path]
+    # the deleted files, including the old names of renamed files
+    deleted: List[Path]
+
+
+def get_file_changes(
+    revision: Optional[str] = None,
+    *,
+    staged: bool = False,
+    toplevel: Optional[Path] = None,
+) -> FileChanges:
+    """Get the files that have been added, modified or deleted
+
+    Arguments:
+        revision    get the files changed since the merge base of the
+                    revision and HEAD, including the changes of the working
+                    tree and the untracked files, which are not ignored.
+                    Without a revision the changes against HEAD are
+                    returned.
+        staged      only consider the changes in the index, excluding the
+                    untracked files
+        toplevel    the root directory of the working tree. The working
+                    tree of the current working directory is used if not
+                    set.
+
+    Returns:
+        the absolute paths of the changed and the deleted files. Renamed
+        files are reported as the deletion of the old name and the addition
+        of the new name.
+    """
+    toplevel = toplevel or get_toplevel()
+
+    args = ["diff", "--name-status", "-z", "--no-renames"]
+    if staged:
+        args.append("--cached")
+    if revision:
+        args.append(
+            git("merge-base", revision, "HEAD", cwd=toplevel).decode().strip()
+        )
+    elif not staged:
+        args.append("HEAD")
+
+    output = git(*args, "--", cwd=toplevel).split(b"\0")
+
+    changes = FileChanges([], [])
+    # the output consists of pairs of the status and the path
+    for status, name in zip(output[::2], output[1::2]):
+        path = toplevel / os.fsdecode(name)
+        # also deleted in the working tree or not a file e.g. a submodule
+        if status == b"D" or not path.is_file():
+            changes.deleted.append(path)
+        else:
+            changes.changed.append(path)
+
+    if not staged:
+        output = git(
+            "ls-files", "--others", "--exclude-standard", "-z", cwd=toplevel
+        )
+        changes.changed.extend(
+            toplevel / os.fsdecode(name) for name in output.split(b"\0") if name
+        )
+
+    return changes
+
+
+def get_changed_files(
+    revision: Optional[str] = None,
+    *,
+    staged: bool = False,
+    toplevel: Optional[Path] = None,
+) -> List[Path]:
+    """Get the files that have been added or modified and still exist
+
+    See `get_file_changes()` for the arguments.
+    """
+    return get_file_changes(revision, staged=staged, toplevel=toplevel).changed
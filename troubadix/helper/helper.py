@@ -15,6 +15,8 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 import os
+import stat
+import tempfile
 from pathlib import Path
 from subprocess import PIPE, Popen
 from typing import AnyStr, List, Optional, Tuple, Union
@@ -107,3 +109,24 @@ def get_root(path: Path) -> Path:
             return parent
 
     return path
+
+
+def write_file_atomically(path: Path, content: bytes) -> None:
+    """Replace the content of an existing file atomically
+
+    The content is written to a temporary file in the same directory, which
+    is renamed to the file afterwards. Readers and an interrupted write never
+    see a partially written file. The permissions of the file are kept.
+    """
+    mode = stat.S_IMODE(path.stat().st_mode)
+    fd, tmp_name = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.chmod(tmp_name, mode)
+        os.replace(tmp_name, path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
@@ -0,0 +1,181 @@
+# Copyright (C) 2022 Greenbone Networks GmbH
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import re
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Dict, List, Optional, Union
+
+from troubadix.helper.patterns import (
+    ScriptTag,
+    SpecialScriptTag,
+    get_script_tag_pattern,
+    get_special_script_tag_pattern,
+)
+
+# Matches the start of every `script_<call>(` in a single pass. Only the
+# "script_" prefix is consumed, so nested occurrences like
+# "script_script_tag(" are still found at every position.
+_SCRIPT_CALL_PATTERN = re.compile(r"script_(?=(?P<call>\w+)\s*\()")
+
+
+class VTMetadata:
+    """The metadata of a single VT
+
+    The content is scanned once for all `script_*(` calls. Afterwards the
+    precompiled script tag patterns are only matched at the offsets of the
+    corresponding calls instead of searching the whole content again. All
+    results are cached, so plugins can query the same tags repeatedly for
+    free.
+
+    The returned matches are identical to the ones returned by
+    `pattern.search()` and `pattern.finditer()` on the whole content.
+    """
+
+    def __init__(self, file_content: str) -> None:
+        self.file_content = file_content
+
+        self._calls: Optional[Dict[str, List[int]]] = None
+        self._line_offsets: Optional[List[int]] = None
+        self._script_tags: Dict[ScriptTag, List[re.Match]] = {}
+        self._special_script_tags: Dict[SpecialScriptTag, List[re.Match]] = {}
+
+    @property
+    def calls(self) -> Dict[str, List[int]]:
+        """Offsets of all `script_<call>(` calls grouped by the call name
+        without the "script_" prefix e.g. "tag", "xref" or "oid"
+        """
+        if self._calls is None:
+            self._calls = defaultdict(list)
+            for match in _SCRIPT_CALL_PATTERN.finditer(self.file_content):
+                self._calls[match.group("call")].append(match.start())
+        return self._calls
+
+    def find_script_calls(
+        self, call: str, pattern: re.Pattern
+    ) -> List[re.Match]:
+        """Match a pattern at the offsets of all `script_<call>(` calls
+
+        Arguments:
+            call        the name of the call without the "script_" prefix
+            pattern     a pattern starting with `script_<call>`
+
+        Returns
+            the non-overlapping matches in the order of the content
+        """
+        matches = []
+        end = 0
+        for start in self.calls.get(call, []):
+            if start < end:
+                continue
+
+            match = pattern.match(self.file_content, start)
+            if match:
+                matches.append(match)
+                end = match.end()
+
+        return matches
+
+    def get_script_tags(self, script_tag: ScriptTag) -> List[re.Match]:
+        """Get all `script_tag(name:"<name>", value:"<value>");` matches of
+        the given script tag
+        """
+        matches = self._script_tags.get(script_tag)
+        if matches is None:
+            matches = self.find_script_calls(
+                "tag", get_script_tag_pattern(script_tag)
+            )
+            self._script_tags[script_tag] = matches
+        return matches
+
+    def get_script_tag(self, script_tag: ScriptTag) -> Optional[re.Match]:
+        """Get the first match of the given script tag or None"""
+        matches = self.get_script_tags(script_tag)
+        return matches[0] if matches else None
+
+    def get_special_script_tags(
+        self, special_script_tag: SpecialScriptTag
+    ) -> List[re.Match]:
+        """Get all `script_<name>(<value>);` matches of the given special
+        script tag
+        """
+        matches = self._special_script_tags.get(special_script_tag)
+        if matches is None:
+            matches = self.find_script_calls(
+                special_script_tag.value,
+                get_special_script_tag_pattern(special_script_tag),
+            )
+            self._special_script_tags[special_script_tag] = matches
+        return matches
+
+    def get_special_script_tag(
+        self, special_script_tag: SpecialScriptTag
+    ) -> Optional[re.Match]:
+        """Get the first match of the given special script tag or None"""
+        matches = self.get_special_script_tags(special_script_tag)
+        return matches[0] if matches else None
+
+    def get_line_number(self, position: Union[int, re.Match]) -> int:
+        """Get the (1-based) line number of an offset or of the start of a
+        match within the content
+        """
+        if isinstance(position, re.Match):
+            position = position.start()
+
+        if self._line_offsets is None:
+            self._line_offsets = [
+                match.end() for match in re.finditer(r"\n", self.file_content)
+            ]
+        return bisect_right(self._line_offsets, position) + 1
+
+    def _get_special_script_tag_value(
+        self, special_script_tag: SpecialScriptTag
+    ) -> Optional[str]:
+        match = self.get_special_script_tag(special_script_tag)
+        return match.group("value") if match else None
+
+    @property
+    def oid(self) -> Optional[str]:
+        match = self.get_special_script_tag(SpecialScriptTag.OID)
+        return match.group("oid") if match else None
+
+    @property
+    def name(self) -> Optional[str]:
+        return self._get_special_script_tag_value(SpecialScriptTag.NAME)
+
+    @property
+    def family(self) -> Optional[str]:
+        return self._get_special_script_tag_value(SpecialScriptTag.FAMILY)
+
+    @property
+    def category(self) -> Optional[str]:
+        return self._get_special_script_tag_value(SpecialScriptTag.CATEGORY)
+
+    @property
+    def cvss_base(self) -> Optional[str]:
+        match = self.get_script_tag(ScriptTag.CVSS_BASE)
+        return match.group("value") if match else None
+
+    @property
+    def solution_type(self) -> Optional[str]:
+        match = self.get_script_tag(ScriptTag.SOLUTION_TYPE)
+        return match.group("value") if match else None
+
+    @property
+    def is_detection(self) -> bool:
+        """Detection VTs are using a cvss_base of 0.0"""
+        return self.cvss_base == "0.0"
@@ -0,0 +1,731 @@
+# Copyright (C) 2022 Greenbone Networks GmbH
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+""" Language server publishing the results of the file plugins while typing
+
+The server implements the subset of the Language Server Protocol needed for
+diagnostics over stdio. The plugins are run against the unsaved content of
+the open documents. Each plugin records which inputs it reads from the
+context of a document. After a change only the plugins are run again whose
+inputs have changed, e.g. a plugin only querying script tags isn't run
+again if the code after the description block has been changed.
+"""
+
+import dis
+import json
+import re
+import threading
+import traceback
+from functools import lru_cache
+from pathlib import Path
+from typing import (
+    Any,
+    BinaryIO,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+)
+from urllib.parse import unquote, urlparse
+from urllib.request import pathname2url
+
+from troubadix.__version__ import __version__
+from troubadix.discovery import FileFinder
+from troubadix.helper import CURRENT_ENCODING, VTMetadata, get_root
+from troubadix.plugin import (
+    FileContentPlugin,
+    FilePlugin,
+    FilePluginContext,
+    FilesPluginContext,
+    LinterResult,
+    Severity,
+)
+from troubadix.plugins import StandardPlugins
+from troubadix.plugins.duplicate_oid import CheckDuplicateOID
+
+# Delay in seconds after the last change before a document is checked
+DEBOUNCE_DELAY = 0.3
+
+# see the LSP specification
+_TEXT_DOCUMENT_SYNC_FULL = 1
+_METHOD_NOT_FOUND = -32601
+_INVALID_REQUEST = -32600
+_SERVER_NOT_INITIALIZED = -32002
+_MESSAGE_TYPE_ERROR = 1
+_MESSAGE_TYPE_INFO = 3
+_DIAGNOSTIC_SEVERITIES = {
+    Severity.ERROR: 1,
+    Severity.WARNING: 2,
+    Severity.FIX: 3,
+    Severity.RESULT: 3,
+}
+
+# the queries of the VT metadata recorded as inputs of a plugin
+_RECORDED_METHODS = {
+    "find_script_calls",
+    "get_script_tags",
+    "get_script_tag",
+    "get_special_script_tags",
+    "get_special_script_tag",
+    "get_line_number",
+}
+_RECORDED_PROPERTIES = {
+    "oid",
+    "name",
+    "family",
+    "category",
+    "cvss_base",
+    "solution_type",
+    "is_detection",
+}
+
+
+def read_message(stream: BinaryIO) -> Optional[dict]:
+    """Read a JSON-RPC message with its headers
+
+    Returns:
+        the message or None at the end of the stream
+    """
+    length = None
+    while True:
+        line = stream.readline()
+        if not line:
+            return None
+        line = line.strip()
+        if not line:
+            break
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length":
+            length = int(value)
+
+    if length is None:
+        raise ValueError("Missing Content-Length header")
+    return json.loads(stream.read(length).decode("utf-8"))
+
+
+def write_message(stream: BinaryIO, message: dict) -> None:
+    body = json.dumps(message).encode("utf-8")
+    stream.write(b"Content-Length: %d\r\n\r\n" % len(body) + body)
+    stream.flush()
+
+
+def uri_to_path(uri: str) -> Optional[Path]:
+    parsed = urlparse(uri)
+    if parsed.scheme != "file":
+        return None
+    return Path(unquote(parsed.path))
+
+
+def path_to_uri(path: Path) -> str:
+    return f"file://{pathname2url(str(path))}"
+
+
+def _snapshot(value: Any) -> Any:
+    """Get a comparable copy of the result of a query"""
+    if isinstance(value, re.Match):
+        return value.start(), value.end(), value.group()
+    if isinstance(value, (list, tuple)):
+        return tuple(_snapshot(item) for item in value)
+    return value
+
+
+@lru_cache(maxsize=None)
+def _uses_file_content(plugin_class: Type[FileContentPlugin]) -> bool:
+    """Check if check_content() of a plugin reads its file_content argument
+
+    Many plugins only query the VT metadata and ignore the argument.
+    """
+    code = plugin_class.check_content.__code__
+    if "file_content" in code.co_cellvars:
+        # used by a nested function
+        return True
+
+    for instruction in dis.get_instructions(code):
+        if not instruction.opname.startswith("LOAD_FAST"):
+            continue
+        argval = instruction.argval
+        if argval == "file_content" or (
+            isinstance(argval, tuple) and "file_content" in argval
+        ):
+            return True
+    return False
+
+
+class _Reads:
+    """The inputs of the document read by a plugin"""
+
+    def __init__(self) -> None:
+        # the whole content or the status of the file
+        self.content = False
+        self.queries: List[Tuple[str, tuple, Any]] = []
+
+    def is_unchanged(self, vt_metadata: VTMetadata) -> bool:
+        """Check if all queries have the same results for the VT metadata of
+        the changed content"""
+        if self.content:
+            return False
+
+        for name, args, snapshot in self.queries:
+            value = getattr(vt_metadata, name)
+            if name in _RECORDED_METHODS:
+                value = value(*args)
+            if _snapshot(value) != snapshot:
+                return False
+        return True
+
+
+class _RecordingVTMetadata:
+    """Records the queries of the VT metadata by a plugin"""
+
+    def __init__(self, vt_metadata: VTMetadata, reads: _Reads) -> None:
+        self._vt_metadata = vt_metadata
+        self._reads = reads
+
+    def _record(self, name: str, *args: Any) -> Any:
+        # only the position of a match is used to get its line number
+        args = tuple(
+            arg.start() if isinstance(arg, re.Match) else arg for arg in args
+        )
+        value = getattr(self._vt_metadata, name)(*args)
+        self._reads.queries.append((name, args, _snapshot(value)))
+        return value
+
+    def __getattr__(self, name: str) -> Any:
+        if name in _RECORDED_METHODS:
+            return lambda *args: self._record(name, *args)
+
+        value = getattr(self._vt_metadata, name)
+        if name in _RECORDED_PROPERTIES:
+            self._reads.queries.append((name, (), _snapshot(value)))
+        else:
+            self._reads.content = True
+        return value
+
+
+class DocumentContext(FilePluginContext):
+    """The context of the content of an open document
+
+    The inputs read by a plugin are recorded in `reads` if set.
+    """
+
+    def __init__(self, *, root: Path, nasl_file: Path, text: str) -> None:
+        try:
+            raw_content = text.encode(CURRENT_ENCODING)
+        except UnicodeEncodeError:
+            # the encoding plugin reports the characters of other encodings
+            raw_content = text.encode("utf-8")
+
+        super().__init__(
+            root=root, nasl_file=nasl_file, raw_content=raw_content
+        )
+        self.reads: Optional[_Reads] = None
+
+        # create the shared views without recording
+        self._vt_metadata = VTMetadata(self.file_content)
+        self._lines = self.file_content.splitlines()
+
+    def _read_content(self) -> None:
+        if self.reads is not None:
+            self.reads.content = True
+
+    @property
+    def raw_content(self) -> bytes:
+        self._read_content()
+        return self._raw_content
+
+    @property
+    def stat(self):
+        self._read_content()
+        return super().stat
+
+    @property
+    def file_content(self) -> str:
+        self._read_content()
+        return super().file_content
+
+    @property
+    def lines(self) -> Iterable[str]:
+        self._read_content()
+        return self._lines
+
+    @property
+    def unrecorded_file_content(self) -> str:
+        """The content without recording it as input of the current plugin"""
+        return self._file_content
+
+    @property
+    def vt_metadata(self) -> VTMetadata:
+        if self.reads is None:
+            return self._vt_metadata
+        return _RecordingVTMetadata(self._vt_metadata, self.reads)
+
+
+class _PluginState:
+    """The results of a plugin for the last checked content of a document"""
+
+    def __init__(
+        self, inputs: List[str], reads: _Reads, results: List[LinterResult]
+    ) -> None:
+        self.inputs = inputs
+        self.reads = reads
+        self.results = results
+
+
+class Document:
+    """An open document"""
+
+    def __init__(self, uri: str, path: Path, version: int, text: str) -> None:
+        self.uri = uri
+        self.path = path
+        self.version = version
+        self.text = text
+        # the text of the last check
+        self.checked_text: Optional[str] = None
+        self.plugins: Dict[str, _PluginState] = {}
+        self.timer: Optional[threading.Timer] = None
+
+
+class OIDIndex:
+    """The OIDs of all VTs below a root directory
+
+    The index is loaded once in the background and is updated with the
+    content of the saved documents.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self._lock = threading.Lock()
+        self._files: Dict[Path, str] = {}
+        self._oids: Dict[str, Set[Path]] = {}
+        self.ready = threading.Event()
+
+    def load(self) -> None:
+        for nasl_file, _ in FileFinder(["**/*.nasl"]).iter_find([self.root]):
+            try:
+                oid = CheckDuplicateOID.map(
+                    FilePluginContext(root=self.root, nasl_file=nasl_file)
+                )
+            except OSError:
+                continue
+            self.update(nasl_file, oid)
+
+        self.ready.set()
+
+    def update(self, nasl_file: Path, oid: Optional[str]) -> None:
+        """Set the OID of a VT"""
+        nasl_file = nasl_file.resolve()
+        with self._lock:
+            previous = self._files.pop(nasl_file, None)
+            if previous:
+                self._oids[previous].discard(nasl_file)
+            if oid:
+                self._files[nasl_file] = oid
+                self._oids.setdefault(oid, set()).add(nasl_file)
+
+    def get_other_file(self, oid: str, nasl_file: Path) -> Optional[Path]:
+        """Get another VT using the OID"""
+        nasl_file = nasl_file.resolve()
+        with self._lock:
+            others = sorted(self._oids.get(oid, set()) - {nasl_file})
+        return others[0] if others else None
+
+
+class LanguageServer:
+    """Publishes the results of the file plugins as diagnostics of the open
+    documents
+
+    The documents are synchronized as a whole. A document is checked when it
+    is opened or saved and after a change, once no further change has been
+    made for the debounce delay.
+    """
+
+    def __init__(
+        self,
+        reader: BinaryIO,
+        writer: BinaryIO,
+        *,
+        root: Optional[Path] = None,
+        excluded_plugins: Iterable[str] = None,
+        included_plugins: Iterable[str] = None,
+        ignore_warnings: bool = False,
+        debounce_delay: float = DEBOUNCE_DELAY,
+    ) -> None:
+        self._reader = reader
+        self._writer = writer
+        self._root = root
+        self._ignore_warnings = ignore_warnings
+        self._debounce_delay = debounce_delay
+
+        plugins = StandardPlugins(excluded_plugins, included_plugins)
+        self._file_plugins: Tuple[Type[FilePlugin], ...] = tuple(
+            plugins.file_plugins
+        )
+        self._check_duplicate_oid = CheckDuplicateOID in plugins.files_plugins
+
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        self._documents: Dict[str, Document] = {}
+        self._indexes: Dict[Path, OIDIndex] = {}
+        self._initialized = False
+        self._shutdown = False
+
+    def _send(self, message: dict) -> None:
+        message["jsonrpc"] = "2.0"
+        with self._write_lock:
+            write_message(self._writer, message)
+
+    def _notify(self, method: str, params: dict) -> None:
+        self._send({"method": method, "params": params})
+
+    def _log(self, message_type: int, message: str) -> None:
+        self._notify(
+            "window/logMessage", {"type": message_type, "message": message}
+        )
+
+    def _get_root(self, path: Path) -> Path:
+        return self._root or get_root(path.resolve())
+
+    def _get_index(self, root: Path) -> OIDIndex:
+        """Get the OID index of the root, which is loaded in the background
+        on first use"""
+        index = self._indexes.get(root)
+        if index is None:
+            index = OIDIndex(root)
+            self._indexes[root] = index
+            threading.Thread(target=index.load, daemon=True).start()
+        return index
+
+    def _run_plugin(
+        self,
+        plugin_class: Type[FilePlugin],
+        context: DocumentContext,
+        document: Document,
+    ) -> List[LinterResult]:
+        plugin = plugin_class(context)
+        inputs = list(plugin.get_cache_inputs())
+
+        state = document.plugins.get(plugin.name)
+        if (
+            state is not None
+            and state.inputs == inputs
+            and state.reads.is_unchanged(context.vt_metadata)
+        ):
+            return state.results
+
+        context.reads = _Reads()
+        try:
+            if isinstance(plugin, FileContentPlugin) and not _uses_file_content(
+                plugin_class
+            ):
+                # pass the content without recording it as input
+                results = list(
+                    plugin.check_content(
+                        context.nasl_file, context.unrecorded_file_content
+                    )
+                )
+            else:
+                results = list(plugin.run())
+        finally:
+            reads = context.reads
+            context.reads = None
+
+        document.plugins[plugin.name] = _PluginState(inputs, reads, results)
+        return results
+
+    def _check_duplicate_oid_of(
+        self, context: DocumentContext
+    ) -> List[LinterResult]:
+        oid = CheckDuplicateOID.map(context)
+        index = self._get_index(context.root)
+        if not oid or not index.ready.is_set():
+            return []
+
+        other = index.get_other_file(oid, context.nasl_file)
+        facts = [(other, oid)] if other else []
+        facts.append((context.nasl_file, oid))
+        plugin = CheckDuplicateOID(
+            FilesPluginContext(root=context.root, nasl_files=[])
+        )
+        return [
+            result
+            for result in plugin.reduce(facts)
+            if result.file == context.nasl_file
+        ]
+
+    def check(self, document: Document) -> None:
+        """Check the current content of a document and publish the
+        diagnostics"""
+        if document.text == document.checked_text:
+            return
+        document.checked_text = document.text
+
+        context = DocumentContext(
+            root=self._get_root(document.path),
+            nasl_file=document.path,
+            text=document.text,
+        )
+        results: List[Tuple[str, LinterResult]] = []
+        for plugin_class in self._file_plugins:
+            try:
+                plugin_results = self._run_plugin(
+                    plugin_class, context, document
+                )
+            except Exception:  # pylint: disable=broad-except
+                document.plugins.pop(plugin_class.name, None)
+                self._log(
+                    _MESSAGE_TYPE_ERROR,
+                    f"{plugin_class.name} failed on {document.path}:\n"
+                    f"{traceback.format_exc()}",
+                )
+                continue
+            results.extend(
+                (plugin_class.name, result) for result in plugin_results
+            )
+
+        if self._check_duplicate_oid:
+            results.extend(
+                (CheckDuplicateOID.name, result)
+                for result in self._check_duplicate_oid_of(context)
+            )
+
+        self._publish(document, results)
+
+    def _publish(
+        self, document: Document, results: List[Tuple[str, LinterResult]]
+    ) -> None:
+        lines = document.text.split("\n")
+        diagnostics = []
+        for plugin_name, result in results:
+            if result.file is not None and result.file != document.path:
+                continue
+            if self._ignore_warnings and result.severity == Severity.WARNING:
+                continue
+
+            line = min(max((result.line or 1) - 1, 0), len(lines) - 1)
+            diagnostics.append(
+                {
+                    "range": {
+                        "start": {"line": line, "character": 0},
+                        "end": {
+                            "line": line,
+                            "character": len(lines[line].rstrip("\r")),
+                        },
+                    },
+                    "severity": _DIAGNOSTIC_SEVERITIES[result.severity],
+                    "source": "troubadix",
+                    "code": result.plugin or plugin_name,
+                    "message": result.message,
+                }
+            )
+
+        self._notify(
+            "textDocument/publishDiagnostics",
+            {
+                "uri": document.uri,
+                "version": document.version,
+                "diagnostics": diagnostics,
+            },
+        )
+
+    def _check_later(self, uri: str, version: int) -> None:
+        with self._lock:
+            document = self._documents.get(uri)
+            if document is not None and document.version == version:
+                document.timer = None
+                self.check(document)
+
+    def _schedule(self, document: Document) -> None:
+        if document.timer:
+            document.timer.cancel()
+        document.timer = threading.Timer(
+            self._debounce_delay,
+            self._check_later,
+            (document.uri, document.version),
+        )
+        document.timer.daemon = True
+        document.timer.start()
+
+    def _did_open(self, params: dict) -> None:
+        text_document = params["textDocument"]
+        path = uri_to_path(text_document["uri"])
+        if path is None:
+            return
+
+        document = Document(
+            text_document["uri"],
+            path,
+            text_document.get("version", 0),
+            text_document["text"],
+        )
+        self._documents[document.uri] = document
+        self.check(document)
+
+    def _did_change(self, params: dict) -> None:
+        text_document = params["textDocument"]
+        document = self._documents.get(text_document["uri"])
+        if document is None or not params["contentChanges"]:
+            return
+
+        document.version = text_document.get("version", document.version)
+        document.text = params["contentChanges"][-1]["text"]
+        self._schedule(document)
+
+    def _did_save(self, params: dict) -> None:
+        document = self._documents.get(params["textDocument"]["uri"])
+        if document is None:
+            return
+
+        if "text" in params:
+            document.text = params["text"]
+        if document.timer:
+            document.timer.cancel()
+            document.timer = None
+
+        # the status of the file may have been changed
+        document.checked_text = None
+        self.check(document)
+
+        index = self._indexes.get(self._get_root(document.path))
+        if index is not None:
+            index.update(
+                document.path,
+                CheckDuplicateOID.map(
+                    DocumentContext(
+                        root=index.root,
+                        nasl_file=document.path,
+                        text=document.text,
+                    )
+                ),
+            )
+
+    def _did_close(self, params: dict) -> None:
+        uri = params["textDocument"]["uri"]
+        document = self._documents.pop(uri, None)
+        if document is None:
+            return
+
+        if document.timer:
+            document.timer.cancel()
+        self._notify(
+            "textDocument/publishDiagnostics",
+            {"uri": uri, "diagnostics": []},
+        )
+
+    def _initialize(self, params: dict) -> dict:
+        if self._root is None:
+            root_uri = params.get("rootUri")
+            root_path = uri_to_path(root_uri) if root_uri else None
+            if root_path is not None:
+                # e.g. the checkout of the feed containing the nasl dir
+                nasl_dir = root_path / "nasl"
+                self._root = nasl_dir if nasl_dir.is_dir() else None
+
+        if self._root is not None and self._check_duplicate_oid:
+            self._get_index(self._root)
+
+        self._initialized = True
+        return {
+            "capabilities": {
+                "textDocumentSync": {
+                    "openClose": True,
+                    "change": _TEXT_DOCUMENT_SYNC_FULL,
+                    "save": {"includeText": False},
+                }
+            },
+            "serverInfo": {"name": "troubadix", "version": __version__},
+        }
+
+    _NOTIFICATIONS = {
+        "textDocument/didOpen": _did_open,
+        "textDocument/didChange": _did_change,
+        "textDocument/didSave": _did_save,
+        "textDocument/didClose": _did_close,
+    }
+
+    def handle(self, message: dict) -> bool:
+        """Handle a single message of the client
+
+        Returns:
+            False if the server should exit
+        """
+        method = message.get("method")
+        request_id = message.get("id")
+
+        if method == "exit":
+            return False
+
+        if request_id is None:
+            handler = self._NOTIFICATIONS.get(method)
+            if handler and self._initialized:
+                with self._lock:
+                    try:
+                        handler(self, message.get("params", {}))
+                    except (KeyError, TypeError, AttributeError) as e:
+                        self._log(
+                            _MESSAGE_TYPE_ERROR, f"Invalid {method}: {e!r}"
+                        )
+            return True
+
+        if method == "initialize":
+            response = {"result": self._initialize(message.get("params", {}))}
+        elif not self._initialized:
+            response = {
+                "error": {
+                    "code": _SERVER_NOT_INITIALIZED,
+                    "message": "Server not initialized",
+                }
+            }
+        elif method == "shutdown":
+            self._shutdown = True
+            response = {"result": None}
+        elif method is None:
+            response = {
+                "error": {"code": _INVALID_REQUEST, "message": "No method"}
+            }
+        else:
+            response = {
+                "error": {
+                    "code": _METHOD_NOT_FOUND,
+                    "message": f"Method {method} not found",
+                }
+            }
+
+        response["id"] = request_id
+        self._send(response)
+        return True
+
+    def serve(self) -> int:
+        """Handle the messages of the client until it exits
+
+        Returns:
+            the exit code of the server
+        """
+        self._log(_MESSAGE_TYPE_INFO, f"troubadix {__version__} started")
+        while True:
+            message = read_message(self._reader)
+            if message is None or not self.handle(message):
+                break
+
+        with self._lock:
+            for document in self._documents.values():
+                if document.timer:
+                    document.timer.cancel()
+
+        return 0 if self._shutdown else 1
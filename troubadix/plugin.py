@@ -15,63 +15,326 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import bisect
+import difflib
+import os
+import re
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from enum import IntEnum
 from pathlib import Path
-from typing import Iterable, Iterator, Optional
+from typing import Any, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 
-from troubadix.helper import CURRENT_ENCODING
+from troubadix.helper import CURRENT_ENCODING, VTMetadata
+
+
+class Severity(IntEnum):
+    """The kind of a result"""
+
+    RESULT = 0
+    FIX = 1
+    WARNING = 2
+    ERROR = 3
 
 
-@dataclass
 class LinterResult:
-    """A result found during running a check"""
+    """A result found during running a check
+
+    Results are created in large numbers, therefore they don't have an
+    instance dict. The kind of a result is available as the severity tag of
+    its class.
+    """
+
+    __slots__ = ("message", "file", "plugin", "line")
+
+    severity = Severity.RESULT
+
+    def __init__(
+        self,
+        message: str,
+        file: Optional[Path] = None,
+        plugin: Optional[str] = None,
+        line: Optional[int] = None,
+    ) -> None:
+        self.message = message
+        self.file = file
+        self.plugin = plugin
+        self.line = line
+
+    @staticmethod
+    def create(
+        severity: Severity,
+        message: str,
+        file: Optional[Path] = None,
+        plugin: Optional[str] = None,
+        line: Optional[int] = None,
+    ) -> "LinterResult":
+        """Create a result of the class of the given severity"""
+        return RESULT_CLASSES[severity](
+            message, file=file, plugin=plugin, line=line
+        )
+
+    def _astuple(self) -> tuple:
+        return (self.message, self.file, self.plugin, self.line)
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._astuple() == other._astuple()
 
-    message: str
-    file: Optional[Path] = None
-    plugin: Optional[str] = None
-    line: Optional[int] = None
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(message={self.message!r}, "
+            f"file={self.file!r}, plugin={self.plugin!r}, line={self.line!r})"
+        )
 
 
 class LinterWarning(LinterResult):
     """A result that is considered a warning"""
 
+    __slots__ = ()
+
+    severity = Severity.WARNING
+
 
 class LinterError(LinterResult):
     """A error found during a check"""
 
+    __slots__ = ()
+
+    severity = Severity.ERROR
+
 
 class LinterFix(LinterResult):
     """A fix that has been applied"""
 
+    __slots__ = ()
+
+    severity = Severity.FIX
+
+
+RESULT_CLASSES = {
+    Severity.RESULT: LinterResult,
+    Severity.FIX: LinterFix,
+    Severity.WARNING: LinterWarning,
+    Severity.ERROR: LinterError,
+}
+
+
+class Edit(NamedTuple):
+    """Replace the span start:end of the original file content with text"""
+
+    start: int
+    end: int
+    text: str
+
+
+class FixTransaction:
+    """Collects the fixes of all plugins for a single file
+
+    All edits refer to the original content of the file, so the fixes of
+    different plugins don't overwrite each other. The fixes of a plugin are
+    only accepted if none of its edits overlaps an edit of a previously
+    accepted fix. The accepted edits are applied at once after all plugins
+    have run.
+
+    If the line breaks of the content seen by the plugins have been converted
+    to \\n, the edits are applied to the text with the original line breaks,
+    so the untouched lines keep them. The line breaks of the inserted text
+    are converted to the first line break of the original text.
+    """
+
+    def __init__(self, content: str, original: Optional[str] = None) -> None:
+        self.content = content
+        self.original = content if original is None else original
+        self._edits: List[Tuple[Edit, str]] = []
+        # the offsets of the \\r\\n line breaks in the content
+        self._crlf_offsets: Optional[List[int]] = None
+
+    @staticmethod
+    def _overlaps(edit: Edit, other: Edit) -> bool:
+        return (edit.start < other.end and other.start < edit.end) or (
+            edit.start == other.start
+        )
+
+    def submit(self, plugin: str, edits: Iterable[Edit]) -> bool:
+        """Submit the edits of a fix
+
+        Returns:
+            True if the edits have been accepted, False if they are
+            conflicting with the edits of another fix
+        """
+        edits = list(edits)
+        for edit in edits:
+            if not 0 <= edit.start <= edit.end <= len(self.content):
+                raise ValueError(f"Invalid edit {edit} of plugin {plugin}")
+
+            for other, _ in self._edits:
+                if self._overlaps(edit, other):
+                    return False
+
+        self._edits.extend((edit, plugin) for edit in edits)
+        return True
+
+    def get_conflicting_plugin(self, edit: Edit) -> Optional[str]:
+        """Get the plugin of an accepted edit overlapping the edit"""
+        for other, plugin in self._edits:
+            if self._overlaps(edit, other):
+                return plugin
+        return None
+
+    @property
+    def edits(self) -> List[Edit]:
+        """The accepted edits in the order of the content"""
+        return sorted(edit for edit, _ in self._edits)
+
+    def _get_original_offset(self, offset: int) -> int:
+        if self.original is self.content:
+            return offset
+
+        if self._crlf_offsets is None:
+            self._crlf_offsets = [
+                match.start() - i
+                for i, match in enumerate(re.finditer("\r\n", self.original))
+            ]
+        return offset + bisect.bisect_left(self._crlf_offsets, offset)
+
+    def apply(self) -> str:
+        """Get the original content with all accepted edits applied"""
+        line_break = "\n"
+        if self.original is not self.content:
+            line_break = re.search("\r\n?|\n", self.original).group()
+
+        parts = []
+        position = 0
+        for edit in self.edits:
+            parts.append(
+                self.original[position : self._get_original_offset(edit.start)]
+            )
+            parts.append(edit.text.replace("\n", line_break))
+            position = self._get_original_offset(edit.end)
+        parts.append(self.original[position:])
+        return "".join(parts)
+
+    def diff(self, path: str) -> str:
+        """Get the accepted edits as a unified patch for the file at path,
+        which can be applied with `git apply` or `patch -p1`"""
+        patch = []
+        for line in difflib.unified_diff(
+            _split_lines(self.original),
+            _split_lines(self.apply()),
+            fromfile=f"a/{path}",
+            tofile=f"b/{path}",
+        ):
+            if not line.endswith("\n"):
+                line = f"{line}\n\\ No newline at end of file\n"
+            patch.append(line)
+        return "".join(patch)
+
+
+def _split_lines(content: str) -> List[str]:
+    # only split at \n to keep other line breaks like \r within the lines
+    lines = [f"{line}\n" for line in content.split("\n")]
+    last = lines.pop()[:-1]
+    if last:
+        lines.append(last)
+    return lines
+
 
 class FilePluginContext:
+    """The state of a single file shared by all plugins running on it
+
+    The file is opened and read only once. The content and its status are
+    cached and all other views like the decoded text and the lines are
+    derived from the raw content. The content can also be passed directly,
+    e.g. the unsaved content of an editor. Then only the status is read from
+    the file.
+    """
+
     def __init__(
         self,
         *,
         root: Path,
         nasl_file: Path = None,
+        raw_content: Optional[bytes] = None,
     ) -> None:
         self.root = root
         self.nasl_file = nasl_file
 
-        self._file_content = None
-        self._lines = None
+        self._raw_content = raw_content
+        self._stat: Optional[os.stat_result] = None
+        self._file_content: Optional[str] = None
+        # the decoded content with the original line breaks, if they differ
+        self._original_content: Optional[str] = None
+        self._lines: Optional[List[str]] = None
+        self._vt_metadata: Optional[VTMetadata] = None
+        self._fixes: Optional[FixTransaction] = None
+
+    def _read(self) -> None:
+        if self._raw_content is not None:
+            self._stat = self.nasl_file.stat()
+            return
+
+        with self.nasl_file.open("rb") as f:
+            self._stat = os.fstat(f.fileno())
+            self._raw_content = f.read()
+
+    @property
+    def raw_content(self) -> bytes:
+        """The content of the file as it is stored on disk"""
+        if self._raw_content is None:
+            self._read()
+        return self._raw_content
+
+    @property
+    def stat(self) -> os.stat_result:
+        """The status of the file at the time it has been read"""
+        if self._stat is None:
+            self._read()
+        return self._stat
 
     @property
     def file_content(self) -> str:
-        if not self._file_content:
-            self._file_content = self.nasl_file.read_text(
-                encoding=CURRENT_ENCODING
-            )
+        """The decoded content with \\r\\n and \\r line breaks converted to
+        \\n like the universal newlines mode of read_text(). Plugins checking
+        the line breaks need to use the raw content."""
+        if self._file_content is None:
+            content = self.raw_content.decode(CURRENT_ENCODING)
+            if "\r" in content:
+                self._original_content = content
+                content = content.replace("\r\n", "\n").replace("\r", "\n")
+            self._file_content = content
         return self._file_content
 
     @property
     def lines(self) -> Iterable[str]:
-        if not self._lines:
+        if self._lines is None:
             self._lines = self.file_content.splitlines()
         return self._lines
 
+    @property
+    def vt_metadata(self) -> VTMetadata:
+        """The parsed script tags of the file content, shared by all
+        plugins running on this file"""
+        if self._vt_metadata is None:
+            self._vt_metadata = VTMetadata(self.file_content)
+        return self._vt_metadata
+
+    @property
+    def fixes(self) -> FixTransaction:
+        """The fixes of all plugins for this file. They are applied by the
+        runner after all plugins have run."""
+        if self._fixes is None:
+            self._fixes = FixTransaction(
+                self.file_content, self._original_content
+            )
+        return self._fixes
+
+    @property
+    def has_fixes(self) -> bool:
+        return self._fixes is not None and bool(self._fixes.edits)
+
 
 class FilesPluginContext:
     def __init__(self, *, root: Path, nasl_files: Iterable[Path]) -> None:
@@ -100,12 +363,82 @@ class FilesPlugin(Plugin):
         self.context = context
 
 
+class FilesMapReducePlugin(FilesPlugin):
+    """A plugin that does checks over all files in two steps
+
+    The map step extracts the facts needed by the plugin from a single file.
+    It is run in the per file pass and reuses the already loaded content of
+    the file. The reduce step evaluates the facts of all files afterwards.
+    """
+
+    @classmethod
+    @abstractmethod
+    def map(cls, context: FilePluginContext) -> Any:
+        """Extract the facts of a single file
+
+        Returns:
+            small picklable facts of the file or None if the file isn't
+            relevant for the plugin
+        """
+
+    @abstractmethod
+    def reduce(
+        self, facts: Iterable[Tuple[Path, Any]]
+    ) -> Iterator[LinterResult]:
+        """Evaluate the facts of all files
+
+        Arguments:
+            facts   tuples of the file and its facts in the order of the
+                    files. Files without facts are omitted.
+        """
+
+    def run(self) -> Iterator[LinterResult]:
+        facts = []
+        for nasl_file in self.context.nasl_files:
+            fact = self.map(
+                FilePluginContext(root=self.context.root, nasl_file=nasl_file)
+            )
+            if fact is not None:
+                facts.append((nasl_file, fact))
+
+        return self.reduce(facts)
+
+
 class FilePlugin(Plugin):
     """A plugin that does checks on single files"""
 
     def __init__(self, context: FilePluginContext) -> None:
         self.context = context
 
+    def get_cache_inputs(self) -> Iterable[str]:
+        """Inputs besides the path and the content of the file, which
+        influence the results of this plugin. Cached results of the plugin
+        are invalidated if one of the inputs changes."""
+        return []
+
+    def submit_fix(self, edits: Iterable[Edit], message: str) -> LinterResult:
+        """Submit the edits of a fix to the fix transaction of the file
+
+        Returns:
+            a fix result with the message if the edits have been accepted,
+            otherwise a warning about the conflicting fix
+        """
+        edits = list(edits)
+        fixes = self.context.fixes
+        if fixes.submit(self.name, edits):
+            return LinterFix(
+                message, file=self.context.nasl_file, plugin=self.name
+            )
+
+        conflicting = {fixes.get_conflicting_plugin(edit) for edit in edits}
+        conflicting.discard(None)
+        return LinterWarning(
+            "Fix has not been applied because it conflicts with the fix of "
+            f"{', '.join(sorted(conflicting))}.",
+            file=self.context.nasl_file,
+            plugin=self.name,
+        )
+
 
 class FileContentPlugin(FilePlugin):
     """A plugin that does checks on the whole file content"""
@@ -125,6 +125,7 @@ _FILE_PLUGINS = [
     CheckSecurityMessages,
     CheckSolutionText,
     CheckSolutionType,
+    CheckSpelling,
     CheckTabs,
     CheckTodoTbd,
     CheckTrailingSpacesTabs,
@@ -141,7 +142,6 @@ _FILE_PLUGINS = [
 _FILES_PLUGINS = [
     CheckDuplicateOID,
     CheckNoSolution,
-    CheckSpelling,
 ]
 
 
@@ -19,13 +19,7 @@ import re
 from pathlib import Path
 from typing import Iterator
 
-from troubadix.helper import CURRENT_ENCODING
-from troubadix.plugin import (
-    FileContentPlugin,
-    LinterError,
-    LinterFix,
-    LinterResult,
-)
+from troubadix.plugin import Edit, FileContentPlugin, LinterError, LinterResult
 
 CORRECT_COPYRIGHT_PHRASE = (
     "# Some text descriptions might be excerpted from (a) referenced\n"
@@ -67,7 +61,7 @@ class CheckCopyrightText(FileContentPlugin):
         # Some text descriptions might be excerpted from (a) referenced
         # source(s), and are Copyright (C) by the respective right holder(s).
         """
-        self.new_file_content = None
+        self.copyright_span = None
 
         if nasl_file.suffix == ".inc":
             return
@@ -82,10 +76,7 @@ class CheckCopyrightText(FileContentPlugin):
             re.MULTILINE,
         )
         if match:
-            self.new_file_content = file_content.replace(
-                match.group(0),
-                CORRECT_COPYRIGHT_PHRASE,
-            )
+            self.copyright_span = match.span()
 
             yield LinterError(
                 "The VT is using an incorrect copyright statement.",
@@ -94,17 +85,11 @@ class CheckCopyrightText(FileContentPlugin):
             )
 
     def fix(self) -> Iterator[LinterResult]:
-        if not self.new_file_content:
+        if not self.copyright_span:
             return
 
-        nasl_file = self.context.nasl_file
-        nasl_file.write_text(
-            data=self.new_file_content, encoding=CURRENT_ENCODING
-        )
-
-        yield LinterFix(
+        yield self.submit_fix(
+            [Edit(*self.copyright_span, CORRECT_COPYRIGHT_PHRASE)],
             f"The copyright statement has been updated to "
             f"{CORRECT_COPYRIGHT_PHRASE}",
-            file=nasl_file,
-            plugin=self.name,
         )
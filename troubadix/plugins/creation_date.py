@@ -19,7 +19,7 @@ from datetime import datetime
 from pathlib import Path
 from typing import Iterator
 
-from troubadix.helper.patterns import ScriptTag, get_script_tag_pattern
+from troubadix.helper.patterns import ScriptTag
 from troubadix.plugin import FileContentPlugin, LinterError, LinterResult
 
 LENGTH = 44
@@ -44,10 +44,8 @@ class CheckCreationDate(FileContentPlugin):
             )
             return
 
-        tag_pattern = get_script_tag_pattern(ScriptTag.CREATION_DATE)
-
         # Example: "2017-11-29 13:56:41 +0100 (Wed, 29 Nov 2017)"
-        match = tag_pattern.search(file_content)
+        match = self.context.vt_metadata.get_script_tag(ScriptTag.CREATION_DATE)
 
         if match:
             try:
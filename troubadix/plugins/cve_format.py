@@ -18,9 +18,9 @@
 import re
 from datetime import datetime
 from pathlib import Path
-from typing import Iterator
+from typing import Iterable, Iterator
 
-from troubadix.helper import ScriptTag, get_script_tag_pattern
+from troubadix.helper import ScriptTag
 from troubadix.plugin import (
     FileContentPlugin,
     LinterError,
@@ -32,6 +32,10 @@ from troubadix.plugin import (
 class CheckCVEFormat(FileContentPlugin):
     name = "check_cve_format"
 
+    def get_cache_inputs(self) -> Iterable[str]:
+        # CVEs of the next year become valid at the turn of the year
+        return [str(datetime.now().year)]
+
     def check_content(
         self,
         nasl_file: Path,
@@ -40,11 +44,11 @@ class CheckCVEFormat(FileContentPlugin):
         if nasl_file.suffix == ".inc":
             return
 
-        tag_pattern = get_script_tag_pattern(ScriptTag.CVSS_BASE)
-
         # don't need to check detection scripts since they don't refer to CVEs.
         # all detection scripts have a cvss of 0.0
-        cvss_detect = tag_pattern.search(file_content)
+        cvss_detect = self.context.vt_metadata.get_script_tag(
+            ScriptTag.CVSS_BASE
+        )
         if cvss_detect and cvss_detect.group("value") == "0.0":
             return
 
@@ -18,7 +18,7 @@ import re
 from pathlib import Path
 from typing import Iterator
 
-from troubadix.helper import ScriptTag, get_script_tag_pattern
+from troubadix.helper import ScriptTag
 from troubadix.plugin import FileContentPlugin, LinterError, LinterResult
 
 
@@ -34,10 +34,7 @@ class CheckCVSSFormat(FileContentPlugin):
         if nasl_file.suffix == ".inc":
             return
 
-        cvss_base_pattern = get_script_tag_pattern(ScriptTag.CVSS_BASE)
-        cvss_base_vector_pattern = get_script_tag_pattern(
-            ScriptTag.CVSS_BASE_VECTOR
-        )
+        vt_metadata = self.context.vt_metadata
 
         missing_cvss_base = re.search('"cvss_base", value:""', file_content)
         if missing_cvss_base:
@@ -47,7 +44,7 @@ class CheckCVSSFormat(FileContentPlugin):
                 plugin=self.name,
             )
         else:
-            cvss_detect = cvss_base_pattern.search(file_content)
+            cvss_detect = vt_metadata.get_script_tag(ScriptTag.CVSS_BASE)
             if not cvss_detect:
                 yield LinterError(
                     "VT has an invalid cvss_base value.",
@@ -55,7 +52,7 @@ class CheckCVSSFormat(FileContentPlugin):
                     plugin=self.name,
                 )
 
-        vector_match = cvss_base_vector_pattern.search(file_content)
+        vector_match = vt_metadata.get_script_tag(ScriptTag.CVSS_BASE_VECTOR)
 
         if not vector_match:
             yield LinterError(
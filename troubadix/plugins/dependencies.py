@@ -19,11 +19,11 @@
 
 import re
 from pathlib import Path
-from typing import Iterator
+from typing import Iterable, Iterator
 
+from troubadix.cache import get_dependency_cache_inputs
 from troubadix.helper import SpecialScriptTag
-from troubadix.helper.helper import is_enterprise_folder, FEED_VERSIONS
-from troubadix.helper.patterns import get_special_script_tag_pattern
+from troubadix.helper.helper import FEED_VERSIONS, is_enterprise_folder
 from troubadix.plugin import (
     FilePlugin,
     LinterError,
@@ -35,6 +35,11 @@ from troubadix.plugin import (
 class CheckDependencies(FilePlugin):
     name = "check_dependencies"
 
+    def get_cache_inputs(self) -> Iterable[str]:
+        return get_dependency_cache_inputs(
+            self.context.root, self.context.vt_metadata
+        )
+
     def run(
         self,
     ) -> Iterator[LinterResult]:
@@ -46,14 +51,11 @@ class CheckDependencies(FilePlugin):
         if self.context.nasl_file.suffix == ".inc":
             return
 
-        dependencies_pattern = get_special_script_tag_pattern(
-            SpecialScriptTag.DEPENDENCIES
-        )
-
         root = self.context.root
-        file_content = self.context.file_content
 
-        matches = dependencies_pattern.finditer(file_content)
+        matches = self.context.vt_metadata.get_special_script_tags(
+            SpecialScriptTag.DEPENDENCIES
+        )
 
         for match in matches:
             if match:
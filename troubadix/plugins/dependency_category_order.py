@@ -20,13 +20,14 @@
 import re
 from enum import IntEnum
 from pathlib import Path
-from typing import Iterator, Union
+from typing import Iterable, Iterator, Union
 
-from troubadix.helper import CURRENT_ENCODING, SpecialScriptTag
+from troubadix.cache import get_dependency_cache_inputs
+from troubadix.helper import CURRENT_ENCODING, SpecialScriptTag, VTMetadata
 from troubadix.helper.helper import FEED_VERSIONS
-from troubadix.helper.patterns import get_special_script_tag_pattern
 from troubadix.plugin import FileContentPlugin, LinterError, LinterResult
 
+
 # See https://shorturl.at/jBGJT for a list of the category numbers.
 class VTCategory(IntEnum):
     ACT_INIT = 0
@@ -47,17 +48,17 @@ class CategoryError(Exception):
 
 
 def check_category(
-    content: str, pattern: re.Pattern, script: str
+    vt_metadata: VTMetadata, script: str
 ) -> Union[LinterError, VTCategory]:
     """Check if the content contains a script category
     Arguments:
-        content         the content to check
+        vt_metadata     the metadata of the content to check
 
     Returns:
         LinterError     if no category found or category invalid
         VTCategory      else
     """
-    match = pattern.search(content)
+    match = vt_metadata.get_special_script_tag(SpecialScriptTag.CATEGORY)
 
     if not match:
         raise CategoryError(
@@ -76,6 +77,11 @@ def check_category(
 class CheckDependencyCategoryOrder(FileContentPlugin):
     name = "check_dependency_category_order"
 
+    def get_cache_inputs(self) -> Iterable[str]:
+        return get_dependency_cache_inputs(
+            self.context.root, self.context.vt_metadata
+        )
+
     def check_content(
         self,
         nasl_file: Path,
@@ -93,14 +99,11 @@ class CheckDependencyCategoryOrder(FileContentPlugin):
         if not "script_dependencies(" in file_content:
             return
 
-        category_pattern = get_special_script_tag_pattern(
-            SpecialScriptTag.CATEGORY
-        )
+        vt_metadata = self.context.vt_metadata
 
         try:
             category = check_category(
-                content=file_content,
-                pattern=category_pattern,
+                vt_metadata=vt_metadata,
                 script=nasl_file.name,
             )
         except CategoryError as e:
@@ -111,10 +114,9 @@ class CheckDependencyCategoryOrder(FileContentPlugin):
             )
             return
 
-        dependencies_pattern = get_special_script_tag_pattern(
+        matches = vt_metadata.get_special_script_tags(
             SpecialScriptTag.DEPENDENCIES
         )
-        matches = dependencies_pattern.finditer(file_content)
 
         if not matches:
             return
@@ -156,8 +158,7 @@ class CheckDependencyCategoryOrder(FileContentPlugin):
 
                         try:
                             dependency_category = check_category(
-                                content=dependency_content,
-                                pattern=category_pattern,
+                                vt_metadata=VTMetadata(dependency_content),
                                 script=dependency_path.name,
                             )
                         except CategoryError as e:
@@ -18,17 +18,22 @@
 # pylint: disable=fixme
 
 import re
-from typing import Iterator
+from typing import Iterable, Iterator
 
+from troubadix.cache import get_dependency_cache_inputs
 from troubadix.helper import CURRENT_ENCODING, SpecialScriptTag
 from troubadix.helper.helper import FEED_VERSIONS
-from troubadix.helper.patterns import get_special_script_tag_pattern
 from troubadix.plugin import FilePlugin, LinterError, LinterResult
 
 
 class CheckDeprecatedDependency(FilePlugin):
     name = "check_deprecated_dependency"
 
+    def get_cache_inputs(self) -> Iterable[str]:
+        return get_dependency_cache_inputs(
+            self.context.root, self.context.vt_metadata
+        )
+
     def run(self) -> Iterator[LinterResult]:
         """No VT should depend on other VTs that are marked as deprecated via:
 
@@ -46,10 +51,9 @@ class CheckDeprecatedDependency(FilePlugin):
 
         root = self.context.root
 
-        dependencies_pattern = get_special_script_tag_pattern(
+        matches = self.context.vt_metadata.get_special_script_tags(
             SpecialScriptTag.DEPENDENCIES
         )
-        matches = dependencies_pattern.finditer(file_content)
         if not matches:
             return
 
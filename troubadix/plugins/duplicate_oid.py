@@ -16,15 +16,16 @@
 #  along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import re
-from typing import Iterator
-
-from troubadix.helper import (
-    CURRENT_ENCODING,
-    SpecialScriptTag,
-    get_path_from_root,
-    get_special_script_tag_pattern,
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Tuple
+
+from troubadix.helper import get_path_from_root
+from troubadix.plugin import (
+    FilePluginContext,
+    FilesMapReducePlugin,
+    LinterError,
+    LinterResult,
 )
-from troubadix.plugin import FilesPlugin, LinterError, LinterResult
 
 # import json
 
@@ -35,29 +36,25 @@ KNOWN_DUPS = {"1.3.6.1.4.1.25623.1.0.850001", "1.3.6.1.4.1.25623.1.0.95888"}
 KNOWN_ABSENTS = {"template.nasl"}
 
 
-class CheckDuplicateOID(FilesPlugin):
+class CheckDuplicateOID(FilesMapReducePlugin):
     name = "check_duplicate_oid"
 
-    def run(self) -> Iterator[LinterResult]:
-        """Run PRE_RUN_COLLECTOR."""
+    @classmethod
+    def map(cls, context: FilePluginContext) -> Optional[str]:
+        """Get the OID of a VT or an empty string if no OID is found"""
+        if not context.nasl_file.suffix == ".nasl":
+            return None
 
-        mapping = dict()
+        return context.vt_metadata.oid or ""
 
-        for nasl_file in self.context.nasl_files:
-            if not nasl_file.suffix == ".nasl":
-                continue
+    def reduce(
+        self, facts: Iterable[Tuple[Path, str]]
+    ) -> Iterator[LinterResult]:
+        mapping = dict()
 
+        for nasl_file, oid in facts:
             nasl_file_root = get_path_from_root(nasl_file, self.context.root)
 
-            oid = None
-            content = nasl_file.read_text(encoding=CURRENT_ENCODING)
-            match = get_special_script_tag_pattern(SpecialScriptTag.OID).search(
-                content
-            )
-
-            if match:
-                oid = match.group("oid")
-
             if not oid:
                 yield LinterError(
                     f"Could not find an OID in '{nasl_file_root}'.",
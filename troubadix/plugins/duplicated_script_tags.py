@@ -17,13 +17,9 @@
 
 from typing import Iterator
 
-from troubadix.helper.patterns import (
-    get_script_tag_patterns,
-    get_special_script_tag_patterns,
-)
+from troubadix.helper.patterns import ScriptTag, SpecialScriptTag
 from troubadix.plugin import FilePlugin, LinterError, LinterResult
 
-
 allowed_dup_dependencies = [
     "GSHB/EL15/GSHB.nasl",
     "gsf/PCIDSS/PCI-DSS.nasl",
@@ -39,9 +35,9 @@ class CheckDuplicatedScriptTags(FilePlugin):
         if self.context.nasl_file.suffix == ".inc":
             return
 
-        special_script_tag_patterns = get_special_script_tag_patterns()
         file_content = self.context.file_content
-        for tag, pattern in special_script_tag_patterns.items():
+        vt_metadata = self.context.vt_metadata
+        for tag in SpecialScriptTag:
             # TBD: script_name might also look like this:
             # script_name("MyVT (Windows)");
 
@@ -53,7 +49,7 @@ class CheckDuplicatedScriptTags(FilePlugin):
                 if any(f in file_path for f in allowed_dup_dependencies):
                     continue
 
-            match = pattern.finditer(file_content)
+            match = vt_metadata.get_special_script_tags(tag)
 
             if match:
                 # This is allowed, see e.g.
@@ -63,7 +59,6 @@ class CheckDuplicatedScriptTags(FilePlugin):
                 if tag.value == "xref":
                     continue
 
-                match = list(match)
                 if len(match) > 1:
                     yield LinterError(
                         f"The VT is using the script tag 'script_"
@@ -72,12 +67,10 @@ class CheckDuplicatedScriptTags(FilePlugin):
                         plugin=self.name,
                     )
 
-        script_tag_patterns = get_script_tag_patterns()
-        for tag, pattern in script_tag_patterns.items():
-            match = pattern.finditer(file_content)
+        for tag in ScriptTag:
+            match = vt_metadata.get_script_tags(tag)
 
             if match:
-                match = list(match)
                 if len(match) > 1:
                     yield LinterError(
                         f"The VT is using the script tag '{tag.value}' "
@@ -37,7 +37,7 @@ class CheckEncoding(LineContentPlugin):
         nasl_file: Path,
         lines: Iterable[str],
     ) -> Iterator[LinterResult]:
-        detection = chardet.detect(nasl_file.read_bytes())
+        detection = chardet.detect(self.context.raw_content)
         encoding = detection.get("encoding")
         if encoding and encoding not in ["ascii", "latin1", "ISO-8859-1"]:
             yield LinterError(
@@ -16,7 +16,18 @@
 #  along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import re
-from typing import AnyStr, Iterator
+from bisect import bisect_right
+from functools import lru_cache
+from typing import (
+    AnyStr,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Pattern,
+    Set,
+    Tuple,
+)
 
 from troubadix.plugin import FilePlugin, LinterError, LinterResult
 
@@ -74,6 +85,187 @@ def get_grammer_pattern() -> re.Pattern:
     )
 
 
+# Every match of the grammar pattern contains at least one of these keywords
+# or a doubled word. The doubled words are only looked ahead, so they can't
+# hide an overlapping keyword.
+_KEYWORD_PATTERN = re.compile(
+    r"refer|multiple|vulnerab|link|attackers|flaw|error|problem|issue|"
+    r"feature|mentioned|software|prone|affected|"
+    r"(?=\s(with|and|this|for|as|a|of|to|an|the|is|in|are|have|has|that)"
+    r"\s+\1\s)",
+    re.IGNORECASE,
+)
+# Only matches at the end of the content, see "or not" in the grammar pattern
+_OR_NOT_PATTERN = re.compile(r"\s+or\s+not\.?(\"\);)?$", re.IGNORECASE)
+# The maximum number of whitespace separated tokens between the start of a
+# grammar problem and its keyword, e.g. '- A foo and bar issues'
+_MAX_TOKENS_BEFORE_KEYWORD = 4
+
+
+class GrammarEngine:
+    """Finds the same grammar problems as `get_grammer_pattern().finditer()`
+
+    Finding all matches of the pattern is expensive. Its leading ".*" forces
+    the regex engine to backtrack from every position of every line. A match
+    of the pattern can only start at the position where the last search
+    ended or at the start of a line. And it can only start at a line start if
+    the line (or a line spanned by whitespace) contains a keyword of the
+    pattern. Therefore the keywords are searched first and the pattern is
+    only matched at the start of the candidate lines.
+    """
+
+    def __init__(self, pattern: Pattern = None) -> None:
+        self.pattern = pattern or get_grammer_pattern()
+
+    @staticmethod
+    def _get_candidate_lines(
+        content: str, line_starts: List[int], position: int
+    ) -> Set[int]:
+        """Get the lines that may contain the start of a match containing a
+        keyword at the given position"""
+        index = bisect_right(line_starts, position) - 1
+        lines = {index}
+
+        # the start of a match may be located in a previous line, if the
+        # whitespace between the tokens is spanning multiple lines
+        allowed = _MAX_TOKENS_BEFORE_KEYWORD + 1
+        count = len(content[line_starts[index] : position].split())
+        while index > 0 and count <= allowed:
+            allowed -= count
+            index -= 1
+            lines.add(index)
+            count = len(
+                content[line_starts[index] : line_starts[index + 1]].split()
+            )
+
+        return lines
+
+    def finditer(self, content: str) -> Iterator[re.Match]:
+        """Find the same matches as `pattern.finditer(content)`"""
+        keywords = [
+            match.start() for match in _KEYWORD_PATTERN.finditer(content)
+        ]
+        or_not = _OR_NOT_PATTERN.search(content)
+        if not keywords and not or_not:
+            return
+
+        line_starts = [0] + [
+            match.end() for match in re.finditer(r"\n", content)
+        ]
+
+        candidates: Set[int] = set()
+        for position in keywords:
+            candidates.update(
+                self._get_candidate_lines(content, line_starts, position)
+            )
+        if or_not:
+            candidates.update(
+                range(
+                    bisect_right(line_starts, or_not.start()) - 1,
+                    bisect_right(line_starts, or_not.end()),
+                )
+            )
+
+        position = 0
+        for line in sorted(candidates):
+            if line_starts[line] < position:
+                continue
+
+            match = self.pattern.match(content, line_starts[line])
+            while match:
+                yield match
+
+                # the next search of finditer() starts at the end of the match
+                position = match.end()
+                match = self.pattern.match(content, position)
+
+
+class FalsePositive(NamedTuple):
+    """A known false positive of the grammar check
+
+    Attributes:
+        text    regex searched in the found grammar problem
+        files   substring of the path of the file or None for all files
+    """
+
+    text: str
+    files: Optional[str] = None
+
+
+FALSE_POSITIVES = (
+    # Exclude a few known false positives
+    FalsePositive(re.escape("a few ")),
+    FalsePositive(re.escape("A few ")),
+    FalsePositive(re.escape("a multiple keyboard ")),
+    FalsePositive(re.escape("A A S Application Access Server")),
+    FalsePositive(re.escape("a Common Vulnerabilities and Exposures")),
+    FalsePositive(re.escape("Multiple '/' Vulnerability")),
+    FalsePositive(re.escape("an attackers choise")),
+    FalsePositive(
+        re.escape(
+            "e. VMware VMnc Codec heap overflow vulnerabilities\n\n"
+            "  Vulnerabilities in the"
+        ),
+        "2012/gb_VMSA-2010-0007.nasl",
+    ),
+    # nb: Valid sentence
+    FalsePositive(re.escape("(Note that"), "gb_opensuse_2018_1900_1.nasl"),
+    # same as above
+    FalsePositive(re.escape("with\n WITH"), "gb_sles_2021_3215_1.nasl"),
+    # same as above
+    FalsePositive(re.escape("with WITH"), "gb_sles_2021_2320_1.nasl"),
+    # same
+    FalsePositive(re.escape("multiple error handling vulnerabilities")),
+    # Like seen in e.g. 2008/freebsd/freebsd_mod_php4-twig.nasl
+    FalsePositive(r'(\s+|")[Aa]\s+multiple\s+of'),
+    # Like seen in 2022/debian/deb_dla_2981.nasl
+    FalsePositive(re.escape("a multiple concurrency")),
+    # WITH can be used like e.g. the following which is valid:
+    # "with WITH stack unwinding"
+    FalsePositive(re.escape("with WITH")),
+    # From 2008/debian/deb_1017_1.nasl
+    FalsePositive(
+        re.escape(
+            "Harald Welte discovered that if a process issues a "
+            "USB Request Block (URB)"
+        )
+    ),
+    # Valid sentences
+    FalsePositive(r"these\s+error\s+(messages|reports|conditions)"),
+)
+
+
+# The substrings of the paths of all files with specific false positives
+_FALSE_POSITIVE_FILES = tuple(
+    dict.fromkeys(
+        false_positive.files
+        for false_positive in FALSE_POSITIVES
+        if false_positive.files is not None
+    )
+)
+
+
+@lru_cache(maxsize=None)
+def _compile_false_positives(files: Tuple[str, ...]) -> Pattern:
+    return re.compile(
+        "|".join(
+            f"(?:{false_positive.text})"
+            for false_positive in FALSE_POSITIVES
+            if false_positive.files is None or false_positive.files in files
+        )
+    )
+
+
+def get_false_positives_pattern(nasl_file: str) -> Pattern:
+    """Get a single pattern for all false positives relevant for a file"""
+    return _compile_false_positives(
+        tuple(files for files in _FALSE_POSITIVE_FILES if files in nasl_file)
+    )
+
+
+_ENGINE = GrammarEngine()
+
+
 class CheckGrammar(FilePlugin):
     name = "check_grammar"
 
@@ -86,95 +278,26 @@ class CheckGrammar(FilePlugin):
             file_content: The content of the file that is going to be
                           checked
         """
-        pattern = get_grammer_pattern()
-
-        for match in pattern.finditer(self.context.file_content):
-            if match:
-                if self.check_for_false_positives(
-                    match.group(0), str(self.context.nasl_file)
-                ):
-                    continue
-
-                yield LinterError(
-                    "VT/Include has the following grammar problem:"
-                    f" {match.group(0)}",
-                    file=self.context.nasl_file,
-                    plugin=self.name,
+        false_positives = None
+
+        for match in _ENGINE.finditer(self.context.file_content):
+            if false_positives is None:
+                false_positives = get_false_positives_pattern(
+                    str(self.context.nasl_file)
                 )
+            if false_positives.search(match.group(0)):
+                continue
+
+            yield LinterError(
+                "VT/Include has the following grammar problem:"
+                f" {match.group(0)}",
+                file=self.context.nasl_file,
+                plugin=self.name,
+            )
 
     @staticmethod
     def check_for_false_positives(match: AnyStr, nasl_file: str) -> bool:
         """
         Checks for false positives in the findings.
         """
-        # Exclude a few known false positives
-        if (
-            "a few " in match
-            or "A few " in match
-            or "a multiple keyboard " in match
-        ):
-            return True
-
-        if "A A S Application Access Server" in match:
-            return True
-
-        if "a Common Vulnerabilities and Exposures" in match:
-            return True
-
-        if "Multiple '/' Vulnerability" in match:
-            return True
-
-        if "an attackers choise" in match:
-            return True
-
-        if (
-            "2012/gb_VMSA-2010-0007.nasl" in nasl_file
-            and "e. VMware VMnc Codec heap overflow vulnerabilities\n\n"
-            "  Vulnerabilities in the" in match
-        ):
-            return True
-
-        # nb: Valid sentence
-        if (
-            "gb_opensuse_2018_1900_1.nasl" in nasl_file
-            and "(Note that" in match
-        ):
-            return True
-
-        # same as above
-        if "gb_sles_2021_3215_1.nasl" in nasl_file and "with\n WITH" in match:
-            return True
-
-        # same as above
-        if "gb_sles_2021_2320_1.nasl" in nasl_file and "with WITH" in match:
-            return True
-
-        # same
-        if "multiple error handling vulnerabilities" in match:
-            return True
-
-        # Like seen in e.g. 2008/freebsd/freebsd_mod_php4-twig.nasl
-        if re.search(r'(\s+|")[Aa]\s+multiple\s+of', match):
-            return True
-
-        # Like seen in 2022/debian/deb_dla_2981.nasl
-        if "a multiple concurrency" in match:
-            return True
-
-        # WITH can be used like e.g. the following which is valid:
-        # "with WITH stack unwinding"
-        if "with WITH" in match:
-            return True
-
-        # From 2008/debian/deb_1017_1.nasl
-        if (
-            "Harald Welte discovered that if a process issues a "
-            "USB Request Block (URB)" in match
-        ):
-            return True
-
-        # Valid sentences
-        if re.search(r"these\s+error\s+(messages|reports|conditions)", match):
-            return True
-
-        return False
+        return bool(get_false_positives_pattern(nasl_file).search(match))
@@ -18,9 +18,8 @@
 import re
 from typing import Iterator, Union
 
-from troubadix.helper import CURRENT_ENCODING
 from troubadix.helper.patterns import get_common_tag_patterns
-from troubadix.plugin import FilePlugin, LinterFix, LinterResult, LinterWarning
+from troubadix.plugin import Edit, FilePlugin, LinterResult, LinterWarning
 
 # import magic
 
@@ -62,24 +61,21 @@ class CheckIllegalCharacters(FilePlugin):
         every script_tag(name:"", value:"") :
         """
 
+        self.edits = []
+
         if self.context.nasl_file.suffix == ".inc":
             return
 
         pattern = get_common_tag_patterns()
         file_content = self.context.file_content
 
-        self.new_file_content = None
-
         tag_matches = pattern.finditer(file_content)
         if tag_matches:
             for match in tag_matches:
                 if match and match.group(0) is not None:
                     new_tag = check_match(match)
                     if new_tag:
-                        file_content = file_content.replace(
-                            match.group(0), new_tag
-                        )
-                        self.new_file_content = file_content
+                        self.edits.append(Edit(*match.span(), new_tag))
                         yield LinterWarning(
                             f"Found illegal character in {match.group(0)}",
                             file=self.context.nasl_file,
@@ -87,15 +83,7 @@ class CheckIllegalCharacters(FilePlugin):
                         )
 
     def fix(self) -> Iterator[LinterResult]:
-        if not self.new_file_content:
+        if not self.edits:
             return
 
-        self.context.nasl_file.write_text(
-            self.new_file_content, encoding=CURRENT_ENCODING
-        )
-
-        yield LinterFix(
-            "Replaced Illegal Characters.",
-            file=self.context.nasl_file,
-            plugin=self.name,
-        )
+        yield self.submit_fix(self.edits, "Replaced Illegal Characters.")
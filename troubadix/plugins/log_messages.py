@@ -18,8 +18,6 @@ import re
 from pathlib import Path
 from typing import Iterator
 
-from troubadix.helper import ScriptTag
-from troubadix.helper.patterns import get_script_tag_pattern
 from troubadix.plugin import (
     FileContentPlugin,
     LinterError,
@@ -66,10 +64,7 @@ class CheckLogMessages(FileContentPlugin):
 
         # don't need to check detection scripts since they are for sure using
         # a log_message. all detection scripts have a cvss of 0.0
-        cvss_pattern = get_script_tag_pattern(ScriptTag.CVSS_BASE)
-        cvss_detect = cvss_pattern.search(file_content)
-
-        if cvss_detect and cvss_detect.group("value") == "0.0":
+        if self.context.vt_metadata.is_detection:
             return
 
         # log_match = re.search(r'.*(log_message[\s]*\([^)]+\)[\s]*;)',
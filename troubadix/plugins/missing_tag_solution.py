@@ -19,7 +19,7 @@ from pathlib import Path
 from typing import Iterator
 
 from troubadix.helper import is_ignore_file
-from troubadix.helper.patterns import ScriptTag, get_script_tag_pattern
+from troubadix.helper.patterns import ScriptTag
 from troubadix.plugin import FileContentPlugin, LinterError, LinterResult
 
 # We don't want to touch the metadata of this older VTs...
@@ -57,19 +57,19 @@ class CheckMissingTagSolution(FileContentPlugin):
             return
 
         # Avoid unnecessary message against deprecated VTs.
-        deprecated_pattern = get_script_tag_pattern(ScriptTag.DEPRECATED)
-        deprecated_match = deprecated_pattern.search(string=file_content)
+        vt_metadata = self.context.vt_metadata
+        deprecated_match = vt_metadata.get_script_tag(ScriptTag.DEPRECATED)
 
         if deprecated_match and deprecated_match.group("value"):
             return
 
-        solution_type_pattern = get_script_tag_pattern(ScriptTag.SOLUTION_TYPE)
-        solution_type_match = solution_type_pattern.search(string=file_content)
+        solution_type_match = vt_metadata.get_script_tag(
+            ScriptTag.SOLUTION_TYPE
+        )
         if not solution_type_match:
             return
 
-        solution_pattern = get_script_tag_pattern(ScriptTag.SOLUTION)
-        solution_match = solution_pattern.search(string=file_content)
+        solution_match = vt_metadata.get_script_tag(ScriptTag.SOLUTION)
 
         if not solution_match or solution_match.group(0) is None:
             yield LinterError(
@@ -31,8 +31,8 @@ class CheckNewlines(FilePlugin):
         - Search for (\r or \r\n).
         - Search for whitespaces in script_name( "myname") or script_copyright
         """
-        # Need to be loaded as bytes or \r is converted to \n
-        data = self.context.nasl_file.read_bytes()
+        # Need to be checked as bytes or \r is converted to \n
+        data = self.context.raw_content
         if b"\r" in data or b"\r\n" in data:
             yield LinterError("Found \\r or \\r\\n newline.")
 
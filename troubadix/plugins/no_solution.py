@@ -17,63 +17,74 @@
 
 import re
 from datetime import datetime, timedelta
-from typing import Iterator
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Tuple
 
-from troubadix.helper import CURRENT_ENCODING, ScriptTag, get_script_tag_pattern
+from troubadix.helper import ScriptTag
 from troubadix.helper.helper import get_path_from_root
 from troubadix.plugin import (
-    FilesPlugin,
+    FilePluginContext,
+    FilesMapReducePlugin,
     LinterError,
     LinterResult,
     LinterWarning,
 )
 
-NO_SOLUTION_DATE_TOO_YOUNG = datetime.now() - timedelta(days=31)
-NO_SOLUTION_DATE_TOO_OLDER_6_MONTH = datetime.now() - timedelta(days=186)
-NO_SOLUTION_DATE_TOO_OLDER_1_YEAR = datetime.now() - timedelta(days=365)
-
 # Add the solutions date's here
 STRPTIMES = ["%d %B, %Y", "%d %b, %Y", "%Y/%m/%d"]
 
+DATE_PATTERN = re.compile(r"as\s+of\s*(?P<date>.+?)\.\s*", re.DOTALL)
+
 
-class CheckNoSolution(FilesPlugin):
+class CheckNoSolution(FilesMapReducePlugin):
     name = "check_no_solution"
 
-    def run(self) -> Iterator[LinterResult]:
-        """Run PRE_RUN_COLLECTOR."""
+    @classmethod
+    def map(
+        cls, context: FilePluginContext
+    ) -> Optional[Tuple[bool, Optional[str]]]:
+        """Get whether a VT without an available solution has a solution tag
+        and the date since when no solution is available"""
+        if context.nasl_file.suffix == ".inc":
+            return None
 
-        total_missing_solutions = 0
-        missing_solutions_younger_1_month = 0
-        missing_solutions_older_than_6_months = 0
-        missing_solutions_older_than_1_year = 0
+        vt_metadata = context.vt_metadata
 
-        for nasl_file in self.context.nasl_files:
-            if nasl_file.suffix == ".inc":
-                continue
+        st = vt_metadata.get_script_tag(ScriptTag.SOLUTION_TYPE)
+        if st and st.group("value") != "NoneAvailable":
+            return None
 
-            content = nasl_file.read_text(encoding=CURRENT_ENCODING)
+        # don't need to check detection scripts since they don't refer
+        # to CVEs. all detection scripts have a cvss of 0.0
+        if vt_metadata.is_detection:
+            return None
 
-            st_pattern = get_script_tag_pattern(ScriptTag.SOLUTION_TYPE)
-            st = st_pattern.search(content)
-            if st and st.group("value") != "NoneAvailable":
-                continue
+        solution_match = vt_metadata.get_script_tag(ScriptTag.SOLUTION)
+        if not solution_match:
+            return False, None
 
-            tag_pattern = get_script_tag_pattern(ScriptTag.CVSS_BASE)
-            # don't need to check detection scripts since they don't refer
-            # to CVEs. all detection scripts have a cvss of 0.0
-            cvss_detect = tag_pattern.search(content)
-            if cvss_detect and cvss_detect.group("value") == "0.0":
-                continue
+        date_match = DATE_PATTERN.search(solution_match.group("value"))
+        if not date_match:
+            return None
 
-            solution_match = get_script_tag_pattern(ScriptTag.SOLUTION).search(
-                content
-            )
+        return True, date_match.group("date")
+
+    def reduce(
+        self, facts: Iterable[Tuple[Path, Tuple[bool, Optional[str]]]]
+    ) -> Iterator[LinterResult]:
+        total_missing_solutions = 0
+        missing_solutions_younger_1_month = 0
+        missing_solutions_older_than_6_months = 0
+        missing_solutions_older_than_1_year = 0
 
-            if solution_match:
-                date_match = re.compile(
-                    r"as\s+of\s*(?P<date>.+?)\.\s*", re.DOTALL
-                ).search(solution_match.group("value"))
-            else:
+        # determined per run, the process may be running for days
+        now = datetime.now()
+        date_too_young = now - timedelta(days=31)
+        date_too_older_6_month = now - timedelta(days=186)
+        date_too_older_1_year = now - timedelta(days=365)
+
+        for nasl_file, (has_solution, date) in facts:
+            if not has_solution:
                 yield LinterError(
                     f"{get_path_from_root(nasl_file, self.context.root)}: "
                     "No Solution tag found.",
@@ -83,23 +94,20 @@ class CheckNoSolution(FilesPlugin):
                 continue
 
             # total number of missing solutions
-            if date_match:
-                total_missing_solutions += 1
-            else:
-                continue
+            total_missing_solutions += 1
 
-            no_solution_since = parse_date(date_match.group("date"))
+            no_solution_since = parse_date(date)
             if not no_solution_since:
                 yield LinterError(
                     f"{get_path_from_root(nasl_file, self.context.root)}: "
-                    f"Can not convert '{date_match.group('date')}' to datetime",
+                    f"Can not convert '{date}' to datetime",
                     file=nasl_file,
                     plugin=self.name,
                 )
                 continue
 
             # no solution and older than 1 year
-            if no_solution_since <= NO_SOLUTION_DATE_TOO_OLDER_1_YEAR:
+            if no_solution_since <= date_too_older_1_year:
                 missing_solutions_older_than_1_year += 1
                 yield LinterWarning(
                     f"{get_path_from_root(nasl_file, self.context.root)}: "
@@ -110,7 +118,7 @@ class CheckNoSolution(FilesPlugin):
                 continue
 
             # no solution and older than 6 months
-            if no_solution_since <= NO_SOLUTION_DATE_TOO_OLDER_6_MONTH:
+            if no_solution_since <= date_too_older_6_month:
                 missing_solutions_older_than_6_months += 1
                 yield LinterWarning(
                     f"{get_path_from_root(nasl_file, self.context.root)}: "
@@ -121,7 +129,7 @@ class CheckNoSolution(FilesPlugin):
                 continue
 
             # no solution and younger than 31 days
-            if no_solution_since >= NO_SOLUTION_DATE_TOO_YOUNG:
+            if no_solution_since >= date_too_young:
                 missing_solutions_younger_1_month += 1
                 yield LinterWarning(
                     f"{get_path_from_root(nasl_file, self.context.root)}: "
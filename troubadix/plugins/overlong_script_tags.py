@@ -19,7 +19,7 @@ from pathlib import Path
 from typing import Iterator
 
 from troubadix.helper import is_ignore_file
-from troubadix.helper.patterns import get_script_tag_patterns
+from troubadix.helper.patterns import ScriptTag
 
 from ..plugin import FileContentPlugin, LinterError, LinterResult
 
@@ -57,9 +57,9 @@ class CheckOverlongScriptTags(FileContentPlugin):
         if is_ignore_file(nasl_file, IGNORE_FILES):
             return
 
-        script_tag_patterns = get_script_tag_patterns()
-        for tag, pattern in script_tag_patterns.items():
-            for match in pattern.finditer(file_content):
+        vt_metadata = self.context.vt_metadata
+        for tag in ScriptTag:
+            for match in vt_metadata.get_script_tags(tag):
                 if len(match.group("value")) > VALUE_LIMIT:
                     yield LinterError(
                         f"Tag {tag.value} is to long"
@@ -17,13 +17,15 @@
 import re
 from typing import Iterator
 
-from troubadix.helper import ScriptTag, SpecialScriptTag
-from troubadix.helper.patterns import (
-    _get_special_script_tag_pattern,
-    get_script_tag_pattern,
-)
+from troubadix.helper import SpecialScriptTag
+from troubadix.helper.patterns import _get_special_script_tag_pattern
 from troubadix.plugin import FilePlugin, LinterError, LinterResult
 
+_FAMILY_DETECTION_PATTERN = _get_special_script_tag_pattern(
+    name=SpecialScriptTag.FAMILY.value,
+    value=r"(Product|Service) detection",
+)
+
 
 class CheckProdSvcDetectInVulnvt(FilePlugin):
     name = "check_prod_svc_detect_in_vulnvt"
@@ -60,17 +62,16 @@ class CheckProdSvcDetectInVulnvt(FilePlugin):
             return
 
         file_content = self.context.file_content
+        vt_metadata = self.context.vt_metadata
         # Don't need to check VTs having a cvss of 0.0
-        cvss_base_pattern = get_script_tag_pattern(ScriptTag.CVSS_BASE)
-        cvss_detect = cvss_base_pattern.search(file_content)
-
-        if cvss_detect is not None and cvss_detect.group("value") == "0.0":
+        if vt_metadata.is_detection:
             return
 
-        match_family = _get_special_script_tag_pattern(
-            name=SpecialScriptTag.FAMILY.value,
-            value=r"(Product|Service) detection",
-        ).search(file_content)
+        matches_family = vt_metadata.find_script_calls(
+            SpecialScriptTag.FAMILY.value,
+            _FAMILY_DETECTION_PATTERN,
+        )
+        match_family = matches_family[0] if matches_family else None
         if match_family and match_family.group("value"):
             yield LinterError(
                 "VT has a severity but is placed in the family '"
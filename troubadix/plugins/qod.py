@@ -17,7 +17,7 @@
 
 from typing import Iterator
 
-from troubadix.helper.patterns import ScriptTag, get_script_tag_pattern
+from troubadix.helper.patterns import ScriptTag
 from troubadix.plugin import FilePlugin, LinterError, LinterResult
 
 VALID_QOD_NUM_VALUES = [
@@ -62,13 +62,10 @@ class CheckQod(FilePlugin):
         if self.context.nasl_file.suffix == ".inc":
             return
 
-        file_content = self.context.file_content
+        vt_metadata = self.context.vt_metadata
 
-        qod_pattern = get_script_tag_pattern(ScriptTag.QOD)
-        qod_type_pattern = get_script_tag_pattern(ScriptTag.QOD_TYPE)
-
-        match_qod = list(qod_pattern.finditer(file_content))
-        match_qod_type = list(qod_type_pattern.finditer(file_content))
+        match_qod = vt_metadata.get_script_tags(ScriptTag.QOD)
+        match_qod_type = vt_metadata.get_script_tags(ScriptTag.QOD_TYPE)
 
         num_matches = len(match_qod) + len(match_qod_type)
         if num_matches < 1:
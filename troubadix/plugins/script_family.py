@@ -18,10 +18,7 @@
 from pathlib import Path
 from typing import Iterator
 
-from troubadix.helper.patterns import (
-    SpecialScriptTag,
-    get_special_script_tag_pattern,
-)
+from troubadix.helper.patterns import SpecialScriptTag
 from troubadix.plugin import FileContentPlugin, LinterError, LinterResult
 
 VALID_FAMILIES = [
@@ -104,8 +101,9 @@ class CheckScriptFamily(FileContentPlugin):
         if nasl_file.suffix == ".inc":
             return
 
-        family_pattern = get_special_script_tag_pattern(SpecialScriptTag.FAMILY)
-        matches = list(family_pattern.finditer(file_content))
+        matches = self.context.vt_metadata.get_special_script_tags(
+            SpecialScriptTag.FAMILY
+        )
 
         if not matches:
             yield LinterError(
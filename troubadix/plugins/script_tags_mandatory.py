@@ -18,12 +18,7 @@
 from pathlib import Path
 from typing import Iterator
 
-from troubadix.helper.patterns import (
-    ScriptTag,
-    SpecialScriptTag,
-    get_script_tag_pattern,
-    get_special_script_tag_pattern,
-)
+from troubadix.helper.patterns import ScriptTag, SpecialScriptTag
 from troubadix.plugin import FileContentPlugin, LinterError, LinterResult
 
 MANDATORY_TAGS = [ScriptTag.SUMMARY]
@@ -58,8 +53,10 @@ class CheckScriptTagsMandatory(FileContentPlugin):
         if nasl_file.suffix == ".inc":
             return
 
+        vt_metadata = self.context.vt_metadata
+
         for tag in MANDATORY_TAGS:
-            if not get_script_tag_pattern(tag).search(file_content):
+            if not vt_metadata.get_script_tag(tag):
                 yield LinterError(
                     "VT does not contain the following mandatory tag: "
                     f"'script_{tag.value}'",
@@ -68,9 +65,7 @@ class CheckScriptTagsMandatory(FileContentPlugin):
                 )
 
         for special_tag in MANDATORY_SPECIAL_TAGS:
-            if not get_special_script_tag_pattern(special_tag).search(
-                file_content
-            ):
+            if not vt_metadata.get_special_script_tag(special_tag):
                 yield LinterError(
                     "VT does not contain the following mandatory tag: "
                     f"'script_{special_tag.value}'",
@@ -20,21 +20,13 @@ import re
 from pathlib import Path
 from typing import Iterator
 
-from troubadix.helper import CURRENT_ENCODING
 from troubadix.helper.patterns import (
     LAST_MODIFICATION_ANY_VALUE_PATTERN,
     SCRIPT_VERSION_ANY_VALUE_PATTERN,
     ScriptTag,
     SpecialScriptTag,
-    get_script_tag_pattern,
-    get_special_script_tag_pattern,
-)
-from troubadix.plugin import (
-    FileContentPlugin,
-    LinterError,
-    LinterFix,
-    LinterResult,
 )
+from troubadix.plugin import Edit, FileContentPlugin, LinterError, LinterResult
 
 
 class CheckScriptVersionAndLastModificationTags(FileContentPlugin):
@@ -75,14 +67,14 @@ class CheckScriptVersionAndLastModificationTags(FileContentPlugin):
             )
             return
 
-        self.old_script_version = match_script_version_any.group(0)
+        self.old_script_version_span = match_script_version_any.span()
         self.old_script_version_value = match_script_version_any.group("value")
 
         # script_version("2019-03-21T12:19:01+0000");")
-        version_pattern = get_special_script_tag_pattern(
+        vt_metadata = self.context.vt_metadata
+        version_match = vt_metadata.get_special_script_tag(
             SpecialScriptTag.VERSION
         )
-        version_match = version_pattern.search(file_content)
 
         if not version_match:
             # check for old format:
@@ -114,17 +106,18 @@ class CheckScriptVersionAndLastModificationTags(FileContentPlugin):
             )
             return
 
-        self.old_last_modification = match_last_modification_any_value.group(0)
+        self.old_last_modification_span = (
+            match_last_modification_any_value.span()
+        )
         self.old_last_modification_value = (
             match_last_modification_any_value.group("value")
         )
 
         # script_tag(name:"last_modification",
         # value:"2019-03-21 12:19:01 +0000 (Thu, 21 Mar 2019)");
-        last_modification_pattern = get_script_tag_pattern(
+        match_last_modified = vt_metadata.get_script_tag(
             ScriptTag.LAST_MODIFICATION
         )
-        match_last_modified = last_modification_pattern.search(file_content)
 
         if not match_last_modified:
             # check for old format:
@@ -155,37 +148,31 @@ class CheckScriptVersionAndLastModificationTags(FileContentPlugin):
 
         now = datetime.datetime.now(datetime.timezone.utc)
 
-        file_content = self.context.file_content
-
         # get that version date formatted correctly:
         # "2021-03-24T10:08:26+0000"
         correctly_formatted_version = f"{now:%Y-%m-%dT%H:%M:%S%z}"
 
-        file_content = file_content.replace(
-            self.old_script_version,
-            version_template.format(date=correctly_formatted_version),
-        )
-
         # get that last modification date formatted correctly:
         # "2021-03-24 10:08:26 +0000 (Wed, 24 Mar 2021)"
         correctly_formatted_last_modification = (
             f"{now:%Y-%m-%d %H:%M:%S %z (%a, %d %b %Y)}"
         )
 
-        file_content = file_content.replace(
-            self.old_last_modification,
-            tag_template.format(date=correctly_formatted_last_modification),
-        )
-
-        self.context.nasl_file.write_text(
-            file_content, encoding=CURRENT_ENCODING
-        )
-
-        yield LinterFix(
+        yield self.submit_fix(
+            [
+                Edit(
+                    *self.old_script_version_span,
+                    version_template.format(date=correctly_formatted_version),
+                ),
+                Edit(
+                    *self.old_last_modification_span,
+                    tag_template.format(
+                        date=correctly_formatted_last_modification
+                    ),
+                ),
+            ],
             f"Replaced last_modification {self.old_last_modification_value} "
             f"with {correctly_formatted_last_modification} and script_version "
             f"{self.old_script_version_value} with "
             f"{correctly_formatted_version}.",
-            file=self.context.nasl_file,
-            plugin=self.name,
         )
@@ -18,7 +18,7 @@ import re
 from pathlib import Path
 from typing import Iterator
 
-from troubadix.helper.patterns import ScriptTag, get_script_tag_pattern
+from troubadix.helper.patterns import ScriptTag
 from troubadix.plugin import FileContentPlugin, LinterError, LinterResult
 
 
@@ -53,8 +53,9 @@ class CheckSecurityMessages(FileContentPlugin):
         # don't need to check VTs having a severity (which are for sure
         # using a security_message) or no cvss_base (which shouldn't happen and
         # is checked in a separate step) included at all.
-        cvss_base_pattern = get_script_tag_pattern(ScriptTag.CVSS_BASE)
-        cvss_detect = cvss_base_pattern.search(file_content)
+        cvss_detect = self.context.vt_metadata.get_script_tag(
+            ScriptTag.CVSS_BASE
+        )
 
         if cvss_detect and cvss_detect.group("value") != "0.0":
             return
@@ -15,235 +15,233 @@
 #  You should have received a copy of the GNU General Public License
 #  along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-import io
 import re
-from contextlib import redirect_stdout
 from pathlib import Path
-from typing import Iterator
-
-from codespell_lib import main as codespell_main
-
-from troubadix.plugin import FilesPlugin, LinterError, LinterResult
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Pattern,
+    Tuple,
+)
+
+from troubadix.helper.codespell import Codespell, Misspelling, get_codespell
+from troubadix.plugin import FilePlugin, LinterError, LinterResult
 
 plugin_path = Path(__file__).parent.resolve()
 codespell_config_path = (plugin_path.parent / "codespell").resolve()
 
 
-class CheckSpelling(FilesPlugin):
+def _get_config_file(name: str) -> Path:
+    # Overwrite with local repository files if exist
+    local_file = Path(name)
+    if local_file.exists():
+        return local_file.resolve()
+    return codespell_config_path / name
+
+
+def _get_codespell() -> Codespell:
+    return get_codespell(
+        _get_config_file("codespell.additions"),
+        _get_config_file("codespell.exclude"),
+        _get_config_file("codespell.ignore"),
+    )
+
+
+class FalsePositive(NamedTuple):
+    """A rule for excluding known false positives of the spell checker
+
+    Attributes:
+        files           regex searched in the path of the file or None for
+                        all files
+        word            regex matching the end of the misspelled word
+        suggestions     regex matching the start of the suggestions, joined
+                        by ", "
+        flags           flags for compiling the word and suggestions regexes
+    """
+
+    files: Optional[str]
+    word: str
+    suggestions: str = ""
+    flags: int = 0
+
+
+_PCIDSS_GSHB = r"PCIDSS/|GSHB/|attic/PCIDSS_"
+
+FALSE_POSITIVES = (
+    # From /Policy which is just a huge blob of text
+    # and too large for codespell.exclude:
+    FalsePositive(r"policy_file_checksums_win\.nasl", r"nD", r"and, 2nd"),
+    FalsePositive(r"policy_file_checksums_win\.nasl", r"oD", r"of"),
+    # Same for a few other files:
+    FalsePositive(r"smtp_AV_42zip_DoS\.nasl", r"BA", r"BY, BE"),
+    FalsePositive(r"bad_ssh_host_keys\.inc", r"ba", r"by, be"),
+    FalsePositive(r"wmi_misc\.inc", r"BA", r"BY, BE"),
+    FalsePositive(r"wmi_misc\.inc", r"OD", r"OF"),
+    FalsePositive(
+        r"ssl_funcs\.inc|gb_ssl_tls_cert_details\.nasl",
+        r"fpr",
+        r"for, far, fps",
+    ),
+    # Codespell has currently cna->can in the dictionary.txt
+    # which is causing false positives for CNA (widely used term
+    # in VTs) because codespell doesn't look at the casing. For
+    # now we're excluding any uppercase "CNA" results because
+    # these are usually false positives we don't want to report.
+    FalsePositive(None, r"CNA", r"CAN"),
+    # Name of a Huawei product
+    FalsePositive(
+        r"gb_huawei|telnetserver_detect_type_nd_version\.nasl",
+        r"eSpace",
+        r"escape",
+        re.IGNORECASE,
+    ),
+    # "ure" is a Debian package, again too many hits for
+    # codespell.exclude.
+    FalsePositive(
+        r"(deb_(dla_)?[0-9]+(_[0-9]+)?|gb_ubuntu_.+)\.nasl", r"ure", r"sure"
+    ),
+    # gsf/PCIDSS VTs are currently using some german text parts
+    # nb: codespell seems to have some issues with
+    # german umlauts in the codespell.exclude so a few of these
+    # were also excluded here instead of directly
+    # via codespell.exclude.
+    FalsePositive(
+        rf"{_PCIDSS_GSHB}|ITG_Kompendium/",
+        r"(sie|ist|oder|prozess|manuell|unter|funktion|"
+        r"alle|als|tage|lokale|uptodate|paket|titel|ba|"
+        r"ordner|modul|interaktive|programm|explizit|"
+        r"normale|applikation|attributen|lokal|signatur|"
+        r"modell|klick|generell)",
+        flags=re.IGNORECASE,
+    ),
+    # False positives in the gsf/PCIDSS and GSHB/ VTs:
+    # string('\nIn the file sent\nin milliseconds
+    # There are too many hits to maintain
+    # them in codespell.exclude so exclude them for now here.
+    FalsePositive(_PCIDSS_GSHB, r"n[iI]n", r"inn"),
+    # False positive in this VT in German example responses.
+    FalsePositive(
+        r"gb_exchange_server_CVE-2021-26855_active\.nasl", r"ist", r"is"
+    ),
+    # Mostly a false positive in LSCs because of things like
+    # "ALSA: hda" or a codec called "Conexant". There are too
+    # many hits to maintain them in codespell.exclude so exclude
+    # them for now here.
+    FalsePositive(
+        r"gb_(sles|(open)?suse|ubuntu_USN)_.+\.nasl",
+        r"(hda|conexant)",
+        r"(had|connexant)",
+        re.IGNORECASE,
+    ),
+    # Jodie Chancel is a security researcher who is mentioned
+    # many times in Mozilla advisories
+    FalsePositive(
+        r"gb_mozilla_firefox_mfsa_\d{4}-\d{2,4}_lin\.nasl",
+        r"Chancel",
+        r"Cancel",
+    ),
+    # Look like correct as this is also in dictionary_rare.txt
+    FalsePositive(r"deb_dla_2896\.nasl", r"dependant", r"dependent"),
+    # Similar to the one above for e.g. SLES.
+    # Also exclude "tre", because it's a package name.
+    FalsePositive(
+        r"mgasa-\d{4}-\d{4}.nasl",
+        r"(hda|tre|conexant)",
+        r"(had|tree|connexant)",
+        re.IGNORECASE,
+    ),
+    # Similar to the corrections above, with some additional
+    # exclusions like e.g. names
+    FalsePositive(r"ELSA-\d{4}-\d{4,5}\.nasl", r"Stange", r"Strange"),
+    FalsePositive(r"ELSA-\d{4}-\d{4,5}\.nasl", r"chang", r"change, charge"),
+    FalsePositive(
+        r"ELSA-\d{4}-\d{4,5}\.nasl", r"IST", r"IS, IT, ITS, IT'S, SIT, LIST"
+    ),
+    FalsePositive(r"ELSA-\d{4}-\d{4,5}\.nasl", r"hda", r"had"),
+    FalsePositive(r"ELSA-\d{4}-\d{4,5}\.nasl", r"Readded", r"Read"),
+    FalsePositive(r"ELSA-\d{4}-\d{4,5}\.nasl", r"ACI", r"ACPI", re.IGNORECASE),
+    FalsePositive(r"ELSA-\d{4}-\d{4,5}\.nasl", r"UE", r"USE, DUE"),
+)
+
+
+class _CompiledFalsePositive(NamedTuple):
+    word: Pattern
+    suggestions: Pattern
+
+    def matches(self, misspelling: Misspelling) -> bool:
+        return bool(
+            self.word.search(misspelling.word)
+        ) and self.suggestions.match(", ".join(misspelling.suggestions))
+
+
+def _compile_false_positives(
+    false_positives: Iterable[FalsePositive],
+) -> List[Tuple[Optional[Pattern], Tuple[_CompiledFalsePositive, ...]]]:
+    """Compile the rules and bucket them by their files regex"""
+    buckets: Dict[Optional[str], List[_CompiledFalsePositive]] = {}
+    for false_positive in false_positives:
+        buckets.setdefault(false_positive.files, []).append(
+            _CompiledFalsePositive(
+                re.compile(
+                    rf"(?:{false_positive.word})$", false_positive.flags
+                ),
+                re.compile(false_positive.suggestions, false_positive.flags),
+            )
+        )
+
+    return [
+        (re.compile(files) if files else None, tuple(rules))
+        for files, rules in buckets.items()
+    ]
+
+
+_FALSE_POSITIVE_BUCKETS = _compile_false_positives(FALSE_POSITIVES)
+
+
+def get_false_positive_rules(
+    nasl_file: Path,
+) -> Tuple[_CompiledFalsePositive, ...]:
+    """Get the false positive rules relevant for a file"""
+    path = str(nasl_file)
+    rules = ()
+    for files, bucket in _FALSE_POSITIVE_BUCKETS:
+        if files is None or files.search(path):
+            rules += bucket
+    return rules
+
+
+class CheckSpelling(FilePlugin):
     name = "check_spelling"
 
+    def get_cache_inputs(self) -> List[str]:
+        return [_get_codespell().fingerprint]
+
     def run(self) -> Iterator[LinterResult]:
-        """This script checks, via the codespell library, wether
+        """This script checks, via the codespell dictionaries, wether
         the provided nasl files contain spelling errors.
         Certain errors are ignored based on listed exceptions
 
         Yields:
             Iterator[LinterResult]: The detected spelling errors
         """
-
-        # Overwrite with local repository files if exist
-        if Path("codespell.additions").exists():
-            codespell_additions = Path("codespell.additions").resolve()
-        else:
-            codespell_additions = f"{codespell_config_path}/codespell.additions"
-        if Path("codespell.exclude").exists():
-            codespell_exclude = Path("codespell.exclude").resolve()
-        else:
-            codespell_exclude = f"{codespell_config_path}/codespell.exclude"
-        if Path("codespell.ignore").exists():
-            codespell_ignore = Path("codespell.ignore").resolve()
-        else:
-            codespell_ignore = f"{codespell_config_path}/codespell.ignore"
-
-        batch_size = 10_000
-        for i in range(0, len(self.context.nasl_files), batch_size):
-
-            files_parameters = [
-                str(nasl_file)
-                for nasl_file in self.context.nasl_files[i : i + batch_size]
-            ]
-            codespell_arguments = [
-                "--hard-encoding-detection",
-                "--dictionary=-",
-                f"--dictionary={codespell_additions}",
-                f"--exclude-file={codespell_exclude}",
-                f"--ignore-words={codespell_ignore}",
-                "--disable-colors",
-            ] + files_parameters
-
-            with redirect_stdout(io.StringIO()) as codespell:
-                codespell_main(*codespell_arguments)
-
-            codespell = codespell.getvalue()
-            if "Traceback (most recent call last):" not in codespell:
-                _codespell = codespell.splitlines()
-                codespell = ""
-                for line in _codespell:
-
-                    # From /Policy which is just a huge blob of text
-                    # and too large for codespell.exclude:
-                    if "policy_file_checksums_win.nasl" in line:
-                        if re.search(r"nD\s+==>\s+and, 2nd", line) or re.search(
-                            r"oD\s+==>\s+of", line
-                        ):
-                            continue
-
-                    # Same for a few other files:
-                    if "smtp_AV_42zip_DoS.nasl" in line and re.search(
-                        r"BA\s+==>\s+BY, BE", line
-                    ):
-                        continue
-
-                    if "bad_ssh_host_keys.inc" in line and re.search(
-                        r"ba\s+==>\s+by, be", line
-                    ):
-                        continue
-
-                    if "wmi_misc.inc" in line:
-                        if re.search(r"BA\s+==>\s+BY, BE", line) or re.search(
-                            r"OD\s+==>\s+OF", line
-                        ):
-                            continue
-
-                    if (
-                        "ssl_funcs.inc" in line
-                        or "gb_ssl_tls_cert_details.nasl" in line
-                    ):
-                        if re.search(r"fpr\s+==>\s+for, far, fps", line):
-                            continue
-
-                    # Codespell has currently cna->can in the dictionary.txt
-                    # which is causing false positives for CNA (widely used term
-                    # in VTs) because codespell doesn't look at the casing. For
-                    # now we're excluding any uppercase "CNA" results because
-                    # these are usually false positives we don't want to report.
-                    if re.search(r"CNA\s+==>\s+CAN", line):
-                        continue
-
-                    # Name of a Huawei product
-                    if (
-                        "gb_huawei" in line
-                        or "telnetserver_detect_type_nd_version.nasl" in line
-                    ):
-                        if re.search(
-                            r"eSpace\s+==>\s+escape", line, flags=re.IGNORECASE
-                        ):
-                            continue
-
-                    # "ure" is a Debian package, again too many hits for
-                    # codespell.exclude.
-                    if re.search(
-                        r"(deb_(dla_)?[0-9]+(_[" r"0-9]+)?|gb_ubuntu_.+)\.nasl",
-                        line,
-                    ):
-                        if re.search(r"ure\s+==>\s+sure", line):
-                            continue
-
-                    # gsf/PCIDSS VTs are currently using some german text parts
-                    # nb: codespell seems to have some issues with
-                    # german umlauts in the codespell.exclude so a few of these
-                    # were also excluded here instead of directly
-                    # via codespell.exclude.
-                    if (
-                        "PCIDSS/" in line
-                        or "GSHB/" in line
-                        or "attic/PCIDSS_" in line
-                        or "ITG_Kompendium/" in line
-                    ):
-                        if re.search(
-                            r"(sie|ist|oder|prozess|manuell|unter|funktion|"
-                            r"alle|als|tage|lokale|uptodate|paket|titel|ba|"
-                            r"ordner|modul|interaktive|programm|explizit|"
-                            r"normale|applikation|attributen|lokal|signatur|"
-                            r"modell|klick|generell)\s+==>\s+",
-                            line,
-                            flags=re.IGNORECASE,
-                        ):
-                            continue
-
-                    # False positives in the gsf/PCIDSS and GSHB/ VTs:
-                    # string('\nIn the file sent\nin milliseconds
-                    # There are too many hits to maintain
-                    # them in codespell.exclude so exclude them for now here.
-                    if (
-                        "PCIDSS/" in line
-                        or "GSHB/" in line
-                        or "attic/PCIDSS_" in line
-                    ):
-                        if re.search(r"n[iI]n\s+==>\s+inn", line):
-                            continue
-
-                    # False positive in this VT in German example responses.
-                    if "gb_exchange_server_CVE-2021-26855_active.nasl" in line:
-                        if re.search(r"ist\s+==>\s+is", line):
-                            continue
-
-                    # Mostly a false positive in LSCs because of things like
-                    # "ALSA: hda" or a codec called "Conexant". There are too
-                    # many hits to maintain them in codespell.exclude so exclude
-                    # them for now here.
-                    if re.search(
-                        r"gb_(sles|(open)?suse|ubuntu_USN)_.+\.nasl", line
-                    ):
-                        if re.search(
-                            r"(hda|conexant)\s+==>\s+(had|connexant)",
-                            line,
-                            flags=re.IGNORECASE,
-                        ):
-                            continue
-
-                    # Jodie Chancel is a security researcher who is mentioned
-                    # many times in Mozilla advisories
-                    if re.search(
-                        r"gb_mozilla_firefox_mfsa_\d{4}-\d{2,4}_lin\.nasl", line
-                    ) and re.search(r"Chancel\s+==>\s+Cancel", line):
-                        continue
-
-                    # Look like correct as this is also in dictionary_rare.txt
-                    if "deb_dla_2896.nasl" in line and re.search(
-                        r"dependant\s+==>\s+dependent", line
-                    ):
-                        continue
-
-                    # Similar to the one above for e.g. SLES.
-                    # Also exclude "tre", because it's a package name.
-                    if re.search(r"mgasa-\d{4}-\d{4}.nasl", line) and re.search(
-                        r"(hda|tre|conexant)\s+==>\s+(had|tree|connexant)",
-                        line,
-                        flags=re.IGNORECASE,
-                    ):
-                        continue
-
-                    # Similar to the corrections above, with some additional
-                    # exclusions like e.g. names
-                    if re.search(r"ELSA-\d{4}-\d{4,5}\.nasl", line):
-                        if (
-                            re.search(r"Stange\s+==>\s+Strange", line)
-                            or re.search(r"chang\s+==>\s+change, charge", line)
-                            or re.search(
-                                r"IST\s+==>\s+IS, IT, ITS, IT'S, SIT, LIST",
-                                line,
-                            )
-                            or re.search(r"hda\s+==>\s+had", line)
-                            or re.search(r"Readded\s+==>\s+Read", line)
-                            or re.search(
-                                r"ACI\s+==>\s+ACPI", line, re.IGNORECASE
-                            )
-                            or re.search(r"UE\s+==>\s+USE, DUE", line)
-                        ):
-                            continue
-
-                    codespell += line + "\n"
-
-            for codespell_entry in codespell.splitlines():
-                if "==>" in codespell:
-                    yield LinterError(
-                        codespell_entry,
-                        file=codespell_entry.split(":")[0],
-                        plugin=self.name,
-                    )
-                elif "Traceback (most recent call last):" in codespell:
-                    yield LinterError(
-                        codespell,
-                        plugin=self.name,
-                    )
+        codespell = _get_codespell()
+        content = self.context.raw_content
+        rules = None
+
+        for misspelling in codespell.check(self.context.nasl_file, content):
+            if rules is None:
+                rules = get_false_positive_rules(self.context.nasl_file)
+            if any(rule.matches(misspelling) for rule in rules):
+                continue
+
+            # the file is reported separately, relative to the root
+            yield LinterError(
+                f"Line {misspelling.line}: {misspelling.message}",
+                file=self.context.nasl_file,
+                plugin=self.name,
+                line=misspelling.line,
+            )
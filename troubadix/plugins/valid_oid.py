@@ -19,10 +19,7 @@ import re
 from pathlib import Path
 from typing import Iterator
 
-from troubadix.helper.patterns import (
-    SpecialScriptTag,
-    get_special_script_tag_pattern,
-)
+from troubadix.helper.patterns import SpecialScriptTag
 from troubadix.plugin import FileContentPlugin, LinterError, LinterResult
 
 
@@ -58,8 +55,9 @@ class CheckValidOID(FileContentPlugin):
         is_using_reserved = "is using an OID that is reserved for"
         invalid_oid = "is using an invalid OID"
 
-        oid_pattern = get_special_script_tag_pattern(SpecialScriptTag.OID)
-        oid_match = oid_pattern.search(file_content)
+        vt_metadata = self.context.vt_metadata
+
+        oid_match = vt_metadata.get_special_script_tag(SpecialScriptTag.OID)
         if oid_match is None or oid_match.group("oid") is None:
             yield LinterError(
                 "No valid script_oid() call found",
@@ -80,10 +78,9 @@ class CheckValidOID(FileContentPlugin):
 
         # Vendor-specific OIDs
         if "1.3.6.1.4.1.25623.1.1." in oid:
-            family_pattern = get_special_script_tag_pattern(
+            family_match = vt_metadata.get_special_script_tag(
                 SpecialScriptTag.FAMILY
             )
-            family_match = family_pattern.search(file_content)
             if family_match is None or family_match.group("value") is None:
                 yield LinterError(
                     "VT is missing a script family!",
@@ -335,8 +332,9 @@ class CheckValidOID(FileContentPlugin):
 
         # product-specific OIDs
         if "1.3.6.1.4.1.25623.1.2." in oid:
-            name_patter = get_special_script_tag_pattern(SpecialScriptTag.NAME)
-            name_match = name_patter.search(file_content)
+            name_match = vt_metadata.get_special_script_tag(
+                SpecialScriptTag.NAME
+            )
             if not name_match or not name_match.group("value"):
                 yield LinterError(
                     "VT is missing a script name!",
@@ -16,7 +16,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from stat import filemode
-from typing import Iterator
+from typing import Iterable, Iterator
 
 from troubadix.plugin import FilePlugin, LinterError, LinterResult
 
@@ -28,9 +28,12 @@ class CheckVTFilePermissions(FilePlugin):
 
     name = "check_vt_file_permissions"
 
+    def get_cache_inputs(self) -> Iterable[str]:
+        return [filemode(self.context.stat.st_mode)]
+
     def run(self) -> Iterator[LinterResult]:
 
-        permissions = filemode(self.context.nasl_file.stat().st_mode)
+        permissions = filemode(self.context.stat.st_mode)
 
         if "x" in permissions:
             yield LinterError(
@@ -18,13 +18,19 @@
 import re
 from itertools import chain
 from pathlib import Path
-from typing import Iterator
+from typing import Iterable, Iterator
 
-from troubadix.helper import ScriptTag, SpecialScriptTag, get_script_tag_pattern
+from troubadix.helper import ScriptTag, SpecialScriptTag
 from troubadix.helper.helper import ENTERPRISE_FOLDERS, FEED_VERSIONS
 from troubadix.helper.patterns import _get_special_script_tag_pattern
 from troubadix.plugin import FileContentPlugin, LinterError, LinterResult
 
+_FAMILY_DETECTION_PATTERN = _get_special_script_tag_pattern(
+    name=SpecialScriptTag.FAMILY.value,
+    value=r"(Product|Service) detection",
+    flags=re.MULTILINE,
+)
+
 
 class CheckVTPlacement(FileContentPlugin):
     """The script checks if the passed VT is using one of the
@@ -38,6 +44,9 @@ class CheckVTPlacement(FileContentPlugin):
 
     name = "check_vt_placement"
 
+    def get_cache_inputs(self) -> Iterable[str]:
+        return [str(self.context.root.absolute())]
+
     def check_content(
         self,
         nasl_file: Path,
@@ -57,18 +66,14 @@ class CheckVTPlacement(FileContentPlugin):
 
         root = self.context.root
 
-        match = _get_special_script_tag_pattern(
-            name=SpecialScriptTag.FAMILY.value,
-            value=r"(Product|Service) detection",
-            flags=re.MULTILINE,
-        ).search(file_content)
-        if match is None:
-            return
+        vt_metadata = self.context.vt_metadata
 
-        tag_pattern = get_script_tag_pattern(ScriptTag.DEPRECATED)
+        if not vt_metadata.find_script_calls(
+            SpecialScriptTag.FAMILY.value, _FAMILY_DETECTION_PATTERN
+        ):
+            return
 
-        match = tag_pattern.search(file_content)
-        if match is not None:
+        if vt_metadata.get_script_tag(ScriptTag.DEPRECATED) is not None:
             return
 
         if any(
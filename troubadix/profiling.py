@@ -0,0 +1,392 @@
+# Copyright (C) 2022 Greenbone Networks GmbH
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+""" Profiling of the plugins within the worker processes
+
+The plugin timings are recorded per plugin and file by the workers and
+collected by the parent. cProfile and tracemalloc are started in each
+worker, dumped when the worker exits and merged by the parent.
+"""
+
+import cProfile
+import inspect
+import json
+import math
+import os
+import pstats
+import tracemalloc
+from collections import defaultdict
+from multiprocessing.util import Finalize
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from troubadix.plugin import Plugin
+from troubadix.results import FileResults, Results
+
+# Increase if the format of the written timings changes
+PROFILE_FORMAT_VERSION = 1
+# Default number of the slowest files and plugin file pairs to report
+PROFILE_TOP = 10
+
+
+class PluginTiming(NamedTuple):
+    plugin: str
+    # None for the plugins checking all files at once and the reduce step
+    file: Optional[Path]
+    # the elapsed wall time and cpu time in seconds
+    wall: float
+    cpu: float
+
+
+class PluginStatistic(NamedTuple):
+    plugin: str
+    count: int
+    total: float
+    mean: float
+    p95: float
+    cpu: float
+
+
+def get_percentile(values: Iterable[float], percent: float) -> float:
+    """Get the percentile of the values by the nearest rank"""
+    values = sorted(values)
+    if not values:
+        return 0.0
+    rank = max(math.ceil(percent / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+class PluginProfile:
+    """Collects the timings of the plugins of a run
+
+    The timings are recorded by the workers only if profiling is enabled,
+    see `Results.add_plugin_timing`, and are added in the parent process.
+    """
+
+    def __init__(self) -> None:
+        self.timings: List[PluginTiming] = []
+
+    def add(
+        self, plugin: str, file: Optional[Path], wall: float, cpu: float
+    ) -> None:
+        self.timings.append(PluginTiming(plugin, file, wall, cpu))
+
+    def add_results(self, results: Results) -> None:
+        """Add the timings recorded together with the results"""
+        file_path = (
+            results.file_path if isinstance(results, FileResults) else None
+        )
+        for plugin, (wall, cpu) in results.plugin_timings.items():
+            self.add(plugin, file_path, wall, cpu)
+
+    def get_plugin_statistics(self) -> List[PluginStatistic]:
+        """Get the statistic of each plugin, the slowest plugin first"""
+        walls: Dict[str, List[float]] = defaultdict(list)
+        cpus: Dict[str, float] = defaultdict(float)
+        for timing in self.timings:
+            walls[timing.plugin].append(timing.wall)
+            cpus[timing.plugin] += timing.cpu
+
+        statistics = [
+            PluginStatistic(
+                plugin,
+                len(values),
+                sum(values),
+                sum(values) / len(values),
+                get_percentile(values, 95),
+                cpus[plugin],
+            )
+            for plugin, values in walls.items()
+        ]
+        return sorted(statistics, key=lambda item: item.total, reverse=True)
+
+    def get_slowest_files(self, count: int) -> List[Tuple[Path, float]]:
+        """Get the files with the highest wall time of all plugins"""
+        files: Dict[Path, float] = defaultdict(float)
+        for timing in self.timings:
+            if timing.file is not None:
+                files[timing.file] += timing.wall
+        return sorted(files.items(), key=lambda item: item[1], reverse=True)[
+            :count
+        ]
+
+    def get_slowest_pairs(self, count: int) -> List[PluginTiming]:
+        """Get the plugins with the highest wall time on a single file"""
+        return sorted(
+            (timing for timing in self.timings if timing.file is not None),
+            key=lambda timing: timing.wall,
+            reverse=True,
+        )[:count]
+
+    def write_json(self, path: Path) -> None:
+        """Write all recorded timings"""
+        path.write_text(
+            json.dumps(
+                {
+                    "version": PROFILE_FORMAT_VERSION,
+                    "timings": [
+                        {
+                            "plugin": timing.plugin,
+                            "file": str(timing.file) if timing.file else None,
+                            "wall": timing.wall,
+                            "cpu": timing.cpu,
+                        }
+                        for timing in self.timings
+                    ],
+                }
+            ),
+            encoding="utf-8",
+        )
+
+
+CPROFILE_FILE_NAME = "troubadix.prof"
+CPROFILE_REPORT_NAME = "plugins.txt"
+TRACEMALLOC_REPORT_NAME = "allocations.txt"
+# Number of frames stored per allocation, required to attribute allocations
+# of shared helpers to the calling plugin
+TRACEMALLOC_FRAMES = 12
+# Number of source lines in the top allocations report
+ALLOCATIONS_TOP = 30
+
+_CPROFILE_DUMP_PATTERN = "*.prof.part"
+_TRACEMALLOC_DUMP_PATTERN = "*.tracemalloc.part"
+
+
+def _remove_dumps(directory: Path, pattern: str) -> None:
+    for dump in directory.glob(pattern):
+        dump.unlink()
+
+
+def prepare_dumps(
+    cprofile_dir: Optional[Path], tracemalloc_dir: Optional[Path]
+) -> None:
+    """Create the directories and remove the dumps of previous runs"""
+    if cprofile_dir:
+        cprofile_dir.mkdir(parents=True, exist_ok=True)
+        _remove_dumps(cprofile_dir, _CPROFILE_DUMP_PATTERN)
+    if tracemalloc_dir:
+        tracemalloc_dir.mkdir(parents=True, exist_ok=True)
+        _remove_dumps(tracemalloc_dir, _TRACEMALLOC_DUMP_PATTERN)
+
+
+def _dump_cprofile(profiler: cProfile.Profile, path: Path) -> None:
+    profiler.disable()
+    profiler.dump_stats(path)
+
+
+def _dump_tracemalloc(path: Path) -> None:
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    snapshot.filter_traces(
+        [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ]
+    ).dump(str(path))
+
+
+def start_worker_profilers(
+    cprofile_dir: Optional[Path], tracemalloc_dir: Optional[Path]
+) -> None:
+    """Start cProfile and tracemalloc in the current worker process
+
+    The data is dumped into the directories when the worker exits normally,
+    i.e. after the pool has been closed and joined. Terminated workers
+    don't write any data.
+    """
+    name = f"worker-{os.getpid()}"
+    if cprofile_dir:
+        profiler = cProfile.Profile()
+        Finalize(
+            profiler,
+            _dump_cprofile,
+            args=(profiler, cprofile_dir / f"{name}.prof.part"),
+            exitpriority=10,
+        )
+        profiler.enable()
+
+    if tracemalloc_dir:
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+        Finalize(
+            None,
+            _dump_tracemalloc,
+            args=(tracemalloc_dir / f"{name}.tracemalloc.part",),
+            exitpriority=10,
+        )
+
+
+def dump_parent_cprofile(
+    profiler: cProfile.Profile, cprofile_dir: Path
+) -> None:
+    """Dump the profile of the parent process to be merged with the
+    workers"""
+    _dump_cprofile(profiler, cprofile_dir / f"parent-{os.getpid()}.prof.part")
+
+
+def get_plugin_source_files(plugins: Iterable[type]) -> Dict[str, str]:
+    """Get the names of the plugins by the real path of their source"""
+    return {
+        os.path.realpath(inspect.getsourcefile(plugin_class)): (
+            plugin_class.name
+        )
+        for plugin_class in plugins
+        if issubclass(plugin_class, Plugin)
+    }
+
+
+def merge_cprofile(cprofile_dir: Path, plugins: Iterable[type]) -> int:
+    """Merge the profiles of all processes into a single pstats file and
+    write the time spent within each plugin
+
+    The cumulative time of a plugin is the highest cumulative time of the
+    functions of its module, usually the entry point called by the runner.
+    The own time is the time spent in the functions of the module itself,
+    excluding the called helpers and regular expressions.
+
+    Returns:
+        the number of merged profiles
+    """
+    dumps = sorted(cprofile_dir.glob(_CPROFILE_DUMP_PATTERN))
+    if not dumps:
+        return 0
+
+    stats = pstats.Stats(*(str(dump) for dump in dumps))
+    stats.dump_stats(str(cprofile_dir / CPROFILE_FILE_NAME))
+
+    source_files = get_plugin_source_files(plugins)
+    paths: Dict[str, Optional[str]] = {}
+    cumulative: Dict[str, float] = defaultdict(float)
+    own: Dict[str, float] = defaultdict(float)
+    calls: Dict[str, int] = defaultdict(int)
+    for (filename, _, _), stat in stats.stats.items():
+        _, ncalls, tottime, cumtime, _ = stat
+        if filename not in paths:
+            paths[filename] = source_files.get(os.path.realpath(filename))
+        plugin = paths[filename]
+        if plugin is None:
+            continue
+
+        own[plugin] += tottime
+        if cumtime > cumulative[plugin]:
+            cumulative[plugin] = cumtime
+            calls[plugin] = ncalls
+
+    lines = [
+        f"Merged profile of {len(dumps)} processes: {CPROFILE_FILE_NAME}",
+        "",
+        f"{'Plugin':48} {'Calls':>8} {'Cumulative':>12} {'Own':>10}",
+    ]
+    for plugin in sorted(cumulative, key=cumulative.get, reverse=True):
+        lines.append(
+            f"{plugin:48} {calls[plugin]:8} {cumulative[plugin]:11.3f}s "
+            f"{own[plugin]:9.3f}s"
+        )
+    (cprofile_dir / CPROFILE_REPORT_NAME).write_text(
+        "\n".join(lines) + "\n", encoding="utf-8"
+    )
+
+    for dump in dumps:
+        dump.unlink()
+
+    return len(dumps)
+
+
+def _format_size(size: int) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}" if unit != "B" else f"{size} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def merge_tracemalloc(
+    tracemalloc_dir: Path, plugins: Iterable[type], top: int = ALLOCATIONS_TOP
+) -> int:
+    """Merge the snapshots of the workers into a report of the top
+    allocations and the allocations by plugin
+
+    The snapshots are taken when the workers exit. Therefore they contain
+    the memory still held at that time, e.g. by caches and compiled
+    patterns. An allocation is attributed to the most recent plugin in its
+    traceback.
+
+    Returns:
+        the number of merged snapshots
+    """
+    dumps = sorted(tracemalloc_dir.glob(_TRACEMALLOC_DUMP_PATTERN))
+    if not dumps:
+        return 0
+
+    source_files = get_plugin_source_files(plugins)
+    paths: Dict[str, Optional[str]] = {}
+    locations: Dict[Tuple[str, int], List[int]] = defaultdict(lambda: [0, 0])
+    by_plugin: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+    total = 0
+
+    for dump in dumps:
+        snapshot = tracemalloc.Snapshot.load(str(dump))
+        for statistic in snapshot.statistics("traceback"):
+            total += statistic.size
+            frame = statistic.traceback[-1]
+            location = locations[(frame.filename, frame.lineno)]
+            location[0] += statistic.size
+            location[1] += statistic.count
+
+            plugin = "-"
+            for frame in reversed(statistic.traceback):
+                if frame.filename not in paths:
+                    paths[frame.filename] = source_files.get(
+                        os.path.realpath(frame.filename)
+                    )
+                if paths[frame.filename]:
+                    plugin = paths[frame.filename]
+                    break
+            by_plugin[plugin][0] += statistic.size
+            by_plugin[plugin][1] += statistic.count
+
+    lines = [
+        f"Memory held by {len(dumps)} worker processes at exit: "
+        f"{_format_size(total)}",
+        "",
+        f"Top {top} allocations",
+        f"{'Size':>12} {'Count':>8}  Location",
+    ]
+    for (filename, lineno), (size, count) in sorted(
+        locations.items(), key=lambda item: item[1][0], reverse=True
+    )[:top]:
+        lines.append(f"{_format_size(size):>12} {count:8}  {filename}:{lineno}")
+
+    lines.extend(
+        [
+            "",
+            "Allocations by plugin",
+            f"{'Size':>12} {'Count':>8}  Plugin",
+        ]
+    )
+    for plugin, (size, count) in sorted(
+        by_plugin.items(), key=lambda item: item[1][0], reverse=True
+    ):
+        lines.append(f"{_format_size(size):>12} {count:8}  {plugin}")
+
+    (tracemalloc_dir / TRACEMALLOC_REPORT_NAME).write_text(
+        "\n".join(lines) + "\n", encoding="utf-8"
+    )
+
+    for dump in dumps:
+        dump.unlink()
+
+    return len(dumps)
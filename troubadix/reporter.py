@@ -15,16 +15,392 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import json
+import queue
+import threading
+from enum import Enum
 from pathlib import Path
-from typing import Iterable, List
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Set
+from xml.sax.saxutils import escape, quoteattr
 
 from pontos.terminal import Terminal
 
+from troubadix.__version__ import __version__
+from troubadix.helper import CURRENT_ENCODING
 from troubadix.helper.helper import get_path_from_root
 from troubadix.plugin import LinterError, LinterFix, LinterResult, LinterWarning
 from troubadix.plugins import Plugins
+from troubadix.profiling import PROFILE_TOP, PluginProfile
 from troubadix.results import FileResults, ResultCounts, Results
 
+TOOL_NAME = "troubadix"
+TOOL_URI = "https://github.com/greenbone/troubadix"
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+SARIF_VERSION = "2.1.0"
+
+
+class Style(Enum):
+    """The style of a human-oriented message"""
+
+    PRINT = "print"
+    INFO = "info"
+    BOLD_INFO = "bold_info"
+    OK = "ok"
+    WARNING = "warning"
+    ERROR = "error"
+
+
+def get_result_type(result: LinterResult) -> str:
+    return result.severity.name.lower()
+
+
+class Finding(NamedTuple):
+    plugin: str
+    # the path of the file relative to the root directory
+    file: Optional[str]
+    result: LinterResult
+
+
+class BufferedWriter:
+    """Writes text to a file in a background thread
+
+    The file is opened only once. Writing only queues the text, the writer
+    thread drains the queue and writes everything queued at once.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        mode: str = "w",
+        *,
+        encoding: str = "utf-8",
+        newline: Optional[str] = None,
+    ) -> None:
+        self._file = path.open(mode=mode, encoding=encoding, newline=newline)
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._error: Optional[OSError] = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        closed = False
+        while not closed:
+            items = [self._queue.get()]
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            closed = None in items
+            if self._error is None:
+                try:
+                    self._file.write(
+                        "".join(item for item in items if item is not None)
+                    )
+                    self._file.flush()
+                except OSError as e:
+                    self._error = e
+
+            for _ in items:
+                self._queue.task_done()
+
+        self._file.close()
+
+    def write(self, text: str) -> None:
+        self._queue.put(text)
+
+    def flush(self) -> None:
+        """Wait until all queued text has been written"""
+        self._queue.join()
+        if self._error:
+            raise self._error
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+        if self._error:
+            raise self._error
+
+
+class Sink:
+    """Receives everything reported by the Reporter
+
+    The human-oriented messages are already formatted and filtered by the
+    verbosity. The results are passed per file or per files plugin, as soon
+    as they are available.
+    """
+
+    def report_text(self, style: Style, message: str) -> None:
+        """Report a human-oriented message"""
+
+    def report_statistic_text(self, style: Style, message: str) -> None:
+        """Report a line of the statistic"""
+
+    def report_results(self, results: Results) -> None:
+        """Report the results of a checked file (FileResults) or of files
+        plugins (Results)"""
+
+    def flush(self) -> None:
+        """Wait until everything reported so far has been written"""
+
+    def close(self) -> None:
+        """Finish the output"""
+
+
+class TerminalSink(Sink):
+    """Prints the human-oriented messages and the statistic"""
+
+    def __init__(self, term: Terminal) -> None:
+        self._term = term
+
+    def report_text(self, style: Style, message: str) -> None:
+        getattr(self._term, style.value)(message)
+
+    def report_statistic_text(self, style: Style, message: str) -> None:
+        self.report_text(style, message)
+
+
+class LogFileSink(Sink):
+    """Appends the human-oriented messages to a log file"""
+
+    def __init__(self, path: Path) -> None:
+        self._writer = BufferedWriter(path, mode="a")
+
+    @staticmethod
+    def _format(style: Style, message: str) -> str:
+        if style == Style.INFO:
+            return f"\t{message}\n"
+        if style == Style.BOLD_INFO:
+            return f"\n\n{message}\n"
+        message = f"\t\t{message}".replace("\n", "\n\t\t")
+        return f"{message}\n"
+
+    def report_text(self, style: Style, message: str) -> None:
+        self._writer.write(self._format(style, message))
+
+    def flush(self) -> None:
+        self._writer.flush()
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+class StatisticLogFileSink(LogFileSink):
+    """Appends the statistic to a log file"""
+
+    def report_text(self, style: Style, message: str) -> None:
+        pass
+
+    def report_statistic_text(self, style: Style, message: str) -> None:
+        self._writer.write(f"{message}\n")
+
+
+class _ResultsFileSink(Sink):
+    """Base class for the structured outputs of the results"""
+
+    def __init__(self, path: Path, root: Path) -> None:
+        self._root = root
+        self._writer = BufferedWriter(path)
+
+    def _get_path(self, path: Path) -> str:
+        try:
+            return get_path_from_root(path, self._root).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+    def _iter_results(self, results: Results) -> Iterator[Finding]:
+        file_path = (
+            results.file_path if isinstance(results, FileResults) else None
+        )
+        for plugin_name, plugin_results in results.plugin_results.items():
+            for result in plugin_results:
+                file = result.file or file_path
+                yield Finding(
+                    result.plugin or plugin_name,
+                    self._get_path(file) if file else None,
+                    result,
+                )
+
+    def flush(self) -> None:
+        self._writer.flush()
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+class JSONLinesSink(_ResultsFileSink):
+    """Writes every result as a single JSON object per line"""
+
+    def report_results(self, results: Results) -> None:
+        lines = [
+            json.dumps(
+                {
+                    "type": get_result_type(result),
+                    "plugin": plugin_name,
+                    "file": file,
+                    "line": result.line,
+                    "message": result.message,
+                }
+            )
+            for plugin_name, file, result in self._iter_results(results)
+        ]
+        if lines:
+            self._writer.write("\n".join(lines) + "\n")
+
+
+class SARIFSink(_ResultsFileSink):
+    """Writes the results as a SARIF 2.1.0 log
+
+    The results are streamed into the results array of the run. The
+    rules of the tool are only known at the end and are written after the
+    results.
+    """
+
+    _LEVELS = {
+        "error": "error",
+        "warning": "warning",
+        "fix": "note",
+        "result": "none",
+    }
+
+    def __init__(self, path: Path, root: Path) -> None:
+        super().__init__(path, root)
+        self._rules: Set[str] = set()
+        self._first = True
+        self._writer.write(
+            f'{{"$schema": "{SARIF_SCHEMA}", "version": "{SARIF_VERSION}", '
+            '"runs": [{"results": ['
+        )
+
+    def report_results(self, results: Results) -> None:
+        for plugin_name, file, result in self._iter_results(results):
+            self._rules.add(plugin_name)
+
+            sarif_result = {
+                "ruleId": plugin_name,
+                "level": self._LEVELS[get_result_type(result)],
+                "message": {"text": result.message},
+            }
+            if file:
+                location = {"artifactLocation": {"uri": file}}
+                if result.line:
+                    location["region"] = {"startLine": result.line}
+                sarif_result["locations"] = [{"physicalLocation": location}]
+
+            separator = "\n" if self._first else ",\n"
+            self._first = False
+            self._writer.write(separator + json.dumps(sarif_result))
+
+    def close(self) -> None:
+        driver = {
+            "name": TOOL_NAME,
+            "version": __version__,
+            "informationUri": TOOL_URI,
+            "rules": [{"id": rule} for rule in sorted(self._rules)],
+        }
+        self._writer.write(
+            f'\n], "tool": {{"driver": {json.dumps(driver)}}}}}]}}\n'
+        )
+        super().close()
+
+
+class JUnitSink(_ResultsFileSink):
+    """Writes the results as JUnit XML
+
+    Every checked file is a test case, failing if a plugin reported an
+    error. The results of the files plugins are reported as one test case
+    per plugin.
+    """
+
+    def __init__(self, path: Path, root: Path) -> None:
+        super().__init__(path, root)
+        self._writer.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            f"<testsuites>\n<testsuite name={quoteattr(TOOL_NAME)}>\n"
+        )
+
+    def _write_testcase(
+        self, classname: str, name: str, findings: List[Finding]
+    ) -> None:
+        errors = []
+        output = []
+        for plugin_name, file, result in findings:
+            location = f"{file}:{result.line}" if result.line else file
+            text = f"{plugin_name}: {result.message}"
+            if location:
+                text = f"{location}: {text}"
+
+            if isinstance(result, LinterError):
+                errors.append(text)
+            else:
+                output.append(f"{get_result_type(result)}: {text}")
+
+        testcase = (
+            f"<testcase classname={quoteattr(classname)} "
+            f"name={quoteattr(name)}"
+        )
+        if not errors and not output:
+            self._writer.write(f"{testcase}/>\n")
+            return
+
+        parts = [f"{testcase}>\n"]
+        if errors:
+            parts.append(
+                f"<failure message={quoteattr(f'{len(errors)} error(s)')}>"
+                f"{escape(chr(10).join(errors))}</failure>\n"
+            )
+        if output:
+            parts.append(
+                f"<system-out>{escape(chr(10).join(output))}</system-out>\n"
+            )
+        parts.append("</testcase>\n")
+        self._writer.write("".join(parts))
+
+    def report_results(self, results: Results) -> None:
+        if isinstance(results, FileResults):
+            self._write_testcase(
+                TOOL_NAME,
+                self._get_path(results.file_path),
+                list(self._iter_results(results)),
+            )
+            return
+
+        for plugin_name, plugin_results in results.plugin_results.items():
+            plugin_only = Results()
+            plugin_only.plugin_results[plugin_name] = plugin_results
+            self._write_testcase(
+                f"{TOOL_NAME}.plugins",
+                plugin_name,
+                list(self._iter_results(plugin_only)),
+            )
+
+    def close(self) -> None:
+        self._writer.write("</testsuite>\n</testsuites>\n")
+        super().close()
+
+
+class PatchSink(Sink):
+    """Writes the fixes of the checked files as a single unified patch"""
+
+    def __init__(self, path: Path) -> None:
+        # the patches contain the content of the files in the encoding of
+        # the files
+        self._writer = BufferedWriter(
+            path, encoding=CURRENT_ENCODING, newline=""
+        )
+
+    def report_results(self, results: Results) -> None:
+        patch = getattr(results, "patch", None)
+        if patch:
+            self._writer.write(patch)
+
+    def flush(self) -> None:
+        self._writer.flush()
+
+    def close(self) -> None:
+        self._writer.close()
+
 
 class Reporter:
     def __init__(
@@ -38,10 +414,9 @@ class Reporter:
         statistic: bool = True,
         verbose: int = 0,
         ignore_warnings: bool = False,
+        sinks: Iterable[Sink] = (),
     ) -> None:
         self._term = term
-        self._log_file = log_file
-        self._log_file_statistic = log_file_statistic
         self._statistic = statistic
         self._verbose = verbose
         self._fix = fix
@@ -50,32 +425,48 @@ class Reporter:
         self._ignore_warnings = ignore_warnings
         self._result_counts = ResultCounts()
 
-    def set_files_count(self, count: int):
+        self._sinks: List[Sink] = [TerminalSink(term)]
+        if log_file:
+            self._sinks.append(LogFileSink(log_file))
+        if log_file_statistic:
+            self._sinks.append(StatisticLogFileSink(log_file_statistic))
+        self._sinks.extend(sinks)
+
+    def set_files_count(self, count: Optional[int]):
+        """Set the number of files to check or None if it is not known in
+        advance"""
         self._files_count = count
 
     def get_error_count(self) -> int:
         return self._result_counts.error_count
 
+    def _report_text(self, style: Style, message: str) -> None:
+        for sink in self._sinks:
+            sink.report_text(style, message)
+
+    def _report_statistic_text(self, style: Style, message: str) -> None:
+        for sink in self._sinks:
+            sink.report_statistic_text(style, message)
+
+    def _report_results(self, results: Results) -> None:
+        for sink in self._sinks:
+            sink.report_results(results)
+
     def _report_warning(self, message: str) -> None:
-        self._term.warning(message)
-        self._log_append(f"\t\t{message}".replace("\n", "\n\t\t"))
+        self._report_text(Style.WARNING, message)
 
     def _report_error(self, message: str) -> None:
-        self._term.error(message)
-        self._log_append(f"\t\t{message}".replace("\n", "\n\t\t"))
+        self._report_text(Style.ERROR, message)
 
     def report_info(self, message: str) -> None:
         """Report an info message"""
-        self._term.info(message)
-        self._log_append(f"\t{message}")
+        self._report_text(Style.INFO, message)
 
     def _report_bold_info(self, message: str) -> None:
-        self._term.bold_info(message)
-        self._log_append(f"\n\n{message}")
+        self._report_text(Style.BOLD_INFO, message)
 
     def _report_ok(self, message: str) -> None:
-        self._term.ok(message)
-        self._log_append(f"\t\t{message}".replace("\n", "\n\t\t"))
+        self._report_text(Style.OK, message)
 
     def _process_plugin_results(
         self, plugin_name: str, plugin_results: List[LinterResult]
@@ -121,6 +512,8 @@ class Reporter:
             with self._term.indent():
                 self._process_plugin_results(plugin_name, plugin_results)
 
+        self._report_results(results)
+
     def report_by_file_plugin(
         self, file_results: FileResults, pos: int
     ) -> None:
@@ -129,16 +522,18 @@ class Reporter:
         Arguments:
             file_results    a file results object
             pos             the absolute file number in relation
-                            to the whole file count
+                            to the whole file count or the running count
+                            if the file count is not known
         """
         if file_results and self._verbose > 0 or self._verbose > 1:
             # only print the part "common/some_nasl.nasl"
             from_root_path = get_path_from_root(
                 file_results.file_path, self._root
             )
-            self._report_bold_info(
-                f"Checking {from_root_path} ({pos}/{self._files_count})"
+            progress = (
+                f"{pos}/{self._files_count}" if self._files_count else pos
             )
+            self._report_bold_info(f"Checking {from_root_path} ({progress})")
 
         with self._term.indent():
             for (
@@ -147,6 +542,8 @@ class Reporter:
             ) in file_results.plugin_results.items():
                 self._process_plugin_results(plugin_name, plugin_results)
 
+        self._report_results(file_results)
+
     def report_plugin_overview(
         self,
         plugins: Plugins,
@@ -184,10 +581,8 @@ class Reporter:
             line = f"{'Plugin':48} {'  Errors':8} {'Warnings':8}"
             length = "-" * 67
 
-        self._term.print(line)
-        self._log_statistic_append(line)
-        self._term.print(length)
-        self._log_statistic_append(length)
+        self._report_statistic_text(Style.PRINT, line)
+        self._report_statistic_text(Style.PRINT, length)
 
         for (plugin, count) in self._result_counts.result_counts.items():
             if self._fix and self._ignore_warnings:
@@ -203,14 +598,11 @@ class Reporter:
                 line = f"{plugin:48} {count['error']:8} {count['warning']:8}"
 
             if count["error"] > 0:
-                self._term.error(line)
-                self._log_statistic_append(line)
+                self._report_statistic_text(Style.ERROR, line)
             else:
-                self._term.warning(line)
-                self._log_statistic_append(line)
+                self._report_statistic_text(Style.WARNING, line)
 
-        self._term.print(length)
-        self._log_statistic_append(length)
+        self._report_statistic_text(Style.PRINT, length)
 
         if self._fix and self._ignore_warnings:
             line = (
@@ -231,21 +623,70 @@ class Reporter:
                 f" {self._result_counts.warning_count:8}"
             )
 
-        self._term.info(line)
-        self._log_statistic_append(line)
+        self._report_statistic_text(Style.INFO, line)
 
-    def _log_append(self, message: str):
-        if self._log_file:
-            with self._log_file.open(mode="a", encoding="utf-8") as f:
-                f.write(f"{message}\n")
+    def report_profile(
+        self, profile: PluginProfile, count: int = PROFILE_TOP
+    ) -> None:
+        """Print the timings of the plugins recorded by a profiled run
 
-    def _log_statistic_append(self, message: str):
-        if self._log_file_statistic:
-            with self._log_file_statistic.open(mode="a", encoding="utf-8") as f:
-                f.write(f"{message}\n")
+        Arguments:
+            profile     the recorded timings
+            count       the number of the slowest files and plugin file
+                        pairs to print
+        """
+        self._report_statistic_text(
+            Style.INFO,
+            "Plugin timings: total wall and cpu time in s, mean and p95 of "
+            "the wall time in ms",
+        )
+        line = f"{'Plugin':47} {'Total':>6} {'CPU':>6} {'Mean':>6} {'P95':>6}"
+        length = "-" * len(line)
+        self._report_statistic_text(Style.PRINT, line)
+        self._report_statistic_text(Style.PRINT, length)
+        for statistic in profile.get_plugin_statistics():
+            self._report_statistic_text(
+                Style.PRINT,
+                f"{statistic.plugin:47} {statistic.total:6.2f} "
+                f"{statistic.cpu:6.2f} {statistic.mean * 1000:6.2f} "
+                f"{statistic.p95 * 1000:6.2f}",
+            )
+        self._report_statistic_text(Style.PRINT, length)
+
+        self._report_statistic_text(Style.INFO, f"Slowest {count} files")
+        for nasl_file, wall in profile.get_slowest_files(count):
+            self._report_statistic_text(
+                Style.PRINT, f"{wall:8.3f}s {self._get_path(nasl_file)}"
+            )
+
+        self._report_statistic_text(
+            Style.INFO, f"Slowest {count} plugins on a single file"
+        )
+        for timing in profile.get_slowest_pairs(count):
+            self._report_statistic_text(
+                Style.PRINT,
+                f"{timing.wall:8.3f}s {timing.plugin} "
+                f"{self._get_path(timing.file)}",
+            )
+
+    def _get_path(self, path: Path) -> str:
+        try:
+            return get_path_from_root(path, self._root).as_posix()
+        except ValueError:
+            return path.as_posix()
 
     def plugin_not_found(self, plugin_name):
         self._report_error(f"Plugin {plugin_name} is not existing.")
 
     def plugin_unknown(self, plugin_name):
         self._report_error(f"Plugin {plugin_name} can not be read.")
+
+    def flush(self) -> None:
+        """Wait until all sinks have written everything reported so far"""
+        for sink in self._sinks:
+            sink.flush()
+
+    def close(self) -> None:
+        """Finish the output of all sinks"""
+        for sink in self._sinks:
+            sink.close()
@@ -15,11 +15,156 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import sys
+from array import array
 from collections import defaultdict
+from functools import lru_cache
+from itertools import chain
+from operator import attrgetter
 from pathlib import Path
-from typing import Dict, Iterable, Iterator
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
-from troubadix.plugin import LinterResult, LinterWarning
+from troubadix.plugin import RESULT_CLASSES, LinterResult, LinterWarning
+
+# Marks a missing file, plugin or line in the columns
+_NONE = -1
+
+
+@lru_cache(maxsize=None)
+def _intern_path(path: str) -> Path:
+    # all results of a file share a single path object within the run
+    return Path(path)
+
+
+class ResultColumns:
+    """The results of the plugins in a columnar layout
+
+    Every attribute of the results is stored in a flat array. The messages,
+    file paths and plugin names are deduplicated into a string table and are
+    referenced by their index. This is much cheaper to pickle than a list of
+    result objects and is used to send the results of a file from the
+    worker processes to the parent.
+    """
+
+    __slots__ = (
+        "strings",
+        "plugin_names",
+        "owners",
+        "severities",
+        "messages",
+        "files",
+        "plugins",
+        "lines",
+    )
+
+    def __init__(self) -> None:
+        self.strings: List[str] = []
+        # the indices of the plugin names of the plugin_results dict
+        self.plugin_names = array("i")
+        # the index into plugin_names of the entry containing a result
+        self.owners = array("i")
+        self.severities = bytearray()
+        self.messages = array("i")
+        self.files = array("i")
+        self.plugins = array("i")
+        self.lines = array("i")
+
+    @classmethod
+    def from_plugin_results(
+        cls, plugin_results: Dict[str, List[LinterResult]]
+    ) -> "ResultColumns":
+        columns = cls()
+
+        all_results: List[LinterResult] = []
+        owners: List[int] = []
+        for owner, results in enumerate(plugin_results.values()):
+            all_results.extend(results)
+            owners.extend([owner] * len(results))
+
+        messages = list(map(attrgetter("message"), all_results))
+        plugins = list(map(attrgetter("plugin"), all_results))
+        # the results of a file usually share the same path object, so the
+        # paths are converted once per object
+        files = list(map(attrgetter("file"), all_results))
+        file_ids = list(map(id, files))
+        file_objects = dict(zip(file_ids, files))
+
+        strings = dict.fromkeys(
+            chain(
+                plugin_results,
+                messages,
+                plugins,
+                (
+                    str(file)
+                    for file in file_objects.values()
+                    if file is not None
+                ),
+            )
+        )
+        strings.pop(None, None)
+        columns.strings = list(strings)
+        ids: Dict[Optional[str], int] = {
+            string: index for index, string in enumerate(columns.strings)
+        }
+        ids[None] = _NONE
+        object_ids = {
+            key: ids[None if file is None else str(file)]
+            for key, file in file_objects.items()
+        }
+
+        columns.plugin_names = array("i", map(ids.__getitem__, plugin_results))
+        columns.owners = array("i", owners)
+        columns.severities = bytearray(map(attrgetter("severity"), all_results))
+        columns.messages = array("i", map(ids.__getitem__, messages))
+        columns.files = array("i", map(object_ids.__getitem__, file_ids))
+        columns.plugins = array("i", map(ids.__getitem__, plugins))
+        columns.lines = array(
+            "i",
+            [
+                _NONE if result.line is None else result.line
+                for result in all_results
+            ],
+        )
+        return columns
+
+    def to_plugin_results(self) -> Dict[str, List[LinterResult]]:
+        strings = self.strings
+        files: Dict[int, Optional[Path]] = {
+            file: _intern_path(strings[file])
+            for file in set(self.files)
+            if file != _NONE
+        }
+        files[_NONE] = None
+        plugins: Dict[int, Optional[str]] = {
+            plugin: sys.intern(strings[plugin])
+            for plugin in set(self.plugins)
+            if plugin != _NONE
+        }
+        plugins[_NONE] = None
+
+        plugin_results = defaultdict(list)
+        owners = [
+            plugin_results[sys.intern(strings[index])]
+            for index in self.plugin_names
+        ]
+        for owner, severity, message, file, plugin, line in zip(
+            self.owners,
+            self.severities,
+            self.messages,
+            self.files,
+            self.plugins,
+            self.lines,
+        ):
+            owners[owner].append(
+                RESULT_CLASSES[severity](
+                    strings[message],
+                    files[file],
+                    plugins[plugin],
+                    None if line == _NONE else line,
+                )
+            )
+
+        return plugin_results
 
 
 class Results:
@@ -28,6 +173,9 @@ class Results:
             list
         )
         self.has_plugin_results = False
+        # the wall time and cpu time of each plugin in seconds, only
+        # recorded if the plugins are profiled
+        self.plugin_timings: Dict[str, Tuple[float, float]] = {}
         self._ignore_warnings = ignore_warnings
 
     def add_plugin_results(
@@ -46,17 +194,48 @@ class Results:
         self.plugin_results[plugin_name] += results
         return self
 
+    def add_plugin_timing(
+        self, plugin_name: str, wall: float, cpu: float
+    ) -> "Results":
+        """Add the wall time and cpu time of a plugin in seconds"""
+        total_wall, total_cpu = self.plugin_timings.get(plugin_name, (0.0, 0.0))
+        self.plugin_timings[plugin_name] = (total_wall + wall, total_cpu + cpu)
+        return self
+
     def __bool__(self):
         return self.has_plugin_results
 
+    def __getstate__(self) -> dict:
+        # Results are sent from the worker processes to the parent. Use a
+        # columnar batch instead of pickling every single result object.
+        state = self.__dict__.copy()
+        state["plugin_results"] = ResultColumns.from_plugin_results(
+            self.plugin_results
+        )
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.plugin_results = state["plugin_results"].to_plugin_results()
+
 
 class FileResults(Results):
     """Class to store results from different plugins for a file"""
 
     def __init__(self, file_path: Path, ignore_warnings: bool = False):
         self.file_path = file_path
+        self.plugin_facts: Dict[str, Any] = {}
+        # the fixes of the plugins as unified patch if they haven't been
+        # written to the file
+        self.patch: Optional[str] = None
         super().__init__(ignore_warnings)
 
+    def add_plugin_facts(self, plugin_name: str, facts: Any) -> "FileResults":
+        """Add the facts of the map step of a FilesMapReducePlugin"""
+        if facts is not None:
+            self.plugin_facts[plugin_name] = facts
+        return self
+
 
 def resultsdict():
     return defaultdict(int)
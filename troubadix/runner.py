@@ -15,31 +15,282 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import cProfile
 import datetime
+import itertools
+import os
 import signal
+import threading
+import time
+from contextlib import contextmanager
 from multiprocessing import Pool
+from multiprocessing.pool import AsyncResult
 from pathlib import Path
-from typing import Iterable
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+)
 
+from troubadix.cache import ResultCache
+from troubadix.helper import CURRENT_ENCODING, write_file_atomically
 from troubadix.helper.patterns import (
     init_script_tag_patterns,
     init_special_script_tag_patterns,
 )
-from troubadix.plugin import FilePluginContext, FilesPluginContext, Plugin
+from troubadix.plugin import (
+    FilePlugin,
+    FilePluginContext,
+    FilesMapReducePlugin,
+    FilesPluginContext,
+    Plugin,
+)
 from troubadix.plugins import StandardPlugins
+from troubadix.profiling import (
+    CPROFILE_FILE_NAME,
+    CPROFILE_REPORT_NAME,
+    TRACEMALLOC_REPORT_NAME,
+    PluginProfile,
+    dump_parent_cprofile,
+    merge_cprofile,
+    merge_tracemalloc,
+    prepare_dumps,
+    start_worker_profilers,
+)
 from troubadix.reporter import Reporter
 from troubadix.results import FileResults, Results
+from troubadix.scheduler import create_batches, estimate_costs, get_timing_key
+
+CHUNKSIZE = 1  # default 1, used for the files plugins
+# Number of files per batch of a streamed run without a fixed chunksize
+STREAM_CHUNKSIZE = 8
+# Number of batches per worker sent ahead to the pool in a streamed run
+STREAM_BACKLOG = 4
 
-CHUNKSIZE = 1  # default 1
+_PHASES = ("files plugins", "file plugins", "reduce")
 
 
 class TroubadixException(Exception):
     """Generic Exception for Troubadix"""
 
 
-def initializer():
-    """Ignore CTRL+C in the worker process."""
+class _Worker:
+    """The state of a worker process
+
+    The state is installed once per worker process by the initializer of the
+    pool. Therefore the tasks only need to carry the file path or the files
+    plugin to run.
+    """
+
+    def __init__(
+        self,
+        *,
+        file_plugins: Iterable[Type[FilePlugin]],
+        map_reduce_plugins: Iterable[Type[FilesMapReducePlugin]],
+        root: Path,
+        fix: bool,
+        ignore_warnings: bool,
+        cache: Optional[ResultCache],
+        diff: bool = False,
+        profile: bool = False,
+        cprofile_dir: Optional[Path] = None,
+        tracemalloc_dir: Optional[Path] = None,
+    ) -> None:
+        self.file_plugins = tuple(file_plugins)
+        self.map_reduce_plugins = tuple(map_reduce_plugins)
+        self.root = root
+        self.fix = fix
+        self.diff = diff
+        self.ignore_warnings = ignore_warnings
+        self.cache = cache
+        # record the wall time and cpu time of each plugin
+        self.profile = profile
+        # dump cProfile and tracemalloc data into the directories on exit
+        self.cprofile_dir = cprofile_dir
+        self.tracemalloc_dir = tracemalloc_dir
+
+    def _check(self, plugin: Plugin, results: Results) -> Results:
+        """Run a single plugin and collect the results"""
+        if self.profile:
+            start = time.perf_counter()
+            cpu_start = time.process_time()
+
+        results.add_plugin_results(plugin.name, plugin.run())
+
+        if self.fix:
+            results.add_plugin_results(plugin.name, plugin.fix())
+
+        if self.profile:
+            results.add_plugin_timing(
+                plugin.name,
+                time.perf_counter() - start,
+                time.process_time() - cpu_start,
+            )
+
+        return results
+
+    def check_files(self, plugin: Plugin) -> Results:
+        """Run a files plugin and collect the results"""
+        results = Results(ignore_warnings=self.ignore_warnings)
+        return self._check(plugin, results)
+
+    def check_file(self, file_path: Path) -> FileResults:
+        """Run all file plugins on a single file and collect the results"""
+        results = FileResults(file_path, ignore_warnings=self.ignore_warnings)
+        context = FilePluginContext(
+            root=self.root, nasl_file=file_path.resolve()
+        )
+
+        cache_entry = (
+            self.cache.get_entry(file_path, context.raw_content, context.stat)
+            if self.cache
+            else None
+        )
+
+        for plugin_class in self.file_plugins:
+            plugin = plugin_class(context)
+
+            if cache_entry is None:
+                self._check(plugin, results)
+                continue
+
+            if self.profile:
+                start = time.perf_counter()
+                cpu_start = time.process_time()
+
+            fingerprint = self.cache.get_plugin_fingerprint(plugin)
+            plugin_results = cache_entry.get(plugin.name, fingerprint)
+            if plugin_results is None:
+                plugin_results = list(plugin.run())
+                cache_entry.set(plugin.name, fingerprint, plugin_results)
+
+            results.add_plugin_results(plugin.name, plugin_results)
+
+            if self.profile:
+                results.add_plugin_timing(
+                    plugin.name,
+                    time.perf_counter() - start,
+                    time.process_time() - cpu_start,
+                )
+
+        if cache_entry is not None:
+            cache_entry.save()
+
+        if self.fix and context.has_fixes:
+            self._apply_fixes(context, file_path, results)
+
+        for plugin_class in self.map_reduce_plugins:
+            if self.profile:
+                start = time.perf_counter()
+                cpu_start = time.process_time()
+
+            results.add_plugin_facts(
+                plugin_class.name, plugin_class.map(context)
+            )
+
+            if self.profile:
+                results.add_plugin_timing(
+                    plugin_class.name,
+                    time.perf_counter() - start,
+                    time.process_time() - cpu_start,
+                )
+
+        return results
+
+    def _apply_fixes(
+        self, context: FilePluginContext, file_path: Path, results: FileResults
+    ) -> None:
+        """Write the fixes of all plugins at once or create a patch of them"""
+        if self.diff:
+            results.patch = context.fixes.diff(
+                Path(os.path.relpath(os.path.abspath(file_path))).as_posix()
+            )
+            return
+
+        write_file_atomically(
+            context.nasl_file, context.fixes.apply().encode(CURRENT_ENCODING)
+        )
+
+    def check_file_batch(
+        self, files: Sequence[Path]
+    ) -> Tuple[int, List[Tuple[FileResults, float]]]:
+        """Run all file plugins on a batch of files
+
+        Returns:
+            the pid of the worker and the results of each file together with
+            the duration of the check in seconds
+        """
+        batch_results = []
+        for file_path in files:
+            start = time.perf_counter()
+            results = self.check_file(file_path)
+            batch_results.append((results, time.perf_counter() - start))
+
+        return os.getpid(), batch_results
+
+
+_worker: Optional[_Worker] = None
+
+
+def initializer(worker: Optional[_Worker] = None, ignore_sigterm: bool = False):
+    """Ignore CTRL+C in the worker process and install the state of the
+    worker
+
+    Workers ignoring SIGTERM too are only stopped by closing the pool. A
+    worker killed while waiting for a task would keep the lock of the task
+    queue of the pool forever.
+    """
     signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if ignore_sigterm:
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
+    global _worker  # pylint: disable=global-statement
+    _worker = worker
+
+    if worker is not None and (worker.cprofile_dir or worker.tracemalloc_dir):
+        start_worker_profilers(worker.cprofile_dir, worker.tracemalloc_dir)
+
+    # required if the worker process is spawned instead of forked
+    init_script_tag_patterns()
+    init_special_script_tag_patterns()
+
+
+def _check_files(plugin: Plugin) -> Tuple[int, Results, float]:
+    start = time.perf_counter()
+    results = _worker.check_files(plugin)
+    return os.getpid(), results, time.perf_counter() - start
+
+
+def _check_file_batch(
+    files: Sequence[Path],
+) -> Tuple[int, List[Tuple[FileResults, float]]]:
+    return _worker.check_file_batch(files)
+
+
+def get_tail_latency(
+    n_jobs: int, start: float, idle_times: Iterable[float], end: float
+) -> Optional[float]:
+    """Get the time from the second to last worker becoming idle until the
+    end of the run
+
+    Arguments:
+        n_jobs      the number of worker processes
+        start       the start time of the run
+        idle_times  the time of the last result of each worker that got work
+        end         the end time of the run
+    """
+    if n_jobs < 2:
+        return None
+
+    idle_times = sorted(idle_times)
+    # workers without work have been idle from the start
+    idle_times = [start] * (n_jobs - len(idle_times)) + idle_times
+    return end - idle_times[-2]
 
 
 class Runner:
@@ -52,10 +303,22 @@ class Runner:
         excluded_plugins: Iterable[str] = None,
         included_plugins: Iterable[str] = None,
         fix: bool = False,
+        diff: bool = False,
         ignore_warnings: bool = False,
+        cache_dir: Path = None,
+        cache: Optional[ResultCache] = None,
+        chunksize: Optional[int] = None,
+        profile: Optional[PluginProfile] = None,
+        cprofile_dir: Optional[Path] = None,
+        tracemalloc_dir: Optional[Path] = None,
     ) -> bool:
         # plugins initialization
         self.plugins = StandardPlugins(excluded_plugins, included_plugins)
+        self._map_reduce_plugins = tuple(
+            plugin_class
+            for plugin_class in self.plugins.files_plugins
+            if issubclass(plugin_class, FilesMapReducePlugin)
+        )
 
         self._excluded_plugins = excluded_plugins
         self._included_plugins = included_plugins
@@ -64,74 +327,376 @@ class Runner:
         self._n_jobs = n_jobs
         self._root = root
         self._fix = fix
+        # create patches of the fixes instead of writing the files
+        self._diff = diff
         self._ignore_warnings = ignore_warnings
+        # None for automatic batching by the costs of the files
+        self._chunksize = chunksize
+        self._tail_latency: Optional[float] = None
+        # collects the timings of the plugins if given
+        self._profile = profile
+        # profile the worker processes of the own pools of the runs
+        self._cprofile_dir = cprofile_dir
+        self._tracemalloc_dir = tracemalloc_dir
+        self._phase_timings: Dict[str, float] = {}
+        # a cache passed by the caller is used instead of the cache_dir
+        if cache is None and cache_dir:
+            cache = ResultCache(cache_dir)
+        # fixes are modifying the files, therefore don't cache the results
+        self._cache = cache if not fix else None
 
         init_script_tag_patterns()
         init_special_script_tag_patterns()
 
-    def _check(self, plugin: Plugin, results: Results) -> Results:
-        """Run a single plugin and collect the results"""
-        results.add_plugin_results(plugin.name, plugin.run())
+    def _create_worker(self) -> _Worker:
+        return _Worker(
+            file_plugins=self.plugins.file_plugins,
+            map_reduce_plugins=self._map_reduce_plugins,
+            root=self._root,
+            fix=self._fix,
+            ignore_warnings=self._ignore_warnings,
+            cache=self._cache,
+            diff=self._diff,
+            profile=self._profile is not None,
+            cprofile_dir=self._cprofile_dir,
+            tracemalloc_dir=self._tracemalloc_dir,
+        )
 
-        if self._fix:
-            results.add_plugin_results(plugin.name, plugin.fix())
+    def create_pool(self, ignore_sigterm: bool = False) -> Pool:
+        """Create a pool of worker processes for the plugins and settings of
+        this runner
 
-        return results
+        The pool can be kept by the caller and passed to several runs of
+        runners with the same plugins and settings, see `run`.
 
-    def _check_files(self, plugin: Plugin) -> Results:
-        """Run a files plugin and collect the results"""
-        results = Results(ignore_warnings=self._ignore_warnings)
-        return self._check(plugin, results)
+        Arguments:
+            ignore_sigterm  the workers are only stopped by `Pool.close` and
+                            `Pool.join`, e.g. if the whole process group of
+                            a daemon is terminated
+        """
+        return Pool(
+            processes=self._n_jobs,
+            initializer=initializer,
+            initargs=(self._create_worker(), ignore_sigterm),
+        )
 
-    def _check_file(self, file_path: Path) -> FileResults:
-        """Run all file plugins on a single file and collect the results"""
-        results = FileResults(file_path, ignore_warnings=self._ignore_warnings)
-        context = FilePluginContext(
-            root=self._root, nasl_file=file_path.resolve()
+    @contextmanager
+    def _use_pool(self, pool: Optional[Pool]) -> Iterator[Pool]:
+        if pool is not None:
+            yield pool
+            return
+
+        with self.create_pool() as new_pool:
+            yield new_pool
+
+            if self._cprofile_dir or self._tracemalloc_dir:
+                # the workers only dump their profiles on a normal exit
+                new_pool.close()
+                new_pool.join()
+
+    def _create_batches(
+        self, files: Iterable[Path], sizes: Optional[Dict[Path, int]] = None
+    ) -> List[Sequence[Path]]:
+        timings = self._cache.load_timings() if self._cache else None
+        return create_batches(
+            estimate_costs(files, timings, sizes),
+            self._n_jobs,
+            self._chunksize,
         )
 
-        for plugin_class in self.plugins.file_plugins:
-            plugin = plugin_class(context)
+    def check_files(
+        self, files: Iterable[Path], pool: Pool
+    ) -> Iterator[FileResults]:
+        """Run the file plugins and the map step of the map reduce plugins on
+        the files without reporting the results
 
-            self._check(plugin, results)
+        The results are yielded in the order of completion and contain the
+        facts of the map reduce plugins, see `FileResults.plugin_facts`.
 
-        return results
+        Arguments:
+            files   the files to check
+            pool    a pool of worker processes created by `create_pool`
+        """
+        timings: Dict[str, float] = {}
+        try:
+            for _, batch_results in pool.imap_unordered(
+                _check_file_batch, self._create_batches(files)
+            ):
+                for results, duration in batch_results:
+                    timings[get_timing_key(results.file_path)] = duration
+                    yield results
+        finally:
+            if self._cache:
+                self._cache.save_timings(timings)
 
-    def _run_pooled(self, files: Iterable[Path]):
+    def _report_files_results(
+        self,
+        pending: List[AsyncResult],
+        idle_times: Dict[int, float],
+        wait: bool = False,
+    ) -> List[AsyncResult]:
+        """Report the results of the finished files plugins
+
+        Returns:
+            the still pending files plugins
+        """
+        still_pending = []
+        for async_result in pending:
+            if not wait and not async_result.ready():
+                still_pending.append(async_result)
+                continue
+
+            pid, results, duration = async_result.get()
+            idle_times[pid] = time.monotonic()
+            self._reporter.report_by_plugin(results)
+            if self._profile is not None:
+                self._profile.add_results(results)
+
+            # the files plugins are started right at the beginning of the run
+            self._phase_timings["files plugins"] = max(
+                duration, self._phase_timings.get("files plugins", 0.0)
+            )
+
+        return still_pending
+
+    def _stream_batches(
+        self,
+        files: Iterable[Path],
+        seen: List[Path],
+        slots: threading.BoundedSemaphore,
+        stopped: threading.Event,
+    ) -> Iterator[List[Path]]:
+        """Group the files into batches while they are still being found
+
+        The batches are consumed by the task handler thread of the pool. Each
+        batch takes a slot, which is released after its results have been
+        reported. Therefore the discovery is paused if the workers can't keep
+        up.
+
+        Arguments:
+            files       the files to check, possibly containing duplicates
+            seen        collects the checked files in the order of the input
+            slots       bounds the number of batches sent to the pool
+            stopped     set if the run has been aborted
+        """
+        chunksize = self._chunksize or STREAM_CHUNKSIZE
+        known = set()
+        batch: List[Path] = []
+
+        for nasl_file in itertools.chain(files, [None]):
+            if nasl_file is not None:
+                if nasl_file in known:
+                    continue
+                known.add(nasl_file)
+                seen.append(nasl_file)
+                batch.append(nasl_file)
+                if len(batch) < chunksize:
+                    continue
+            elif not batch:
+                break
+
+            while not slots.acquire(timeout=0.1):
+                if stopped.is_set():
+                    return
+            yield batch
+            batch = []
+
+    def _run_pooled(
+        self,
+        files: Iterable[Path],
+        sizes: Optional[Dict[Path, int]] = None,
+        stream: bool = False,
+        pool: Optional[Pool] = None,
+    ):
         """Run all plugins that check single files"""
-        self._reporter.set_files_count(len(files))
-        with Pool(processes=self._n_jobs, initializer=initializer) as pool:
+        if stream:
+            # the files are only known after the discovery has finished
+            input_files = files
+            files = []
+            self._reporter.set_files_count(None)
+        else:
+            self._reporter.set_files_count(len(files))
+
+        stopped = threading.Event()
+        own_pool = pool is None
+        with self._use_pool(pool) as pool:
             try:
-                # run files plugins
+                start = time.monotonic()
+                idle_times: Dict[int, float] = {}
                 context = FilesPluginContext(root=self._root, nasl_files=files)
                 files_plugins = [
-                    plugin_class(context)
+                    plugin_class
                     for plugin_class in self.plugins.files_plugins
+                    if plugin_class not in self._map_reduce_plugins
                 ]
 
-                for results in pool.imap_unordered(
-                    self._check_files, files_plugins, chunksize=CHUNKSIZE
+                if stream:
+                    slots = threading.BoundedSemaphore(
+                        self._n_jobs * STREAM_BACKLOG
+                    )
+                    batches = self._stream_batches(
+                        input_files, files, slots, stopped
+                    )
+                    pending = []
+                else:
+                    slots = None
+                    batches = self._create_batches(files, sizes)
+                    # Submit the files plugins first. They are running in the
+                    # pool while the other workers are checking the single
+                    # files.
+                    pending = [
+                        pool.apply_async(_check_files, (plugin_class(context),))
+                        for plugin_class in files_plugins
+                    ]
+                    files_plugins = []
+
+                # run file plugins and the map step of the map reduce plugins
+                plugin_facts = {
+                    plugin_class.name: {}
+                    for plugin_class in self._map_reduce_plugins
+                }
+                timings: Dict[str, float] = {}
+                i = 0
+                for pid, batch_results in pool.imap_unordered(
+                    _check_file_batch, batches
                 ):
+                    if slots:
+                        slots.release()
+
+                    idle_times[pid] = time.monotonic()
+                    for results, duration in batch_results:
+                        i += 1
+                        self._reporter.report_by_file_plugin(
+                            file_results=results, pos=i
+                        )
+                        for name, facts in results.plugin_facts.items():
+                            plugin_facts[name][results.file_path] = facts
+                        timings[get_timing_key(results.file_path)] = duration
+                        if self._profile is not None:
+                            self._profile.add_results(results)
+
+                    if pending:
+                        pending = self._report_files_results(
+                            pending, idle_times
+                        )
+
+                self._phase_timings["file plugins"] = time.monotonic() - start
+
+                # the files plugins of a streamed run need the complete list
+                # of the files
+                pending.extend(
+                    pool.apply_async(_check_files, (plugin_class(context),))
+                    for plugin_class in files_plugins
+                )
+                if pending:
+                    self._report_files_results(pending, idle_times, wait=True)
+
+                self._tail_latency = get_tail_latency(
+                    self._n_jobs, start, idle_times.values(), time.monotonic()
+                )
+                if self._cache:
+                    self._cache.save_timings(timings)
+
+                # run the reduce step of the map reduce plugins in order of
+                # the files
+                reduce_start = time.monotonic()
+                for plugin_class in self._map_reduce_plugins:
+                    facts = plugin_facts[plugin_class.name]
+                    start = time.perf_counter()
+                    cpu_start = time.process_time()
+                    results = Results(ignore_warnings=self._ignore_warnings)
+                    results.add_plugin_results(
+                        plugin_class.name,
+                        plugin_class(context).reduce(
+                            (nasl_file, facts[nasl_file])
+                            for nasl_file in files
+                            if nasl_file in facts
+                        ),
+                    )
+                    if self._profile is not None:
+                        self._profile.add(
+                            plugin_class.name,
+                            None,
+                            time.perf_counter() - start,
+                            time.process_time() - cpu_start,
+                        )
                     self._reporter.report_by_plugin(results)
 
-                # run file plugins
-                for i, results in enumerate(
-                    iterable=pool.imap_unordered(
-                        self._check_file, files, chunksize=CHUNKSIZE
-                    ),
-                    start=1,
-                ):
-                    self._reporter.report_by_file_plugin(
-                        file_results=results, pos=i
+                if self._map_reduce_plugins:
+                    self._phase_timings["reduce"] = (
+                        time.monotonic() - reduce_start
                     )
 
             except KeyboardInterrupt:
+                stopped.set()
+                if not own_pool:
+                    # the pool of the caller is shut down by the caller
+                    raise
                 pool.terminate()
                 pool.join()
+            finally:
+                # Terminating the pool on an error joins its task handler
+                # thread, which is waiting for a slot in _stream_batches
+                stopped.set()
+
+    def _run_profiled(
+        self,
+        files: Iterable[Path],
+        sizes: Optional[Dict[Path, int]],
+        stream: bool,
+        pool: Optional[Pool],
+    ) -> None:
+        """Run the plugins with cProfile and tracemalloc started in the
+        workers and merge the data of all processes afterwards"""
+        prepare_dumps(self._cprofile_dir, self._tracemalloc_dir)
+
+        profiler = None
+        if self._cprofile_dir:
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+        try:
+            self._run_pooled(files, sizes, stream, pool)
+        finally:
+            if profiler:
+                dump_parent_cprofile(profiler, self._cprofile_dir)
 
-    def run(self, files: Iterable[Path]) -> bool:
+        if self._cprofile_dir:
+            count = merge_cprofile(self._cprofile_dir, self.plugins)
+            self._reporter.report_info(
+                f"Merged cProfile data of {count} processes into "
+                f"{self._cprofile_dir / CPROFILE_FILE_NAME}, see "
+                f"{self._cprofile_dir / CPROFILE_REPORT_NAME} for the "
+                "plugins"
+            )
+        if self._tracemalloc_dir:
+            count = merge_tracemalloc(self._tracemalloc_dir, self.plugins)
+            self._reporter.report_info(
+                f"Merged tracemalloc data of {count} processes into "
+                f"{self._tracemalloc_dir / TRACEMALLOC_REPORT_NAME}"
+            )
+
+    def run(
+        self,
+        files: Iterable[Path],
+        sizes: Optional[Dict[Path, int]] = None,
+        stream: bool = False,
+        pool: Optional[Pool] = None,
+    ) -> bool:
         """The function that should be executed to run
-        the Plugins over all files"""
+        the Plugins over all files
+
+        Arguments:
+            files   the files to check
+            sizes   the already known sizes of the files if available
+            stream  check the files while they are still being produced by
+                    the iterable, e.g. a discovery of the files. The files
+                    are checked in the order of the iterable instead of
+                    their costs.
+            pool    a pool of warm worker processes kept by the caller,
+                    created by `create_pool`. Otherwise a pool is created
+                    for this run only.
+        """
         if not len(self.plugins):
             raise TroubadixException("No Plugin found.")
 
@@ -143,12 +708,32 @@ class Runner:
         )
 
         start = datetime.datetime.now()
-        self._run_pooled(files)
+        if self._cprofile_dir or self._tracemalloc_dir:
+            self._run_profiled(files, sizes, stream, pool)
+        else:
+            self._run_pooled(files, sizes, stream, pool)
 
-        self._reporter.report_info(
-            f"Time elapsed: {datetime.datetime.now() - start}"
-        )
+        if self._cache:
+            # remove the entries of outdated revisions of the files
+            self._cache.prune()
+
+        timings = [
+            f"{phase}: {datetime.timedelta(seconds=seconds)}"
+            for phase, seconds in sorted(
+                self._phase_timings.items(),
+                key=lambda item: _PHASES.index(item[0]),
+            )
+        ]
+        if self._tail_latency is not None:
+            tail_latency = datetime.timedelta(seconds=self._tail_latency)
+            timings.append(f"tail latency: {tail_latency}")
+
+        elapsed = f"Time elapsed: {datetime.datetime.now() - start}"
+        if timings:
+            elapsed = f"{elapsed} ({', '.join(timings)})"
+        self._reporter.report_info(elapsed)
         self._reporter.report_statistic()
+        self._reporter.flush()
 
         # Return true if no error exists
         return self._reporter.get_error_count() == 0
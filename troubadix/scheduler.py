@@ -0,0 +1,115 @@
+# Copyright (C) 2022 Greenbone Networks GmbH
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+""" Cost aware scheduling of the files for the worker processes """
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+# Each batch of the automatic chunking gets at most 1 / (factor * n_jobs) of
+# the remaining costs, so the batches are shrinking towards the end of a run
+GUIDED_FACTOR = 4
+MAX_BATCH_SIZE = 64
+
+
+def get_timing_key(nasl_file: Path) -> str:
+    return str(nasl_file.resolve())
+
+
+def estimate_costs(
+    files: Iterable[Path],
+    timings: Optional[Dict[str, float]] = None,
+    known_sizes: Optional[Dict[Path, int]] = None,
+) -> Dict[Path, float]:
+    """Estimate the costs of checking each file
+
+    The costs are the durations recorded by a previous run. Files without a
+    recorded duration are estimated by their size, scaled to seconds with the
+    average speed of the recorded files if possible. Sizes already known
+    e.g. from the file discovery are not queried again.
+    """
+    known_sizes = known_sizes or {}
+    sizes = {}
+    for nasl_file in files:
+        size = known_sizes.get(nasl_file)
+        if size is None:
+            try:
+                size = nasl_file.stat().st_size
+            except OSError:
+                size = 0
+        sizes[nasl_file] = size
+
+    if not timings:
+        return {nasl_file: float(size) for nasl_file, size in sizes.items()}
+
+    recorded = {}
+    recorded_size = 0
+    recorded_duration = 0.0
+    for nasl_file, size in sizes.items():
+        duration = timings.get(get_timing_key(nasl_file))
+        if duration is not None:
+            recorded[nasl_file] = duration
+            recorded_size += size
+            recorded_duration += duration
+
+    seconds_per_byte = (
+        recorded_duration / recorded_size if recorded_size else 1.0
+    )
+    return {
+        nasl_file: recorded.get(nasl_file, size * seconds_per_byte)
+        for nasl_file, size in sizes.items()
+    }
+
+
+def create_batches(
+    costs: Dict[Path, float], n_jobs: int, chunksize: Optional[int] = None
+) -> List[Sequence[Path]]:
+    """Group the files into batches for the workers
+
+    The most expensive files are dispatched first. With a fixed chunksize
+    every batch contains chunksize files. Otherwise expensive files are run
+    alone and cheap files are grouped into batches of shrinking costs, to
+    keep all workers busy until the end of the run.
+    """
+    files = sorted(costs, key=costs.__getitem__, reverse=True)
+
+    if chunksize:
+        return [
+            files[i : i + chunksize] for i in range(0, len(files), chunksize)
+        ]
+
+    batches = []
+    remaining = sum(costs.values())
+    batch: List[Path] = []
+    batch_cost = 0.0
+    target = remaining / (GUIDED_FACTOR * n_jobs)
+
+    for nasl_file in files:
+        batch.append(nasl_file)
+        batch_cost += costs[nasl_file]
+
+        if len(batch) >= MAX_BATCH_SIZE or 0 < target <= batch_cost:
+            batches.append(batch)
+            remaining -= batch_cost
+            batch = []
+            batch_cost = 0.0
+            target = remaining / (GUIDED_FACTOR * n_jobs)
+
+    if batch:
+        batches.append(batch)
+
+    return batches
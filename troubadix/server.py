@@ -0,0 +1,262 @@
+# Copyright (C) 2022 Greenbone Networks GmbH
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+""" Long-running daemon checking files for the thin client
+
+The daemon keeps the plugins, the compiled patterns and a pool of warm
+worker processes per root directory. The workers keep the results of the
+file plugins in memory, see `troubadix.cache.MemoryResultCache`. The
+protocol is described in `troubadix.client`.
+"""
+
+import json
+import os
+import socket
+import socketserver
+import sys
+from multiprocessing.pool import Pool
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Optional
+
+from pontos.terminal.terminal import Terminal
+
+from troubadix.cache import MemoryResultCache
+from troubadix.client import encode_message
+from troubadix.helper import get_root
+from troubadix.reporter import Reporter
+from troubadix.runner import Runner
+
+
+class SocketTerminal(Terminal):
+    """A terminal sending the messages together with their style and
+    indentation to the client"""
+
+    def __init__(self, wfile: BinaryIO) -> None:
+        super().__init__()
+        self._wfile = wfile
+
+    def _send(self, style: str, messages: Iterable[Any]) -> None:
+        self._wfile.write(
+            encode_message(
+                {
+                    "style": style,
+                    "indent": self._indent,
+                    "message": "".join(str(message) for message in messages),
+                }
+            )
+        )
+
+    def out(self, *messages: Any, **kwargs: Any) -> None:
+        self._send("print", messages)
+
+    def print(self, *messages: Any, **kwargs: Any) -> None:
+        self._send("print", messages)
+
+    def ok(self, *messages: Any, **kwargs: Any) -> None:
+        self._send("ok", messages)
+
+    def fail(self, *messages: Any, **kwargs: Any) -> None:
+        self._send("fail", messages)
+
+    def error(self, *messages: Any, **kwargs: Any) -> None:
+        self._send("error", messages)
+
+    def warning(self, *messages: Any, **kwargs: Any) -> None:
+        self._send("warning", messages)
+
+    def info(self, *messages: Any, **kwargs: Any) -> None:
+        self._send("info", messages)
+
+    def bold_info(self, *messages: Any, **kwargs: Any) -> None:
+        self._send("bold_info", messages)
+
+    def download_progress(self, progress: Any) -> None:
+        pass
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: "Server"
+
+    def handle(self) -> None:
+        terminal = SocketTerminal(self.wfile)
+        try:
+            job = json.loads(self.rfile.readline())
+            files = [Path(nasl_file) for nasl_file in job["files"]]
+        except (ValueError, KeyError, TypeError) as e:
+            terminal.error(f"Invalid job: {e}")
+            self.wfile.write(encode_message({"exit_code": 1}))
+            return
+
+        success = self.server.check(
+            files,
+            terminal,
+            verbose=job.get("verbose", 0),
+            statistic=job.get("statistic", True),
+        )
+        self.wfile.write(encode_message({"exit_code": 0 if success else 1}))
+
+
+class Server(socketserver.UnixStreamServer):
+    """Checks the files sent by clients on a Unix domain socket
+
+    The jobs are checked one after another by the workers. The socket is
+    only accessible by the current user.
+    """
+
+    def __init__(
+        self,
+        socket_path: Path,
+        *,
+        n_jobs: int,
+        root: Optional[Path] = None,
+        excluded_plugins: Iterable[str] = None,
+        included_plugins: Iterable[str] = None,
+        fix: bool = False,
+        ignore_warnings: bool = False,
+        cache_dir: Optional[Path] = None,
+        chunksize: Optional[int] = None,
+    ) -> None:
+        self.socket_path = socket_path
+        self._root = root
+        self._n_jobs = n_jobs
+        self._excluded_plugins = excluded_plugins
+        self._included_plugins = included_plugins
+        self._fix = fix
+        self._ignore_warnings = ignore_warnings
+        self._chunksize = chunksize
+        self._cache = MemoryResultCache(cache_dir)
+        self._pools: Dict[Path, Pool] = {}
+
+        _remove_stale_socket(socket_path)
+        umask = os.umask(0o077)
+        try:
+            super().__init__(os.fspath(socket_path), _RequestHandler)
+        finally:
+            os.umask(umask)
+
+    def _create_runner(self, root: Path, reporter: Reporter) -> Runner:
+        return Runner(
+            n_jobs=self._n_jobs,
+            reporter=reporter,
+            root=root,
+            excluded_plugins=self._excluded_plugins,
+            included_plugins=self._included_plugins,
+            fix=self._fix,
+            ignore_warnings=self._ignore_warnings,
+            cache=self._cache,
+            chunksize=self._chunksize,
+        )
+
+    def _get_pool(self, root: Path, runner: Runner) -> Pool:
+        pool = self._pools.get(root)
+        if pool is None:
+            pool = runner.create_pool(ignore_sigterm=True)
+            self._pools[root] = pool
+        return pool
+
+    def start(self, terminal: Terminal) -> None:
+        """Start the workers for the root directory if already known"""
+        if self._root:
+            reporter = Reporter(term=terminal, root=self._root)
+            self._get_pool(
+                self._root, self._create_runner(self._root, reporter)
+            )
+
+    def check(
+        self,
+        files: Iterable[Path],
+        terminal: Terminal,
+        *,
+        verbose: int = 0,
+        statistic: bool = True,
+    ) -> bool:
+        """Check the files and report the results to the terminal
+
+        Returns:
+            True if no errors have been found
+        """
+        files = list(dict.fromkeys(files))
+        missing = [nasl_file for nasl_file in files if not nasl_file.is_file()]
+        if not files or missing:
+            terminal.warning(
+                "No files given/found."
+                if not files
+                else f"Files not found: {', '.join(map(str, missing))}"
+            )
+            return False
+
+        root = self._root or get_root(files[0].resolve())
+        reporter = Reporter(
+            term=terminal,
+            root=root,
+            fix=self._fix,
+            statistic=statistic,
+            verbose=verbose,
+            ignore_warnings=self._ignore_warnings,
+        )
+        runner = self._create_runner(root, reporter)
+
+        terminal.info(f"Start linting {len(files)} files ... ")
+        try:
+            return runner.run(files, pool=self._get_pool(root, runner))
+        finally:
+            reporter.close()
+
+    def handle_error(self, request, client_address) -> None:
+        # a client closing the connection early is not an error of the daemon
+        if not isinstance(
+            sys.exc_info()[1], (BrokenPipeError, ConnectionError)
+        ):
+            super().handle_error(request, client_address)
+
+    def server_close(self) -> None:
+        """Stop the workers and remove the socket
+
+        The workers are finishing their current tasks before they are
+        stopped.
+        """
+        super().server_close()
+        for pool in self._pools.values():
+            pool.close()
+            pool.join()
+        self._pools.clear()
+
+        try:
+            self.socket_path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _remove_stale_socket(socket_path: Path) -> None:
+    """Remove the socket of a daemon, which is not running anymore
+
+    Raises:
+        FileExistsError if another daemon is listening on the socket
+    """
+    if not socket_path.exists():
+        return
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(os.fspath(socket_path))
+        except ConnectionRefusedError:
+            socket_path.unlink()
+            return
+
+    raise FileExistsError(
+        f"Another troubadix daemon is listening on {socket_path}"
+    )
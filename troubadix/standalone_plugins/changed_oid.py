@@ -21,7 +21,15 @@ import sys
 import os
 from argparse import ArgumentParser, Namespace
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Iterator
+
+from troubadix.plugin import LinterError, LinterResult
+from troubadix.standalone_plugins.diff import DiffRule, FileDiff, get_vt_diffs
+
+OID_PATTERN = re.compile(
+    r'^\s*script_oid\s*\(\s*["\'](?P<oid>[0-9.]+)["\']\s*\)\s*;',
+    re.MULTILINE,
+)
 
 
 def file_type(string: str) -> Path:
@@ -71,9 +79,8 @@ def git(*args) -> str:
     ).stdout
 
 
-def check_oid(args: Namespace) -> bool:
-    """The script checks (via git diff) if the passed VT has changed the
-    OID in the following tag:
+class ChangedOIDRule(DiffRule):
+    """Reports a changed OID in the following tag:
 
     - script_oid("1.2.3");
 
@@ -81,53 +88,40 @@ def check_oid(args: Namespace) -> bool:
     two VTs).
     """
 
-    if not args.files:
-        args.files += [
-            Path(f)
-            for f in git(
-                "diff", "--name-only", "--diff-filter=d", args.commit_range
-            ).splitlines()
-        ]
+    name = "changed_oid"
 
-    rcode = False
-    for nasl_file in args.files:
-        if nasl_file.suffix != ".nasl" or not nasl_file.exists():
-            continue
-
-        print(f"Check file {nasl_file}")
-        text = git(
-            "-c",
-            "color.status=false",
-            "--no-pager",
-            "diff",
-            args.commit_range,
-            nasl_file,
-        )
-
-        oid_added = re.search(
-            r'^\+\s*script_oid\s*\(\s*["\'](?P<oid>[0-9.]+)["\']\s*\)\s*;',
-            text,
-            re.MULTILINE,
-        )
+    def check(self, file_diff: FileDiff) -> Iterator[LinterResult]:
+        oid_added = OID_PATTERN.search(file_diff.added_text)
         if not oid_added or not oid_added.group("oid"):
-            continue
+            return
 
-        oid_removed = re.search(
-            r'^-\s*script_oid\s*\(\s*["\'](?P<oid>[0-9.]+)["\']\s*\)\s*;',
-            text,
-            re.MULTILINE,
-        )
+        oid_removed = OID_PATTERN.search(file_diff.removed_text)
         if not oid_removed or not oid_removed.group("oid"):
-            continue
+            return
 
         if oid_added.group("oid") != oid_removed.group("oid"):
-            print(
-                f"OID of VT {nasl_file} was changed. This is only allowed in "
-                f"rare cases (e.g. a duplicate OID got fixed or a single VT "
-                f"was split into two VTs)."
+            yield LinterError(
+                f"OID of VT {file_diff.path} was changed. This is only "
+                f"allowed in rare cases (e.g. a duplicate OID got fixed or a "
+                f"single VT was split into two VTs)."
                 f"\nOID NEW: {oid_added.group('oid')}"
-                f"\nOID OLD: {oid_removed.group('oid')}"
+                f"\nOID OLD: {oid_removed.group('oid')}",
+                file=file_diff.path,
+                plugin=self.name,
             )
+
+
+def check_oid(args: Namespace) -> bool:
+    """The script checks (via git diff) if the passed VT has changed the
+    OID, see `ChangedOIDRule`.
+    """
+    rule = ChangedOIDRule()
+
+    rcode = False
+    for file_diff in get_vt_diffs(args.commit_range, args.files):
+        print(f"Check file {file_diff.path}")
+        for result in rule.check(file_diff):
+            print(result.message)
             rcode = True
     return rcode
 
@@ -0,0 +1,210 @@
+# Copyright (C) 2022 Greenbone Networks GmbH
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+""" Single pass analysis of the changes of a git commit range """
+
+import codecs
+import re
+import subprocess
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Sequence
+
+from troubadix.helper.git import get_toplevel
+from troubadix.plugin import LinterResult
+
+_HUNK_PATTERN = re.compile(rb"^@@ -(?P<old>\d+)(?:,\d+)? \+(?P<new>\d+)")
+_QUOTED_PATH_PATTERN = re.compile(rb'^"(?P<path>(?:[^"\\]|\\.)*)"')
+
+
+class DiffLine(NamedTuple):
+    # the line number in the old file for removed lines and in the new file
+    # for added lines
+    line: int
+    text: str
+
+
+class FileDiff(NamedTuple):
+    path: Path
+    added: List[DiffLine]
+    removed: List[DiffLine]
+
+    @property
+    def added_text(self) -> str:
+        """The added lines joined to a single text"""
+        return "\n".join(line.text for line in self.added)
+
+    @property
+    def removed_text(self) -> str:
+        """The removed lines joined to a single text"""
+        return "\n".join(line.text for line in self.removed)
+
+
+class DiffRule(ABC):
+    """A check running on the changes of a single file"""
+
+    name: str = None
+
+    @abstractmethod
+    def check(self, file_diff: FileDiff) -> Iterator[LinterResult]:
+        pass
+
+
+def _unquote(path: bytes) -> bytes:
+    """Remove the C style quoting git applies to unusual paths"""
+    match = _QUOTED_PATH_PATTERN.match(path)
+    if not match:
+        return path
+    return codecs.escape_decode(match.group("path"))[0]
+
+
+def _parse_path(name: bytes, prefix: bytes) -> Path:
+    name = _unquote(name)
+    if name.startswith(prefix):
+        name = name[len(prefix) :]
+    # paths are decoded like the content of the diff
+    return Path(name.decode("latin-1"))
+
+
+def _parse_git_header(header: bytes) -> Path:
+    # "a/<path> b/<path>" with identical paths, because renames are disabled.
+    # The path is corrected by the "+++ b/<path>" line if there is one.
+    if header.startswith(b'"'):
+        return _parse_path(header, b"a/")
+    return _parse_path(header[: (len(header) - 1) // 2], b"a/")
+
+
+def parse_diff(lines: Iterable[bytes]) -> Iterator[FileDiff]:
+    """Parse the lines of a `git diff -U0 --no-renames` output
+
+    The output is processed line by line and each file is yielded as soon as
+    all of its changes have been read.
+    """
+    path: Optional[Path] = None
+    added: List[DiffLine] = []
+    removed: List[DiffLine] = []
+    in_hunk = False
+    old_line = new_line = 0
+
+    for raw_line in lines:
+        if raw_line.startswith(b"diff --git "):
+            if path is not None:
+                yield FileDiff(path, added, removed)
+
+            path = _parse_git_header(raw_line[11:].rstrip(b"\n"))
+            added = []
+            removed = []
+            in_hunk = False
+            continue
+
+        if path is None:
+            continue
+
+        if in_hunk:
+            prefix = raw_line[:1]
+            if prefix == b"+":
+                text = raw_line[1:].rstrip(b"\n").decode("latin-1")
+                added.append(DiffLine(new_line, text))
+                new_line += 1
+                continue
+            if prefix == b"-":
+                text = raw_line[1:].rstrip(b"\n").decode("latin-1")
+                removed.append(DiffLine(old_line, text))
+                old_line += 1
+                continue
+            if prefix == b"\\":
+                # "\ No newline at end of file"
+                continue
+
+        match = _HUNK_PATTERN.match(raw_line)
+        if match:
+            old_line = int(match.group("old"))
+            new_line = int(match.group("new"))
+            in_hunk = True
+        elif not in_hunk and raw_line.startswith(b"+++ "):
+            name = raw_line[4:].rstrip(b"\n").rstrip(b"\t")
+            if name != b"/dev/null":
+                path = _parse_path(name, b"b/")
+
+    if path is not None:
+        yield FileDiff(path, added, removed)
+
+
+def git_diff(
+    commit_range: str, files: Sequence[Path] = ()
+) -> Iterator[FileDiff]:
+    """Get the changes of all added or modified files within a commit range
+
+    A single git process is spawned for all files and its output is parsed
+    while it is running.
+
+    Arguments:
+        commit_range    the commit range e.g. "main..HEAD"
+        files           limit the diff to these files
+    """
+    args = [
+        "git",
+        "--no-pager",
+        "diff",
+        "-U0",
+        "--no-color",
+        "--no-ext-diff",
+        "--no-textconv",
+        "--no-renames",
+        "--text",
+        "--diff-filter=d",
+        "--src-prefix=a/",
+        "--dst-prefix=b/",
+        commit_range,
+        "--",
+    ] + [str(nasl_file) for nasl_file in files]
+
+    with subprocess.Popen(args, stdout=subprocess.PIPE) as process:
+        yield from parse_diff(process.stdout)
+
+    if process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, args)
+
+
+def get_vt_diffs(
+    commit_range: str, files: Sequence[Path] = ()
+) -> Iterator[FileDiff]:
+    """Get the changes of the existing VTs within a commit range
+
+    If files are passed, each of them is checked even if it hasn't been
+    changed at all. The passed files are reported with their paths as given,
+    all other files with their paths relative to the root directory of the
+    repository.
+    """
+    toplevel = get_toplevel()
+    # git reports the paths relative to the root directory of the working
+    # tree, while the passed files may be given in any spelling
+    requested = {nasl_file.resolve(): nasl_file for nasl_file in files}
+    seen = set()
+    for file_diff in git_diff(commit_range, files):
+        path = (toplevel / file_diff.path).resolve()
+        seen.add(path)
+        if file_diff.path.suffix == ".nasl" and path.exists():
+            if path in requested:
+                file_diff = file_diff._replace(path=requested[path])
+            yield file_diff
+
+    for path, nasl_file in requested.items():
+        if path in seen:
+            continue
+        if nasl_file.suffix == ".nasl" and nasl_file.exists():
+            yield FileDiff(nasl_file, [], [])
@@ -0,0 +1,129 @@
+# Copyright (C) 2022 Greenbone Networks GmbH
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+""" Run all diff rules on the changes of a commit range at once """
+
+import os
+import subprocess
+import sys
+from argparse import ArgumentParser, Namespace
+from pathlib import Path
+from typing import Iterable, List
+
+from troubadix.standalone_plugins.changed_oid import ChangedOIDRule
+from troubadix.standalone_plugins.diff import DiffRule, get_vt_diffs
+from troubadix.standalone_plugins.version_updated import VersionUpdatedRule
+
+DIFF_RULES = [
+    ChangedOIDRule,
+    VersionUpdatedRule,
+]
+
+
+def file_type(string: str) -> Path:
+    file_path = Path(string)
+    if not file_path.is_file():
+        raise ValueError(f"{string} is not a file.")
+    return file_path
+
+
+def parse_args(args: Iterable[str]) -> Namespace:
+    parser = ArgumentParser(
+        description="Check the changes of a commit range with all diff rules",
+    )
+    parser.add_argument(
+        "-c",
+        "--commit_range",
+        type=str,
+        required=True,
+        help=(
+            "Git commit range to check e.g "
+            "2c87f4b6062804231fd508411510ca07fd270380^..HEAD or "
+            "YOUR_BRANCH..main"
+        ),
+    )
+    parser.add_argument(
+        "-f",
+        "--files",
+        nargs="+",
+        type=file_type,
+        default=[],
+        help=(
+            "List of files to diff. "
+            "If empty use all files added or modified in the commit range"
+        ),
+    )
+    parser.add_argument(
+        "--exclude-rules",
+        nargs="+",
+        choices=[rule.name for rule in DIFF_RULES],
+        default=[],
+        help="The diff rules to skip",
+    )
+    return parser.parse_args(args=args)
+
+
+def check_diff(
+    rules: List[DiffRule], files: List[Path], commit_range: str
+) -> bool:
+    """Run the rules on the changes of all VTs within the commit range
+
+    Returns:
+        True if none of the rules reported an error
+    """
+    rcode = True
+    for file_diff in get_vt_diffs(commit_range, files):
+        print(f"Check file {file_diff.path}")
+        for rule in rules:
+            for result in rule.check(file_diff):
+                print(result.message, file=sys.stderr)
+                rcode = False
+
+    return rcode
+
+
+def main() -> int:
+    args = sys.argv[1:]
+
+    try:
+        git_base = subprocess.run(
+            ["git", "rev-parse", "--show-toplevel"],
+            capture_output=True,
+            encoding="latin-1",
+            check=True,
+        ).stdout
+        os.chdir(git_base.rstrip("\n"))
+    except subprocess.SubprocessError:
+        print(
+            "Your current working directory doesn't belong to a git repository"
+        )
+        return 1
+
+    parsed_args = parse_args(args)
+    rules = [
+        rule()
+        for rule in DIFF_RULES
+        if rule.name not in parsed_args.exclude_rules
+    ]
+    if not check_diff(rules, parsed_args.files, parsed_args.commit_range):
+        return 2
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
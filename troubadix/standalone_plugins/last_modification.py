@@ -20,20 +20,32 @@
 import datetime
 import re
 import sys
+import time
 from argparse import ArgumentParser, ArgumentTypeError, Namespace
+from collections import Counter
+from enum import Enum
+from functools import partial
+from multiprocessing import Pool, cpu_count
 from pathlib import Path
-from typing import Iterable, Sequence
+from typing import Iterable, Iterator, NamedTuple, Optional, Sequence, Tuple
 
 from pontos.terminal import Terminal
 from pontos.terminal.terminal import ConsoleTerminal
 
-from troubadix.helper import CURRENT_ENCODING
+from troubadix.argparser import check_cpu_count
+from troubadix.helper import CURRENT_ENCODING, write_file_atomically
 from troubadix.helper.patterns import (
     LAST_MODIFICATION_ANY_VALUE_PATTERN,
     SCRIPT_VERSION_ANY_VALUE_PATTERN,
 )
 from troubadix.troubadix import from_file
 
+LAST_MODIFICATION_PATTERN = re.compile(LAST_MODIFICATION_ANY_VALUE_PATTERN)
+SCRIPT_VERSION_PATTERN = re.compile(SCRIPT_VERSION_ANY_VALUE_PATTERN)
+
+# Number of files sent to a worker process at once
+CHUNKSIZE = 16
+
 
 def existing_file_type(string: str) -> Path:
     file_path = Path(string)
@@ -44,30 +56,47 @@ def existing_file_type(string: str) -> Path:
     return file_path
 
 
-def update(nasl_file: Path, terminal: Terminal):
-    file_content = nasl_file.read_text(encoding=CURRENT_ENCODING)
+class UpdateStatus(Enum):
+    UPDATED = "updated"
+    UNCHANGED = "unchanged"
+    MISSING_LAST_MODIFICATION = "missing_last_modification"
+    MISSING_SCRIPT_VERSION = "missing_script_version"
+    FAILED = "failed"
+
+
+class UpdateResult(NamedTuple):
+    nasl_file: Path
+    status: UpdateStatus
+    message: str = ""
+
+
+def get_now() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
 
+
+def update_content(
+    file_content: str, now: datetime.datetime
+) -> Tuple[UpdateStatus, str]:
+    """Set the last_modification tag and the script_version of the content
+    of a VT to the passed time
+
+    Returns:
+        the status and the updated content
+    """
     # update modification date
     tag_template = 'script_tag(name:"last_modification", value:"{date}");'
 
-    match_last_modification_any_value = re.search(
-        pattern=LAST_MODIFICATION_ANY_VALUE_PATTERN,
-        string=file_content,
+    match_last_modification_any_value = LAST_MODIFICATION_PATTERN.search(
+        file_content
     )
-
     if not match_last_modification_any_value:
-        terminal.warning(
-            f'Ignoring "{nasl_file}" because it is missing a '
-            "last_modification tag."
-        )
-        return
+        return UpdateStatus.MISSING_LAST_MODIFICATION, file_content
 
-    now = datetime.datetime.now(datetime.timezone.utc)
     # get that date formatted correctly:
     # "2021-03-24 10:08:26 +0000 (Wed, 24 Mar 2021)"
     correctly_formatted_datetime = f"{now:%Y-%m-%d %H:%M:%S %z (%a, %d %b %Y)}"
 
-    file_content = file_content.replace(
+    new_file_content = file_content.replace(
         match_last_modification_any_value.group(0),
         tag_template.format(date=correctly_formatted_datetime),
     )
@@ -75,26 +104,100 @@ def update(nasl_file: Path, terminal: Terminal):
     # update script version
     script_version_template = 'script_version("{date}");'
 
-    match_script_version = re.search(
-        pattern=SCRIPT_VERSION_ANY_VALUE_PATTERN,
-        string=file_content,
-    )
+    match_script_version = SCRIPT_VERSION_PATTERN.search(new_file_content)
     if not match_script_version:
-        terminal.warning(
-            f'Ignoring "{nasl_file}" because it is missing a ' "script_version."
-        )
-        return
+        return UpdateStatus.MISSING_SCRIPT_VERSION, file_content
 
     # get that date formatted correctly:
     # "2021-03-24T10:08:26+0000"
     correctly_formatted_version = f"{now:%Y-%m-%dT%H:%M:%S%z}"
 
-    new_file_content = file_content.replace(
+    new_file_content = new_file_content.replace(
         match_script_version.group(0),
         script_version_template.format(date=correctly_formatted_version),
     )
 
-    nasl_file.write_text(new_file_content, encoding=CURRENT_ENCODING)
+    if new_file_content == file_content:
+        return UpdateStatus.UNCHANGED, file_content
+
+    return UpdateStatus.UPDATED, new_file_content
+
+
+def update_file(
+    nasl_file: Path, now: datetime.datetime, dry_run: bool = False
+) -> UpdateResult:
+    """Update a single file, see `update_content`
+
+    The file is replaced atomically. With dry_run the file is only checked
+    for changes and not written.
+    """
+    try:
+        # keep the line endings of the file
+        with nasl_file.open("r", encoding=CURRENT_ENCODING, newline="") as f:
+            file_content = f.read()
+
+        status, new_file_content = update_content(file_content, now)
+        if status == UpdateStatus.UPDATED and not dry_run:
+            write_file_atomically(
+                nasl_file, new_file_content.encode(CURRENT_ENCODING)
+            )
+    except (OSError, UnicodeError) as e:
+        return UpdateResult(nasl_file, UpdateStatus.FAILED, str(e))
+
+    return UpdateResult(nasl_file, status)
+
+
+def report(result: UpdateResult, terminal: Terminal, dry_run: bool) -> None:
+    if result.status == UpdateStatus.UPDATED:
+        if dry_run:
+            terminal.info(f'Would update "{result.nasl_file}"')
+        else:
+            terminal.info(f'Updated "{result.nasl_file}"')
+    elif result.status == UpdateStatus.MISSING_LAST_MODIFICATION:
+        terminal.warning(
+            f'Ignoring "{result.nasl_file}" because it is missing a '
+            "last_modification tag."
+        )
+    elif result.status == UpdateStatus.MISSING_SCRIPT_VERSION:
+        terminal.warning(
+            f'Ignoring "{result.nasl_file}" because it is missing a '
+            "script_version."
+        )
+    elif result.status == UpdateStatus.FAILED:
+        terminal.error(
+            f'Failed to update "{result.nasl_file}": {result.message}'
+        )
+
+
+def update(
+    nasl_file: Path,
+    terminal: Terminal,
+    now: Optional[datetime.datetime] = None,
+) -> UpdateResult:
+    """Update a single file and report the result"""
+    result = update_file(nasl_file, now or get_now())
+    report(result, terminal, dry_run=False)
+    return result
+
+
+def update_files(
+    files: Iterable[Path],
+    now: datetime.datetime,
+    n_jobs: int = 1,
+    dry_run: bool = False,
+) -> Iterator[UpdateResult]:
+    """Update all files with the same time, using a pool of n_jobs worker
+    processes for more than one job
+
+    The results are yielded in the order of completion.
+    """
+    worker = partial(update_file, now=now, dry_run=dry_run)
+    if n_jobs < 2:
+        yield from map(worker, files)
+        return
+
+    with Pool(processes=n_jobs) as pool:
+        yield from pool.imap_unordered(worker, files, chunksize=CHUNKSIZE)
 
 
 def parse_args(args: Sequence[str] = None) -> Namespace:
@@ -117,6 +220,22 @@ def parse_args(args: Sequence[str] = None) -> Namespace:
             "updated. Files should be separated by newline."
         ),
     )
+    parser.add_argument(
+        "-j",
+        "--n-jobs",
+        dest="n_jobs",
+        default=max(cpu_count() // 2, 1),
+        type=check_cpu_count,
+        help=(
+            "Define number of jobs, that should run simultaneously. "
+            "Default: %(default)s"
+        ),
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only report the files that would be updated",
+    )
     return parser.parse_args(args)
 
 
@@ -132,14 +251,38 @@ def main() -> int:
         # will not happen
         sys.exit(1)
 
+    nasl_files = []
     for nasl_file in files:
         if nasl_file.suffix != ".nasl":
             terminal.warning(f'Skipping "{nasl_file}". Not a nasl file.')
             continue
+        nasl_files.append(nasl_file)
+
+    # all files get the same time
+    now = get_now()
+    dry_run = parsed_args.dry_run
+    counts = Counter()
+    start = time.monotonic()
+
+    for result in update_files(
+        nasl_files, now, n_jobs=parsed_args.n_jobs, dry_run=dry_run
+    ):
+        report(result, terminal, dry_run)
+        counts[result.status] += 1
+
+    duration = time.monotonic() - start
+    throughput = len(nasl_files) / duration if duration > 0 else 0.0
+    verb = "Would update" if dry_run else "Updated"
+    terminal.info(
+        f"{verb} {counts[UpdateStatus.UPDATED]} of {len(nasl_files)} files "
+        f"in {duration:.2f}s ({throughput:.0f} files/s), "
+        f"ignored {counts[UpdateStatus.MISSING_LAST_MODIFICATION]} files "
+        f"without last_modification and "
+        f"{counts[UpdateStatus.MISSING_SCRIPT_VERSION]} files without "
+        f"script_version, failed {counts[UpdateStatus.FAILED]} files"
+    )
 
-        terminal.info(f'Updating "{nasl_file}"')
-        update(nasl_file, terminal)
-    return 0
+    return 1 if counts[UpdateStatus.FAILED] else 0
 
 
 if __name__ == "__main__":
@@ -21,18 +21,21 @@ import subprocess
 import sys
 from argparse import ArgumentParser, Namespace
 from pathlib import Path
-from typing import Iterable, List
+from typing import Iterable, Iterator, List
 
 from troubadix.helper.patterns import (
     LAST_MODIFICATION_ANY_VALUE_PATTERN,
     SCRIPT_VERSION_ANY_VALUE_PATTERN,
 )
+from troubadix.plugin import LinterError, LinterResult
+from troubadix.standalone_plugins.diff import DiffRule, FileDiff, get_vt_diffs
 
+# Matched against the added lines of a file
 SCRIPT_VERSION_PATTERN = re.compile(
-    r"^\+\s*" + SCRIPT_VERSION_ANY_VALUE_PATTERN, re.MULTILINE
+    r"^\s*" + SCRIPT_VERSION_ANY_VALUE_PATTERN, re.MULTILINE
 )
 SCRIPT_LAST_MODIFICATION_PATTERN = re.compile(
-    r"^\+\s*" + LAST_MODIFICATION_ANY_VALUE_PATTERN, re.MULTILINE
+    r"^\s*" + LAST_MODIFICATION_ANY_VALUE_PATTERN, re.MULTILINE
 )
 
 
@@ -84,48 +87,45 @@ def git(*args) -> str:
     ).stdout
 
 
-def check_version_updated(files: List[Path], commit_range: str) -> bool:
-    """The script checks (via git diff) if the passed VT has changed the
-    the following tags:
+class VersionUpdatedRule(DiffRule):
+    """Reports a changed VT that did not update the following tags:
 
     - script_version("[...]");
     - script_tag(name:"last_modification", value:"[...]");
     """
 
-    if not files:
-        files = [
-            Path(f)
-            for f in git(
-                "diff", "--name-only", "--diff-filter=d", commit_range
-            ).splitlines()
-        ]
+    name = "version_updated"
 
-    rcode = True
-    for nasl_file in files:
-        if nasl_file.suffix != ".nasl" or not nasl_file.exists():
-            continue
-
-        print(f"Check file {nasl_file}")
-        text = git(
-            "-c",
-            "color.status=false",
-            "--no-pager",
-            "diff",
-            commit_range,
-            nasl_file,
-        )
+    def check(self, file_diff: FileDiff) -> Iterator[LinterResult]:
+        text = file_diff.added_text
 
         if not SCRIPT_VERSION_PATTERN.search(text):
-            print(
-                f"{nasl_file}: Missing updated script_version", file=sys.stderr
+            yield LinterError(
+                f"{file_diff.path}: Missing updated script_version",
+                file=file_diff.path,
+                plugin=self.name,
             )
-            rcode = False
 
         if not SCRIPT_LAST_MODIFICATION_PATTERN.search(text):
-            print(
-                f"{nasl_file}: Missing updated last_modification",
-                file=sys.stderr,
+            yield LinterError(
+                f"{file_diff.path}: Missing updated last_modification",
+                file=file_diff.path,
+                plugin=self.name,
             )
+
+
+def check_version_updated(files: List[Path], commit_range: str) -> bool:
+    """The script checks (via git diff) if the passed VT has changed the
+    the script_version and last_modification tags, see
+    `VersionUpdatedRule`.
+    """
+    rule = VersionUpdatedRule()
+
+    rcode = True
+    for file_diff in get_vt_diffs(commit_range, files):
+        print(f"Check file {file_diff.path}")
+        for result in rule.check(file_diff):
+            print(result.message, file=sys.stderr)
             rcode = False
 
     return rcode
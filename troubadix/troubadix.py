@@ -17,19 +17,40 @@
 
 """ Main module for troubadix """
 
+import itertools
+import os
+import signal
 import sys
+from argparse import Namespace
 from pathlib import Path
-from typing import Iterable, List, Tuple
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple
 
 from pontos.terminal import Terminal
 from pontos.terminal.terminal import ConsoleTerminal
 
 from troubadix.__version__ import __version__
 from troubadix.argparser import parse_args
+from troubadix.dependency_index import DependencyIndex
+from troubadix.discovery import FileFinder
 from troubadix.helper import get_root
-from troubadix.reporter import Reporter
+from troubadix.helper.git import (
+    FileChanges,
+    GitError,
+    get_file_changes,
+    get_toplevel,
+)
+from troubadix.reporter import (
+    JSONLinesSink,
+    JUnitSink,
+    PatchSink,
+    Reporter,
+    SARIFSink,
+)
 from troubadix.runner import Runner
 
+# Maximum number of bytes read at once from the standard input
+STDIN_BUFFER_SIZE = 64 * 1024
+
 
 def generate_file_list(
     dirs: Iterable[Path],
@@ -48,18 +69,7 @@ def generate_file_list(
 
     Returns
     List of Path objects"""
-    files: List[Path] = []
-    for directory in dirs:
-        for pattern in include_patterns:
-            files.extend(directory.glob(pattern))
-    if exclude_patterns:
-        excluded_files = []
-        for directory in dirs:
-            for pattern in exclude_patterns:
-                excluded_files.extend(directory.glob(pattern))
-        files = [f for f in files if f not in excluded_files]
-
-    return files
+    return list(FileFinder(include_patterns, exclude_patterns).find(dirs))
 
 
 def generate_patterns(
@@ -107,6 +117,154 @@ def from_file(include_file: Path, term: Terminal) -> Iterable[Path]:
         sys.exit(1)
 
 
+def from_git(
+    finder: FileFinder,
+    *,
+    revision: Optional[str],
+    staged: bool,
+    term: Terminal,
+) -> FileChanges:
+    """Get the changed and deleted files of the git repository of the
+    current working directory, that are matching the patterns of the
+    finder"""
+    try:
+        toplevel = get_toplevel()
+        changes = get_file_changes(revision, staged=staged, toplevel=toplevel)
+    except GitError as e:
+        term.error(f"Unable to get the changed files from git. {e}")
+        sys.exit(1)
+
+    return FileChanges(
+        *(
+            [
+                nasl_file
+                for nasl_file in files
+                if finder.match(nasl_file.relative_to(toplevel).as_posix())
+            ]
+            for files in changes
+        )
+    )
+
+
+def from_stdin(
+    separator: bytes, stdin: Optional[BinaryIO] = None
+) -> Iterator[Path]:
+    """Read the files separated by the separator from the standard input
+
+    The files are yielded as soon as they are read, while the input is still
+    being written.
+    """
+    stdin = stdin or sys.stdin.buffer
+    rest = b""
+    end = False
+    while not end:
+        chunk = stdin.read1(STDIN_BUFFER_SIZE)
+        end = not chunk
+
+        *names, rest = (rest + chunk).split(separator)
+        if end:
+            names.append(rest)
+
+        for name in names:
+            if separator == b"\n":
+                name = name.rstrip(b"\r")
+            if name:
+                yield Path(os.fsdecode(name))
+
+
+def serve(parsed_args: Namespace, term: Terminal) -> None:
+    """Run the daemon until it is interrupted or terminated"""
+    # pylint: disable=import-outside-toplevel
+    from troubadix.client import get_default_socket_path
+    from troubadix.server import Server
+
+    socket_path = parsed_args.socket or get_default_socket_path()
+    try:
+        server = Server(
+            socket_path,
+            n_jobs=parsed_args.n_jobs,
+            root=parsed_args.root,
+            excluded_plugins=parsed_args.excluded_plugins,
+            included_plugins=parsed_args.included_plugins,
+            fix=parsed_args.fix,
+            ignore_warnings=parsed_args.ignore_warnings,
+            cache_dir=parsed_args.cache_dir,
+            chunksize=parsed_args.chunksize,
+        )
+    except OSError as e:
+        term.error(f"Unable to start the daemon. {e}")
+        sys.exit(1)
+
+    # stop gracefully on SIGTERM too
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        server.start(term)
+        term.info(f"Listening on {socket_path}")
+        server.serve_forever()
+    except KeyboardInterrupt:
+        term.info("Stopping the daemon")
+    finally:
+        server.server_close()
+
+
+def watch(
+    parsed_args: Namespace,
+    term: Terminal,
+    *,
+    dirs: Iterable[Path],
+    finder: FileFinder,
+    root: Path,
+) -> None:
+    """Check the changed files of the directories until interrupted"""
+    # pylint: disable=import-outside-toplevel
+    from troubadix.cache import (
+        DEFAULT_CACHE_DIR,
+        MemoryResultCache,
+        ResultCache,
+    )
+    from troubadix.watch import Watcher
+
+    reporter = Reporter(
+        term=term,
+        root=root,
+        verbose=parsed_args.verbose,
+        ignore_warnings=parsed_args.ignore_warnings,
+    )
+    runner = Runner(
+        reporter=reporter,
+        n_jobs=parsed_args.n_jobs,
+        excluded_plugins=parsed_args.excluded_plugins,
+        included_plugins=parsed_args.included_plugins,
+        ignore_warnings=parsed_args.ignore_warnings,
+        root=root,
+        # unchanged files are skipped by the warm workers
+        cache=MemoryResultCache(parsed_args.cache_dir),
+        chunksize=parsed_args.chunksize,
+    )
+    watcher = Watcher(
+        runner,
+        term,
+        dirs=dirs,
+        finder=finder,
+        root=root,
+        index=DependencyIndex(
+            root, ResultCache(parsed_args.cache_dir or DEFAULT_CACHE_DIR)
+        ),
+        verbose=parsed_args.verbose,
+        ignore_warnings=parsed_args.ignore_warnings,
+    )
+
+    pool = runner.create_pool()
+    try:
+        watcher.watch(pool)
+    except KeyboardInterrupt:
+        term.info("Stopping to watch")
+    finally:
+        pool.terminate()
+        pool.join()
+        reporter.close()
+
+
 def main(args=None):
     """Main process of greenbone-docker"""
     term = ConsoleTerminal()
@@ -120,6 +278,38 @@ def main(args=None):
         term.info(f"troubadix version {__version__}")
         sys.exit(1)
 
+    if parsed_args.serve:
+        serve(parsed_args, term)
+        return
+
+    if parsed_args.lsp:
+        # pylint: disable=import-outside-toplevel
+        from troubadix.lsp import LanguageServer
+
+        sys.exit(
+            LanguageServer(
+                sys.stdin.buffer,
+                sys.stdout.buffer,
+                root=parsed_args.root,
+                excluded_plugins=parsed_args.excluded_plugins,
+                included_plugins=parsed_args.included_plugins,
+                ignore_warnings=parsed_args.ignore_warnings,
+            ).serve()
+        )
+
+    if parsed_args.client:
+        # pylint: disable=import-outside-toplevel
+        from troubadix.client import check, get_default_socket_path
+
+        sys.exit(
+            check(
+                parsed_args.client,
+                socket_path=parsed_args.socket or get_default_socket_path(),
+                verbose=parsed_args.verbose,
+                statistic=not parsed_args.no_statistic,
+            )
+        )
+
     # Full will run in the root directory of executing. (Like pwd)
     if parsed_args.full:
         cwd = Path.cwd()
@@ -129,6 +319,9 @@ def main(args=None):
         dirs = parsed_args.dirs
 
     files = None
+    sizes = None
+    deleted: List[Path] = []
+    stream = parsed_args.stream
     if dirs:
         include_patterns, exclude_patterns = generate_patterns(
             terminal=term,
@@ -137,31 +330,93 @@ def main(args=None):
             non_recursive=parsed_args.non_recursive,
         )
 
-        files = generate_file_list(
-            dirs=dirs,
-            exclude_patterns=exclude_patterns,
-            include_patterns=include_patterns,
+        finder = FileFinder(include_patterns, exclude_patterns)
+        if stream:
+            files = (path for path, _ in finder.iter_find(dirs))
+        else:
+            found = finder.find(dirs)
+            files = list(found)
+            sizes = {path: stat.st_size for path, stat in found.items()}
+
+    elif parsed_args.changed_since or parsed_args.staged:
+        include_patterns, exclude_patterns = generate_patterns(
+            terminal=term,
+            include_patterns=parsed_args.include_patterns,
+            exclude_patterns=parsed_args.exclude_patterns,
+            non_recursive=False,
+        )
+        files, deleted = from_git(
+            FileFinder(include_patterns, exclude_patterns),
+            revision=parsed_args.changed_since,
+            staged=parsed_args.staged,
+            term=term,
         )
 
     elif parsed_args.from_file:
         files = from_file(include_file=parsed_args.from_file, term=term)
 
+    elif parsed_args.stdin_separator:
+        files = from_stdin(parsed_args.stdin_separator)
+        stream = True
+
     elif parsed_args.files:
         files = parsed_args.files
 
-    if not files:
+    if stream:
+        # Peek at the first file. The other files are still being found
+        # while the first ones are checked.
+        files = iter(files or [])
+        first_file = next(files, None)
+        if first_file is not None:
+            files = itertools.chain([first_file], files)
+    else:
+        # Remove duplicate files but keep the order
+        files = list(dict.fromkeys(files or []))
+        first_file = files[0] if files else None
+        if first_file is None and parsed_args.with_dependents and deleted:
+            # the dependents of the deleted files need to be checked
+            first_file = deleted[0]
+
+    if first_file is None:
         term.warning("No files given/found.")
         sys.exit(1)
 
-    # Remove duplicate files
-    files = list(set(files))
-
     # Get the root of the nasl files
     if parsed_args.root:
         root = parsed_args.root
     else:
-        first_file = files[0].resolve()
-        root = get_root(first_file)
+        root = get_root(first_file.resolve())
+
+    if parsed_args.watch:
+        watch(parsed_args, term, dirs=dirs, finder=finder, root=root)
+        return
+
+    if parsed_args.with_dependents:
+        # pylint: disable=import-outside-toplevel
+        from troubadix.cache import DEFAULT_CACHE_DIR, ResultCache
+
+        index = DependencyIndex(
+            root, ResultCache(parsed_args.cache_dir or DEFAULT_CACHE_DIR)
+        )
+        index.update()
+
+        count = len(files)
+        files = index.expand(files, deleted)
+        term.info(f"Added {len(files) - count} dependent files")
+
+        if not files:
+            term.warning("No files given/found.")
+            sys.exit(1)
+
+    sinks = []
+    if parsed_args.jsonl_file:
+        sinks.append(JSONLinesSink(parsed_args.jsonl_file, root))
+    if parsed_args.sarif_file:
+        sinks.append(SARIFSink(parsed_args.sarif_file, root))
+    if parsed_args.junit_file:
+        sinks.append(JUnitSink(parsed_args.junit_file, root))
+    if parsed_args.diff_file:
+        sinks.append(PatchSink(parsed_args.diff_file))
 
     reporter = Reporter(
         term=term,
@@ -172,22 +427,48 @@ def main(args=None):
         statistic=True if not parsed_args.no_statistic else False,
         verbose=parsed_args.verbose,
         ignore_warnings=parsed_args.ignore_warnings,
+        sinks=sinks,
     )
 
+    profile = None
+    if parsed_args.profile_plugins is not None:
+        # pylint: disable=import-outside-toplevel
+        from troubadix.profiling import PluginProfile
+
+        profile = PluginProfile()
     runner = Runner(
         reporter=reporter,
         n_jobs=parsed_args.n_jobs,
         excluded_plugins=parsed_args.excluded_plugins,
         included_plugins=parsed_args.included_plugins,
         fix=parsed_args.fix,
+        diff=bool(parsed_args.diff_file),
         ignore_warnings=parsed_args.ignore_warnings,
         root=root,
+        cache_dir=parsed_args.cache_dir,
+        chunksize=parsed_args.chunksize,
+        profile=profile,
+        cprofile_dir=parsed_args.cprofile_dir,
+        tracemalloc_dir=parsed_args.tracemalloc_dir,
     )
 
-    term.info(f"Start linting {len(files)} files ... ")
+    if stream:
+        term.info("Start linting files ... ")
+    else:
+        term.info(f"Start linting {len(files)} files ... ")
+
+    try:
+        success = runner.run(files, sizes, stream)
+
+        if profile is not None:
+            reporter.report_profile(profile, parsed_args.profile_plugins)
+            if parsed_args.profile_plugins_json:
+                profile.write_json(parsed_args.profile_plugins_json)
+    finally:
+        reporter.close()
 
     # Return exit with 1 if error exist
-    if not runner.run(files):
+    if not success:
         sys.exit(1)
 
 
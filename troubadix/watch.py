@@ -0,0 +1,380 @@
+# Copyright (C) 2022 Greenbone Networks GmbH
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+""" Watch mode checking the changed files of directories continuously
+
+The files are found by polling the modification times and sizes of the files
+against the snapshot of the previous cycle, without requiring inotify or any
+other external dependency. Each cycle only checks the touched files and the
+VTs depending on them with a pool of worker processes kept for the whole
+session. The reduce step of a map reduce plugin is only run again if the
+facts of one of its files have been changed. Instead of the full report only
+the findings that are new or fixed since the previous cycle are printed.
+"""
+
+import datetime
+import os
+import time
+from multiprocessing.pool import Pool
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from pontos.terminal import Terminal
+
+from troubadix.cache import RACY_INTERVAL_NS
+from troubadix.dependency_index import DependencyIndex
+from troubadix.discovery import FileFinder
+from troubadix.helper import get_path_from_root
+from troubadix.plugin import FilesMapReducePlugin, FilesPluginContext
+from troubadix.reporter import get_result_type
+from troubadix.results import FileResults, Results
+from troubadix.runner import Runner
+
+# Seconds between two polls of the watched directories
+POLL_INTERVAL = 1.0
+
+# The modification time in nanoseconds and the size of each file
+Snapshot = Dict[Path, Tuple[int, int]]
+
+
+class WatchFinding(NamedTuple):
+    # the path of the file relative to the root directory
+    file: Optional[str]
+    line: Optional[int]
+    plugin: str
+    type: str
+    message: str
+
+    def sort_key(self) -> Tuple[str, int, str, str]:
+        return (self.file or "", self.line or 0, self.plugin, self.message)
+
+    def __str__(self) -> str:
+        location = self.file or "-"
+        if self.line is not None:
+            location = f"{location}:{self.line}"
+        return f"{location}: {self.plugin}: {self.message}"
+
+
+class CycleResult(NamedTuple):
+    # the files checked again, including the dependents of touched files
+    checked: List[Path]
+    deleted: List[Path]
+    new: List[WatchFinding]
+    fixed: List[WatchFinding]
+
+
+class Watcher:
+    """Checks the changed files of the watched directories in cycles
+
+    The plugins, the settings and the cache of the worker processes are taken
+    from the runner. The dependency index is updated with the touched files
+    of each cycle only. Only dependents within the watched directories are
+    checked, because the other files are not watched for being fixed.
+    """
+
+    def __init__(
+        self,
+        runner: Runner,
+        term: Terminal,
+        *,
+        dirs: Iterable[Path],
+        finder: FileFinder,
+        root: Path,
+        index: DependencyIndex,
+        verbose: int = 0,
+        ignore_warnings: bool = False,
+        interval: float = POLL_INTERVAL,
+    ) -> None:
+        self._runner = runner
+        self._term = term
+        self._dirs = list(dirs)
+        self._finder = finder
+        self._root = root
+        self._index = index
+        self._verbose = verbose
+        self._interval = interval
+        self._ignore_warnings = ignore_warnings
+
+        self._map_reduce_plugins = [
+            plugin_class
+            for plugin_class in runner.plugins.files_plugins
+            if issubclass(plugin_class, FilesMapReducePlugin)
+        ]
+        self._files_plugins = [
+            plugin_class
+            for plugin_class in runner.plugins.files_plugins
+            if plugin_class not in self._map_reduce_plugins
+        ]
+
+        self._snapshot: Snapshot = {}
+        # files modified shortly before the previous scan, which could have
+        # been modified again without changing their status
+        self._racy: Set[Path] = set()
+        self._started = False
+        # the facts of the map step by plugin name and file
+        self._facts: Dict[str, Dict[Path, Any]] = {
+            plugin_class.name: {} for plugin_class in self._map_reduce_plugins
+        }
+        self._file_findings: Dict[Path, Set[WatchFinding]] = {}
+        self._plugin_findings: Dict[str, Set[WatchFinding]] = {}
+
+    @property
+    def findings(self) -> Set[WatchFinding]:
+        """All current findings"""
+        findings = set()
+        for file_findings in self._file_findings.values():
+            findings.update(file_findings)
+        for plugin_findings in self._plugin_findings.values():
+            findings.update(plugin_findings)
+        return findings
+
+    def scan(self) -> Tuple[Snapshot, Set[Path]]:
+        """Get the status of all watched files
+
+        Returns:
+            the snapshot and the racy files, which need to be checked again
+            by the next cycle even if their status is unchanged
+        """
+        scanned_ns = time.time_ns()
+        snapshot = {
+            nasl_file: (stat.st_mtime_ns, stat.st_size)
+            for nasl_file, stat in self._finder.iter_find(self._dirs)
+        }
+        racy = {
+            nasl_file
+            for nasl_file, (mtime_ns, _) in snapshot.items()
+            if mtime_ns >= scanned_ns - RACY_INTERVAL_NS
+        }
+        return snapshot, racy
+
+    def _get_finding_path(self, path: Path) -> str:
+        try:
+            return get_path_from_root(path, self._root).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+    def _get_findings(
+        self, results: Results, file_path: Optional[Path] = None
+    ) -> Set[WatchFinding]:
+        findings = set()
+        for plugin_name, plugin_results in results.plugin_results.items():
+            for result in plugin_results:
+                file = result.file or file_path
+                findings.add(
+                    WatchFinding(
+                        self._get_finding_path(file) if file else None,
+                        result.line,
+                        result.plugin or plugin_name,
+                        get_result_type(result),
+                        result.message,
+                    )
+                )
+        return findings
+
+    def _get_changes(self, snapshot: Snapshot) -> Tuple[List[Path], List[Path]]:
+        if not self._started:
+            return list(snapshot), []
+
+        changed = [
+            nasl_file
+            for nasl_file, state in snapshot.items()
+            if self._snapshot.get(nasl_file) != state or nasl_file in self._racy
+        ]
+        deleted = [
+            nasl_file
+            for nasl_file in self._snapshot
+            if nasl_file not in snapshot
+        ]
+        return changed, deleted
+
+    def _expand(
+        self, snapshot: Snapshot, changed: List[Path], deleted: List[Path]
+    ) -> List[Path]:
+        """Add the watched dependents of the touched files"""
+        self._index.update_files(changed, deleted)
+
+        watched = {nasl_file.resolve(): nasl_file for nasl_file in snapshot}
+        files = {}
+        for nasl_file in self._index.expand(changed, deleted):
+            watched_file = watched.get(nasl_file.resolve())
+            if watched_file is not None:
+                files[watched_file] = None
+        return list(files)
+
+    def _reduce(
+        self, files: List[Path], changed_plugins: Iterable[str]
+    ) -> None:
+        context = FilesPluginContext(root=self._root, nasl_files=files)
+        for plugin_class in self._map_reduce_plugins:
+            if plugin_class.name not in changed_plugins:
+                continue
+
+            facts = self._facts[plugin_class.name]
+            results = Results(ignore_warnings=self._ignore_warnings)
+            results.add_plugin_results(
+                plugin_class.name,
+                plugin_class(context).reduce(
+                    (nasl_file, facts[nasl_file])
+                    for nasl_file in files
+                    if nasl_file in facts
+                ),
+            )
+            self._plugin_findings[plugin_class.name] = self._get_findings(
+                results
+            )
+
+        # other plugins checking all files at once can't be run
+        # incrementally
+        for plugin_class in self._files_plugins:
+            results = Results(ignore_warnings=self._ignore_warnings)
+            results.add_plugin_results(
+                plugin_class.name, plugin_class(context).run()
+            )
+            self._plugin_findings[plugin_class.name] = self._get_findings(
+                results
+            )
+
+    def cycle(self, pool: Pool) -> Optional[CycleResult]:
+        """Check the files touched since the previous cycle
+
+        The first cycle checks all files.
+
+        Returns:
+            the result of the cycle or None if no file has been touched
+        """
+        snapshot, racy = self.scan()
+        changed, deleted = self._get_changes(snapshot)
+        touched = any(
+            self._snapshot.get(nasl_file) != snapshot[nasl_file]
+            for nasl_file in changed
+        )
+        started = self._started
+        self._snapshot = snapshot
+        self._racy = racy
+        self._started = True
+
+        if started and not changed and not deleted:
+            return None
+
+        if started:
+            files = self._expand(snapshot, changed, deleted)
+        else:
+            self._index.update()
+            files = changed
+        previous = self.findings
+
+        changed_plugins = set()
+        for nasl_file in deleted:
+            self._file_findings.pop(nasl_file, None)
+            for name, facts in self._facts.items():
+                if nasl_file in facts:
+                    del facts[nasl_file]
+                    changed_plugins.add(name)
+
+        results: FileResults
+        for results in self._runner.check_files(files, pool):
+            nasl_file = results.file_path
+            self._file_findings[nasl_file] = self._get_findings(
+                results, nasl_file
+            )
+            for name, facts in results.plugin_facts.items():
+                plugin_facts = self._facts[name]
+                if nasl_file not in plugin_facts or (
+                    plugin_facts[nasl_file] != facts
+                ):
+                    plugin_facts[nasl_file] = facts
+                    changed_plugins.add(name)
+
+        # keep the order of the files stable for the reduce step
+        self._reduce(sorted(snapshot), changed_plugins)
+
+        current = self.findings
+        new = sorted(current - previous, key=WatchFinding.sort_key)
+        fixed = sorted(previous - current, key=WatchFinding.sort_key)
+        if started and not touched and not deleted and not new and not fixed:
+            # only racy files have been checked again without a difference
+            return None
+
+        return CycleResult(files, deleted, new, fixed)
+
+    def _report_finding(self, prefix: str, finding: WatchFinding) -> None:
+        message = f"{prefix} {finding.type}: {finding}"
+        if prefix == "fixed":
+            self._term.ok(message)
+        elif finding.type == "error":
+            self._term.error(message)
+        elif finding.type == "warning":
+            self._term.warning(message)
+        else:
+            self._term.info(message)
+
+    def report(
+        self, result: CycleResult, duration: float, first: bool = False
+    ) -> None:
+        """Print the new and fixed findings of a cycle
+
+        The findings of the first cycle are only listed in verbose mode.
+        """
+        elapsed = datetime.timedelta(seconds=duration)
+        if first:
+            self._term.info(f"Checked {len(result.checked)} files in {elapsed}")
+        else:
+            message = f"Checked {len(result.checked)} files"
+            if result.deleted:
+                message = f"{message}, {len(result.deleted)} deleted"
+            self._term.info(f"{message} in {elapsed}")
+
+        if not first or self._verbose > 0:
+            with self._term.indent():
+                for finding in result.new:
+                    self._report_finding("new", finding)
+                for finding in result.fixed:
+                    self._report_finding("fixed", finding)
+
+        findings = self.findings
+        errors = sum(1 for finding in findings if finding.type == "error")
+        warnings = sum(1 for finding in findings if finding.type == "warning")
+        self._term.info(
+            f"{len(result.new)} new, {len(result.fixed)} fixed, "
+            f"{errors} errors and {warnings} warnings in total"
+        )
+
+    def watch(self, pool: Pool, cycles: Optional[int] = None) -> None:
+        """Check the touched files until interrupted
+
+        Arguments:
+            pool    the pool of worker processes kept for all cycles
+            cycles  stop after this number of cycles, mainly for testing
+        """
+        count = 0
+        while cycles is None or count < cycles:
+            if count:
+                time.sleep(self._interval)
+
+            first = not self._started
+            start = time.monotonic()
+            result = self.cycle(pool)
+            if result is not None:
+                self.report(result, time.monotonic() - start, first)
+            count += 1
+
+            if first:
+                self._term.info(
+                    f"Watching {', '.join(map(os.fspath, self._dirs))} for "
+                    "changes. Press CTRL+C to stop."
+                )